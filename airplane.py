@@ -7,6 +7,7 @@
 from typing import List, Optional
 from decimal import Decimal
 from utils import get_connection
+from session_helpers.statements import prepared_cursor
 
 class Airplane:
     def __init__(
@@ -96,21 +97,10 @@ def init_airplanes(save_id: int, include_sold: bool = False) -> List[Airplane]:
     """
     global Aircrafts
     yhteys = get_connection()
-    kursori = yhteys.cursor(dictionary=True)
+    kursori = prepared_cursor(yhteys, dictionary=True)
     try:
-        where_sold = "" if include_sold else "AND a.sold_day IS NULL"
-        query = f"""
-            SELECT
-                a.aircraft_id, a.model_code, a.base_level, a.current_airport_ident, a.registration,
-                a.nickname, a.acquired_day, a.purchase_price, a.condition_percent, a.status,
-                a.hours_flown, a.sold_day, a.sale_price, a.save_id, a.base_id,
-                am.model_name
-            FROM aircraft a
-            JOIN aircraft_models am ON a.model_code = am.model_code
-            WHERE a.save_id = %s {where_sold}
-            ORDER BY a.aircraft_id ASC
-        """
-        kursori.execute(query, (save_id,))
+        statement = "aircraft.list_for_save" if include_sold else "aircraft.list_unsold_for_save"
+        kursori.execute(statement, (save_id,))
         rows = kursori.fetchall() or []
 
         Aircrafts = []
@@ -164,23 +154,14 @@ def upgrade_airplane(aircraft_id: int, upgrade_code: str, level: int, current_da
     Lisää tai päivittää koneen upgrade-tason aircraft_upgrades-taulussa.
     """
     yhteys = get_connection()
-    cur = yhteys.cursor()
+    cur = prepared_cursor(yhteys)
     try:
-        cur.execute(
-            "SELECT aircraft_upgrade_id, level FROM aircraft_upgrades WHERE aircraft_id = %s AND upgrade_code = %s",
-            (aircraft_id, upgrade_code),
-        )
+        cur.execute("upgrade.find", (aircraft_id, upgrade_code))
         row = cur.fetchone()
         if row:
-            cur.execute(
-                "UPDATE aircraft_upgrades SET level = %s, installed_day = %s WHERE aircraft_upgrade_id = %s",
-                (level, current_day, row[0]),
-            )
+            cur.execute("upgrade.set_level", (level, current_day, row[0]))
         else:
-            cur.execute(
-                "INSERT INTO aircraft_upgrades (aircraft_id, upgrade_code, level, installed_day) VALUES (%s, %s, %s, %s)",
-                (aircraft_id, upgrade_code, level, current_day),
-            )
+            cur.execute("upgrade.insert", (aircraft_id, upgrade_code, level, current_day))
         yhteys.commit()
     finally:
         try:
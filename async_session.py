@@ -0,0 +1,420 @@
+# async_session.py
+# ----------------
+# Asynkroninen datapolku (asyncio + aiomysql) GameSessionin kuumille operaatioille:
+#   advance_to_next_day, start_new_task, laivastolistauksen datahaku ja kuukausilaskut.
+#
+# - Pelisäännöt ovat yhteisiä synkronisen polun kanssa (session_helpers.rules); tässä
+#   moduulissa on vain I/O. Näin yksi tapahtumasilmukka voi ajaa satoja sessioita ilman
+#   säiettä per odottava pelaaja.
+# - Jokaisella sessiolla on oma random.Random(rng_seed): lomittuvat sessiot eivät sotke
+#   toistensa satunnaislukuvirtaa, joten siemen pysyy deterministisenä.
+# - Valikot/tulostukset jäävät GameSessionille; tämä luokka palauttaa pelkkää dataa.
+
+import random
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import aiomysql
+
+from session_helpers import (
+    _to_dec,
+    build_task_offer,
+    eco_multiplier_for_level,
+    haversine_km,
+    is_billing_day,
+    monthly_bill,
+    nearest_point,
+    return_flight,
+    settle_arrival,
+    speed_km_per_day,
+)
+from session_helpers.aircraft import with_effective_eco
+from session_helpers.statements import FLEET_OVERVIEW_SQL, STATS_ADD_SQL
+from session_helpers.stats import arrival_stats, merge_stats, stats_params
+from upgrade_config import UPGRADE_CODE, SURVIVAL_TARGET_DAYS
+
+
+async def _fetchall(kursori, sql: str, params=()) -> List[dict]:
+    await kursori.execute(sql, params)
+    return list(await kursori.fetchall() or [])
+
+
+async def _fetchone(kursori, sql: str, params=()) -> Optional[dict]:
+    await kursori.execute(sql, params)
+    return await kursori.fetchone()
+
+
+class AsyncGameSession:
+    """
+    Yhden game_saves-rivin asynkroninen vastine. Pitää kassan/päivän/statuksen muistissa
+    kuten GameSession ja käyttää jaettua aiomysql-poolia.
+    """
+
+    def __init__(
+            self,
+            pool,
+            save_id: int,
+            current_day: int,
+            cash: Decimal,
+            status: str,
+            rng_seed: Optional[int] = None,
+    ):
+        self.pool = pool
+        self.save_id = int(save_id)
+        self.current_day = int(current_day)
+        self.cash = _to_dec(cash)
+        self.status = status
+        self.rng_seed = rng_seed
+        self.rng = random.Random(rng_seed)
+        # Tukikohtien koordinaatit ja lähin tukikohta per kenttä (tällä polulla ei luoda tukikohtia)
+        self._base_coords: Optional[Dict[str, Optional[tuple]]] = None
+        self._nearest_base: Dict[str, tuple] = {}
+        self._rtb_swept = False
+
+    @classmethod
+    async def load(cls, pool, save_id: int) -> "AsyncGameSession":
+        """Lataa tallennuksen tilan game_saves-taulusta."""
+        async with pool.acquire() as yhteys:
+            async with yhteys.cursor(aiomysql.DictCursor) as kursori:
+                r = await _fetchone(
+                    kursori,
+                    "SELECT current_day, cash, status, rng_seed FROM game_saves WHERE save_id = %s",
+                    (save_id,),
+                )
+        if not r:
+            raise ValueError(f"Tallennetta save_id={save_id} ei löytynyt.")
+        return cls(pool, save_id, r["current_day"], r["cash"], r["status"], r.get("rng_seed"))
+
+    # ---------- Laivasto ----------
+
+    async def fetch_fleet_overview(self) -> List[dict]:
+        """Laivastolistauksen data (sama kysely ja ECO-laskenta kuin synkronisessa polussa)."""
+        async with self.pool.acquire() as yhteys:
+            async with yhteys.cursor(aiomysql.DictCursor) as kursori:
+                rows = await _fetchall(kursori, FLEET_OVERVIEW_SQL, (self.save_id, UPGRADE_CODE, self.save_id))
+        return with_effective_eco(rows)
+
+    async def fetch_idle_planes(self) -> List[dict]:
+        """Tehtävään vapaat koneet (IDLE ja täydessä kunnossa)."""
+        async with self.pool.acquire() as yhteys:
+            async with yhteys.cursor(aiomysql.DictCursor) as kursori:
+                return await _fetchall(
+                    kursori,
+                    """
+                    SELECT a.aircraft_id, a.registration, a.current_airport_ident, a.model_code,
+                           am.model_name, am.base_cargo_kg, am.cruise_speed_kts, am.eco_fee_multiplier,
+                           COALESCE((SELECT MAX(au.level) FROM aircraft_upgrades au
+                                     WHERE au.aircraft_id = a.aircraft_id AND au.upgrade_code = %s), 0) AS eco_level
+                    FROM aircraft a
+                             JOIN aircraft_models am ON am.model_code = a.model_code
+                    WHERE a.save_id = %s
+                      AND a.status = 'IDLE'
+                      AND a.condition_percent >= 100
+                    ORDER BY a.aircraft_id
+                    """,
+                    (UPGRADE_CODE, self.save_id),
+                )
+
+    # ---------- Tehtävät ----------
+
+    async def random_task_offers_for_plane(self, plane: dict, count: int = 5) -> List[dict]:
+        """Generoi tarjoukset koneelle samoilla säännöillä kuin GameSession."""
+        dep_ident = plane["current_airport_ident"]
+        eff_eco = Decimal(str(eco_multiplier_for_level(plane.get("eco_fee_multiplier") or 1.0,
+                                                       int(plane.get("eco_level") or 0))))
+        async with self.pool.acquire() as yhteys:
+            async with yhteys.cursor(aiomysql.DictCursor) as kursori:
+                rows = await _fetchall(
+                    kursori,
+                    """
+                    SELECT ident, name, latitude_deg, longitude_deg
+                    FROM airport
+                    WHERE ident <> %s
+                      AND type IN ('small_airport', 'medium_airport', 'large_airport')
+                      AND latitude_deg IS NOT NULL
+                      AND longitude_deg IS NOT NULL
+                    """,
+                    (dep_ident,),
+                )
+                dep = await _fetchone(
+                    kursori,
+                    "SELECT latitude_deg, longitude_deg FROM airport WHERE ident = %s",
+                    (dep_ident,),
+                )
+        if not dep or dep["latitude_deg"] is None:
+            return []
+
+        dests = rows if len(rows) <= count * 2 else self.rng.sample(rows, count * 2)
+        speed_per_day = speed_km_per_day(plane.get("cruise_speed_kts"))
+        offers = []
+        for d in dests[:count]:
+            dist_km = haversine_km(float(dep["latitude_deg"]), float(dep["longitude_deg"]),
+                                   float(d["latitude_deg"]), float(d["longitude_deg"]))
+            offers.append(build_task_offer(d, dist_km, plane.get("base_cargo_kg"), speed_per_day,
+                                           eff_eco, self.current_day, rng=self.rng))
+        return offers
+
+    async def start_new_task(self, plane: dict, offer: dict) -> int:
+        """Luo contract + flight ja merkitse kone BUSY yhdessä transaktiossa. Palauttaa contract_id:n."""
+        now_day = self.current_day
+        total_dist = float(offer["distance_km"]) * offer["trips"]
+        arr_day = now_day + offer["total_days"]
+
+        async with self.pool.acquire() as yhteys:
+            await yhteys.begin()
+            try:
+                async with yhteys.cursor() as kursori:
+                    await kursori.execute(
+                        """
+                        INSERT INTO contracts (payload_kg, reward, penalty, priority,
+                                               created_day, deadline_day, accepted_day, completed_day,
+                                               status, lost_packages, damaged_packages,
+                                               save_id, aircraft_id, ident, event_id)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        """,
+                        (
+                            offer["payload_kg"], offer["reward"], offer["penalty"], "NORMAL",
+                            now_day, offer["deadline"], now_day, None,
+                            "IN_PROGRESS", 0, 0,
+                            self.save_id, plane["aircraft_id"], offer["dest_ident"], None,
+                        ),
+                    )
+                    contract_id = kursori.lastrowid
+                    await kursori.execute(
+                        """
+                        INSERT INTO flights (created_day, dep_day, arrival_day, status, distance_km, schedule_delay_min,
+                                             emission_kg_co2, eco_fee, dep_ident, arr_ident, aircraft_id, save_id,
+                                             contract_id)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        """,
+                        (
+                            now_day, now_day, arr_day, "ENROUTE", total_dist, 0,
+                            0.0, Decimal("0.00"), plane["current_airport_ident"], offer["dest_ident"],
+                            plane["aircraft_id"], self.save_id, contract_id,
+                        ),
+                    )
+                    await kursori.execute(
+                        "UPDATE aircraft SET status = 'BUSY' WHERE aircraft_id = %s",
+                        (plane["aircraft_id"],),
+                    )
+                    await kursori.execute(STATS_ADD_SQL, stats_params(self.save_id, {"contract_flights": 1}))
+                await yhteys.commit()
+                return int(contract_id)
+            except Exception:
+                await yhteys.rollback()
+                raise
+
+    # ---------- Seuraava päivä + kuukausilaskut ----------
+
+    async def advance_to_next_day(self) -> dict:
+        """
+        Asynkroninen vastine GameSession.advance_to_next_day(silent=True): saapumiset ja
+        vieraille kentille päättyneiden sopimuslentojen paluulennot yhdessä transaktiossa,
+        kuukausilaskut ja voittoraja. Ensimmäisenä päivänä kertakierros jumiin jääneille koneille.
+        """
+        if not self._rtb_swept:
+            await self._initiate_return_flights_for_idle_aircraft()
+            self._rtb_swept = True
+
+        new_day = self.current_day + 1
+        total_delta = Decimal("0.00")
+        day_stats: Dict[str, object] = {}
+
+        async with self.pool.acquire() as yhteys:
+            await yhteys.begin()
+            try:
+                async with yhteys.cursor(aiomysql.DictCursor) as kursori:
+                    await kursori.execute(
+                        "UPDATE game_saves SET current_day = %s, updated_at = %s WHERE save_id = %s",
+                        (new_day, datetime.utcnow(), self.save_id),
+                    )
+                    arrivals = await _fetchall(
+                        kursori,
+                        """
+                        SELECT f.flight_id, f.contract_id, f.aircraft_id,
+                               f.arr_ident, f.arrival_day, f.dep_day, f.status AS flight_status,
+                               c.deadline_day, c.reward, c.penalty,
+                               am.cruise_speed_kts, am.co2_kg_per_km
+                        FROM flights f
+                                 LEFT JOIN contracts c ON c.contractId = f.contract_id
+                                 JOIN aircraft a ON a.aircraft_id = f.aircraft_id
+                                 JOIN aircraft_models am ON am.model_code = a.model_code
+                        WHERE f.save_id = %s
+                          AND f.status IN ('ENROUTE', 'ENROUTE_RTB')
+                          AND f.arrival_day <= %s
+                        """,
+                        (self.save_id, new_day),
+                    )
+                    for flight_data in arrivals:
+                        outcome = settle_arrival(flight_data, new_day)
+                        merge_stats(day_stats, **arrival_stats(outcome))
+                        aircraft_id = flight_data["aircraft_id"]
+                        if outcome["hours_to_add"] > 0:
+                            await kursori.execute(
+                                "UPDATE aircraft SET hours_flown = hours_flown + %s WHERE aircraft_id = %s",
+                                (outcome["hours_to_add"], aircraft_id),
+                            )
+                        await kursori.execute(
+                            "UPDATE flights SET status = %s WHERE flight_id = %s",
+                            (outcome["flight_status"], flight_data["flight_id"]),
+                        )
+                        await kursori.execute(
+                            "UPDATE aircraft SET status = 'IDLE', current_airport_ident = %s WHERE aircraft_id = %s",
+                            (flight_data["arr_ident"], aircraft_id),
+                        )
+                        if flight_data["flight_status"] == "ENROUTE":
+                            bases = await self._load_base_coords(kursori)
+                            if flight_data["arr_ident"] not in bases:
+                                await self._schedule_return_flight(kursori, flight_data, new_day, day_stats)
+                        if outcome["contract_status"] is not None:
+                            await kursori.execute(
+                                "UPDATE contracts SET status = %s, completed_day = %s WHERE contractId = %s",
+                                (outcome["contract_status"], new_day, flight_data["contract_id"]),
+                            )
+                            total_delta += outcome["earned"]
+
+                    new_cash = self.cash
+                    if total_delta != Decimal("0.00"):
+                        r = await _fetchone(
+                            kursori, "SELECT cash FROM game_saves WHERE save_id = %s FOR UPDATE", (self.save_id,)
+                        )
+                        new_cash = (_to_dec(r["cash"]) + total_delta).quantize(Decimal("0.01"))
+                        await kursori.execute(
+                            "UPDATE game_saves SET cash = %s WHERE save_id = %s", (new_cash, self.save_id)
+                        )
+                    if day_stats:
+                        await kursori.execute(STATS_ADD_SQL, stats_params(self.save_id, day_stats))
+                await yhteys.commit()
+            except Exception:
+                await yhteys.rollback()
+                raise
+
+        self.cash = new_cash
+        self.current_day = new_day
+
+        if is_billing_day(self.current_day) and self.status == "ACTIVE":
+            await self.process_monthly_bills()
+        if self.current_day >= SURVIVAL_TARGET_DAYS and self.status == "ACTIVE":
+            await self._set_status("VICTORY")
+
+        return {"arrivals": len(arrivals), "earned": total_delta}
+
+    async def process_monthly_bills(self) -> dict:
+        """Veloita kuukausilaskut (sama laskukaava kuin GameSession). Palauttaa laskun tiedot."""
+        async with self.pool.acquire() as yhteys:
+            async with yhteys.cursor(aiomysql.DictCursor) as kursori:
+                r = await _fetchone(
+                    kursori,
+                    """
+                    SELECT COUNT(*)                                                 AS total,
+                           SUM(CASE WHEN am.category = 'STARTER' THEN 1 ELSE 0 END) AS starters
+                    FROM aircraft a
+                             JOIN aircraft_models am ON am.model_code = a.model_code
+                    WHERE a.save_id = %s
+                      AND (a.sold_day IS NULL OR a.sold_day = 0)
+                    """,
+                    (self.save_id,),
+                )
+                r = r or {"total": 0, "starters": 0}
+                base_bill, total_bill = monthly_bill(int(r["total"] or 0), int(r["starters"] or 0), self.current_day)
+
+                if self.cash < total_bill:
+                    await self._set_status("BANKRUPT")
+                    return {"base_bill": base_bill, "total_bill": total_bill, "paid": False}
+
+                new_cash = (self.cash - total_bill).quantize(Decimal("0.01"))
+                await kursori.execute(
+                    "UPDATE game_saves SET cash = %s, updated_at = %s WHERE save_id = %s",
+                    (new_cash, datetime.utcnow(), self.save_id),
+                )
+                await kursori.execute(STATS_ADD_SQL, stats_params(self.save_id, {"spend_bills": total_bill}))
+        self.cash = new_cash
+        return {"base_bill": base_bill, "total_bill": total_bill, "paid": True}
+
+    async def _load_base_coords(self, kursori) -> Dict[str, Optional[tuple]]:
+        """Omien tukikohtien koordinaatit (haetaan kerran sessiota kohden)."""
+        if self._base_coords is None:
+            bases = await _fetchall(
+                kursori,
+                """
+                SELECT ob.base_ident, ap.latitude_deg, ap.longitude_deg
+                FROM owned_bases ob
+                         LEFT JOIN airport ap ON ap.ident = ob.base_ident
+                WHERE ob.save_id = %s
+                """,
+                (self.save_id,),
+            )
+            self._base_coords = {
+                b["base_ident"]: ((float(b["latitude_deg"]), float(b["longitude_deg"]))
+                                  if b["latitude_deg"] is not None else None)
+                for b in bases
+            }
+        return self._base_coords
+
+    async def _schedule_return_flight(self, kursori, plane: dict, day: int, stats: Dict[str, object]) -> bool:
+        """Paluulento lähimpään tukikohtaan kutsujan transaktiossa (kuten GameSession._schedule_return_flight)."""
+        ident = plane.get("arr_ident") or plane["current_airport_ident"]
+        nearest = self._nearest_base.get(ident)
+        if nearest is None:
+            base_coords = await self._load_base_coords(kursori)
+            r = await _fetchone(
+                kursori, "SELECT latitude_deg, longitude_deg FROM airport WHERE ident = %s", (ident,)
+            )
+            if r is None or r["latitude_deg"] is None or not base_coords:
+                nearest = (None, float("inf"))
+            else:
+                nearest = nearest_point((float(r["latitude_deg"]), float(r["longitude_deg"])), base_coords)
+            self._nearest_base[ident] = nearest
+        closest, min_dist = nearest
+        if not closest:
+            return False
+        arrival_day, emissions = return_flight(min_dist, plane.get("cruise_speed_kts"), plane.get("co2_kg_per_km"), day)
+        await kursori.execute(
+            "INSERT INTO flights (created_day, dep_day, arrival_day, status, distance_km, emission_kg_co2, dep_ident, arr_ident, aircraft_id, save_id, contract_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NULL)",
+            (day, day, arrival_day, "ENROUTE_RTB", min_dist, emissions, ident, closest, plane["aircraft_id"],
+             self.save_id),
+        )
+        await kursori.execute(
+            "UPDATE aircraft SET status = 'BUSY_RTB' WHERE aircraft_id = %s",
+            (plane["aircraft_id"],),
+        )
+        merge_stats(stats, rtb_flights=1, total_emissions_kg=Decimal(str(emissions)))
+        return True
+
+    async def _initiate_return_flights_for_idle_aircraft(self) -> int:
+        """Lähetä vierailla kentillä joutilaat koneet lähimpään tukikohtaan. Palauttaa luotujen lentojen määrän."""
+        created = 0
+        async with self.pool.acquire() as yhteys:
+            async with yhteys.cursor(aiomysql.DictCursor) as kursori:
+                base_coords = await self._load_base_coords(kursori)
+                if not base_coords:
+                    return 0
+                placeholders = ",".join(["%s"] * len(base_coords))
+                stranded = await _fetchall(
+                    kursori,
+                    f"""
+                    SELECT a.aircraft_id, a.current_airport_ident, am.cruise_speed_kts, am.co2_kg_per_km
+                    FROM aircraft a
+                             JOIN aircraft_models am ON a.model_code = am.model_code
+                    WHERE a.save_id = %s AND a.status = 'IDLE'
+                      AND a.current_airport_ident NOT IN ({placeholders})
+                    """,
+                    tuple([self.save_id] + list(base_coords.keys())),
+                )
+                sweep_stats: Dict[str, object] = {}
+                for plane in stranded:
+                    if await self._schedule_return_flight(kursori, plane, self.current_day, sweep_stats):
+                        created += 1
+                if sweep_stats:
+                    await kursori.execute(STATS_ADD_SQL, stats_params(self.save_id, sweep_stats))
+        return created
+
+    async def _set_status(self, new_status: str) -> None:
+        async with self.pool.acquire() as yhteys:
+            async with yhteys.cursor() as kursori:
+                await kursori.execute(
+                    "UPDATE game_saves SET status = %s, updated_at = %s WHERE save_id = %s",
+                    (new_status, datetime.utcnow(), self.save_id),
+                )
+        self.status = new_status
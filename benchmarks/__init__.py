@@ -0,0 +1 @@
+"""Benchmarks for the simulation hot paths. Run modules with `python -m benchmarks.<name>`."""
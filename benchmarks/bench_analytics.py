@@ -0,0 +1,111 @@
+"""
+Fleet analytics at scale: load + group-by time of session_helpers/analytics.py.
+
+Creates a synthetic save (benchmarks/synthetic_save.py) with --aircraft aircraft and
+--history-flights past flights (about 80 % of them contract flights with a settled contract),
+then runs fleet_analytics on it --repeat times. Reports the streaming load time, the
+vectorized compute time and flight rows per second of the best run.
+
+    python -m benchmarks.bench_analytics --aircraft 2000 --history-flights 1000000
+    python -m benchmarks.bench_analytics --history-flights 1000000 --max-seconds 10 --out analytics.json
+
+Exits with status 1 if the best total time exceeds --max-seconds.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import utils
+from benchmarks.synthetic_save import ensure_airports, generate_save
+
+DEFAULT_MAX_SECONDS = 15.0
+
+
+def run(aircraft: int, history_flights: int, airports: int, repeat: int, seed: int) -> dict:
+    from session_helpers.analytics import fleet_analytics
+
+    ensure_airports(airports, seed)
+    t0 = time.perf_counter()
+    save = generate_save(aircraft, seed=seed, history_flights=history_flights)
+    build_s = time.perf_counter() - t0
+    print(f"… tallennus {save['save_id']} luotu {build_s:.1f} s", file=sys.stderr)
+
+    runs = []
+    for _ in range(max(1, repeat)):
+        report = fleet_analytics(save["save_id"], save["day"])
+        runs.append({"load_s": round(report["load_s"], 3), "compute_s": round(report["compute_s"], 3)})
+        print(f"… luku {report['load_s']:.2f} s, laskenta {report['compute_s']:.3f} s", file=sys.stderr)
+    best = min(runs, key=lambda r: r["load_s"] + r["compute_s"])
+    total = best["load_s"] + best["compute_s"]
+    return {
+        "save_id": save["save_id"],
+        "rows": save["rows"],
+        "build_s": round(build_s, 2),
+        "flights": report["flights"],
+        "contracts": report["contracts"],
+        "runs": runs,
+        "best_s": round(total, 3),
+        "flights_per_s": round(report["flights"] / total) if total else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Laivastoanalytiikan luku- ja laskenta-aika suurella tallennuksella.")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--sqlite-path", help="SQLite-tiedosto (oletus: väliaikainen tiedosto)")
+    parser.add_argument("--aircraft", type=int, default=2_000)
+    parser.add_argument("--history-flights", type=int, default=1_000_000)
+    parser.add_argument("--airports", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=666)
+    parser.add_argument("--max-seconds", type=float, default=DEFAULT_MAX_SECONDS,
+                        help="sallittu kokonaisaika (luku + laskenta) sekunteina")
+    parser.add_argument("--out", help="tulokset JSON-tiedostoon (oletus: stdout)")
+    args = parser.parse_args(argv)
+
+    utils.DB_BACKEND = args.backend
+    tmpdir = None
+    if args.backend == "sqlite":
+        if not args.sqlite_path:
+            tmpdir = tempfile.mkdtemp(prefix="afc666-analytics-")
+            args.sqlite_path = os.path.join(tmpdir, "bench.db")
+        utils.SQLITE_PATH = args.sqlite_path
+    try:
+        result = run(args.aircraft, args.history_flights, args.airports, args.repeat, args.seed)
+    finally:
+        if tmpdir:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "max_seconds": args.max_seconds,
+        "passed": result["best_s"] <= args.max_seconds,
+        "result": result,
+    }
+    text = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if not report["passed"]:
+        print(f"❌ Analytiikka {result['best_s']:.2f} s > raja {args.max_seconds:g} s", file=sys.stderr)
+        return 1
+    print(f"✅ Analytiikka {result['best_s']:.2f} s ({result['flights']} lentoa, raja {args.max_seconds:g} s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
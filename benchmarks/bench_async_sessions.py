@@ -0,0 +1,110 @@
+"""
+Sessions-per-core benchmark for the asyncio data-access path.
+
+Creates N fresh saves (one base + starter plane each), then drives all of them from a
+single event loop: every simulated day each session starts a task if a plane is idle and
+advances the day. Reports day-advances per CPU second and how many sessions one core
+could serve at a given per-session action rate.
+
+    python -m benchmarks.bench_async_sessions --sessions 200 --days 30
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from async_session import AsyncGameSession
+from utils import get_async_pool
+
+
+async def _create_save(pool, idx: int, seed: int) -> int:
+    now = datetime.utcnow()
+    async with pool.acquire() as yhteys:
+        async with yhteys.cursor() as kursori:
+            await kursori.execute(
+                """
+                INSERT INTO game_saves (player_name, current_day, cash, difficulty, status, rng_seed, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                (f"bench-{idx}", 1, Decimal("300000.00"), "NORMAL", "ACTIVE", seed + idx, now, now),
+            )
+            save_id = kursori.lastrowid
+            await kursori.execute(
+                """
+                INSERT INTO owned_bases (save_id, base_ident, base_name, acquired_day, purchase_cost, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                (save_id, "EFHK", "Helsinki-Vantaa", 1, Decimal("90000.00"), now, now),
+            )
+            await kursori.execute(
+                """
+                INSERT INTO aircraft (model_code, base_level, current_airport_ident, registration, acquired_day,
+                                      purchase_price, condition_percent, status, hours_flown, save_id, base_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                ("DC3FREE", 1, "EFHK", f"B-{idx:05d}", 1, Decimal("0.00"), 100, "IDLE", 0, save_id,
+                 kursori.lastrowid),
+            )
+    return int(save_id)
+
+
+async def _play(session: AsyncGameSession, days: int) -> int:
+    advanced = 0
+    for _ in range(days):
+        for plane in await session.fetch_idle_planes():
+            offers = await session.random_task_offers_for_plane(plane, count=3)
+            if offers:
+                await session.start_new_task(plane, offers[0])
+        await session.advance_to_next_day()
+        advanced += 1
+        if session.status != "ACTIVE":
+            break
+    return advanced
+
+
+async def run(sessions: int, days: int, seed: int, pool_size: int, target_rate: float) -> dict:
+    pool = await get_async_pool(minsize=1, maxsize=pool_size)
+    try:
+        save_ids = [await _create_save(pool, i, seed) for i in range(sessions)]
+        loaded = [await AsyncGameSession.load(pool, sid) for sid in save_ids]
+
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        advanced = await asyncio.gather(*(_play(s, days) for s in loaded))
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+    finally:
+        pool.close()
+        await pool.wait_closed()
+
+    total = sum(advanced)
+    per_cpu_second = total / cpu if cpu > 0 else float("inf")
+    return {
+        "sessions": sessions,
+        "days": days,
+        "day_advances": total,
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu, 3),
+        "day_advances_per_wall_s": round(total / wall, 1) if wall > 0 else None,
+        "day_advances_per_cpu_s": round(per_cpu_second, 1),
+        "target_actions_per_session_s": target_rate,
+        "sessions_per_core": int(per_cpu_second / target_rate) if target_rate > 0 else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Async GameSession sessions-per-core benchmark.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=666)
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--target-rate", type=float, default=0.2,
+                        help="Pelaajan toimintoja sekunnissa per sessio (sessions_per_core-laskentaan).")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.sessions, args.days, args.seed, args.pool_size, args.target_rate))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Clubhouse odds check: exact expected value vs NumPy Monte Carlo for every clubhouse game.
+
+For each game in session_helpers.clubhouse.CLUBHOUSE_GAMES, runs --spins simulated rounds
+(seeded) and prints the exact EV, the Monte Carlo mean ± standard error, the house edge
+and the simulation time.
+
+    python -m benchmarks.bench_clubhouse
+    python -m benchmarks.bench_clubhouse --spins 1000000 --seed 1
+"""
+
+import argparse
+import time
+
+from session_helpers.clubhouse import CLUBHOUSE_GAMES, monte_carlo
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Kerhohuoneen kertoimet: tarkka EV ja Monte Carlo.")
+    parser.add_argument("--spins", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=666)
+    args = parser.parse_args(argv)
+
+    for game in CLUBHOUSE_GAMES.values():
+        started = time.perf_counter()
+        res = monte_carlo(game, spins=args.spins, seed=args.seed)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{game.name:<24} | EV {res['exact_ev']:+.5f} | MC {res['mean']:+.5f} ± {res['stderr']:.5f} "
+            f"| talon etu {-res['exact_ev'] * 100:.2f} % | {args.spins:,} kierrosta {elapsed:.2f} s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""
+Fast-forward throughput (days per second) by batch size: days committed per transaction.
+
+Every batch size gets a fresh copy of the bench_simulation fleet save and fast-forwards
+--days days with fast_forward_days(batch_days=K). Larger batches save commit/fsync work but
+lose more simulated days if the process dies mid-batch (the game resumes from the last
+committed batch), so the table is for choosing AFC666_FF_BATCH_DAYS.
+
+Use a file database (--sqlite-path, default a temp file) or --backend mysql: an in-memory
+SQLite has no fsync and hides most of the difference.
+
+    python -m benchmarks.bench_fast_forward --fleet 100 --days 300 --batch 1,7,30,90
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from typing import List
+
+import utils
+from benchmarks.bench_simulation import create_fleet_save
+from benchmarks.synthetic_save import ensure_airports
+
+
+def run(fleet: int, airports: int, days: int, batches: List[int], seed: int) -> List[dict]:
+    from game_session import GameSession
+
+    ensure_airports(airports, seed)
+    results = []
+    for batch in batches:
+        session = GameSession.load(create_fleet_save(fleet, seed), headless=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            session.fast_forward_days(days, batch_days=batch)
+        ff = session.last_fast_forward
+        print(f"… batch={batch}: {ff['days_per_s']:.0f} päivää/s", file=sys.stderr)
+        results.append({
+            "batch_days": batch,
+            "days": ff["days"],
+            "commits": ff["commits"],
+            "seconds": round(ff["seconds"], 3),
+            "days_per_s": round(ff["days_per_s"], 1) if ff["days_per_s"] else None,
+        })
+    base = results[0]["days_per_s"] if results else None
+    for r in results:
+        r["speedup"] = round(r["days_per_s"] / base, 2) if base and r["days_per_s"] else None
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pikakelauksen päivää/s eri eräkoilla.")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--sqlite-path", help="SQLite-tiedosto (oletus: väliaikainen tiedosto)")
+    parser.add_argument("--fleet", type=int, default=100)
+    parser.add_argument("--airports", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=300)
+    parser.add_argument("--batch", default="1,7,30,90", help="eräkoot pilkuin eroteltuna")
+    parser.add_argument("--seed", type=int, default=666)
+    parser.add_argument("--out", help="tulokset JSON-tiedostoon (oletus: stdout)")
+    args = parser.parse_args(argv)
+
+    utils.DB_BACKEND = args.backend
+    tmpdir = None
+    if args.backend == "sqlite":
+        if not args.sqlite_path:
+            tmpdir = tempfile.mkdtemp(prefix="afc666-ff-")
+            args.sqlite_path = os.path.join(tmpdir, "bench.db")
+        utils.SQLITE_PATH = args.sqlite_path
+    try:
+        results = run(args.fleet, args.airports, args.days,
+                      [int(b) for b in args.batch.split(",") if b.strip()], args.seed)
+    finally:
+        if tmpdir:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+
+    text = json.dumps({"backend": args.backend, "fleet": args.fleet, "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
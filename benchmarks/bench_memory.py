@@ -0,0 +1,103 @@
+"""
+Memory growth benchmark for long fast-forwards.
+
+Builds the same mixed-state fleet save as bench_simulation (--fleet aircraft, --airports
+airport rows), runs a short warm-up fast-forward so one-time allocations (statement caches,
+the airport catalog, lazily imported modules) are not counted, and then fast-forwards --days
+days with memory instrumentation on (session_helpers/memory.py: tracemalloc snapshot and gc
+at every day boundary).
+
+    python -m benchmarks.bench_memory --fleet 100 --days 300
+    python -m benchmarks.bench_memory --fleet 1000 --days 300 --max-kb-per-day 16 --out mem.json
+
+Exits with status 1 if the retained memory per simulated day exceeds --max-kb-per-day.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import utils
+from benchmarks.bench_simulation import create_fleet_save
+from benchmarks.synthetic_save import ensure_airports
+from session_helpers import memory
+
+DEFAULT_MAX_KB_PER_DAY = 32.0
+
+
+def run(fleet: int, airports: int, days: int, warmup_days: int, seed: int) -> dict:
+    from game_session import GameSession
+
+    airport_rows = ensure_airports(airports, seed)
+    session = GameSession.load(create_fleet_save(fleet, seed), headless=True)
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        memory.disable()
+        session.fast_forward_days(warmup_days)
+        memory.enable()
+        t0 = time.perf_counter()
+        try:
+            session.fast_forward_days(days)
+        finally:
+            memory.disable()
+        wall = time.perf_counter() - t0
+    summary = session.memory_summary or {}
+    return {
+        "fleet": fleet,
+        "airports": airports,
+        "airport_rows": airport_rows,
+        "warmup_days": warmup_days,
+        "wall_s": round(wall, 3),
+        **summary,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pikakelauksen muistikasvu per simuloitu päivä (tracemalloc).")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--fleet", type=int, default=100)
+    parser.add_argument("--airports", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=300)
+    parser.add_argument("--warmup-days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=666)
+    parser.add_argument("--max-kb-per-day", type=float, default=DEFAULT_MAX_KB_PER_DAY,
+                        help="sallittu pysyvä muistikasvu KiB per päivä")
+    parser.add_argument("--out", help="tulokset JSON-tiedostoon (oletus: stdout)")
+    args = parser.parse_args(argv)
+
+    utils.DB_BACKEND = args.backend
+    result = run(args.fleet, args.airports, args.days, args.warmup_days, args.seed)
+    kb_per_day = result.get("retained_per_day", 0.0) / 1024
+    report = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "max_kb_per_day": args.max_kb_per_day,
+        "retained_kb_per_day": round(kb_per_day, 3),
+        "passed": kb_per_day <= args.max_kb_per_day,
+        "result": result,
+    }
+    text = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if not report["passed"]:
+        print(f"❌ Pysyvä muistikasvu {kb_per_day:.2f} KiB/päivä > raja {args.max_kb_per_day:g} KiB/päivä",
+              file=sys.stderr)
+        for site in result.get("top_sites", [])[:5]:
+            print(f"   {site['size_diff'] / 1024:+8.1f} KiB  {site['site']}", file=sys.stderr)
+        return 1
+    print(f"✅ Muistikasvu {kb_per_day:.2f} KiB/päivä (raja {args.max_kb_per_day:g})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
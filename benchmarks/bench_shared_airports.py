@@ -0,0 +1,168 @@
+"""
+Multi-process airport catalog benchmark: one shared mapped copy vs a copy per worker.
+
+The parent builds the catalog (the current backend's airport table, or --airports N synthetic
+airports), publishes it with SharedAirportCatalog and starts --workers processes. Each worker
+maps the published file (or, with --private, loads its own copy from an .npz file), then runs
+--queries distance-kernel queries straight on the arrays: nearest destinations to a random
+origin plus a destination sample, as offer generation does. Workers report their memory from
+/proc/self/smaps_rollup (Linux): Pss is each process's proportional share, so the sum over all
+workers is the memory they really use together.
+
+    python -m benchmarks.bench_shared_airports --workers 32 --airports 80000
+    python -m benchmarks.bench_shared_airports --workers 32 --airports 80000 --private
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from storage.airports import DESTINATION_TYPES, AirportCatalog, SharedAirportCatalog, attach_shared_catalog
+
+_catalog: Optional[AirportCatalog] = None
+_attach_ms = 0.0
+
+
+def synthetic_catalog(count: int, seed: int) -> AirportCatalog:
+    rng = random.Random(f"airports:{seed}")
+    types = DESTINATION_TYPES + ("heliport", "closed")
+    rows = [
+        (f"ZZ{i:06d}", types[i % len(types)], f"Synthetic {i}",
+         round(rng.uniform(-60.0, 70.0), 6), round(rng.uniform(-180.0, 180.0), 6), "ZZ")
+        for i in range(count)
+    ]
+    return AirportCatalog.from_rows(rows)
+
+
+def memory_kb() -> Dict[str, int]:
+    """Rss/Pss/Private/Shared of this process in KiB (empty where smaps_rollup is unavailable)."""
+    out: Dict[str, int] = {}
+    try:
+        with open("/proc/self/smaps_rollup") as fh:
+            for line in fh:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty", "Shared_Clean", "Shared_Dirty"):
+                    out[key] = int(rest.split()[0])
+    except OSError:
+        return {}
+    return {
+        "rss": out.get("Rss", 0),
+        "pss": out.get("Pss", 0),
+        "private": out.get("Private_Clean", 0) + out.get("Private_Dirty", 0),
+        "shared": out.get("Shared_Clean", 0) + out.get("Shared_Dirty", 0),
+    }
+
+
+def _init_worker(shm_name: Optional[str], npz_path: Optional[str]) -> None:
+    global _catalog, _attach_ms
+    t0 = time.perf_counter()
+    _catalog = attach_shared_catalog(shm_name) if shm_name else AirportCatalog.load(npz_path)
+    _attach_ms = (time.perf_counter() - t0) * 1000.0
+
+
+def _work(args) -> dict:
+    worker_seed, queries, barrier_s = args
+    rng = random.Random(worker_seed)
+    catalog = _catalog
+    dest = catalog.destination_index
+    t0 = time.perf_counter()
+    for _ in range(queries):
+        origin = int(dest[rng.randrange(len(dest))])
+        lat, lon = float(catalog.latitude[origin]), float(catalog.longitude[origin])
+        catalog.nearest(lat, lon, k=5)
+        catalog.sample_destinations(catalog.ident_at(origin), 10, rng=rng)
+    elapsed = time.perf_counter() - t0
+    # Pidetään työläiset hengissä, kunnes kaikki ovat mitanneet (Pss jaetaan elävien kesken)
+    time.sleep(barrier_s)
+    return {
+        "pid": os.getpid(),
+        "attach_ms": round(_attach_ms, 2),
+        "queries_per_s": round(queries / elapsed, 1) if elapsed > 0 else None,
+        "memory_kb": memory_kb(),
+    }
+
+
+def run(workers: int, airports: Optional[int], queries: int, private: bool, seed: int,
+        start_method: str) -> dict:
+    if airports:
+        catalog = synthetic_catalog(airports, seed)
+    else:
+        import utils
+        from storage.airports import load_catalog
+
+        catalog = load_catalog(utils.get_backend(), connect=utils.get_connection)
+    catalog_bytes = sum(a.nbytes for a in catalog.columns.values())
+
+    shared = None
+    npz_path = None
+    tmpdir = tempfile.mkdtemp(prefix="afc666-airports-")
+    if private:
+        npz_path = os.path.join(tmpdir, "airports.npz")
+        catalog.save(npz_path)
+    else:
+        shared = SharedAirportCatalog.publish(catalog)
+    del catalog
+
+    ctx = multiprocessing.get_context(start_method)
+    t0 = time.perf_counter()
+    try:
+        with ctx.Pool(workers, initializer=_init_worker,
+                      initargs=(shared.name if shared else None, npz_path)) as pool:
+            # Yksi tehtävä per työläinen; viive pitää kaikki työläiset elossa mittaushetkellä
+            results: List[dict] = pool.map(
+                _work, [(seed + i, queries, 0.5) for i in range(workers)], chunksize=1
+            )
+    finally:
+        if shared is not None:
+            shared.close()
+            shared.unlink()
+        if npz_path and os.path.exists(npz_path):
+            os.remove(npz_path)
+        os.rmdir(tmpdir)
+    wall = time.perf_counter() - t0
+
+    mem = [r["memory_kb"] for r in results if r["memory_kb"]]
+    return {
+        "mode": "private" if private else "shared",
+        "start_method": start_method,
+        "workers": workers,
+        "distinct_pids": len({r["pid"] for r in results}),
+        "catalog_kb": round(catalog_bytes / 1024, 1),
+        "queries_per_worker": queries,
+        "wall_s": round(wall, 3),
+        "attach_ms_max": max(r["attach_ms"] for r in results),
+        "queries_per_s_mean": round(sum(r["queries_per_s"] or 0 for r in results) / len(results), 1),
+        "pss_total_kb": sum(m["pss"] for m in mem),
+        "private_total_kb": sum(m["private"] for m in mem),
+        "rss_mean_kb": round(sum(m["rss"] for m in mem) / len(mem)) if mem else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Jaetun kenttäluettelon moniprosessibenchmark.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--airports", type=int, default=80_000,
+                        help="synteettisten kenttien määrä (0 = käytä tallennustaustan airport-taulua)")
+    parser.add_argument("--queries", type=int, default=200, help="etäisyyskyselyitä per työläinen")
+    parser.add_argument("--private", action="store_true", help="jokainen työläinen lataa oman kopion")
+    parser.add_argument("--seed", type=int, default=666)
+    parser.add_argument("--start-method", default="spawn", choices=multiprocessing.get_all_start_methods())
+    parser.add_argument("--out", help="kirjoita tulokset JSON-tiedostoon")
+    args = parser.parse_args(argv)
+
+    result = run(args.workers, args.airports or None, args.queries, args.private, args.seed, args.start_method)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
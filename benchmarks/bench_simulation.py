@@ -0,0 +1,266 @@
+"""
+Reproducible benchmarks for the GameSession simulation hot paths.
+
+Times advance_to_next_day, _random_task_offers_for_plane,
+_initiate_return_flights_for_idle_aircraft, fast_forward_days(666), the list_aircraft data
+fetch and _process_monthly_bills over a matrix of fleet sizes x airport-table sizes. Every
+case gets a fresh save built from a fixed seed: one third of the fleet idle at home, one
+third idle at foreign airports (RTB candidates) and one third en route on contracts.
+
+Runs against the embedded SQLite backend by default (hermetic, synthetic airports are added
+to reach each airport count) or a local MySQL with --backend mysql (the real airport table is
+used as is; its size is recorded in the results).
+
+    python -m benchmarks.bench_simulation --out bench.json
+    python -m benchmarks.bench_simulation --save-baseline
+    python -m benchmarks.bench_simulation --baseline benchmarks/baseline_simulation.json --threshold 0.25
+
+With a baseline the run exits with status 1 if any case's median is more than `threshold`
+slower than the baseline median (differences under --noise-ms are ignored).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+import utils
+from benchmarks.synthetic_save import HOME_BASE, ensure_airports
+
+DEFAULT_FLEETS = (1, 10, 100, 1000)
+DEFAULT_AIRPORTS = (100, 10_000, 40_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_simulation.json")
+
+
+# ---------- Kiinnikkeet (fixture) ----------
+
+def create_fleet_save(fleet: int, seed: int) -> int:
+    """Create a save with a HUGE home base and `fleet` aircraft in mixed states. Returns save_id."""
+    rng = random.Random(f"fleet:{seed}:{fleet}")
+    now = datetime.utcnow()
+    with utils.get_connection() as yhteys:
+        kursori = yhteys.cursor()
+        yhteys.start_transaction()
+        kursori.execute(
+            "INSERT INTO game_saves (player_name, current_day, cash, difficulty, status, rng_seed, created_at, updated_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            (f"bench-{fleet}", 1, Decimal("1000000000000.00"), "NORMAL", "ACTIVE", seed, now, now),
+        )
+        save_id = kursori.lastrowid
+        kursori.execute(
+            "INSERT INTO owned_bases (save_id, base_ident, base_name, acquired_day, purchase_cost, created_at, updated_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            (save_id, HOME_BASE[0], HOME_BASE[1], 1, Decimal("0.00"), now, now),
+        )
+        base_id = kursori.lastrowid
+        kursori.execute(
+            "INSERT INTO base_upgrades (base_id, upgrade_code, installed_day, upgrade_cost) VALUES (%s, %s, %s, %s)",
+            (base_id, "HUGE", 1, Decimal("0.00")),
+        )
+
+        kursori.execute("SELECT model_code FROM aircraft_models ORDER BY model_code")
+        models = [r[0] for r in kursori.fetchall()]
+        kursori.execute(
+            "SELECT ident FROM airport WHERE ident <> %s AND latitude_deg IS NOT NULL ORDER BY ident LIMIT 5000",
+            (HOME_BASE[0],),
+        )
+        foreign = [r[0] for r in kursori.fetchall()]
+
+        for i in range(fleet):
+            state = i % 3  # 0 = kotona, 1 = vieraalla kentällä, 2 = lennolla
+            location = HOME_BASE[0] if state == 0 or not foreign else rng.choice(foreign)
+            kursori.execute(
+                "INSERT INTO aircraft (model_code, base_level, current_airport_ident, registration, acquired_day, "
+                "purchase_price, condition_percent, status, hours_flown, save_id, base_id) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                (models[i % len(models)], 1, location, f"BX-{i:05d}", 1, Decimal("0.00"), 100,
+                 "BUSY" if state == 2 else "IDLE", 0, save_id, base_id),
+            )
+            aircraft_id = kursori.lastrowid
+            if state == 2:
+                arrival = rng.randint(2, 31)
+                kursori.execute(
+                    "INSERT INTO contracts (payload_kg, reward, penalty, priority, created_day, deadline_day, "
+                    "accepted_day, status, lost_packages, damaged_packages, save_id, aircraft_id, ident) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                    (1000, Decimal("50000.00"), Decimal("15000.00"), "NORMAL", 1, arrival + 2, 1, "IN_PROGRESS",
+                     0, 0, save_id, aircraft_id, HOME_BASE[0]),
+                )
+                contract_id = kursori.lastrowid
+                kursori.execute(
+                    "INSERT INTO flights (created_day, dep_day, arrival_day, status, distance_km, dep_ident, arr_ident, "
+                    "aircraft_id, save_id, contract_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                    (1, 1, arrival, "ENROUTE", 1000.0, location, HOME_BASE[0], aircraft_id, save_id, contract_id),
+                )
+        yhteys.commit()
+    return int(save_id)
+
+
+def reset_stranded(save_id: int) -> None:
+    """Undo RTB departures so _initiate_return_flights_for_idle_aircraft has work on every run."""
+    with utils.get_connection() as yhteys:
+        kursori = yhteys.cursor()
+        yhteys.start_transaction()
+        kursori.execute("DELETE FROM flights WHERE save_id = %s AND status = 'ENROUTE_RTB'", (save_id,))
+        kursori.execute("UPDATE aircraft SET status = 'IDLE' WHERE save_id = %s AND status = 'BUSY_RTB'", (save_id,))
+        yhteys.commit()
+
+
+# ---------- Ajanotto ----------
+
+def _timed(fn: Callable[[], object], runs: int, setup: Optional[Callable[[], None]] = None) -> dict:
+    from session_helpers import statement_counts
+
+    samples: List[float] = []
+    statements = 0
+    sink = io.StringIO()
+    for _ in range(max(1, runs)):
+        if setup is not None:
+            setup()
+        before = sum(statement_counts().values())
+        with contextlib.redirect_stdout(sink):
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) * 1000.0)
+        statements = sum(statement_counts().values()) - before
+        sink.seek(0)
+        sink.truncate()
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "statements_per_run": statements,
+    }
+
+
+def run_case(fleet: int, airports: int, seed: int, runs: int, ff_days: int) -> List[dict]:
+    from game_session import GameSession
+    from session_helpers import fetch_fleet_overview, prepared_cursor
+
+    def fresh_session() -> "GameSession":
+        return GameSession.load(create_fleet_save(fleet, seed), headless=True)
+
+    session = fresh_session()
+    with utils.get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("aircraft.idle_ready", (session.save_id,))
+        idle = kursori.fetchall()
+    plane = idle[0] if idle else None
+
+    results = {
+        # Itse kysely: session _fetch_fleet_overview palvelisi muistista (day_cached)
+        "list_aircraft_fetch": _timed(lambda: fetch_fleet_overview(session.save_id), runs),
+        "_process_monthly_bills": _timed(lambda: session._process_monthly_bills(silent=True), runs),
+        "_initiate_return_flights_for_idle_aircraft": _timed(
+            lambda: session._initiate_return_flights_for_idle_aircraft(silent=True), runs,
+            setup=lambda: reset_stranded(session.save_id)),
+    }
+    if plane is not None:
+        results["_random_task_offers_for_plane"] = _timed(lambda: session._random_task_offers_for_plane(plane), runs)
+    results["advance_to_next_day"] = _timed(lambda: session.advance_to_next_day(silent=True), runs)
+
+    # Pikakelaus omalla tallennuksella, jotta lähtötila on sama kuin muilla mittauksilla
+    ff_session = fresh_session()
+    results[f"fast_forward_days({ff_days})"] = _timed(lambda: ff_session.fast_forward_days(ff_days), 1)
+
+    return [dict(case=name, fleet=fleet, airports=airports, **r) for name, r in results.items()]
+
+
+# ---------- Vertailu ----------
+
+def _key(r: dict) -> str:
+    return f"{r['case']}|fleet={r['fleet']}|airports={r['airports']}"
+
+
+def compare(results: List[dict], baseline: dict, threshold: float, noise_ms: float) -> List[dict]:
+    """Return the cases whose median regressed by more than `threshold` versus the baseline."""
+    base = {_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get(_key(r))
+        if not b:
+            continue
+        r["baseline_median_ms"] = b["median_ms"]
+        r["ratio"] = round(r["median_ms"] / b["median_ms"], 3) if b["median_ms"] > 0 else None
+        if r["median_ms"] - b["median_ms"] > noise_ms and r["median_ms"] > b["median_ms"] * (1.0 + threshold):
+            regressions.append(r)
+    return regressions
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(x.replace("_", "")) for x in text.split(",") if x.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="GameSession hot-path benchmarks (fleet x airports matrix).")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--fleet", type=_int_list, default=list(DEFAULT_FLEETS), help="esim. 1,10,100,1000")
+    parser.add_argument("--airports", type=_int_list, default=list(DEFAULT_AIRPORTS), help="esim. 100,10000,40000")
+    parser.add_argument("--runs", type=int, default=5, help="toistot per mittaus (pikakelaus ajetaan kerran)")
+    parser.add_argument("--ff-days", type=int, default=666)
+    parser.add_argument("--seed", type=int, default=666)
+    parser.add_argument("--out", help="tulokset JSON-tiedostoon (oletus: stdout)")
+    parser.add_argument("--baseline", help="vertaa tähän perustasoon ja palauta 1 regressiosta")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help=f"tallenna tulokset perustasoksi (oletus {DEFAULT_BASELINE})")
+    parser.add_argument("--threshold", type=float, default=0.25, help="sallittu hidastuminen (0.25 = +25 %%)")
+    parser.add_argument("--noise-ms", type=float, default=0.5, help="tätä pienemmät erot eivät ole regressioita")
+    args = parser.parse_args(argv)
+
+    utils.DB_BACKEND = args.backend
+    results: List[dict] = []
+    actual_airports: Dict[int, int] = {}
+    for airports in sorted(args.airports):
+        actual_airports[airports] = ensure_airports(airports, args.seed)
+        for fleet in args.fleet:
+            print(f"… airports={airports} fleet={fleet}", file=sys.stderr)
+            for r in run_case(fleet, airports, args.seed, args.runs, args.ff_days):
+                r["airport_rows"] = actual_airports[airports]
+                results.append(r)
+
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "runs": args.runs,
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            regressions = compare(results, json.load(fh), args.threshold, args.noise_ms)
+        report["regressions"] = [_key(r) for r in regressions]
+        for r in regressions:
+            print(f"REGRESSIO {_key(r)}: {r['baseline_median_ms']} ms -> {r['median_ms']} ms (x{r['ratio']})",
+                  file=sys.stderr)
+        status = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
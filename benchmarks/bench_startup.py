@@ -0,0 +1,123 @@
+"""
+Startup benchmark: how fast main.py shows its menu, and that importing does no I/O.
+
+Each run starts a fresh interpreter that installs a deliberately slow storage backend
+(every connect sleeps --db-delay seconds and then fails), imports main and runs main()
+until the first input() prompt, i.e. until the menu is on screen. Reported per run:
+time to menu, process wall time and how many DB connections were attempted before the
+menu (must be 0). A separate `python -X importtime -c "import main"` run lists the
+slowest imports by cumulative time.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 150 --runs 9 --db-delay 2
+
+Exits with status 1 if the median time to menu exceeds --budget-ms or any run touched the DB.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_DRIVER = r"""
+import builtins, io, json, sys, time
+t0 = time.perf_counter()
+import utils
+
+connects = []
+
+
+class _SlowBackend:
+    def connect(self):
+        connects.append(time.perf_counter() - t0)
+        time.sleep(DB_DELAY)
+        raise RuntimeError("startup-benchmark: tietokanta ei ole käytettävissä")
+
+
+utils._backend = _SlowBackend()
+menu_at = []
+
+
+def _input(prompt=""):
+    menu_at.append(time.perf_counter() - t0)
+    return "0"
+
+
+builtins.input = _input
+real_stdout, sys.stdout = sys.stdout, io.StringIO()
+import main
+main.main()
+sys.stdout = real_stdout
+print(json.dumps({"menu_ms": menu_at[0] * 1000.0, "connects": len(connects)}))
+"""
+
+
+def run_once(db_delay: float) -> dict:
+    code = _DRIVER.replace("DB_DELAY", repr(float(db_delay)))
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+    if proc.returncode != 0:
+        raise RuntimeError(f"käynnistysajo epäonnistui:\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall_ms"] = wall_ms
+    return result
+
+
+def import_times(top: int) -> List[Tuple[str, float, float]]:
+    """Return (module, self_ms, cumulative_ms) for the `top` slowest imports of main."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                          cwd=REPO_ROOT, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        rows.append((module, int(self_us) / 1000.0, int(cumulative_us) / 1000.0))
+    rows.sort(key=lambda r: -r[2])
+    return rows[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="main.py:n käynnistysaika valikkoon asti (budjetilla).")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="sallittu mediaani valikkoon (ms)")
+    parser.add_argument("--db-delay", type=float, default=1.0, help="simuloitu hidas yhteydenotto (s)")
+    parser.add_argument("--top", type=int, default=10, help="näin monta hitainta importtia")
+    parser.add_argument("--json", action="store_true", help="tulosta tulokset JSONina")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.db_delay) for _ in range(max(1, args.runs))]
+    menu_ms = statistics.median(r["menu_ms"] for r in runs)
+    wall_ms = statistics.median(r["wall_ms"] for r in runs)
+    connects = max(r["connects"] for r in runs)
+    imports = import_times(args.top)
+    ok = menu_ms <= args.budget_ms and connects == 0
+
+    if args.json:
+        print(json.dumps({
+            "menu_ms_median": round(menu_ms, 2),
+            "wall_ms_median": round(wall_ms, 2),
+            "db_connects_before_menu": connects,
+            "budget_ms": args.budget_ms,
+            "ok": ok,
+            "slowest_imports": [{"module": m, "self_ms": s, "cumulative_ms": c} for m, s, c in imports],
+        }, indent=2))
+    else:
+        print(f"Valikko näkyvissä: {menu_ms:.1f} ms (mediaani, {len(runs)} ajoa, budjetti {args.budget_ms:.0f} ms)")
+        print(f"Prosessin kokonaisaika: {wall_ms:.1f} ms | tietokantayhteyksiä ennen valikkoa: {connects}")
+        print("\nHitaimmat importit (kumulatiivinen ms):")
+        for module, self_ms, cumulative_ms in imports:
+            print(f"  {cumulative_ms:8.2f}  {self_ms:8.2f}  {module}")
+        print("\n✅ Budjetissa." if ok else "\n❌ Budjetti ylittyi tai importeissa avattiin yhteys.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
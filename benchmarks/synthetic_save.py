@@ -0,0 +1,367 @@
+"""
+Synthetic large-save generator for load and scale testing.
+
+Builds one save with a configurable number of bases and aircraft straight into the database
+with bulk inserts (executemany in chunks), deterministically from --seed:
+
+- bases: the HQ (EFHK) plus random airports, each with a SMALL→MEDIUM→LARGE→HUGE
+  base_upgrades history up to a random level (the HQ always reaches HUGE)
+- aircraft: models of every aircraft_models category in turn, spread over the bases;
+  a share bought from the seed-derived used market (recorded in market_purchases)
+- in flight: BUSY aircraft with an IN_PROGRESS contract and an ENROUTE flight whose
+  arrival days are spread over the next --arrival-spread days, plus RTB legs
+- idle aircraft at home and at foreign airports (RTB candidates)
+- ECO upgrade history in aircraft_upgrades
+- optionally --history-flights past legs: ARRIVED contract flights with their COMPLETED /
+  COMPLETED_LATE contracts, plus ARRIVED_RTB legs (for analytics at scale)
+
+If the airport table is missing or smaller than --airports, synthetic airports (ident ZZnnnnnn)
+are generated first. A real MySQL airport table is only topped up from empty.
+
+    python -m benchmarks.synthetic_save --aircraft 10000 --bases 25
+    python -m benchmarks.synthetic_save --aircraft 2000 --history-flights 1000000
+    AFC666_SQLITE_PATH=big.db python -m benchmarks.synthetic_save --backend sqlite --aircraft 10000 --airports 40000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Sequence, Tuple
+
+import utils
+
+HOME_BASE = ("EFHK", "Helsinki-Vantaa")
+AIRPORT_TYPES = ("small_airport", "medium_airport", "large_airport")
+BASE_LEVELS = ("SMALL", "MEDIUM", "LARGE", "HUGE")
+CATEGORIES = ("STARTER", "SMALL", "MEDIUM", "LARGE", "HUGE")
+CHUNK = 1000
+
+# Konetilojen osuudet (loput ovat kotikentällä joutilaina)
+SHARE_ENROUTE = 0.40
+SHARE_RTB = 0.10
+SHARE_FOREIGN_IDLE = 0.15
+SHARE_USED = 0.10
+SHARE_ECO = 0.30
+SHARE_HISTORY_RTB = 0.20
+
+AIRPORT_INSERT = (
+    "INSERT INTO airport (ident, type, name, latitude_deg, longitude_deg, iso_country) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+BASE_INSERT = (
+    "INSERT INTO owned_bases (save_id, base_ident, base_name, acquired_day, purchase_cost, is_headquarters, "
+    "created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+)
+BASE_UPGRADE_INSERT = (
+    "INSERT INTO base_upgrades (base_id, upgrade_code, installed_day, upgrade_cost) VALUES (%s, %s, %s, %s)"
+)
+AIRCRAFT_INSERT = (
+    "INSERT INTO aircraft (model_code, base_level, current_airport_ident, registration, acquired_day, "
+    "purchase_price, condition_percent, status, hours_flown, save_id, base_id) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+)
+AIRCRAFT_UPGRADE_INSERT = (
+    "INSERT INTO aircraft_upgrades (aircraft_id, upgrade_code, level, installed_day) VALUES (%s, %s, %s, %s)"
+)
+CONTRACT_INSERT = (
+    "INSERT INTO contracts (payload_kg, reward, penalty, priority, created_day, deadline_day, accepted_day, "
+    "status, lost_packages, damaged_packages, save_id, aircraft_id, ident) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+)
+HISTORY_CONTRACT_INSERT = (
+    "INSERT INTO contracts (payload_kg, reward, penalty, priority, created_day, deadline_day, accepted_day, "
+    "completed_day, status, lost_packages, damaged_packages, save_id, aircraft_id, ident) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+)
+FLIGHT_INSERT = (
+    "INSERT INTO flights (created_day, dep_day, arrival_day, status, distance_km, emission_kg_co2, dep_ident, "
+    "arr_ident, aircraft_id, save_id, contract_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+)
+MARKET_PURCHASE_INSERT = "INSERT INTO market_purchases (save_id, listing_id, purchased_day) VALUES (%s, %s, %s)"
+
+
+def _bulk_insert(kursori, sql: str, rows: Sequence[tuple], chunk: int = CHUNK) -> int:
+    for i in range(0, len(rows), chunk):
+        kursori.executemany(sql, rows[i:i + chunk])
+    return len(rows)
+
+
+# ---------- Kentät ----------
+
+def ensure_airports(target: int, seed: int) -> int:
+    """
+    Make sure the airport table exists and holds at least `target` rows, adding synthetic
+    airports where allowed (SQLite, or a MySQL table that is missing or empty). Returns the row count.
+    """
+    with utils.get_connection() as yhteys:
+        kursori = yhteys.cursor()
+        try:
+            kursori.execute("SELECT COUNT(*) FROM airport")
+            have = int(kursori.fetchone()[0])
+        except Exception:
+            from storage.airports import AIRPORT_DDL
+
+            kursori.execute(AIRPORT_DDL)
+            have = 0
+        if have >= target or (utils.DB_BACKEND != "sqlite" and have > 0):
+            return have
+        rng = random.Random(f"airports:{seed}")
+        rows = [
+            (f"ZZ{i:06d}", AIRPORT_TYPES[i % 3], f"Synthetic {i}",
+             round(rng.uniform(-60.0, 70.0), 6), round(rng.uniform(-180.0, 180.0), 6), "ZZ")
+            for i in range(have, target)
+        ]
+        if have == 0:
+            # Tyhjä taulu: kotikenttä on oltava olemassa
+            rows[0] = (HOME_BASE[0], "large_airport", HOME_BASE[1], 60.3172, 24.963301, "FI")
+        yhteys.start_transaction()
+        _bulk_insert(kursori, AIRPORT_INSERT, rows)
+        yhteys.commit()
+    # Kenttäluettelon välimuisti on nyt vanhentunut
+    from session_helpers.airports import reset_airport_catalog
+    from storage.airports import drop_catalog_cache
+
+    drop_catalog_cache(utils.get_backend())
+    reset_airport_catalog()
+    return target
+
+
+def _load_airports(kursori, limit: int = 20000) -> Dict[str, Tuple[float, float]]:
+    kursori.execute(
+        "SELECT ident, latitude_deg, longitude_deg FROM airport "
+        "WHERE latitude_deg IS NOT NULL AND longitude_deg IS NOT NULL ORDER BY ident LIMIT %s",
+        (limit,),
+    )
+    return {r[0]: (float(r[1]), float(r[2])) for r in kursori.fetchall()}
+
+
+# ---------- Tallennus ----------
+
+def generate_save(aircraft: int, bases: int = 10, seed: int = 666, day: int = 120,
+                  arrival_spread: int = 30, player_name: str = None, history_flights: int = 0) -> dict:
+    """Create one synthetic save as described in the module docstring. Returns a summary dict."""
+    from session_helpers import (
+        fetch_market_models,
+        generate_market_listings,
+        haversine_km,
+        market_window,
+    )
+
+    rng = random.Random(f"synthetic:{seed}:{aircraft}:{bases}")
+    now = datetime.utcnow()
+    day = max(2, int(day))
+    counts: Dict[str, int] = {}
+
+    with utils.get_connection() as yhteys:
+        kursori = yhteys.cursor()
+        airports = _load_airports(kursori)
+        idents = sorted(airports)
+        foreign = [a for a in idents if a != HOME_BASE[0]]
+
+        kursori.execute(
+            "SELECT model_code, category, purchase_price, cruise_speed_kts, co2_kg_per_km "
+            "FROM aircraft_models ORDER BY model_code"
+        )
+        by_category: Dict[str, List[tuple]] = {}
+        for row in kursori.fetchall():
+            by_category.setdefault(row[1], []).append(row)
+        categories = [c for c in CATEGORIES if c in by_category]
+        model_info = {m[0]: m for ms in by_category.values() for m in ms}
+
+        yhteys.start_transaction()
+        kursori.execute(
+            "INSERT INTO game_saves (player_name, current_day, cash, difficulty, status, rng_seed, created_at, updated_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            (player_name or f"synthetic-{aircraft}", day, Decimal("1000000000000.00"), "NORMAL", "ACTIVE",
+             seed, now, now),
+        )
+        save_id = int(kursori.lastrowid)
+
+        # Tukikohdat ja niiden päivityshistoria
+        base_idents = [HOME_BASE[0]] + rng.sample(foreign, min(max(0, bases - 1), len(foreign)))
+        base_rows = [
+            (save_id, ident, HOME_BASE[1] if i == 0 else f"Base {ident}", 1 if i == 0 else rng.randint(1, day - 1),
+             Decimal("0.00") if i == 0 else Decimal(rng.randint(50, 500) * 1000), i == 0, now, now)
+            for i, ident in enumerate(base_idents)
+        ]
+        counts["owned_bases"] = _bulk_insert(kursori, BASE_INSERT, base_rows)
+        kursori.execute("SELECT base_id, base_ident FROM owned_bases WHERE save_id = %s", (save_id,))
+        base_ids = {ident: int(base_id) for base_id, ident in kursori.fetchall()}
+
+        upgrade_rows = []
+        for i, row in enumerate(base_rows):
+            top = len(BASE_LEVELS) - 1 if i == 0 else rng.randrange(len(BASE_LEVELS))
+            installed = row[3]
+            for level in range(top + 1):
+                upgrade_rows.append((base_ids[row[1]], BASE_LEVELS[level], installed,
+                                     Decimal("0.00") if level == 0 else Decimal(rng.randint(100, 5000) * 1000)))
+                installed = min(day, installed + rng.randint(1, 30))
+        counts["base_upgrades"] = _bulk_insert(kursori, BASE_UPGRADE_INSERT, upgrade_rows)
+
+        # Käytettyjen markkinoiden ostot: ilmoitukset johdetaan siemenestä kuten pelissä
+        market_models = fetch_market_models()
+        used_listings = []
+        for window in range(market_window(day) + 1):
+            for listing in generate_market_listings(seed, window, market_models):
+                if listing["listed_day"] <= day and rng.random() < 0.5:
+                    used_listings.append(listing)
+        rng.shuffle(used_listings)
+        used_listings = used_listings[:int(aircraft * SHARE_USED)]
+
+        # Koneet: luokat vuorotellen, jotta jokainen kategoria on edustettuna
+        plans, aircraft_rows = [], []
+        for i in range(aircraft):
+            home = base_idents[i % len(base_idents)]
+            if i < len(used_listings):
+                listing = used_listings[i]
+                model_code = listing["model_code"]
+                acquired = max(1, min(day, listing["listed_day"]))
+                price, condition, hours = listing["purchase_price"], listing["condition_percent"], listing["hours_flown"]
+            else:
+                model = rng.choice(by_category[categories[i % len(categories)]])
+                model_code, acquired = model[0], rng.randint(1, day)
+                price, condition, hours = Decimal(model[2]), rng.randint(40, 100), rng.randint(0, 5000)
+
+            roll = rng.random()
+            if roll < SHARE_ENROUTE:
+                state = "ENROUTE"
+            elif roll < SHARE_ENROUTE + SHARE_RTB:
+                state = "ENROUTE_RTB"
+            elif roll < SHARE_ENROUTE + SHARE_RTB + SHARE_FOREIGN_IDLE:
+                state = "FOREIGN"
+            else:
+                state = "HOME"
+            location = home if state in ("HOME", "ENROUTE") or not foreign else rng.choice(foreign)
+            status = {"ENROUTE": "BUSY", "ENROUTE_RTB": "BUSY_RTB"}.get(state, "IDLE")
+            registration = f"SX-{i:06d}"
+            plans.append((registration, model_code, home, location, state, acquired))
+            aircraft_rows.append((model_code, 1, location, registration, acquired, price, condition, status,
+                                  hours, save_id, base_ids[home]))
+        counts["aircraft"] = _bulk_insert(kursori, AIRCRAFT_INSERT, aircraft_rows)
+        counts["market_purchases"] = _bulk_insert(
+            kursori, MARKET_PURCHASE_INSERT,
+            [(save_id, int(l["market_id"]), max(1, min(day, l["listed_day"]))) for l in used_listings],
+        )
+
+        kursori.execute("SELECT aircraft_id, registration FROM aircraft WHERE save_id = %s", (save_id,))
+        aircraft_ids = {reg: int(aid) for aid, reg in kursori.fetchall()}
+
+        # ECO-päivityshistoria
+        eco_rows = []
+        for registration, _model, _home, _loc, _state, installed in plans:
+            if rng.random() < SHARE_ECO:
+                for level in range(1, rng.randint(1, 5) + 1):
+                    eco_rows.append((aircraft_ids[registration], "ECO", level, installed))
+                    installed = min(day, installed + rng.randint(1, 20))
+        counts["aircraft_upgrades"] = _bulk_insert(kursori, AIRCRAFT_UPGRADE_INSERT, eco_rows)
+
+        # Aktiiviset sopimukset ja lennot, saapumiset hajautettuna tuleville päiville
+        contract_rows, flight_plans = [], []
+        for registration, model_code, home, location, state, _acquired in plans:
+            if state not in ("ENROUTE", "ENROUTE_RTB"):
+                continue
+            aid = aircraft_ids[registration]
+            if state == "ENROUTE":
+                dep, dest = home, (rng.choice(foreign) if foreign else home)
+            else:
+                dep, dest = location, home
+            dep_day = rng.randint(max(1, day - 5), day)
+            arrival = day + rng.randint(1, max(1, arrival_spread))
+            lat1, lon1 = airports.get(dep, (0.0, 0.0))
+            lat2, lon2 = airports.get(dest, (0.0, 0.0))
+            dist = round(haversine_km(lat1, lon1, lat2, lon2), 1)
+            co2 = round(dist * float(model_info[model_code][4] or 0), 1)
+            if state == "ENROUTE":
+                reward = Decimal(rng.randint(5000, 500000))
+                contract_rows.append((rng.randint(100, 5000), reward, (reward * Decimal("0.30")).quantize(Decimal("0.01")),
+                                      "NORMAL", dep_day, arrival + rng.randint(0, 5), dep_day, "IN_PROGRESS",
+                                      0, 0, save_id, aid, dest))
+            flight_plans.append((dep_day, arrival, state, dist, co2, dep, dest, aid))
+        counts["contracts"] = _bulk_insert(kursori, CONTRACT_INSERT, contract_rows)
+
+        kursori.execute(
+            "SELECT contractId, aircraft_id FROM contracts WHERE save_id = %s AND status = 'IN_PROGRESS'", (save_id,)
+        )
+        contract_ids = {int(aid): int(cid) for cid, aid in kursori.fetchall()}
+        flight_rows = [
+            (dep_day, dep_day, arrival, state, dist, co2, dep, dest, aid, save_id,
+             contract_ids.get(aid) if state == "ENROUTE" else None)
+            for dep_day, arrival, state, dist, co2, dep, dest, aid in flight_plans
+        ]
+        counts["flights"] = _bulk_insert(kursori, FLIGHT_INSERT, flight_rows)
+        if history_flights > 0:
+            counts.update(_insert_history(kursori, rng, save_id, day, history_flights, plans, aircraft_ids,
+                                          model_info, foreign or [HOME_BASE[0]]))
+        yhteys.commit()
+
+    counts["categories"] = len(categories)
+    return {"save_id": save_id, "seed": seed, "day": day, "rows": counts}
+
+
+def _insert_history(kursori, rng: random.Random, save_id: int, day: int, n: int, plans: List[tuple],
+                    aircraft_ids: Dict[str, int], model_info: Dict[str, tuple], foreign: List[str]) -> Dict[str, int]:
+    """Past legs before `day`: contract flights with settled contracts and return legs."""
+    contract_rows, legs = [], []
+    for _ in range(n):
+        registration, model_code, home, _loc, _state, acquired = rng.choice(plans)
+        dep_day = rng.randint(min(acquired, day - 1), day - 1)
+        arrival = min(day, dep_day + rng.randint(1, 5))
+        dist = round(rng.uniform(100.0, 9000.0), 1)
+        co2 = round(dist * float(model_info[model_code][4] or 0), 1)
+        aid = aircraft_ids[registration]
+        dest = rng.choice(foreign)
+        if rng.random() < SHARE_HISTORY_RTB:
+            legs.append((dep_day, dep_day, arrival, "ARRIVED_RTB", dist, co2, dest, home, aid, save_id, False))
+            continue
+        reward = Decimal(rng.randint(5000, 500000))
+        deadline = arrival + rng.randint(-3, 5)
+        contract_rows.append((rng.randint(100, 5000), reward, (reward * Decimal("0.30")).quantize(Decimal("0.01")),
+                              "NORMAL", dep_day, deadline, dep_day, arrival,
+                              "COMPLETED" if arrival <= deadline else "COMPLETED_LATE",
+                              0, 0, save_id, aid, dest))
+        legs.append((dep_day, dep_day, arrival, "ARRIVED", dist, co2, home, dest, aid, save_id, True))
+    _bulk_insert(kursori, HISTORY_CONTRACT_INSERT, contract_rows)
+
+    # Sopimusten id:t lisäysjärjestyksessä lennoille
+    kursori.execute(
+        "SELECT contractId FROM contracts WHERE save_id = %s AND status IN ('COMPLETED', 'COMPLETED_LATE') "
+        "ORDER BY contractId", (save_id,),
+    )
+    contract_ids = iter([int(r[0]) for r in kursori.fetchall()])
+    flight_rows = [leg[:-1] + (next(contract_ids) if leg[-1] else None,) for leg in legs]
+    return {
+        "history_contracts": len(contract_rows),
+        "history_flights": _bulk_insert(kursori, FLIGHT_INSERT, flight_rows),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Luo synteettinen suuri tallennus kuormitus- ja skaalatestaukseen.")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default=utils.DB_BACKEND)
+    parser.add_argument("--aircraft", type=int, default=10_000)
+    parser.add_argument("--bases", type=int, default=25)
+    parser.add_argument("--airports", type=int, default=10_000, help="vähimmäismäärä kenttiä (synteettisiä tarvittaessa)")
+    parser.add_argument("--day", type=int, default=120, help="tallennuksen nykyinen päivä")
+    parser.add_argument("--arrival-spread", type=int, default=30, help="saapumiset hajautetaan näin monelle päivälle")
+    parser.add_argument("--history-flights", type=int, default=0, help="menneitä lentoja (analytiikkatestaukseen)")
+    parser.add_argument("--seed", type=int, default=666)
+    parser.add_argument("--name", help="pelaajan nimi (oletus synthetic-<koneet>)")
+    args = parser.parse_args(argv)
+
+    utils.DB_BACKEND = args.backend
+    t0 = time.perf_counter()
+    airport_rows = ensure_airports(args.airports, args.seed)
+    summary = generate_save(args.aircraft, args.bases, args.seed, args.day, args.arrival_spread, args.name,
+                             args.history_flights)
+    summary["airports"] = airport_rows
+    summary["seconds"] = round(time.perf_counter() - t0, 2)
+    print(json.dumps(summary, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
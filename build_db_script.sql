@@ -3,6 +3,12 @@
 -- --------------------------------------------------------
 
 -- Pudotetaan taulut turvallisessa järjestyksessä
+DROP TABLE IF EXISTS save_daily_metrics;
+DROP TABLE IF EXISTS save_stats;
+DROP TABLE IF EXISTS save_snapshots;
+DROP TABLE IF EXISTS action_journal;
+DROP TABLE IF EXISTS market_purchases;
+DROP TABLE IF EXISTS market_aircraft; -- korvattu siemenestä johdetuilla markkinoilla
 DROP TABLE IF EXISTS flights;
 DROP TABLE IF EXISTS contracts;
 DROP TABLE IF EXISTS aircraft_upgrades;
@@ -14,6 +20,19 @@ DROP TABLE IF EXISTS aircraft_models;
 DROP TABLE IF EXISTS random_events;
 DROP TABLE IF EXISTS game_saves;
 
+-- --------------------------------------------------------
+-- 0. airport (kenttäluettelo; ei pudoteta uudelleenrakennuksessa)
+--    Täytetään: python -m storage.airports import airports.csv (OurAirports-muoto)
+-- --------------------------------------------------------
+CREATE TABLE IF NOT EXISTS airport (
+  ident VARCHAR(40) PRIMARY KEY,
+  type VARCHAR(40),
+  name VARCHAR(200),
+  latitude_deg DOUBLE,
+  longitude_deg DOUBLE,
+  iso_country VARCHAR(40)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
 -- --------------------------------------------------------
 -- 1. game_saves
 -- --------------------------------------------------------
@@ -196,18 +215,89 @@ CREATE TABLE player_fate (
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 
 -- --------------------------------------------------------
--- 10. market_aircraft (Käytettyjen koneiden kauppapaikka)
--- --------------------------------------------------------
-CREATE TABLE market_aircraft (
-  market_id INT AUTO_INCREMENT PRIMARY KEY,
-  model_code VARCHAR(40) NOT NULL,
-  purchase_price DECIMAL(15,2) NOT NULL,
-  condition_percent INT NOT NULL,
-  hours_flown INT NOT NULL,
-  manufactured_day INT NOT NULL,
-  market_notes TEXT NULL,
-  listed_day INT NOT NULL,
-  FOREIGN KEY (model_code) REFERENCES aircraft_models(model_code)
+-- 10. market_purchases (käytettyjen markkinoiden ostot per tallennus)
+-- Ilmoitukset johdetaan (rng_seed, päiväikkuna) -parista muistissa;
+-- kantaan kirjataan vain ostetut ilmoitukset.
+-- --------------------------------------------------------
+CREATE TABLE market_purchases (
+  save_id INT NOT NULL,
+  listing_id INT NOT NULL,               -- ikkuna * 100 + paikka
+  purchased_day INT NOT NULL,
+  PRIMARY KEY (save_id, listing_id),
+  FOREIGN KEY (save_id) REFERENCES game_saves(save_id)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+-- --------------------------------------------------------
+-- 11. action_journal (append-only: pelaajan toiminnot + RNG-arvonnat replayta varten)
+-- args = metodin argumentit kompaktina JSONina, rng = pakatut arvonnat edellisestä rivistä
+-- alkaen (rng_skip niistä tehtiin valikoissa ennen toimintoa).
+-- --------------------------------------------------------
+CREATE TABLE action_journal (
+  save_id INT NOT NULL,
+  seq INT NOT NULL,
+  day INT NOT NULL,                      -- päivä toiminnon jälkeen
+  action VARCHAR(60) NOT NULL,
+  args TEXT,
+  rng_skip INT NOT NULL DEFAULT 0,
+  rng MEDIUMBLOB,
+  cash_after DECIMAL(15,2),
+  created_at DATETIME NOT NULL,
+  PRIMARY KEY (save_id, seq),
+  FOREIGN KEY (save_id) REFERENCES game_saves(save_id)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+-- --------------------------------------------------------
+-- 12. save_snapshots (tallennuksen tila journaalin kohdassa seq)
+-- --------------------------------------------------------
+CREATE TABLE save_snapshots (
+  save_id INT NOT NULL,
+  seq INT NOT NULL,
+  day INT NOT NULL,
+  state LONGBLOB NOT NULL,
+  created_at DATETIME NOT NULL,
+  PRIMARY KEY (save_id, seq),
+  FOREIGN KEY (save_id) REFERENCES game_saves(save_id)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+-- --------------------------------------------------------
+-- 13. save_stats (yksi rivi per tallennus, päivitetään samoissa transaktioissa kuin pelitila)
+-- Luku on yksi pääavainhaku; session_helpers/stats.py rebuild_save_stats laskee rivin
+-- uudelleen pelitauluista. spend_repairs/spend_bills/clubhouse_net ovat vain tässä.
+-- --------------------------------------------------------
+CREATE TABLE save_stats (
+  save_id INT NOT NULL PRIMARY KEY,
+  aircraft_count INT NOT NULL DEFAULT 0,
+  total_hours BIGINT NOT NULL DEFAULT 0,
+  total_emissions_kg DECIMAL(18,2) NOT NULL DEFAULT 0,
+  contract_flights INT NOT NULL DEFAULT 0,
+  rtb_flights INT NOT NULL DEFAULT 0,
+  flights_arrived INT NOT NULL DEFAULT 0,
+  contracts_on_time INT NOT NULL DEFAULT 0,
+  contracts_late INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(18,2) NOT NULL DEFAULT 0,
+  spend_aircraft DECIMAL(18,2) NOT NULL DEFAULT 0,
+  spend_bases DECIMAL(18,2) NOT NULL DEFAULT 0,
+  spend_upgrades DECIMAL(18,2) NOT NULL DEFAULT 0,
+  spend_repairs DECIMAL(18,2) NOT NULL DEFAULT 0,
+  spend_bills DECIMAL(18,2) NOT NULL DEFAULT 0,
+  clubhouse_net DECIMAL(18,2) NOT NULL DEFAULT 0,
+  FOREIGN KEY (save_id) REFERENCES game_saves(save_id)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+-- --------------------------------------------------------
+-- 14. save_daily_metrics (append-only päiväsarja: kassa, tulot, laskut, saapumiset, käyttöaste)
+-- Yksi rivi per kirjoitettu pätkä peräkkäisiä päiviä; data = pakatut sarakkeet
+-- (session_helpers/metrics.py), luetaan NumPy-taulukoiksi.
+-- --------------------------------------------------------
+CREATE TABLE save_daily_metrics (
+  chunk_id INT AUTO_INCREMENT PRIMARY KEY,
+  save_id INT NOT NULL,
+  first_day INT NOT NULL,
+  days INT NOT NULL,
+  data MEDIUMBLOB NOT NULL,
+  created_at DATETIME NOT NULL,
+  FOREIGN KEY (save_id) REFERENCES game_saves(save_id),
+  INDEX idx_daily_metrics_save_day (save_id, first_day)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 
 -- --------------------------------------------------------
@@ -1,9 +1,11 @@
 
 import random
-from utils import get_connection
+from utils import get_backend, get_connection
 
-conn = get_connection()
-cursor = conn.cursor()
+#Connection and cursor are opened lazily by _get_cursor, so importing this module does no I/O
+_conn = None
+_cursor = None
+_conn_backend = None
 FlightEvents = []
 BorderEvents = []
 #Object of flight event that will be containing all data and multipliers
@@ -30,8 +32,19 @@ class BorderEvent:
         self.dangerLevel = dangerLevel
         self.duration = duration
         self.countries = countries
+#Opens the shared connection on first use and returns its cursor
+#Reconnects if the storage backend has been swapped (utils.use_backend, e.g. replay)
+def _get_cursor():
+    global _conn, _cursor, _conn_backend
+    if _cursor is None or _conn_backend is not get_backend():
+        _conn_backend = get_backend()
+        _conn = get_connection()
+        _cursor = _conn.cursor()
+    return _cursor
+
 #Used to get seed of world based on player_name data from game_saves db
 def GetUserSeed(nickname):
+    cursor = _get_cursor()
     query = f'select rng_seed from game_saves where player_name = "{nickname}"'
     cursor.execute(query)
     row = cursor.fetchone()
@@ -41,6 +54,7 @@ def GetUserSeed(nickname):
 #Chooses and randomizes event for certain day, used in InitEvents
 #Randomizes based on data from random_events that is being saved in dictionary FlightEvent.Events{Name of event: max chance of occurence}
 def RandomizeFlightEvent():
+    cursor = _get_cursor()
     query = 'SELECT event_name, chance_max FROM random_events'
     cursor.execute(query)
     events = cursor.fetchall()
@@ -78,6 +92,7 @@ def EventChecker(flightORcountry):
 #Dates are calculated via seed * 1000, then adding + 1 for each of 666 days.
 #Example of date: seed -- 123. Date needed is 13th day. Wil look like this: 123013 where 123 -- seed x1000 and 001-666 are days
 def InitEvents(seed):
+    cursor = _get_cursor()
     CurrentDay = seed * 1000
     query = f'select * from player_fate where day = "{CurrentDay + 1}"'
     cursor.execute(query)
@@ -95,6 +110,7 @@ def InitEvents(seed):
 #Used to select event for certain day, can be called during start of every flight.
 #Code returns object with the needed multipliers that should be added then to the calculations in the main code
 def SelectEvent(type, day, seed):
+    cursor = _get_cursor()
     Date = seed * 1000 + day
     if type != None:
         if type == "flight":
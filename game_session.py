@@ -13,7 +13,8 @@
 #
 # Yhteysmuuttujat pidetään yhdenmukaisina:
 #   yhteys = get_connection()
-#   kursori = yhteys.cursor(dictionary=True)  # jos mahdollista, muuten yhteys.cursor()
+#   kursori = prepared_cursor(yhteys, dictionary=True)
+#   kursori.execute("<lauseen nimi>", params)  # SQL: session_helpers/statements.py
 
 """
 ===== RNG-SIEMENEN TESTAAMINEN =====
@@ -59,38 +60,96 @@ Näin voit testata että RNG-siemen toimii oikein:
 
 """
 
-import math
 import random
 import string
 import random
 import time
+from contextlib import nullcontext
 from typing import List, Optional, Dict, Set
 from decimal import Decimal, ROUND_HALF_UP, getcontext
 from datetime import datetime
-from utils import get_connection
-from airplane import init_airplanes, upgrade_airplane as db_upgrade_airplane
-from event_system import InitEvents, SelectEvent
+from utils import get_connection, batched_transaction, FF_BATCH_DAYS
+from storage.instrumentation import track_action, is_enabled as query_stats_enabled, report as query_stats_report
+from storage.tracing import traced, annotate
+from storage.batch import current_batch
+from event_system import FlightEvent, InitEvents, SelectEvent
+from play_sound import get_audio_engine
 from session_helpers import (
     _to_dec,
     _icon_title,
+    prepared_cursor,
+    fetch_multi,
     fetch_player_aircrafts_with_model_info,
+    fetch_fleet_overview,
     get_current_aircraft_upgrade_state,
     compute_effective_eco_multiplier,
     calc_aircraft_upgrade_cost,
     apply_aircraft_upgrade,
     get_effective_eco_for_aircraft,
-    fetch_owned_bases,
-    fetch_base_current_level_map,
     insert_base_upgrade,
+    CLUBHOUSE_GAMES,
+    COIN_FLIP,
+    HIGH_LOW,
+    SLOT_MACHINE,
+    house_edge,
+    match_payline,
+    spin,
+    market_window,
+    fetch_market_models,
+    generate_market_listings,
+    fetch_purchased_listing_ids,
+    record_market_purchase,
+    haversine_km,
+    speed_km_per_day,
+    eco_multiplier_for_level,
+    nearest_point,
+    return_flight,
+    build_task_offer,
+    settle_arrival,
+    is_billing_day,
+    monthly_bill,
+    ActionJournal,
+    journaled,
+    add_stats,
+    arrival_stats,
+    merge_stats,
+    init_save_stats,
+    load_save_stats,
+    rebuild_save_stats,
+    hydrate_save,
+    fetch_owned_bases_with_levels,
+    fetch_active_contracts,
+    fetch_fate_calendar,
+    fetch_traffic,
+    build_dashboard,
+    airport_catalog,
+    catalog_coords,
+    catalog_sample_destinations,
+    InvalidationBus,
+    day_cached,
+    publishes,
+    format_cache_stats,
+    FLEET,
+    BASES,
+    CASH,
+    CONTRACTS,
+    DAY,
+    TOPICS,
+)
+from session_helpers.memory import memory_tracker
+from session_helpers.metrics import DailyMetrics, METRICS_FLUSH_DAYS, load_daily_metrics, format_metrics_summary
+from session_helpers.analytics import fleet_analytics, format_fleet_analytics
+from session_helpers.profiling import (
+    PhaseTimer,
+    is_profiling,
+    start_profiling,
+    stop_profiling,
+    format_profile_result,
 )
 
 # Konfiguraatiot yhdessä paikassa
 from upgrade_config import (
     UPGRADE_CODE,
-    HQ_MONTHLY_FEE,
-    MAINT_PER_AIRCRAFT,
-    BILL_GROWTH_RATE,
-    STARTER_MAINT_DISCOUNT,
     REPAIR_COST_PER_PERCENT,
     SURVIVAL_TARGET_DAYS,
 )
@@ -115,6 +174,7 @@ class GameSession:
             status: Optional[str] = None,
             rng_seed: Optional[int] = None,
             difficulty: Optional[str] = None,
+            headless: bool = False,
     ):
         # Tallennetaan konstruktorin parametrit – puuttuvat täydennetään kannasta
         self.save_id = int(save_id)
@@ -124,6 +184,29 @@ class GameSession:
         self.status = status
         self.rng_seed = rng_seed
         self.difficulty = difficulty or "NORMAL"
+        # Headless-tila: ei keinotekoisia viiveitä (skriptattu/automaattinen pelaaminen)
+        self.headless = bool(headless)
+        # Äänet taustasäikeessä; headless-tilassa hiljainen nielu (ei koskaan blokkaa)
+        self.audio = get_audio_engine(headless=self.headless)
+        # Markkinaikkunan ostetut ilmoitukset muistissa: {ikkuna: {listing_id, ...}}
+        self._market_purchased: Dict[int, Set[int]] = {}
+        # Toimintojournaali (action_journal + save_snapshots); käynnistetään new_game/load-lopussa
+        self.journal = ActionJournal(self.save_id)
+        # Session välimuistit (@day_cached) ja niiden invalidointiväylä: kirjoitusmetodit
+        # julkaisevat aiheita (@publishes), load() täyttää välimuistit yhdellä kierroksella
+        self.cache_bus = InvalidationBus()
+        # advance_to_next_day-vaiheiden seinäkelloajat (tulostetaan pikakelauksen lopussa)
+        self.day_phases = PhaseTimer()
+        # Viimeisimmän muistimitatun pikakelauksen yhteenveto (AFC666_MEMTRACE=1, ks. session_helpers/memory.py)
+        self.memory_summary: Optional[dict] = None
+        # Viimeisimmän pikakelauksen nopeus (päivää/s, eräkoko, commitit)
+        self.last_fast_forward: Optional[dict] = None
+        # Vierailta kentiltä kotiin -kertakierros ajettu tällä sessiolla (muuten RTB saapumisen yhteydessä);
+        # tukikohtien muuttuessa kierros ajetaan uudelleen (esim. saapuminen ennen ensimmäistä tukikohtaa)
+        self._rtb_swept = False
+        self.cache_bus.subscribe(BASES, self._on_bases_changed)
+        # Päiväsarjan (kassa, tulot, laskut, saapumiset, käyttöaste) kirjoittamattomat näytteet
+        self.metrics = DailyMetrics(self.save_id)
 
         # Täydennetään puuttuvat kentät kannasta
         self._refresh_save_state()
@@ -133,6 +216,7 @@ class GameSession:
     # ---------- Luonti / Lataus ----------
 
     @classmethod
+    @track_action("uusi peli")
     def new_game(
             cls,
             name: str,
@@ -141,6 +225,7 @@ class GameSession:
             rng_seed: Optional[int] = None,
             status: str = "ACTIVE",
             default_difficulty: str = "NORMAL",
+            headless: bool = False,
     ) -> "GameSession":
         """
         Luo uuden tallennuksen ja käynnistää pelin.
@@ -151,17 +236,12 @@ class GameSession:
           4) Iso-isä lahjoittaa STARTER-koneen (DC3FREE)
         """
         yhteys = get_connection()
-        kursori = yhteys.cursor()
+        kursori = prepared_cursor(yhteys)
         try:
             start_day = 1
             now = datetime.utcnow()
             kursori.execute(
-                """
-                INSERT INTO game_saves
-                (player_name, current_day, cash, difficulty, status, rng_seed, created_at, updated_at)
-                VALUES
-                    (%s, %s, %s, %s, %s, %s, %s, %s)
-                """,
+                "save.insert",
                 (
                     name,
                     start_day,
@@ -174,6 +254,7 @@ class GameSession:
                 ),
             )
             save_id = kursori.lastrowid
+            init_save_stats(kursori, save_id)
             yhteys.commit()
         except Exception as err:
             yhteys.rollback()
@@ -185,7 +266,7 @@ class GameSession:
                 pass
             yhteys.close()
 
-        session = cls(save_id=save_id)
+        session = cls(save_id=save_id, headless=headless)
         InitEvents(session.rng_seed)
 
         if show_intro:
@@ -194,14 +275,41 @@ class GameSession:
         # Ensimmäinen tukikohta + lahjakone (STARTER)
         session._first_time_base_and_gift_setup(starting_cash=_to_dec(cash))
 
+        # Journaalin lähtötila: snapshot valmiista aloitustilanteesta (seq 0)
+        session.journal.start(session.current_day, session.cash)
         return session
 
     @classmethod
-    def load(cls, save_id: int) -> "GameSession":
+    def load(cls, save_id: int, headless: bool = False) -> "GameSession":
         """
         Lataa olemassa olevan tallennuksen ID:llä.
-        """
-        return cls(save_id=save_id)
+        Tallennus, tukikohdat, laivasto, aktiiviset tehtävät ja kohtalokalenteri haetaan
+        yhdellä kierroksella (hydrate_save), ja ne täyttävät session välimuistit.
+        """
+        data = hydrate_save(save_id)
+        if data is None:
+            raise ValueError(f"Tallennetta save_id={save_id} ei löytynyt.")
+        row = data["save"]
+        session = cls(
+            save_id=save_id,
+            current_day=row["current_day"],
+            player_name=row["player_name"],
+            cash=row["cash"],
+            status=row["status"],
+            rng_seed=row.get("rng_seed"),
+            difficulty=row.get("difficulty"),
+            headless=headless,
+        )
+        cls._owned_bases.prime(session, data["bases"])
+        cls._fetch_fleet_overview.prime(session, data["fleet"])
+        cls._active_contracts.prime(session, data["contracts"])
+        cls._fate_calendar.prime(session, data["fate"])
+        cls._traffic.prime(session, data["traffic"])
+        if data["stats"] is None:
+            # Tilastorivi puuttuu (vanha tallennus tai v1-snapshotista tuotu): rakennetaan kerran pelitauluista
+            rebuild_save_stats(save_id)
+        session.journal.start(session.current_day, session.cash, marker="load")
+        return session
     # ---------- Intro / Tarina ----------
 
     def _show_intro_story(self) -> None:
@@ -286,13 +394,23 @@ class GameSession:
         """
         Päävalikon looppi – laivasto, kauppa, upgrade, tehtävät ja ajan kulku.
         """
+        self.audio.preload()
+        announced_day = None
         while True:
-            todaysEvent = SelectEvent("flight", self.current_day, self.rng_seed)
-            home_ident = self._get_primary_base_ident() or "-"
+            # Otsikon tiedot muistista; kanta kysytään vain päivän vaihtuessa tai kirjoituksen jälkeen
+            dash = self._dashboard()
+            if announced_day != dash["day"]:
+                # Päivän tapahtuman ääni kerran per päivä (palaa heti, soi taustalla)
+                announced_day = dash["day"]
+                self.audio.play_event(dash["event"].name)
+            next_arrival = f"päivä {dash['next_arrival']}" if dash["next_arrival"] is not None else "-"
             print("\n" + "🛩️  Päävalikko".center(60, " "))
             print("─" * 60)
             print(
-                f"📅 Päivä: {self.current_day:<4} | 💶 Kassa: {self._fmt_money(self.cash):<14} | 👤 Pelaaja: {self.player_name:<16} | 🏢 Tukikohta: {home_ident} | Eventti: {todaysEvent.name}")
+                f"📅 Päivä: {dash['day']:<4} | 💶 Kassa: {self._fmt_money(dash['cash']):<14} | 👤 Pelaaja: {self.player_name:<16} | 🏢 Tukikohta: {dash['base_ident'] or '-'} | Eventti: {dash['event'].name}")
+            print(
+                f"✈️ Lennolla: {dash['enroute']:<3} | 🛬 Seuraava saapuminen: {next_arrival:<10} | "
+                f"💸 Seuraava lasku: päivä {dash['next_bill_day']} (~{self._fmt_money(dash['next_bill'])})")
             print("1) 📋 Listaa koneet")
             print("2) 🛒 Kauppapaikka")
             print("3) ♻️ Päivitykset")
@@ -302,6 +420,10 @@ class GameSession:
             print("7) ⏩ Etene X päivää")
             print("8) 🎯 Etene kunnes ensimmäinen kone palaa")
             print("9) 🔧 Koneiden huolto")
+            print("A) 📊 Analytiikka")
+            if query_stats_enabled():
+                print("D) 🐞 Kyselytilastot")
+            print(f"P) 🔬 Profilointi: {'päällä' if is_profiling() else 'pois'}")
             print("0) 🚪 Poistu")
 
             choice = input("Valinta: ").strip()
@@ -326,10 +448,12 @@ class GameSession:
                 self.advance_to_next_day()
                 # Pelitilan tarkastelu (voitto/konkurssi)
                 if self.status == "BANKRUPT":
+                    self.audio.play_cue("bankruptcy")
                     print("💀 Yritys meni konkurssiin. Peli päättyy.")
                     self.show_end_game_stats()
                     break
                 if self.current_day >= SURVIVAL_TARGET_DAYS and self.status == "ACTIVE":
+                    self.audio.play_cue("victory")
                     print(f"🏆 Onnea! Selvisit {SURVIVAL_TARGET_DAYS} päivää. Voitit pelin!")
                     self._set_status("VICTORY")
                     self.show_end_game_stats()
@@ -345,6 +469,7 @@ class GameSession:
                     self.fast_forward_days(n)
                     # Pelitilan tarkastelu
                     if self.status == "BANKRUPT":
+                        self.audio.play_cue("bankruptcy")
                         print("💀 Yritys meni konkurssiin. Peli päättyy.")
                         self.show_end_game_stats()
                         break
@@ -352,6 +477,7 @@ class GameSession:
                         # Jos pikakelaus ei jo asettanut VICTORY-tilaa, tee se nyt
                         if self.status == "ACTIVE":
                             self._set_status("VICTORY")
+                        self.audio.play_cue("victory")
                         print(f"🏆 Onnea! Selvisit {SURVIVAL_TARGET_DAYS} päivää. Voitit pelin!")
                         self.show_end_game_stats()
                         break
@@ -367,23 +493,42 @@ class GameSession:
                     self.fast_forward_until_first_return(max_days=cap)
                     # Pelitilan tarkastelu
                     if self.status == "BANKRUPT":
+                        self.audio.play_cue("bankruptcy")
                         print("💀 Yritys meni konkurssiin. Peli päättyy.")
+                        self.metrics.flush()
                         break
                     if self.current_day >= SURVIVAL_TARGET_DAYS:
                         if self.status == "ACTIVE":
                             self._set_status("VICTORY")
+                        self.audio.play_cue("victory")
                         print(f"🏆 Onnea! Selvisit {SURVIVAL_TARGET_DAYS} päivää. Voitit pelin!")
+                        self.metrics.flush()
                         break
 
             elif choice == "9":
                 # Huolto
                 self.maintenance_menu()
 
+            elif choice.lower() == "a":
+                self.show_analytics()
+
+            elif choice.lower() == "d" and query_stats_enabled():
+                # Debug: kyselyinstrumentoinnin raportti (AFC666_QUERY_STATS=1) ja välimuistit
+                print(query_stats_report())
+                print("\n🗃️  Välimuistit")
+                print(format_cache_stats(self.cache_bus))
+
+            elif choice.lower() == "p":
+                # Debug: cProfile päälle/pois; pois kytkettäessä kirjoitetaan pstats + flamegraph
+                self._toggle_profiling()
+
             elif choice == "666":
                 # Shh, avaa salaisen Kas..Kerhohuoneen!
                 self.clubhouse_menu()
 
             elif choice == "0":
+                self.metrics.flush()
+                self.audio.shutdown()
                 print("👋 Heippa!")
                 break
 
@@ -392,35 +537,121 @@ class GameSession:
 
     # ---------- Listaus ----------
 
+    @track_action("valikko: laivasto")
     def list_aircraft(self) -> None:
         """
         Listaa kaikki aktiiviset koneet ja näytä perusinfot + (ECO)upgradet.
         """
-        planes = init_airplanes(self.save_id, include_sold=False)
+        planes = self._fetch_fleet_overview()
         if not planes:
             print("ℹ️  Sinulla ei ole vielä koneita.")
             input("\n↩︎ Enter jatkaaksesi...")
             return
 
-        # Haetaan nykyiset ECO-tasot
-        upgrade_levels = self._fetch_upgrade_levels([p.aircraft_id for p in planes])
-
         _icon_title("Laivasto")
         for i, p in enumerate(planes, start=1):
-            cond = getattr(p, "condition_percent", None)
-            cond = int(cond if cond is not None else 0)
+            cond = int(p.get("condition_percent") or 0)
             broken_flag = " (RIKKI)" if cond < 100 else ""
-            lvl = upgrade_levels.get(p.aircraft_id, 0)
-            eco_now = get_effective_eco_for_aircraft(p.aircraft_id)
-            print(f"\n#{i:>2} ✈️  {(getattr(p, 'model_name', None) or p.model_code)} ({p.registration}) @ {p.current_airport_ident}")
-            print(f"   💶 Ostohinta: {self._fmt_money(p.purchase_price)} | 🔧 Kunto: {cond}%{broken_flag} | 🧭 Status: {p.status}")
-            print(f"   ⏱️ Tunnit: {p.hours_flown} h | 📅 Hankittu päivä: {p.acquired_day}")
-            print(f"   ♻️ ECO-taso: {lvl} | Efektiivinen eco-kerroin: x{eco_now:.2f}")
+            print(f"\n#{i:>2} ✈️  {(p.get('model_name') or p['model_code'])} ({p['registration']}) @ {p['current_airport_ident']}")
+            print(f"   💶 Ostohinta: {self._fmt_money(p['purchase_price'])} | 🔧 Kunto: {cond}%{broken_flag} | 🧭 Status: {p['status']}")
+            print(f"   ⏱️ Tunnit: {int(p.get('hours_flown') or 0)} h | 📅 Hankittu päivä: {int(p.get('acquired_day') or 0)}")
+            print(f"   ♻️ ECO-taso: {p['eco_level']} | Efektiivinen eco-kerroin: x{p['eco_effective']:.2f}")
+
+        input("\n↩︎ Enter jatkaaksesi...")
+
+    @track_action("valikko: analytiikka")
+    def show_analytics(self) -> None:
+        """
+        Laivaston ja lentojen analytiikka: tulot malleittain, käyttöaste, myöhästymiset
+        reittipituuden mukaan ja päästöt eco-luokittain (sarakemuotoisesti, ks. session_helpers/analytics.py).
+        """
+        _icon_title("Analytiikka")
+        # Puskuroidut päivänäytteet mukaan päiväsarjaan
+        self.metrics.flush()
 
+        def progress(statement: str, rows: int) -> None:
+            print(f"\r… {statement}: {rows:,} riviä".replace(",", " ").ljust(60), end="", flush=True)
+
+        try:
+            report = fleet_analytics(self.save_id, self.current_day, progress=progress)
+            series = load_daily_metrics(self.save_id)
+        except ImportError:
+            # NumPy on valinnainen riippuvuus; ilman sitä peli toimii, analytiikka ei
+            print("\r" + " " * 60 + "\r", end="")
+            print("⚠️  Analytiikka vaatii NumPy-kirjaston (pip install numpy).")
+        else:
+            print("\r" + " " * 60 + "\r", end="")
+            print(format_fleet_analytics(report))
+            print("\n" + format_metrics_summary(series))
         input("\n↩︎ Enter jatkaaksesi...")
 
+    @day_cached(topics=(FLEET,), maxsize=1, per_day=False)
+    def _fetch_fleet_overview(self) -> List[dict]:
+        """
+        Laivastolistauksen data yhdellä kyselyllä (kone + malli + ECO-taso + efektiivinen kerroin).
+        Palvellaan muistista, kunnes jokin kirjoitus julkaisee fleet-aiheen.
+        """
+        return fetch_fleet_overview(self.save_id)
+
+    # ---------- Session välimuistit (session_helpers.cache) ----------
+
+    @day_cached(topics=(BASES,), maxsize=1, per_day=False)
+    def _owned_bases(self) -> List[dict]:
+        """Omistetut tukikohdat hankintajärjestyksessä nykyisine kokotasoineen (level)."""
+        return fetch_owned_bases_with_levels(self.save_id)
+
+    @day_cached(topics=(CONTRACTS,), maxsize=1, per_day=False)
+    def _active_contracts(self) -> List[dict]:
+        """Hyväksytyt/käynnissä olevat tehtävät lentoineen."""
+        return fetch_active_contracts(self.save_id)
+
+    @day_cached(maxsize=1, per_day=False)
+    def _fate_calendar(self) -> Dict[int, tuple]:
+        """Kohtalokalenteri (päivä -> tapahtuma); ei muutu pelin aikana."""
+        return fetch_fate_calendar(self.save_id)
+
+    @day_cached(topics=(DAY,), maxsize=1)
+    def _todays_event(self) -> FlightEvent:
+        """
+        Päivän tapahtuma kohtalokalenterista (muistista). Jos kalenteria ei ole, kysytään
+        event_systemiltä kuten ennenkin.
+        """
+        args = self._fate_calendar().get(self.current_day)
+        if args is None:
+            return SelectEvent("flight", self.current_day, self.rng_seed)
+        return FlightEvent(*args)
+
+    @day_cached(topics=(BASES,), maxsize=1, per_day=False)
+    def _base_coords(self) -> Dict[str, Optional[tuple]]:
+        """Omien tukikohtien koordinaatit {ident: (lat, lon)}; avaimet = tukikohtakenttien joukko."""
+        return {b["base_ident"]: self._get_airport_coords(b["base_ident"]) for b in self._owned_bases()}
+
+    @day_cached(topics=(BASES,), maxsize=1024, per_day=False)
+    def _nearest_base(self, ident: str) -> tuple:
+        """Lähimmän oman tukikohdan (ident, km) kentältä `ident`; (None, inf) jos ei tukikohtia/koordinaatteja."""
+        coords = self._get_airport_coords(ident)
+        if not coords:
+            return None, float("inf")
+        return nearest_point(coords, self._base_coords())
+
+    @day_cached(topics=(FLEET, CONTRACTS), maxsize=1, per_day=False)
+    def _traffic(self) -> dict:
+        """Lennolla olevat koneet, seuraava saapumispäivä ja laskutuksen konemäärät."""
+        return fetch_traffic(self.save_id)
+
+    @day_cached(topics=(FLEET, BASES, CASH, CONTRACTS, DAY), maxsize=1)
+    def _dashboard(self) -> dict:
+        """
+        Päävalikon koontinäkymä (päivä, kassa, tukikohta, päivän tapahtuma, lennot, seuraava lasku).
+        Rakennetaan kerran päivässä tai kirjoituksen jälkeen; valikossa liikkuminen ei kysy kantaa.
+        """
+        return build_dashboard(
+            self.current_day, self.cash, self._get_primary_base(), self._todays_event(), self._traffic()
+        )
+
     # ---------- Kauppapaikka ----------
 
+    @track_action("valikko: kauppa")
     def shop_menu(self) -> None:
         """Päävalikko kaupalle, josta voi valita uuden tai käytetyn koneen oston."""
         _icon_title("Kauppapaikka")
@@ -515,29 +746,20 @@ class GameSession:
 
     #---------- Lentori kauppapaikka  --------------
 
+    @track_action("valikko: markkinat")
     def market_menu(self) -> None:
         """Käytettyjen koneiden markkinapaikan käyttöliittymä parannetulla formatoinnilla."""
-        self._refresh_market_aircraft()
+        market_planes = self._current_market_listings()
 
         _icon_title("Käytettyjen markkinat")
 
-        with get_connection() as yhteys:
-            kursori = yhteys.cursor(dictionary=True)
-            kursori.execute("""
-                            SELECT m.*, am.model_name, am.manufacturer
-                            FROM market_aircraft m
-                                     JOIN aircraft_models am ON m.model_code = am.model_code
-                            ORDER BY m.purchase_price ASC
-                            """)
-            market_planes = kursori.fetchall() or []
-
         if not market_planes:
             print("ℹ️  Markkinoilla ei ole juuri nyt yhtään konetta. Yritä myöhemmin uudelleen.");
             input("\n↩︎ Enter jatkaaksesi...");
             return
 
         # Määritetään sarakkeiden leveydet
-        ID_W, NAME_W, PRICE_W, COND_W, HOURS_W, AGE_W, NOTES_W = 3, 28, 13, 7, 8, 10, 40
+        ID_W, NAME_W, PRICE_W, COND_W, HOURS_W, AGE_W, NOTES_W = 6, 28, 13, 7, 8, 10, 40
 
         # Tulostetaan otsikkorivi
         print(
@@ -602,86 +824,46 @@ class GameSession:
             print("❌ Osto epäonnistui.")
         input("\n↩︎ Enter jatkaaksesi...")
 
-    def _refresh_market_aircraft(self):
+    def _current_market_listings(self) -> List[dict]:
         """
-        Päivittää markkinoiden tarjonnan. Poistaa vanhat ja lisää uusia koneita.
-        Ajetaan joka kerta, kun pelaaja avaa markkinat.
+        Palauttaa nykyisen markkinaikkunan ilmoitukset, joita tämä tallennus ei ole vielä ostanut.
+        Tarjonta johdetaan siemenestä (ei kantakirjoituksia); ostetut haetaan kerran per ikkuna.
         """
-        with get_connection() as yhteys:
-            kursori = yhteys.cursor(dictionary=True)
-            # 1. Poista vanhat ilmoitukset (yli 10 päivää vanhat)
-            kursori.execute("DELETE FROM market_aircraft WHERE listed_day < %s", (self.current_day - 10,))
-
-            # 2. Tarkista, montako ilmoitusta on jäljellä
-            kursori.execute("SELECT COUNT(*) as cnt FROM market_aircraft")
-            current_listings = kursori.fetchone()['cnt']
-
-            # 3. Lisää uusia koneita, kunnes markkinoilla on 5-10 konetta
-            num_to_add = random.randint(5, 10) - current_listings
-            if num_to_add <= 0:
-                return
-
-            # Haetaan kaikki mahdolliset konemallit, joita voidaan lisätä
-            kursori.execute("SELECT model_code, purchase_price FROM aircraft_models WHERE category != 'STARTER'")
-            all_models = kursori.fetchall() or []
-            if not all_models: return
-
-            for _ in range(num_to_add):
-                model = random.choice(all_models)
+        window = market_window(self.current_day)
+        seed = self.rng_seed if self.rng_seed is not None else self.save_id
+        listings = generate_market_listings(seed, window, fetch_market_models())
 
-                # Arvotaan koneelle ominaisuudet
-                age = random.randint(10, 500)
-                hours = age * random.randint(1, 5)
-                condition = random.randint(20, 95)
-
-                # Hinta perustuu uuteen hintaan, mutta sitä muokataan iän, tuntien ja kunnon mukaan
-                price_modifier = (Decimal(condition) / 100) - (Decimal(hours) / 20000) - (Decimal(age) / 5000)
-                price_modifier = max(Decimal('0.1'), min(price_modifier, Decimal('0.9')))  # 10-90% uudesta hinnasta
-                price = (Decimal(model['purchase_price']) * price_modifier).quantize(Decimal("0.01"))
-
-                # Satunnainen huomio
-                notes_options = [
-                    None,
-                    "Edellinen omistaja oli todella varovainen.",
-                    "Rungossa on muutamia pieniä naarmuja.",
-                    "Moottori saattaa kaivata huoltoa pian.",
-                    "Tällä on lennetty vain lyhyitä matkoja.",
-                    "Sisusta on kuin uusi.",
-                    None, None
-                ]
-                notes = random.choice(notes_options)
-
-                kursori.execute(
-                    "INSERT INTO market_aircraft (model_code, purchase_price, condition_percent, hours_flown, manufactured_day, market_notes, listed_day) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                    (model['model_code'], price, condition, hours, self.current_day - age, notes, self.current_day)
-                )
+        purchased = self._market_purchased.get(window)
+        if purchased is None:
+            purchased = fetch_purchased_listing_ids(self.save_id, window)
+            self._market_purchased = {window: purchased}
+        return [p for p in listings if p["market_id"] not in purchased]
 
+    @traced("osto: markkinat")
+    @journaled
+    @publishes(FLEET, CASH)
     def _purchase_market_aircraft_tx(self, plane_data: dict) -> bool:
         """Suorittaa käytetyn koneen oston atomisena transaktiona."""
         with get_connection() as yhteys:
-            kursori = yhteys.cursor()
+            kursori = prepared_cursor(yhteys)
             try:
                 # 1. Varmista kassa ja lukitse pelaajan tallennus
-                kursori.execute("SELECT cash FROM game_saves WHERE save_id = %s FOR UPDATE", (self.save_id,))
+                kursori.execute("save.cash_for_update", (self.save_id,))
                 cash_now = Decimal(kursori.fetchone()[0])
                 price = Decimal(plane_data['purchase_price'])
                 if cash_now < price:
                     return False
 
-                # 2. Poista ilmoitus markkinoilta
-                kursori.execute("DELETE FROM market_aircraft WHERE market_id = %s", (plane_data['market_id'],))
-                if kursori.rowcount == 0:
-                    print("⚠️  Joku ehti ostaa koneen ennen sinua!");
+                # 2. Merkitse ilmoitus ostetuksi (tallennuskohtainen, PK estää tuplaoston)
+                if not record_market_purchase(kursori, self.save_id, plane_data['market_id'], self.current_day):
+                    yhteys.rollback()
+                    print("⚠️  Olet jo ostanut tämän koneen!");
                     return False
 
                 # 3. Lisää kone pelaajan laivastoon
                 registration = self._generate_registration()
                 kursori.execute(
-                    """
-                    INSERT INTO aircraft (model_code, current_airport_ident, registration, acquired_day, purchase_price,
-                                          condition_percent, hours_flown, status, save_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, 'IDLE', %s)
-                    """,
+                    "aircraft.insert_used",
                     (
                         plane_data['model_code'],
                         self._get_primary_base_ident() or 'EFHK',  # Sijoitetaan oletuksena pääkonttorille
@@ -694,13 +876,17 @@ class GameSession:
                     )
                 )
 
-                # 4. Päivitä pelaajan kassa
+                # 4. Päivitä pelaajan kassa ja tilastot
                 new_cash = (cash_now - price).quantize(Decimal("0.01"))
-                kursori.execute("UPDATE game_saves SET cash = %s, updated_at = %s WHERE save_id = %s",
+                kursori.execute("save.set_cash_touch",
                                 (new_cash, datetime.utcnow(), self.save_id))
+                add_stats(kursori, self.save_id, aircraft_count=1, spend_aircraft=price,
+                          total_hours=int(plane_data['hours_flown'] or 0))
 
                 yhteys.commit()
                 self.cash = new_cash
+                self._market_purchased.setdefault(market_window(self.current_day), set()).add(
+                    int(plane_data['market_id']))
                 return True
             except Exception as e:
                 yhteys.rollback()
@@ -732,9 +918,7 @@ class GameSession:
             current_eco = compute_effective_eco_multiplier(aircraft_id, base_eco)
 
             # Ennustetaan tuleva kerroin simuloimalla yhtä lisätasoa
-            factor_per_level = Decimal("1.05")
-            next_level_multiplier = Decimal(str(base_eco)) * (factor_per_level ** next_level)
-            new_eco = float(max(Decimal("0.50"), min(next_level_multiplier, Decimal("5.00"))))
+            new_eco = eco_multiplier_for_level(base_eco, next_level)
 
             cost = calc_aircraft_upgrade_cost(row, next_level)
 
@@ -770,14 +954,20 @@ class GameSession:
             return
 
         try:
-            # Kutsutaan yksinkertaistettua funktiota ilman turhia parametreja
-            apply_aircraft_upgrade(aircraft_id=aircraft_id, installed_day=self.current_day)
-            self._add_cash(-cost)
+            self._apply_aircraft_upgrade_tx(aircraft_id, cost)
             print("✅ Päivitys tehty.")
         except Exception as e:
             print(f"❌ Päivitys epäonnistui: {e}")
         input("\n↩︎ Enter jatkaaksesi...")
 
+    @traced("päivitys: kone")
+    @journaled
+    @publishes(FLEET)
+    def _apply_aircraft_upgrade_tx(self, aircraft_id: int, cost: Decimal) -> None:
+        """Asentaa koneelle seuraavan ECO-tason ja veloittaa hinnan."""
+        apply_aircraft_upgrade(aircraft_id=aircraft_id, installed_day=self.current_day)
+        self._add_cash(-_to_dec(cost), stats={"spend_upgrades": _to_dec(cost)})
+
 
     # ---------- Lentokoneiden korjaus ----------
 
@@ -796,25 +986,9 @@ class GameSession:
 
         Käytetään huoltovalikossa listaamaan korjattavat koneet.
         """
-        sql = """
-              SELECT a.aircraft_id, \
-                     a.registration, \
-                     a.status, \
-                     a.condition_percent, \
-                     am.model_name, \
-                     am.model_code
-              FROM aircraft a
-                       JOIN aircraft_models am ON am.model_code = a.model_code
-              WHERE a.save_id = %s
-                AND (a.sold_day IS NULL OR a.sold_day = 0)
-                AND a.condition_percent IS NOT NULL
-                AND a.condition_percent < 100
-              ORDER BY a.aircraft_id \
-              """
-
         with get_connection() as yhteys:
-            kursori = yhteys.cursor(dictionary=True)
-            kursori.execute(sql, (self.save_id,))
+            kursori = prepared_cursor(yhteys, dictionary=True)
+            kursori.execute("aircraft.repairable", (self.save_id,))
             return kursori.fetchall() or []
 
     # Yhden koneen korjaus täyteen kuntoon
@@ -830,15 +1004,17 @@ class GameSession:
     # True, jos korjaus onnistui
     # False, jos kassa ei riittänyt tai kone on "BUSY"
 
+    @journaled
+    @publishes(FLEET, CASH)
     def _repair_aircraft_to_full_tx(self, aircraft_id: int) -> bool:
         yhteys = get_connection()
         try:
-            kursori = yhteys.cursor(dictionary=True)
+            kursori = prepared_cursor(yhteys, dictionary=True)
             yhteys.start_transaction()
 
             # Lukitaan kone
             kursori.execute(
-                "SELECT condition_percent, status FROM aircraft WHERE aircraft_id = %s FOR UPDATE", (aircraft_id,),
+                "aircraft.condition_for_update", (aircraft_id,),
             )
 
             result = kursori.fetchone()
@@ -868,7 +1044,7 @@ class GameSession:
 
 
             # Lukitaan kassa ja tarkistetaan rahojen riittävyys
-            kursori.execute("SELECT cash FROM game_saves WHERE save_id = %s FOR UPDATE", (self.save_id,))
+            kursori.execute("save.cash_for_update", (self.save_id,))
             cash_result = kursori.fetchone()
             cash_now = _to_dec(cash_result["cash"] if cash_result and "cash" in cash_result else 0)
 
@@ -878,15 +1054,16 @@ class GameSession:
                 return False
 
             kursori.execute(
-                "UPDATE aircraft SET condition_percent = 100, status = 'IDLE' WHERE aircraft_id = %s", (aircraft_id,),
+                "aircraft.repair", (aircraft_id,),
             )
 
             # Lasketaan uusi kassa
             new_cash = (cash_now - repair_cost).quantize(Decimal("0.01"),rounding=ROUND_HALF_UP)
             kursori.execute(
-                "UPDATE game_saves SET cash = %s, updated_at = %s WHERE save_id = %s",
+                "save.set_cash_touch",
                 (new_cash, datetime.utcnow(), self.save_id),
             )
+            add_stats(kursori, self.save_id, spend_repairs=repair_cost)
 
             yhteys.commit()
 
@@ -907,6 +1084,8 @@ class GameSession:
             except Exception:
                 pass
 
+    @journaled
+    @publishes(FLEET, CASH)
     def _repair_many_to_full_tx(self, aircraft_ids: List[int]) -> bool:
         """
         Korjaa useita koneita kerralla täyteen kuntoon.
@@ -939,19 +1118,14 @@ class GameSession:
 
         yhteys = get_connection()
         try:
-            kursori = yhteys.cursor(dictionary=True)
+            kursori = prepared_cursor(yhteys, dictionary=True)
             yhteys.start_transaction()
 
             # 1. Lukitaan kaikki annetut koneet ja haetaan niiden tiedot
-            placeholders = ",".join(["%s"] * len(aircraft_ids))
             kursori.execute(
-                f"""
-                    SELECT aircraft_id, condition_percent, status 
-                    FROM aircraft 
-                    WHERE aircraft_id IN ({placeholders})
-                    FOR UPDATE
-                    """,
+                "aircraft.condition_many_for_update",
                 tuple(aircraft_ids),
+                expand=len(aircraft_ids),
             )
             rows = kursori.fetchall() or []
 
@@ -988,7 +1162,7 @@ class GameSession:
 
             # 4. Lukitaan kassa ja tarkistetaan riittävyys
             kursori.execute(
-                "SELECT cash FROM game_saves WHERE save_id = %s FOR UPDATE",
+                "save.cash_for_update",
                 (self.save_id,)
             )
             cr = kursori.fetchone()
@@ -1001,19 +1175,19 @@ class GameSession:
                 return False
 
             # 5. Päivitetään kaikki korjattavat koneet kerralla
-            placeholders2 = ",".join(["%s"] * len(repair_ids))
             kursori.execute(
-                f"UPDATE aircraft SET condition_percent = 100, status = 'IDLE' WHERE aircraft_id IN ({placeholders2})",
-                # KORJATTU: oli "conditon_percent" (kirjoitusvirhe)
+                "aircraft.repair_many",
                 tuple(repair_ids),
+                expand=len(repair_ids),
             )
 
             # 6. Veloitetaan kokonaiskustannus kassasta
             new_cash = (cash_now - total_cost).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
             kursori.execute(
-                "UPDATE game_saves SET cash = %s, updated_at = %s WHERE save_id = %s",
+                "save.set_cash_touch",
                 (new_cash, datetime.utcnow(), self.save_id),
             )
+            add_stats(kursori, self.save_id, spend_repairs=total_cost)
 
             # 7. Commitoidaan kaikki muutokset
             yhteys.commit()
@@ -1038,6 +1212,7 @@ class GameSession:
             except Exception:
                 pass
 
+    @track_action("valikko: huolto")
     def maintenance_menu(self) -> None:
         """
         Interaktiivinen huoltovalikko koneiden korjaamiseen.
@@ -1138,13 +1313,13 @@ class GameSession:
             ("LARGE", "HUGE"): Decimal("1.50"),
         }
 
-        bases = fetch_owned_bases(self.save_id)
+        bases = sorted(self._owned_bases(), key=lambda b: b["base_name"])
         if not bases:
             print("ℹ️  Sinulla ei ole vielä tukikohtia.")
             input("\n↩︎ Enter jatkaaksesi...")
             return
 
-        level_map = fetch_base_current_level_map([b["base_id"] for b in bases])
+        level_map = {b["base_id"]: b["level"] for b in bases}
 
         _icon_title("Tukikohtien päivitykset")
         menu_rows = []
@@ -1195,14 +1370,22 @@ class GameSession:
             return
 
         try:
-            insert_base_upgrade(b["base_id"], nxt, cost, self.current_day)
-            self._add_cash(-_to_dec(cost))
+            self._apply_base_upgrade_tx(b["base_id"], nxt, cost)
             print("✅ Tukikohdan päivitys tehty.")
         except Exception as e:
             print(f"❌ Päivitys epäonnistui: {e}")
 
         input("\n↩︎ Enter jatkaaksesi...")
 
+    @traced("päivitys: tukikohta")
+    @journaled
+    @publishes(BASES)
+    def _apply_base_upgrade_tx(self, base_id: int, level_code: str, cost: Decimal) -> None:
+        """Kirjaa tukikohdalle uuden kokotason ja veloittaa hinnan."""
+        insert_base_upgrade(base_id, level_code, cost, self.current_day)
+        self._add_cash(-_to_dec(cost), stats={"spend_upgrades": _to_dec(cost)})
+
+    @track_action("valikko: päivitykset")
     def upgrade_menu(self) -> None:
         """
         Päävalikko päivityksille.
@@ -1225,18 +1408,19 @@ class GameSession:
 
     def _get_airport_coords(self, ident: str):
         """
-        Hae kentän koordinaatit airport-taulusta.
+        Hae kentän koordinaatit kenttäluettelosta (levyvälimuisti, ks. storage/airports.py);
+        ilman NumPyä airport-taulusta.
         Palauttaa (lat, lon) floatteina tai None jos data puuttuu.
         """
+        if airport_catalog() is not None:
+            return catalog_coords(ident)
+
         yhteys = get_connection()
         try:
-            try:
-                kursori = yhteys.cursor(dictionary=True)
-            except TypeError:
-                kursori = yhteys.cursor()
+            kursori = prepared_cursor(yhteys, dictionary=True)
 
             kursori.execute(
-                "SELECT latitude_deg, longitude_deg FROM airport WHERE ident = %s",
+                "airport.coords",
                 (ident,),
             )
             row = kursori.fetchone()
@@ -1267,26 +1451,21 @@ class GameSession:
         HUOM: Determinismiä varten käytetään Pythonin random-moduulia,
         ei MySQL:n RAND()-funktiota. Haemme KAIKKI sopivat kentät ja
         valitsemme niistä satunnaisesti Pythonilla.
+        Kentät tulevat kenttäluettelosta (muistista), jos se on käytettävissä.
         """
+        rows = catalog_sample_destinations(exclude_ident, n)
+        if rows is not None:
+            return [{"ident": ident, "name": name} for ident, name in rows]
+
         yhteys = get_connection()
         try:
-            try:
-                kursori = yhteys.cursor(dictionary=True)
-            except TypeError:
-                kursori = yhteys.cursor()
+            kursori = prepared_cursor(yhteys, dictionary=True)
 
             # Haetaan KAIKKI sopivat kentät ilman satunnaisuutta
             # (Poistetaan ORDER BY RAND() jotta determinismi toimii)
             # Haetaan KAIKKI sopivat kentät joilla on koordinaatit
             kursori.execute(
-                """
-                SELECT ident, name
-                FROM airport
-                WHERE ident <> %s
-                  AND type IN ('small_airport', 'medium_airport', 'large_airport')
-                  AND latitude_deg IS NOT NULL
-                  AND longitude_deg IS NOT NULL
-                """,
+                "airport.destinations",
                 (exclude_ident,),
             )
 
@@ -1326,13 +1505,7 @@ class GameSession:
         """
         Haversine-kaava kahden pisteen etäisyyteen (km).
         """
-        R = 6371.0
-        phi1, phi2 = math.radians(lat1), math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dl = math.radians(lon2 - lon1)
-        a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dl / 2) ** 2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
+        return haversine_km(lat1, lon1, lat2, lon2)
 
     def _random_task_offers_for_plane(self, plane, count: int = 5):
         """
@@ -1342,30 +1515,18 @@ class GameSession:
         - Palkkio: (payload * PER_KG + distance * PER_KM) * effective_eco
           ja lattia varmistaa ettei palkkio mene negatiiviseksi/turhan pieneksi.
         - Sakko on osuus palkkiosta, mutta ei koskaan negatiivinen.
-        Muokkaa: PER_KG, PER_KM, MIN_TASK_REWARD, ECO_MIN/ECO_MAX.
+        Säännöt ja parametrit: session_helpers.rules (OFFER_*), build_task_offer.
         """
 
-        # Muokattavat palkkioparametrit
-        PER_KG = Decimal("10.10")  # €/kg
-        PER_KM = Decimal("6.90")  # €/km
-        MIN_TASK_REWARD = Decimal("250.00")  # alin sallittu palkkio
-        ECO_MIN = Decimal("0.10")  # eco-kerroin ei alle tämän
-        ECO_MAX = Decimal("5.00")  # eikä yli tämän
-
         dep_ident = plane["current_airport_ident"]
-        speed_kts = float(plane.get("cruise_speed_kts") or 200.0)
-        speed_km_per_day = max(1.0, speed_kts * 1.852 * 24.0 * 2.0)
+        speed_per_day = speed_km_per_day(plane.get("cruise_speed_kts"))
         capacity = int(plane.get("base_cargo_kg") or 0) or 1
 
         # Yritä käyttää tehokasta eco-kerrointa (malli + upgradet); fallback: plane.eco_fee_multiplier
         try:
-            eff_eco_val = get_effective_eco_for_aircraft(
-                plane["aircraft_id"])  # oletetaan funktion olevan käytettävissä
-            eff_eco = Decimal(str(eff_eco_val))
+            eff_eco = Decimal(str(get_effective_eco_for_aircraft(plane["aircraft_id"])))
         except Exception:
             eff_eco = Decimal(str(plane.get("eco_fee_multiplier") or 1.0))
-        # Rajaa eco kohtuullisiin rajoihin
-        eff_eco = max(ECO_MIN, min(ECO_MAX, eff_eco))
 
         # Haetaan hieman ylimääräisiä kohteita siltä varalta, että osa karsiutuu
         dests = self._pick_random_destinations(count * 2, dep_ident)
@@ -1375,158 +1536,63 @@ class GameSession:
             if len(offers) >= count:
                 break
 
-            dest_ident = d["ident"]
             dep_xy = self._get_airport_coords(dep_ident)
-            dst_xy = self._get_airport_coords(dest_ident)
+            dst_xy = self._get_airport_coords(d["ident"])
             if not (dep_xy and dst_xy):
                 # Jos koordinaatit puuttuvat, ohitetaan
                 continue
 
-            # Etäisyys (km)
             dist_km = self._haversine_km(dep_xy[0], dep_xy[1], dst_xy[0], dst_xy[1])
-
-            # Rahti skaalataan etäisyyden mukaan; sallitaan yli-kapasiteetti (→ useita reissuja)
-            if dist_km < 500:
-                payload = random.randint(max(1, capacity // 2), max(1, capacity * 3))
-            elif dist_km < 1500:
-                payload = random.randint(capacity, capacity * 4)
-            else:
-                payload = random.randint(capacity * 2, capacity * 6)
-
-            # Peruskesto (päivinä) matkan mukaan; yli-kapasiteetti lisää reissujen määrää ja kokonaiskestoa
-            base_days = max(1, math.ceil(dist_km / speed_km_per_day))
-            trips = max(1, math.ceil(payload / capacity))
-            total_days = base_days * trips
-
-            # Palkkion laskenta (lattia varmistaa ettei negatiivinen)
-            base_reward = (Decimal(payload) * PER_KG) + (Decimal(dist_km) * PER_KM)
-            reward = (base_reward * eff_eco).quantize(Decimal("0.01"))
-            if reward < MIN_TASK_REWARD:
-                reward = MIN_TASK_REWARD
-
-            # Sakko osuutena; ei koskaan negatiivinen
-            penalty = (reward * Decimal("0.30")).quantize(Decimal("0.01"))
-            if penalty < Decimal("0.00"):
-                penalty = Decimal("0.00")
-
-            # Deadline: kokonaiskesto + puskuri
-            buffer_days = max(1, trips // 2)
-            deadline = self.current_day + total_days + buffer_days
-
-            offers.append({
-                "dest_ident": dest_ident,
-                "dest_name": d.get("name"),
-                "payload_kg": payload,
-                "distance_km": dist_km,
-                "base_days": base_days,
-                "trips": trips,
-                "total_days": total_days,
-                "reward": reward,
-                "penalty": penalty,
-                "deadline": deadline,
-            })
+            offers.append(build_task_offer(d, dist_km, capacity, speed_per_day, eff_eco, self.current_day))
 
         return offers[:count]
 
+    @track_action("valikko: tehtävät")
     def show_active_tasks(self) -> None:
         """
         Listaa aktiiviset tehtävät.
         """
-        yhteys = get_connection()
-        try:
-            try:
-                kursori = yhteys.cursor(dictionary=True)
-            except TypeError:
-                kursori = yhteys.cursor()
-
-            kursori.execute(
-                """
-                SELECT c.contractId,
-                       c.payload_kg,
-                       c.reward,
-                       c.penalty,
-                       c.created_day,
-                       c.deadline_day,
-                       c.accepted_day,
-                       c.status,
-                       c.ident  AS dest_ident,
-                       a.registration,
-                       a.current_airport_ident,
-                       f.arrival_day,
-                       f.status AS flight_status
-                FROM contracts c
-                         LEFT JOIN aircraft a ON a.aircraft_id = c.aircraft_id
-                         LEFT JOIN flights f ON f.contract_id = c.contractId
-                WHERE c.save_id = %s
-                  AND c.status IN ('ACCEPTED', 'IN_PROGRESS')
-                ORDER BY c.deadline_day ASC, c.contractId ASC
-                """,
-                (self.save_id,),
-            )
-            rows = kursori.fetchall() or []
-            if not rows:
-                print("\nℹ️  Ei aktiivisia tehtäviä.")
-                input("\n↩︎ Enter jatkaaksesi...")
-                return
+        rows = self._active_contracts()
+        if not rows:
+            print("\nℹ️  Ei aktiivisia tehtäviä.")
+            input("\n↩︎ Enter jatkaaksesi...")
+            return
 
-            _icon_title("Aktiiviset tehtävät")
-            for r in rows:
-                rd = r if isinstance(r, dict) else None
-                cid = rd["contractId"] if rd else r[0]
-                payload = rd["payload_kg"] if rd else r[1]
-                reward = rd["reward"] if rd else r[2]
-                penalty = rd["penalty"] if rd else r[3]
-                deadline = rd["deadline_day"] if rd else r[5]
-                status = rd["status"] if rd else r[7]
-                dest = rd["dest_ident"] if rd else r[8]
-                reg = rd["registration"] if rd else r[9]
-                arr_day = rd["arrival_day"] if rd else r[11]
-                fl_status = rd["flight_status"] if rd else r[12]
-                left_days = (deadline - self.current_day) if deadline is not None else None
-                late = left_days is not None and left_days < 0
+        _icon_title("Aktiiviset tehtävät")
+        for r in rows:
+            rd = r if isinstance(r, dict) else None
+            cid = rd["contractId"] if rd else r[0]
+            payload = rd["payload_kg"] if rd else r[1]
+            reward = rd["reward"] if rd else r[2]
+            penalty = rd["penalty"] if rd else r[3]
+            deadline = rd["deadline_day"] if rd else r[5]
+            status = rd["status"] if rd else r[7]
+            dest = rd["dest_ident"] if rd else r[8]
+            reg = rd["registration"] if rd else r[9]
+            arr_day = rd["arrival_day"] if rd else r[11]
+            fl_status = rd["flight_status"] if rd else r[12]
+            left_days = (deadline - self.current_day) if deadline is not None else None
+            late = left_days is not None and left_days < 0
 
-                print(
-                    f"📦 #{cid} -> {dest} | ✈️ {reg or '-'} | 🧱 {int(payload)} kg | 💶 {self._fmt_money(reward)} | "
-                    f"DL: {deadline} ({'myöhässä' if late else f'{left_days} pv jäljellä'}) | "
-                    f"🧭 Tila: {status}{f' / Lento: {fl_status}, ETA {arr_day}' if arr_day is not None else ''}"
-                )
-            input("\n↩︎ Enter jatkaaksesi...")
-        finally:
-            try:
-                kursori.close()
-            except Exception:
-                pass
-            yhteys.close()
+            print(
+                f"📦 #{cid} -> {dest} | ✈️ {reg or '-'} | 🧱 {int(payload)} kg | 💶 {self._fmt_money(reward)} | "
+                f"DL: {deadline} ({'myöhässä' if late else f'{left_days} pv jäljellä'}) | "
+                f"🧭 Tila: {status}{f' / Lento: {fl_status}, ETA {arr_day}' if arr_day is not None else ''}"
+            )
+        input("\n↩︎ Enter jatkaaksesi...")
 
+    @track_action("valikko: uusi tehtävä")
     def start_new_task(self) -> None:
         """
         Aloita uusi tehtävä: valitse IDLE-kone, generoi tarjoukset, vahvista, luo contract+flight.
         """
         yhteys = get_connection()
         try:
-            try:
-                kursori = yhteys.cursor(dictionary=True)
-            except TypeError:
-                kursori = yhteys.cursor()
+            kursori = prepared_cursor(yhteys, dictionary=True)
 
             # Vapaat koneet
             kursori.execute(
-                """
-                SELECT a.aircraft_id,
-                       a.registration,
-                       a.current_airport_ident,
-                       a.model_code,
-                       am.model_name,
-                       am.base_cargo_kg,
-                       am.cruise_speed_kts,
-                       am.eco_fee_multiplier
-                FROM aircraft a
-                         JOIN aircraft_models am ON am.model_code = a.model_code
-                WHERE a.save_id = %s
-                  AND a.status = 'IDLE'
-                  AND a.condition_percent >= 100
-                ORDER BY a.aircraft_id
-                """,
+                "aircraft.idle_ready",
                 (self.save_id,),
             )
             planes = kursori.fetchall() or []
@@ -1593,62 +1659,70 @@ class GameSession:
                 print("❎ Peruutettu.")
                 return
 
-            now_day = self.current_day
-            total_dist = float(offer["distance_km"]) * offer["trips"]
-            arr_day = now_day + offer["total_days"]
+            contract_id = self._start_task_tx(plane["aircraft_id"], plane["current_airport_ident"], offer)
+            if contract_id is None:
+                return
+            arr_day = self.current_day + offer["total_days"]
+            print(f"✅ Tehtävä #{contract_id} aloitettu. ETA: {arr_day} (lähtöjä {offer['trips']}).")
+            print("ℹ️  Palkkio hyvitetään, kun lento on saapunut (Seuraava päivä).")
 
+            input("\n↩︎ Enter jatkaaksesi...")
+        finally:
             try:
-                yhteys.start_transaction()
+                kursori.close()
+            except Exception:
+                pass
+            yhteys.close()
 
-                kursori.execute(
-                    """
-                    INSERT INTO contracts (payload_kg, reward, penalty, priority,
-                                           created_day, deadline_day, accepted_day, completed_day,
-                                           status, lost_packages, damaged_packages,
-                                           save_id, aircraft_id, ident, event_id)
-                    VALUES (%s, %s, %s, %s,
-                            %s, %s, %s, %s,
-                            %s, %s, %s,
-                            %s, %s, %s, %s)
-                    """,
-                    (
-                        offer["payload_kg"], offer["reward"], offer["penalty"], "NORMAL",
-                        now_day, offer["deadline"], now_day, None,
-                        "IN_PROGRESS", 0, 0,
-                        self.save_id, plane["aircraft_id"], offer["dest_ident"], None
-                    ),
-                )
-                contract_id = kursori.lastrowid
+    @traced("tehtävä: lähetä")
+    @journaled
+    @publishes(FLEET, CONTRACTS)
+    def _start_task_tx(self, aircraft_id: int, dep_ident: str, offer: dict) -> Optional[int]:
+        """
+        Luo tarjouksesta contract- ja flight-rivit ja merkitsee koneen BUSY-tilaan (yksi transaktio).
+        Palauttaa contract_id:n, tai None jos aloitus epäonnistui.
+        """
+        now_day = self.current_day
+        total_dist = float(offer["distance_km"]) * offer["trips"]
+        arr_day = now_day + offer["total_days"]
 
-                kursori.execute(
-                    """
-                    INSERT INTO flights (created_day, dep_day, arrival_day, status, distance_km, schedule_delay_min,
-                                         emission_kg_co2, eco_fee, dep_ident, arr_ident, aircraft_id, save_id,
-                                         contract_id)
-                    VALUES (%s, %s, %s, %s, %s, %s,
-                            %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        now_day, now_day, arr_day, "ENROUTE", total_dist, 0,
-                        0.0, Decimal("0.00"), plane["current_airport_ident"], offer["dest_ident"],
-                        plane["aircraft_id"], self.save_id, contract_id
-                    ),
-                )
+        yhteys = get_connection()
+        kursori = prepared_cursor(yhteys)
+        try:
+            yhteys.start_transaction()
 
-                kursori.execute(
-                    "UPDATE aircraft SET status = 'BUSY' WHERE aircraft_id = %s",
-                    (plane["aircraft_id"],)
-                )
+            kursori.execute(
+                "contract.insert",
+                (
+                    offer["payload_kg"], offer["reward"], offer["penalty"], "NORMAL",
+                    now_day, offer["deadline"], now_day, None,
+                    "IN_PROGRESS", 0, 0,
+                    self.save_id, aircraft_id, offer["dest_ident"], None
+                ),
+            )
+            contract_id = kursori.lastrowid
 
-                yhteys.commit()
-                print(f"✅ Tehtävä #{contract_id} aloitettu. ETA: {arr_day} (lähtöjä {offer['trips']}).")
-                print("ℹ️  Palkkio hyvitetään, kun lento on saapunut (Seuraava päivä).")
-            except Exception as e:
-                yhteys.rollback()
-                print(f"❌ Tehtävän aloitus epäonnistui: {e}")
-                return
+            kursori.execute(
+                "flight.insert",
+                (
+                    now_day, now_day, arr_day, "ENROUTE", total_dist, 0,
+                    0.0, Decimal("0.00"), dep_ident, offer["dest_ident"],
+                    aircraft_id, self.save_id, contract_id
+                ),
+            )
 
-            input("\n↩︎ Enter jatkaaksesi...")
+            kursori.execute(
+                "aircraft.set_busy",
+                (aircraft_id,)
+            )
+            add_stats(kursori, self.save_id, contract_flights=1)
+
+            yhteys.commit()
+            return contract_id
+        except Exception as e:
+            yhteys.rollback()
+            print(f"❌ Tehtävän aloitus epäonnistui: {e}")
+            return None
         finally:
             try:
                 kursori.close()
@@ -1658,16 +1732,29 @@ class GameSession:
 
     # ---------- Seuraava päivä + kuukausilaskut ----------
 
+    @traced("päivä")
+    @track_action("päivä")
+    @journaled
+    @publishes(DAY, FLEET, CONTRACTS, CASH)
     def advance_to_next_day(self, silent: bool = False) -> dict:
         """
         Siirtää päivän eteenpäin yhdellä, prosessoi saapuneet lennot ja päivittää kassaa.
         Tarkistaa myös, onko joutilaita koneita väärillä kentillä ja lähettää ne kotiin.
         """
+        phases = self.day_phases
+        phases.begin()
         todaysEvent = SelectEvent("flight", self.current_day, self.rng_seed)
+        phases.lap("tapahtuma")
         # --- LÄHETÄ KONEET KOTIIN (RTB) ---------------------------------
-        # Ajetaan tämä vain joka 3. päivä suorituskyvyn säästämiseksi pikakelauksessa
-        if self.current_day % 3 == 0:
+        # Paluulento luodaan saapumisen yhteydessä (alla). Session ensimmäisenä päivänä ajetaan
+        # lisäksi kertakierros koneille, jotka jäivät vieraille kentille muuta kautta
+        # (vanhat tallennukset, muualle ostetut koneet).
+        if not self._rtb_swept:
             self._initiate_return_flights_for_idle_aircraft(silent=silent)
+            self._rtb_swept = True
+        phases.lap("RTB")
+        returns: List[str] = []
+        day_stats: Dict[str, object] = {}  # Tilastodeltat, kirjataan kerran transaktion lopussa
 
         new_day = self.current_day + 1
         arrivals_count = 0
@@ -1677,103 +1764,81 @@ class GameSession:
         yhteys = get_connection()
         try:
             # Käytetään dictionary=True, jotta sarakkeisiin voi viitata nimillä
-            kursori = yhteys.cursor(dictionary=True)
+            kursori = prepared_cursor(yhteys, dictionary=True)
             try:
                 yhteys.start_transaction()
 
                 # Päivitä pelin päivä tietokantaan
                 kursori.execute(
-                    "UPDATE game_saves SET current_day = %s, updated_at = %s WHERE save_id = %s",
+                    "save.set_day",
                     (new_day, db_timestamp, self.save_id),
                 )
 
-                # Hae SAAPUVAT lennot (sekä sopimuslennot että paluulennot)
-                kursori.execute(
-                    """
-                    SELECT f.flight_id, f.contract_id, f.aircraft_id,
-                        f.arr_ident, f.arrival_day, f.dep_day, f.status AS flight_status,
-                        c.deadline_day, c.reward, c.penalty
-                    FROM flights f
-                    -- LEFT JOIN, jotta paluulennot (ei sopimusta) tulevat mukaan
-                    LEFT JOIN contracts c ON c.contractId = f.contract_id
-                    WHERE f.save_id = %s
-                    -- KÄSITTELE SEKÄ ENROUTE ETTÄ ENROUTE_RTB TILAT --
-                    AND f.status IN ('ENROUTE', 'ENROUTE_RTB')
-                    AND f.arrival_day <= %s
-                    """,
-                    (self.save_id, new_day),
-                )
-                arrivals = kursori.fetchall() or []
+                # Hae SAAPUVAT lennot (sekä sopimuslennot että paluulennot) ja päivän alun
+                # tilastorivi päiväsarjaa varten samalla kierroksella
+                arrivals, stats_rows = fetch_multi(yhteys, [
+                    ("flight.arrivals_due", (self.save_id, new_day)),
+                    ("stats.get", (self.save_id,)),
+                ])
                 arrivals_count = len(arrivals)
 
                 for flight_data in arrivals:
                     flight_id = flight_data["flight_id"]
                     aircraft_id = flight_data["aircraft_id"]
-                    arr_ident = flight_data["arr_ident"]
-                    arr_day = int(flight_data["arrival_day"])
-                    dep_day = int(flight_data["dep_day"])
-                    current_flight_status = flight_data["flight_status"]
+                    outcome = settle_arrival(flight_data, new_day)
+                    merge_stats(day_stats, **arrival_stats(outcome))
 
                     # --- Laske ja lisää lentotunnit ---
-                    flight_duration_days = arr_day - dep_day
-                    hours_to_add = max(0, flight_duration_days) * 24
-                    if hours_to_add > 0:
+                    if outcome["hours_to_add"] > 0:
                         kursori.execute(
-                            "UPDATE aircraft SET hours_flown = hours_flown + %s WHERE aircraft_id = %s",
-                            (hours_to_add, aircraft_id),
+                            "aircraft.add_hours",
+                            (outcome["hours_to_add"], aircraft_id),
                         )
 
-                    # --- Päivitä lennon tila ---
-                    # Käytä erillistä tilaa saapuneille paluulennoille, jos tarpeen
-                    new_flight_status = 'ARRIVED_RTB' if current_flight_status == 'ENROUTE_RTB' else 'ARRIVED'
-                    kursori.execute("UPDATE flights SET status = %s WHERE flight_id = %s", (new_flight_status, flight_id,))
+                    # --- Päivitä lennon tila (paluulennoille oma ARRIVED_RTB) ---
+                    kursori.execute("flight.set_status", (outcome["flight_status"], flight_id,))
 
                     # --- Päivitä lentokoneen tila ja sijainti ---
                     # Koneesta tulee IDLE saapumiskentälle
                     kursori.execute(
-                        "UPDATE aircraft SET status = 'IDLE', current_airport_ident = %s WHERE aircraft_id = %s",
-                        (arr_ident, aircraft_id),
+                        "aircraft.land",
+                        (flight_data["arr_ident"], aircraft_id),
                     )
 
+                    # --- Sopimuslento päättyi vieraalle kentälle: paluulento samassa transaktiossa ---
+                    if flight_data["flight_status"] == "ENROUTE" and flight_data["arr_ident"] not in self._base_coords():
+                        eta = self._schedule_return_flight(kursori, flight_data, new_day, day_stats)
+                        if eta is not None:
+                            returns.append(f"  ✈️  Kone {aircraft_id} palaa kentältä {flight_data['arr_ident']} kotiin ({eta[0]}). ETA: päivä {eta[1]}.")
+
                     # --- Käsittele sopimus (Vain jos kyseessä sopimuslento, EI RTB) ---
-                    contract_id = flight_data["contract_id"]
-                    # Tarkista, ettei contract_id ole NULL ja että status oli 'ENROUTE'
-                    if contract_id is not None and current_flight_status == 'ENROUTE':
-                        deadline = int(flight_data["deadline_day"])
-                        reward = _to_dec(flight_data["reward"])
-                        penalty = _to_dec(flight_data["penalty"])
-
-                        # Määritä sopimuksen lopputulos ja palkkio
-                        if new_day <= deadline:
-                            final_reward = reward
-                            new_contract_status = "COMPLETED"
-                        else:
-                            final_reward = max(Decimal("0.00"), reward - penalty)
-                            new_contract_status = "COMPLETED_LATE"
-
-                        # Päivitä sopimuksen tila
+                    if outcome["contract_status"] is not None:
                         kursori.execute(
-                            "UPDATE contracts SET status = %s, completed_day = %s WHERE contractId = %s",
-                            (new_contract_status, new_day, contract_id),
+                            "contract.complete",
+                            (outcome["contract_status"], new_day, flight_data["contract_id"]),
                         )
                         # Lisää ansaittu raha vain sopimuslennoista
-                        total_delta += final_reward
+                        total_delta += outcome["earned"]
 
                 # --- Päivitä kassa (jos sopimuksia valmistui) ---
                 if total_delta != Decimal("0.00"):
                     # Lukitse pelaajan tallennus päivitystä varten
-                    kursori.execute("SELECT cash FROM game_saves WHERE save_id = %s FOR UPDATE", (self.save_id,))
+                    kursori.execute("save.cash_for_update", (self.save_id,))
                     cur_cash = _to_dec(kursori.fetchone()["cash"])
                     new_cash = (cur_cash + total_delta).quantize(Decimal("0.01"))
                     # Päivitä kassa tietokantaan
-                    kursori.execute("UPDATE game_saves SET cash = %s WHERE save_id = %s", (new_cash, self.save_id))
+                    kursori.execute("save.set_cash", (new_cash, self.save_id))
                     # Päivitä kassa myös sessio-olioon heti
                     self.cash = new_cash
 
+                add_stats(kursori, self.save_id, **day_stats)
+
                 # Hyväksy kaikki muutokset tietokantaan
                 yhteys.commit()
                 # Päivitä päivä sessio-olioon vasta onnistuneen commitin jälkeen
                 self.current_day = new_day
+                phases.lap("saapumiset")
+                annotate(day=new_day, arrivals=arrivals_count, earned=total_delta)
 
             except Exception as e:
                 # Peru muutokset, jos jokin meni pieleen
@@ -1796,14 +1861,30 @@ class GameSession:
 
             # --- Käsittele kuukausilaskut ---
             # Tarkista, onko laskutuspäivä (joka 30. päivä) ja onko peli aktiivinen
-            if self.current_day % 30 == 0 and self.status == "ACTIVE":
-                self._process_monthly_bills(silent=silent)
+            bills_paid = Decimal("0.00")
+            if is_billing_day(self.current_day) and self.status == "ACTIVE":
+                bills_paid = self._process_monthly_bills(silent=silent)
+            phases.lap("laskut")
+
+            # --- Päiväsarjan näyte (kirjoitetaan erissä, ei omaa kierrosta per päivä) ---
+            start = stats_rows[0] if stats_rows else None
+            if start is not None:
+                enroute = (int(start["contract_flights"]) + int(start["rtb_flights"]) - int(start["flights_arrived"])
+                           + day_stats.get("rtb_flights", 0) - day_stats.get("flights_arrived", 0))
+                fleet = int(start["aircraft_count"])
+            else:
+                enroute = fleet = 0
+            self.metrics.record(self.current_day, self.cash, total_delta, bills_paid, arrivals_count, enroute, fleet)
+            if current_batch() is None and len(self.metrics) >= METRICS_FLUSH_DAYS:
+                self.metrics.flush()
 
             # --- Tulosta yhteenveto käyttäjälle (jos ei hiljainen tila) ---
             if not silent:
                 # Näytä ansaittu raha vain, jos sitä tuli
                 gained_str = f", ansaittu {self._fmt_money(total_delta)}" if total_delta > 0 else ""
                 print(f"⏭️ Päivä siirtyi: {self.current_day}. Saapuneita lentoja: {arrivals_count}{gained_str}.")
+                for line in returns:
+                    print(line)
                 # Voit poistaa tämän input()-kutsun, jos haluat nopeamman etenemisen
                 input("\n↩︎ Enter jatkaaksesi...")
 
@@ -1826,7 +1907,7 @@ class GameSession:
 
     # ------------ VEROTTAJA TULEE, KUU VAIHTUU --------------
 
-    def _process_monthly_bills(self, silent: bool = False) -> None:
+    def _process_monthly_bills(self, silent: bool = False) -> Decimal:
         """
         Veloittaa kuukausittaiset kulut.
         - HQ_MONTHLY_FEE
@@ -1834,20 +1915,14 @@ class GameSession:
         - STARTER-koneille alennus (STARTER_MAINT_DISCOUNT)
         - 60. päivästä alkaen kulut kasvavat korkoa korolle BILL_GROWTH_RATE-kertoimella.
         Jos rahat eivät riitä: asetetaan status = BANKRUPT.
+        Palauttaa maksetun summan (0, jos laskuja ei maksettu).
         """
         yhteys = get_connection()
         try:
-            kursori = yhteys.cursor(dictionary=True)
+            kursori = prepared_cursor(yhteys, dictionary=True)
             # Laske aktiivisten (ei myytyjen) koneiden määrä ja STARTER-koneiden osuus
             kursori.execute(
-                """
-                SELECT COUNT(*)                                                 AS total,
-                       SUM(CASE WHEN am.category = 'STARTER' THEN 1 ELSE 0 END) AS starters
-                FROM aircraft a
-                         JOIN aircraft_models am ON am.model_code = a.model_code
-                WHERE a.save_id = %s
-                  AND (a.sold_day IS NULL OR a.sold_day = 0)
-                """,
+                "aircraft.fleet_counts",
                 (self.save_id,),
             )
             r = kursori.fetchone() or {"total": 0, "starters": 0}
@@ -1863,22 +1938,8 @@ class GameSession:
             except Exception:
                 pass  # [cite: 449]
 
-        # Lasketaan ensin laskun perussumma ilman korkoja
-        maint_starter = (MAINT_PER_AIRCRAFT * STARTER_MAINT_DISCOUNT) * starter_planes
-        maint_nonstarter = MAINT_PER_AIRCRAFT * max(0, total_planes - starter_planes)
-        base_bill = (HQ_MONTHLY_FEE + maint_starter + maint_nonstarter).quantize(Decimal("0.01"))  #
-
-        # UUSI OSA: Laske "korkoa korolle" 60. päivästä alkaen
-        total_bill = base_bill
-        if self.current_day >= 60:
-            # Lasketaan, monesko korollinen laskutuskausi on menossa.
-            # Päivä 60 = 1. kausi, Päivä 90 = 2. kausi jne.
-            growth_periods = (self.current_day // 30) - 1
-
-            # Sovelletaan korkoa korolle -kaavaa peruslaskuun
-            # Kaava: Loppusumma = Perussumma * (1 + korko)^kaudet
-            growth_multiplier = (1 + BILL_GROWTH_RATE) ** growth_periods
-            total_bill = (base_bill * growth_multiplier).quantize(Decimal("0.01"))
+        # Perussumma + "korkoa korolle" 60. päivästä alkaen (session_helpers.rules)
+        base_bill, total_bill = monthly_bill(total_planes, starter_planes, self.current_day)
 
         if not silent:
             print("\n💸 Kuukausilaskut erääntyivät!")
@@ -1892,39 +1953,58 @@ class GameSession:
             if not silent:
                 print("💀 Rahat eivät riitä laskuihin. Yritys menee konkurssiin.")
             self._set_status("BANKRUPT")
-            return
+            return Decimal("0.00")
 
         try:
-            self._add_cash(-total_bill)
+            self._add_cash(-total_bill, stats={"spend_bills": total_bill})
             if not silent:
                 print("✅ Laskut maksettu.")
+            return total_bill
         except Exception as e:
             if not silent:
                 print(f"❌ Laskujen veloitus epäonnistui: {e}")
+            return Decimal("0.00")
 
     # ---------- Eksyneet koneet kotikentille ------------
 
+    def _schedule_return_flight(self, kursori, plane: dict, day: int, stats: Dict[str, object]) -> Optional[tuple]:
+        """
+        Luo koneelle paluulennon lähimpään omaan tukikohtaan kutsujan transaktiossa.
+        `plane`: aircraft_id, cruise_speed_kts, co2_kg_per_km ja kenttä (arr_ident tai
+        current_airport_ident). Tilastodeltat kerätään `stats`-sanakirjaan (kutsuja kirjaa).
+        Palauttaa (tukikohta, saapumispäivä) tai None.
+        """
+        ident = plane.get("arr_ident") or plane["current_airport_ident"]
+        closest_base_ident, min_dist = self._nearest_base(ident)
+        if not closest_base_ident:
+            return None
+        arrival_day, emissions = return_flight(min_dist, plane.get("cruise_speed_kts"), plane.get("co2_kg_per_km"), day)
+        kursori.execute(
+            "flight.insert_rtb",
+            (day, day, arrival_day, "ENROUTE_RTB", min_dist, emissions,
+             ident, closest_base_ident, plane["aircraft_id"], self.save_id)
+        )
+        kursori.execute("aircraft.set_busy_rtb", (plane["aircraft_id"],))
+        merge_stats(stats, rtb_flights=1, total_emissions_kg=Decimal(str(emissions)))
+        return closest_base_ident, arrival_day
+
+    def _on_bases_changed(self, _topic: str) -> None:
+        # Uusi tukikohta voi olla kotikenttä koneille, joilta paluulento jäi aiemmin luomatta
+        self._rtb_swept = False
+
     def _initiate_return_flights_for_idle_aircraft(self, silent: bool = False):
         """
         Tarkistaa kaikki IDLE-tilassa olevat koneet. Jos kone on vieraalla kentällä,
         se luo sille automaattisen paluulennon lähimpään omistettuun tukikohtaan.
+        Normaalisti paluulento syntyy jo saapumisen yhteydessä; tämä on kertakierros.
         """
-        owned_bases = {b['base_ident']: b for b in fetch_owned_bases(self.save_id)}
-        if not owned_bases:
+        if not self._base_coords():
             return  # Ei tukikohtia, ei voida palata kotiin
 
-        sql = """
-            SELECT a.aircraft_id, a.current_airport_ident, am.cruise_speed_kts, am.co2_kg_per_km
-            FROM aircraft a JOIN aircraft_models am ON a.model_code = am.model_code
-            WHERE a.save_id = %s AND a.status = 'IDLE' 
-              AND a.current_airport_ident NOT IN ({})
-        """.format(','.join(['%s'] * len(owned_bases)))
-
-        params = [self.save_id] + list(owned_bases.keys())
-
         with get_connection() as yhteys:
-            kursori = yhteys.cursor(dictionary=True)
-            kursori.execute(sql, tuple(params))
+            kursori = prepared_cursor(yhteys, dictionary=True)
+            # Vieraalla kentällä = ei minkään oman tukikohdan kentällä
+            kursori.execute("aircraft.stranded_idle", (self.save_id, self.save_id))
             stranded_planes = kursori.fetchall() or []
 
             if not stranded_planes:
@@ -1933,78 +2013,122 @@ class GameSession:
             if not silent:
                 print("ℹ️ Havaittu joutilaita koneita vierailla kentillä, aloitetaan paluulennot...")
 
+            sweep_stats: Dict[str, object] = {}
             for plane in stranded_planes:
-                current_coords = self._get_airport_coords(plane['current_airport_ident'])
-                if not current_coords:
-                    continue
-
-                # Etsi lähin oma tukikohta
-                closest_base_ident = None
-                min_dist = float('inf')
-
-                for base_ident in owned_bases:
-                    base_coords = self._get_airport_coords(base_ident)
-                    if base_coords:
-                        dist = self._haversine_km(current_coords[0], current_coords[1], base_coords[0],
-                                                  base_coords[1])
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest_base_ident = base_ident
-
-                if closest_base_ident:
-                    # Luo paluulento
-                    speed_kts = float(plane.get("cruise_speed_kts") or 200.0)
-                    speed_km_per_day = speed_kts * 1.852 * 24.0 * 2.0  # Tuplataan nopeus
-                    duration_days = max(1, math.ceil(min_dist / speed_km_per_day))
-                    arrival_day = self.current_day + duration_days
-                    co2_per_km = Decimal(str(plane.get("co2_kg_per_km") or 0.2))
-                    emissions = float((Decimal(min_dist) * co2_per_km).quantize(Decimal("0.01")))
-
-                    try:
-                        kursori.execute(
-                            "INSERT INTO flights (created_day, dep_day, arrival_day, status, distance_km, emission_kg_co2, dep_ident, arr_ident, aircraft_id, save_id, contract_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NULL)",
-                            (self.current_day, self.current_day, arrival_day, "ENROUTE_RTB", min_dist, emissions,
-                             plane['current_airport_ident'], closest_base_ident, plane['aircraft_id'], self.save_id)
-                        )
-                        kursori.execute(
-                            "UPDATE aircraft SET status = 'BUSY_RTB' WHERE aircraft_id = %s",
-                            (plane['aircraft_id'],)
-                        )
-                        if not silent:
-                            print(
-                                f"  ✈️  Kone {plane['aircraft_id']} palaa kentältä {plane['current_airport_ident']} kotiin ({closest_base_ident}). ETA: päivä {arrival_day}.")
-                    except Exception as e:
-                        if not silent:
-                            print(f"  ❌ Paluulennon luonti koneelle {plane['aircraft_id']} epäonnistui: {e}")
+                try:
+                    eta = self._schedule_return_flight(kursori, plane, self.current_day, sweep_stats)
+                    if eta is not None and not silent:
+                        print(
+                            f"  ✈️  Kone {plane['aircraft_id']} palaa kentältä {plane['current_airport_ident']} kotiin ({eta[0]}). ETA: päivä {eta[1]}.")
+                except Exception as e:
+                    if not silent:
+                        print(f"  ❌ Paluulennon luonti koneelle {plane['aircraft_id']} epäonnistui: {e}")
+            add_stats(kursori, self.save_id, **sweep_stats)
 
     # ---------- Pikakelaus ---------
 
-    def fast_forward_days(self, days: int) -> None:
+    @traced("pikakelaus")
+    def fast_forward_days(self, days: int, batch_days: Optional[int] = None) -> None:
         """
         Etenee 'days' päivää eteenpäin, hiljaisesti (ei tulostuksia per päivä).
         Pysähtyy, jos:
           - status muuttuu BANKRUPT
           - saavutetaan tai ylitetään SURVIVAL_TARGET_DAYS (status asetetaan VICTORY, jos vielä ACTIVE)
-        Tulostaa lopuksi yhteenvedon.
+        Päivät ajetaan 'batch_days' päivän erissä (oletus AFC666_FF_BATCH_DAYS): yksi transaktio
+        ja commit per erä. Päivän oma virhe perutaan kuten ennenkin (savepoint); erän läpi
+        karkaava virhe tai keskeytys palauttaa pelin viimeksi commitoituun erään.
+        Tulostaa lopuksi yhteenvedon ja nopeuden (päivää/s).
         """
         days = max(0, int(days))
+        batch_days = max(1, int(batch_days or FF_BATCH_DAYS))
         arrived_total = 0
         earned_total = Decimal("0.00")
-
-        for _ in range(days):
-            summary = self.advance_to_next_day(silent=False)
-            arrived_total += int(summary.get("arrivals", 0))
-            earned_total += _to_dec(summary.get("earned", 0))
-            if self.status == "BANKRUPT":
-                break
-            if self.current_day >= SURVIVAL_TARGET_DAYS:
-                if self.status == "ACTIVE":
-                    self._set_status("VICTORY")
-                break
+        start_day = self.current_day
+        remaining = days
+        commits = 0
+        self.day_phases.reset()
+        memory = memory_tracker()
+        if memory is not None:
+            memory.begin(self.current_day)
+
+        t0 = time.perf_counter()
+        try:
+            # Aiemmat (interaktiiviset) näytteet omana kirjoituksenaan, jotta erän peruminen ei vie niitä
+            self.metrics.flush()
+            while remaining > 0:
+                chunk = min(batch_days, remaining)
+                remaining -= chunk
+                batch_arrived = 0
+                batch_earned = Decimal("0.00")
+                with batched_transaction() if batch_days > 1 else nullcontext():
+                    for _ in range(chunk):
+                        summary = self.advance_to_next_day(silent=True)
+                        batch_arrived += int(summary.get("arrivals", 0))
+                        batch_earned += _to_dec(summary.get("earned", 0))
+                        if memory is not None:
+                            memory.day_boundary(self.current_day)
+                        if self.status == "BANKRUPT":
+                            remaining = 0
+                            break
+                        if self.current_day >= SURVIVAL_TARGET_DAYS:
+                            if self.status == "ACTIVE":
+                                self._set_status("VICTORY")
+                            remaining = 0
+                            break
+                    if batch_days > 1:
+                        # Erän päivien näytteet samaan transaktioon (commit tai peruutus yhdessä)
+                        self.metrics.flush()
+                # Erä on commitoitu: sen tulokset lasketaan mukaan vasta nyt
+                commits += 1
+                arrived_total += batch_arrived
+                earned_total += batch_earned
+        except BaseException as e:
+            self._resync_after_rollback()
+            if not isinstance(e, Exception):
+                raise
+            print(f"❌ Pikakelaus keskeytyi: {e}. Palattiin viimeksi tallennettuun erään (päivä {self.current_day}).")
+        elapsed = time.perf_counter() - t0
+        days_run = self.current_day - start_day
+        self.last_fast_forward = {
+            "days": days_run,
+            "seconds": elapsed,
+            "days_per_s": days_run / elapsed if elapsed > 0 else None,
+            "batch_days": batch_days,
+            "commits": commits,
+        }
 
         print(f"⏩ Pikakelaus valmis. Päivä nyt {self.current_day}.")
         print(f"   ✈️ Saapuneita lentoja: {arrived_total} | 💶 Yhteensä ansaittu: {self._fmt_money(earned_total)}")
+        print(f"   🚀 {days_run} päivää {elapsed:.2f} s ({self.last_fast_forward['days_per_s'] or 0:.0f} päivää/s, "
+              f"{batch_days} päivää/commit, {commits} committia)")
+        print(f"   ⏱️ Vaiheet: {self.day_phases.format()}")
+        if memory is not None:
+            memory.finish()
+            self.memory_summary = memory.summary()
+            print(memory.format_report())
 
+    def _resync_after_rollback(self) -> None:
+        """
+        Perutun erän jälkeen: muistissa oleva tila (päivä, kassa, status), journaalin laskurit
+        ja välimuistit luetaan uudelleen kannasta.
+        """
+        self.current_day = self.cash = self.status = None
+        self._refresh_save_state()
+        self.metrics.discard_after(self.current_day)
+        # Perutun erän paluulennot katosivat sen mukana: kertakierros uudelleen
+        self._rtb_swept = False
+        self.journal.resync()
+        self.cache_bus.publish(*TOPICS)
+
+    def _toggle_profiling(self) -> None:
+        """Debug-valikon kytkin: käynnistää cProfilen tai pysäyttää sen ja kertoo tiedostot."""
+        if is_profiling():
+            print(format_profile_result(stop_profiling()))
+        else:
+            start_profiling()
+            print("🔬 Profilointi käynnissä. Valitse P uudelleen pysäyttääksesi.")
+
+    @traced("pikakelaus: ensimmäiseen paluuseen")
     def fast_forward_until_first_return(self, max_days: int = 365) -> None:
         """
         Etenee päivä kerrallaan, kunnes ensimmäinen lento palaa (eli sinä päivänä on ≥1 saapuminen).
@@ -2020,9 +2144,9 @@ class GameSession:
         yhteys = get_connection()
         try:
             try:
-                kursori = yhteys.cursor()
+                kursori = prepared_cursor(yhteys)
                 kursori.execute(
-                    "SELECT COUNT(*) FROM flights WHERE save_id = %s AND status = 'ENROUTE'",
+                    "flight.count_enroute",
                     (self.save_id,),
                 )
                 r = kursori.fetchone()
@@ -2091,17 +2215,10 @@ class GameSession:
 
         yhteys = get_connection()
         try:
-            try:
-                kursori = yhteys.cursor(dictionary=True)
-            except TypeError:
-                kursori = yhteys.cursor()
+            kursori = prepared_cursor(yhteys, dictionary=True)
 
             kursori.execute(
-                """
-                SELECT player_name, cash, difficulty, current_day, status, rng_seed
-                FROM game_saves
-                WHERE save_id = %s
-                """,
+                "save.state",
                 (self.save_id,),
             )
             r = kursori.fetchone()
@@ -2135,39 +2252,10 @@ class GameSession:
         STARTER ei näy kaupassa.
         """
         yhteys = get_connection()
-        kursori = yhteys.cursor(dictionary=True)
+        kursori = prepared_cursor(yhteys, dictionary=True)
         try:
             kursori.execute(
-                """
-                WITH max_tier AS (
-                    SELECT
-                        COALESCE(MAX(
-                                         CASE bu.upgrade_code
-                                             WHEN 'SMALL' THEN 1
-                                             WHEN 'MEDIUM' THEN 2
-                                             WHEN 'LARGE' THEN 3
-                                             WHEN 'HUGE' THEN 4
-                                             ELSE 0
-                                             END
-                                 ), 0) AS t
-                    FROM owned_bases ob
-                             JOIN base_upgrades bu ON bu.base_id = ob.base_id
-                    WHERE ob.save_id = %s
-                )
-                SELECT am.model_code, am.manufacturer, am.model_name, am.purchase_price,
-                       am.base_cargo_kg, am.range_km, am.cruise_speed_kts, am.category
-                FROM aircraft_models am
-                         CROSS JOIN max_tier mt
-                WHERE am.category <> 'STARTER'
-                  AND CASE am.category
-                          WHEN 'SMALL' THEN 1
-                          WHEN 'MEDIUM' THEN 2
-                          WHEN 'LARGE' THEN 3
-                          WHEN 'HUGE' THEN 4
-                          ELSE 0
-                          END <= mt.t
-                ORDER BY am.purchase_price ASC, am.model_code ASC
-                """,
+                "model.available_for_tier",
                 (self.save_id,),
             )
             return kursori.fetchall() or []
@@ -2175,15 +2263,17 @@ class GameSession:
             kursori.close()
             yhteys.close()
 
+    @traced("osto: tukikohta")
+    @publishes(BASES, CASH)
     def _create_owned_base_and_small_upgrade_tx(self, base_ident: str, base_name: str, purchase_cost: Decimal) -> int:
         """
         Luo owned_bases-rivin ja lisää base_upgrades-tauluun SMALL-rivin.
         Veloittaa hinnan kassasta. Palauttaa base_id:n.
         """
         yhteys = get_connection()
-        kursori = yhteys.cursor()
+        kursori = prepared_cursor(yhteys)
         try:
-            kursori.execute("SELECT cash FROM game_saves WHERE save_id = %s FOR UPDATE", (self.save_id,))
+            kursori.execute("save.cash_for_update", (self.save_id,))
             row = kursori.fetchone()
             if not row:
                 raise ValueError("Tallennetta ei löytynyt tukikohtaa luodessa.")
@@ -2193,12 +2283,7 @@ class GameSession:
 
             now = datetime.utcnow()
             kursori.execute(
-                """
-                INSERT INTO owned_bases
-                (save_id, base_ident, base_name, acquired_day, purchase_cost, created_at, updated_at)
-                VALUES
-                    (%s, %s, %s, %s, %s, %s, %s)
-                """,
+                "base.insert",
                 (
                     self.save_id,
                     base_ident,
@@ -2212,18 +2297,16 @@ class GameSession:
             base_id = int(kursori.lastrowid)
 
             kursori.execute(
-                """
-                INSERT INTO base_upgrades (base_id, upgrade_code, installed_day, upgrade_cost)
-                VALUES (%s, %s, %s, %s)
-                """,
+                "base.upgrade_insert",
                 (base_id, "SMALL", self.current_day, Decimal("0.00")),
             )
 
             new_cash = (cur_cash - purchase_cost).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
             kursori.execute(
-                "UPDATE game_saves SET cash = %s, updated_at = %s WHERE save_id = %s",
+                "save.set_cash_touch",
                 (new_cash, now, self.save_id),
             )
+            add_stats(kursori, self.save_id, spend_bases=purchase_cost)
 
             yhteys.commit()
             self.cash = new_cash
@@ -2242,38 +2325,8 @@ class GameSession:
         """
         Palauta ensimmäinen ostettu tukikohta dictinä tai None.
         """
-        yhteys = get_connection()
-        try:
-            try:
-                kursori = yhteys.cursor(dictionary=True)
-            except TypeError:
-                kursori = yhteys.cursor()
-
-            kursori.execute(
-                """
-                SELECT base_id, base_ident, base_name, acquired_day
-                FROM owned_bases
-                WHERE save_id = %s
-                ORDER BY acquired_day ASC, base_id ASC
-                    LIMIT 1
-                """,
-                (self.save_id,),
-            )
-            r = kursori.fetchone()
-            if not r:
-                return None
-            return r if isinstance(r, dict) else {
-                "base_id": r[0],
-                "base_ident": r[1],
-                "base_name": r[2],
-                "acquired_day": r[3],
-            }
-        finally:
-            try:
-                kursori.close()
-            except Exception:
-                pass
-            yhteys.close()
+        bases = self._owned_bases()
+        return bases[0] if bases else None
 
     def _get_primary_base_ident(self) -> Optional[str]:
         """
@@ -2286,23 +2339,10 @@ class GameSession:
         """
         Hae base_id annetulla tunnuksella tältä tallennukselta.
         """
-        yhteys = get_connection()
-        try:
-            kursori = yhteys.cursor()
-            kursori.execute(
-                "SELECT base_id FROM owned_bases WHERE save_id = %s AND base_ident = %s",
-                (self.save_id, base_ident),
-            )
-            r = kursori.fetchone()
-            if not r:
-                return None
-            return int(r["base_id"] if isinstance(r, dict) else r[0])
-        finally:
-            try:
-                kursori.close()
-            except Exception:
-                pass
-            yhteys.close()
+        for b in self._owned_bases():
+            if b["base_ident"] == base_ident:
+                return int(b["base_id"])
+        return None
 
     def _fetch_upgrade_levels(self, aircraft_ids: List[int]) -> Dict[int, int]:
         """
@@ -2312,17 +2352,12 @@ class GameSession:
             return {}
 
         yhteys = get_connection()
-        kursori = yhteys.cursor()
+        kursori = prepared_cursor(yhteys)
         try:
-            placeholders = ",".join(["%s"] * len(aircraft_ids))
             kursori.execute(
-                f"""
-                SELECT aircraft_id, MAX(level) AS max_level
-                FROM aircraft_upgrades
-                WHERE upgrade_code = %s AND aircraft_id IN ({placeholders})
-                GROUP BY aircraft_id
-                """,
+                "upgrade.max_levels",
                 tuple([UPGRADE_CODE] + aircraft_ids),
+                expand=len(aircraft_ids),
             )
             rows = kursori.fetchall() or []
             if rows and isinstance(rows[0], dict):
@@ -2337,17 +2372,21 @@ class GameSession:
 
     # ---------- Kassan ja statuksen hallinta ----------
 
-    def _set_cash(self, new_cash: Decimal) -> None:
+    @publishes(CASH)
+    def _set_cash(self, new_cash: Decimal, stats: Optional[dict] = None) -> None:
         """
         Päivitä kassa kantaan ja pidä olion tila synkassa.
+        `stats`: save_stats-deltat, jotka kirjataan samassa transaktiossa.
         """
         yhteys = get_connection()
-        kursori = yhteys.cursor()
+        kursori = prepared_cursor(yhteys)
         try:
             kursori.execute(
-                "UPDATE game_saves SET cash = %s, updated_at = %s WHERE save_id = %s",
+                "save.set_cash_touch",
                 (_to_dec(new_cash), datetime.utcnow(), self.save_id),
             )
+            if stats:
+                add_stats(kursori, self.save_id, **stats)
             yhteys.commit()
             self.cash = _to_dec(new_cash)
         except Exception:
@@ -2360,24 +2399,25 @@ class GameSession:
                 pass
             yhteys.close()
 
-    def _add_cash(self, delta: Decimal) -> None:
+    def _add_cash(self, delta: Decimal, stats: Optional[dict] = None) -> None:
         """
         Lisää tai vähennä kassaa (ei saa mennä negatiiviseksi).
         """
         new_val = (self.cash + _to_dec(delta)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
         if new_val < Decimal("0"):
             raise ValueError("Kassa ei voi mennä negatiiviseksi.")
-        self._set_cash(new_val)
+        self._set_cash(new_val, stats=stats)
 
+    @journaled
     def _set_status(self, new_status: str) -> None:
         """
         Päivitä tallennuksen status (ACTIVE, BANKRUPT, VICTORY, ...).
         """
         yhteys = get_connection()
-        kursori = yhteys.cursor()
+        kursori = prepared_cursor(yhteys)
         try:
             kursori.execute(
-                "UPDATE game_saves SET status = %s, updated_at = %s WHERE save_id = %s",
+                "save.set_status",
                 (new_status, datetime.utcnow(), self.save_id),
             )
             yhteys.commit()
@@ -2394,6 +2434,9 @@ class GameSession:
 
     # ---------- Osto ja lahjakone ----------
 
+    @traced("osto: kone")
+    @journaled
+    @publishes(FLEET, CASH)
     def _purchase_aircraft_tx(
             self,
             model_code: str,
@@ -2408,11 +2451,12 @@ class GameSession:
           - Lukitse kassa
           - Lisää kone
           - Veloita hinta
+          - Jos kenttä ei ole oma tukikohta, luo paluulento lähimpään tukikohtaan
         """
         yhteys = get_connection()
-        kursori = yhteys.cursor()
+        kursori = prepared_cursor(yhteys)
         try:
-            kursori.execute("SELECT cash FROM game_saves WHERE save_id = %s FOR UPDATE", (self.save_id,))
+            kursori.execute("save.cash_for_update", (self.save_id,))
             row = kursori.fetchone()
             if not row:
                 raise ValueError("Tallennetta ei löytynyt ostohetkellä.")
@@ -2422,16 +2466,7 @@ class GameSession:
                 return False
 
             kursori.execute(
-                """
-                INSERT INTO aircraft
-                (model_code, base_level, current_airport_ident, registration, nickname,
-                 acquired_day, purchase_price, condition_percent, status, hours_flown,
-                 sold_day, sale_price, save_id, base_id)
-                VALUES
-                    (%s, %s, %s, %s, %s,
-                     %s, %s, %s, %s, %s,
-                     %s, %s, %s, %s)
-                """,
+                "aircraft.insert",
                 (
                     model_code,
                     1,
@@ -2452,12 +2487,26 @@ class GameSession:
 
             new_cash = (cash_now - purchase_price).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
             kursori.execute(
-                "UPDATE game_saves SET cash = %s, updated_at = %s WHERE save_id = %s",
+                "save.set_cash_touch",
                 (new_cash, datetime.utcnow(), self.save_id),
             )
+            deltas: Dict[str, object] = {"aircraft_count": 1, "spend_aircraft": purchase_price}
+            eta = None
+            if current_airport_ident not in self._base_coords():
+                aircraft_id = kursori.lastrowid
+                kursori.execute("model.flight_params", (model_code,))
+                params = kursori.fetchone()
+                if params:
+                    if not isinstance(params, dict):
+                        params = {"cruise_speed_kts": params[0], "co2_kg_per_km": params[1]}
+                    plane = {"aircraft_id": aircraft_id, "current_airport_ident": current_airport_ident, **params}
+                    eta = self._schedule_return_flight(kursori, plane, self.current_day, deltas)
+            add_stats(kursori, self.save_id, **deltas)
 
             yhteys.commit()
             self.cash = new_cash
+            if eta is not None:
+                print(f"  ✈️  Kone palaa kentältä {current_airport_ident} kotiin ({eta[0]}). ETA: päivä {eta[1]}.")
             return True
         except Exception as e:
             print(f"❌ Virhe ostossa: {e}")
@@ -2473,6 +2522,7 @@ class GameSession:
     # -------------------------------------------------
     # SALAINEN KERHOHUONE (SIIS TOSI TOSI SALAINEN)
     # -------------------------------------------------
+    @track_action("valikko: kerhohuone")
     def clubhouse_menu(self):
         """Salaisen Kerhohuoneen päävalikko."""
         while True:
@@ -2483,6 +2533,7 @@ class GameSession:
             print("1) 🪙 Kruuna vai Klaava")
             print("2) 🎲 Suurempi vai Pienempi")
             print("3) 🎰 Yksikätinen Rosvo")
+            print("4) 📊 Kertoimet ja talon etu")
             print("0) 🚪 Poistu takaisin toimistolle")
 
             choice = input("Valinta: ").strip()
@@ -2493,6 +2544,8 @@ class GameSession:
                 self._clubhouse_high_low()
             elif choice == "3":
                 self._clubhouse_slot_machine()
+            elif choice == "4":
+                self._clubhouse_show_odds()
             elif choice == "0":
                 print("Näkemiin ja tervetuloa uudelleen!")
                 break
@@ -2505,118 +2558,116 @@ class GameSession:
                 break
             input("\n↩︎ Paina Enter jatkaaksesi...")
 
-    def _clubhouse_coin_flip(self):
-        """Peli 1: Kruuna vai Klaava."""
-        _icon_title("Kruuna vai Klaava")
+    def _clubhouse_show_odds(self):
+        """Näyttää pelien tarkan talon edun samoista taulukoista, joilla pelit pyörivät."""
+        _icon_title("Kertoimet")
+        for game in CLUBHOUSE_GAMES.values():
+            edge = float(house_edge(game)) * 100
+            print(f"{game.name:<24} | Talon etu parhaalla pelillä: {edge:.2f} %")
+
+    def _pause(self, seconds: float) -> None:
+        """Dramaattinen tauko – ohitetaan headless-tilassa."""
+        if not self.headless:
+            time.sleep(seconds)
+
+    def _ask_stake(self) -> Optional[Decimal]:
+        """Kysyy panoksen ja validoi sen. Palauttaa None jos peruttu/virheellinen."""
         print(f"Saldo: {self._fmt_money(self.cash)}")
         try:
             panos = Decimal(input("Aseta panos (0 = peruuta): ").strip())
         except Exception:
             print("⚠️ Virheellinen panos.");
-            return
-        if panos <= 0: return
-        if panos > self.cash: print("❌ Ei riittävästi rahaa!"); return
+            return None
+        if panos <= 0: return None
+        if panos > self.cash: print("❌ Ei riittävästi rahaa!"); return None
+        return panos
+
+    def _clubhouse_coin_flip(self):
+        """Peli 1: Kruuna vai Klaava."""
+        _icon_title("Kruuna vai Klaava")
+        panos = self._ask_stake()
+        if panos is None: return
 
         valinta = input("Valitse kruuna (kr) vai klaava (kl): ").strip().lower()
-        if valinta not in ["kr", "kl"]: print("⚠️ Valitse 'kr' tai 'kl'."); return
+        if valinta not in COIN_FLIP.choices: print("⚠️ Valitse 'kr' tai 'kl'."); return
 
-        voittoheitto = random.choices(["kr", "kl"], weights=[49, 51], k=1)[0]
+        outcome = spin(COIN_FLIP)
+        voittoheitto = outcome[0]
         print("\nHeitetään kolikkoa...");
-        time.sleep(1)
+        self._pause(1)
 
-        if valinta == voittoheitto:
-            print(f"🎉 Tulos oli '{voittoheitto}'! Voitit {self._fmt_money(panos)}!")
-            self._add_cash(panos)
+        kerroin = COIN_FLIP.payout(outcome, valinta)
+        if kerroin > 0:
+            voitto = panos * kerroin
+            print(f"🎉 Tulos oli '{voittoheitto}'! Voitit {self._fmt_money(voitto)}!")
+            self._settle_bet("coin_flip", voitto)
         else:
             print(f"💸 Tulos oli '{voittoheitto}'. Hävisit {self._fmt_money(panos)}.")
-            self._add_cash(-panos)
+            self._settle_bet("coin_flip", -panos)
 
     def _clubhouse_high_low(self):
         """Peli 2: Suurempi vai Pienempi."""
         _icon_title("Suurempi vai Pienempi")
-        print(f"Saldo: {self._fmt_money(self.cash)}")
-        try:
-            panos = Decimal(input("Aseta panos (0 = peruuta): ").strip())
-        except Exception:
-            print("⚠️ Virheellinen panos.");
-            return
-        if panos <= 0: return
-        if panos > self.cash: print("❌ Ei riittävästi rahaa!"); return
+        panos = self._ask_stake()
+        if panos is None: return
 
-        noppa1, noppa2 = random.randint(1, 6), random.randint(1, 6)
+        outcome = spin(HIGH_LOW)
+        noppa1, noppa2 = outcome
         print(f"\nEnsimmäinen noppa heitti: {noppa1}")
         valinta = input("Onko seuraava noppa suurempi (s) vai pienempi (p)? ").strip().lower()
-        if valinta not in ["s", "p"]: print("⚠️ Valitse 's' tai 'p'."); return
+        if valinta not in HIGH_LOW.choices: print("⚠️ Valitse 's' tai 'p'."); return
 
         print(f"Toinen noppa heitti: {noppa2}");
-        time.sleep(1)
-
-        tulos_oikein = (valinta == "s" and noppa2 > noppa1) or \
-                       (valinta == "p" and noppa2 < noppa1)
+        self._pause(1)
 
+        kerroin = HIGH_LOW.payout(outcome, valinta)
         if noppa1 == noppa2:
             print("💸 Tasapeli! Talo voittaa aina. Hävisit panoksesi.")
-            self._add_cash(-panos)
-        elif tulos_oikein:
-            print(f"🎉 Oikein! Voitit {self._fmt_money(panos)}!")
-            self._add_cash(panos)
+            self._settle_bet("high_low", -panos)
+        elif kerroin > 0:
+            voitto = panos * kerroin
+            print(f"🎉 Oikein! Voitit {self._fmt_money(voitto)}!")
+            self._settle_bet("high_low", voitto)
         else:
             print(f"💸 Väärin! Hävisit {self._fmt_money(panos)}.")
-            self._add_cash(-panos)
+            self._settle_bet("high_low", -panos)
 
     def _clubhouse_slot_machine(self):
         """Peli 3: Yksikätinen Rosvo."""
         _icon_title("Yksikätinen Rosvo")
-        print(f"Saldo: {self._fmt_money(self.cash)}")
-        try:
-            panos = Decimal(input("Aseta panos (0 = peruuta): ").strip())
-        except Exception:
-            print("⚠️ Virheellinen panos.");
-            return
-        if panos <= 0: return
-        if panos > self.cash: print("❌ Ei riittävästi rahaa!"); return
+        panos = self._ask_stake()
+        if panos is None: return
 
-        self._add_cash(-panos)
+        self._settle_bet("slot_machine", -panos)
         print(f"Panos {self._fmt_money(panos)} asetettu. Onnea peliin!")
 
-        symbols = ['🍒', '🍋', '🔔', '💎', '💰'];
-        weights = [40, 30, 20, 9, 1]
-        reels = random.choices(symbols, weights=weights, k=3)
+        reels = spin(SLOT_MACHINE)
         print("\nKiekot pyörivät...");
-        time.sleep(1)
+        self._pause(1)
         print(f"| {reels[0]} | {reels[1]} | {reels[2]} |")
 
-        voitto = Decimal("0")
-        if reels[0] == '💰' and reels[1] == '💰' and reels[2] == '💰':
-            print("✨ JÄTTIPOTTI! ✨");
-            voitto = panos * 50
-        elif reels[0] == '💎' and reels[1] == '💎' and reels[2] == '💎':
-            print("💎 Timanttivoitto!");
-            voitto = panos * 20
-        elif reels[0] == '🔔' and reels[1] == '🔔' and reels[2] == '🔔':
-            print("🔔 Kellot soivat!");
-            voitto = panos * 10
-        elif reels[0] == '🍋' and reels[1] == '🍋' and reels[2] == '🍋':
-            print("🍋 Sitruunavoitto!");
-            voitto = panos * 5
-        elif reels[0] == '🍒' and reels[1] == '🍒' and reels[2] == '🍒':
-            print("🍒 Kirsikkavoitto!");
-            voitto = panos * 3
-        elif reels[0] == '🍒' and reels[1] == '🍒':
-            print("🍒 Pieni kirsikkavoitto!");
-            voitto = panos * 2
+        kerroin, viesti = match_payline(reels)
+        voitto = panos * kerroin
+        if viesti:
+            print(viesti)
 
         if voitto > 0:
             print(f"🎉 Voitit {self._fmt_money(voitto)}!")
-            self._add_cash(voitto)
+            self._settle_bet("slot_machine", voitto)
         else:
             print("💸 Ei voittoa tällä kertaa.")
 
+    @journaled
+    def _settle_bet(self, game_key: str, delta: Decimal) -> None:
+        """Kirjaa Kerhohuoneen panoksen tai voiton kassaan (journaaliin omana toimintonaan)."""
+        self._add_cash(delta, stats={"clubhouse_net": _to_dec(delta)})
+
     # -------------------------------------------------
     # SALAINEN KERHOHUONE (TOSI TOSI SALAINEN)
     # -------------------------------------------------
 
 
+    @publishes(FLEET)
     def _insert_gift_aircraft_tx(
             self,
             model_code: str,
@@ -2629,24 +2680,15 @@ class GameSession:
         """
         registration = f"666-{self._rand_letters(2)}{self._rand_digits(2)}"
         yhteys = get_connection()
-        kursori = yhteys.cursor()
+        kursori = prepared_cursor(yhteys)
         try:
-            kursori.execute("SELECT save_id FROM game_saves WHERE save_id = %s FOR UPDATE", (self.save_id,))
+            kursori.execute("save.lock", (self.save_id,))
             r = kursori.fetchone()
             if not r:
                 raise ValueError("Tallennetta ei löytynyt lahjakonetta lisättäessä.")
 
             kursori.execute(
-                """
-                INSERT INTO aircraft
-                (model_code, base_level, current_airport_ident, registration, nickname,
-                 acquired_day, purchase_price, condition_percent, status, hours_flown,
-                 sold_day, sale_price, save_id, base_id)
-                VALUES
-                    (%s, %s, %s, %s, %s,
-                     %s, %s, %s, %s, %s,
-                     %s, %s, %s, %s)
-                """,
+                "aircraft.insert",
                 (
                     model_code,
                     1,
@@ -2666,9 +2708,10 @@ class GameSession:
             )
 
             kursori.execute(
-                "UPDATE game_saves SET updated_at = %s WHERE save_id = %s",
+                "save.touch",
                 (datetime.utcnow(), self.save_id),
             )
+            add_stats(kursori, self.save_id, aircraft_count=1)
 
             yhteys.commit()
         except Exception:
@@ -2708,30 +2751,31 @@ class GameSession:
     # Good Game, tässä vähän tilastoja
 
     def show_end_game_stats(self):
-        """Hakee ja tulostaa yhteenvedon pelin statistiikoista."""
+        """Tulostaa yhteenvedon pelin statistiikoista (save_stats: yksi pääavainhaku)."""
         _icon_title("Pelin yhteenveto")
         print(f"Pelaaja: {self.player_name} | Lopputulos: {self.status}")
+        self.metrics.flush()
 
-        sql_stats = """
-                    SELECT (SELECT SUM(hours_flown) FROM aircraft WHERE save_id = gs.save_id)    AS total_hours, \
-                           (SELECT SUM(emission_kg_co2) FROM flights WHERE save_id = gs.save_id) AS total_emissions, \
-                           (SELECT COUNT(*) FROM aircraft WHERE save_id = gs.save_id)            AS total_aircraft
-                    FROM game_saves gs
-                    WHERE gs.save_id = %s; \
-                    """
-        with get_connection() as yhteys:
-            kursori = yhteys.cursor(dictionary=True)
-            kursori.execute(sql_stats, (self.save_id,))
-            stats = kursori.fetchone()
+        stats = load_save_stats(self.save_id)
+        if stats is None:
+            rebuilt = rebuild_save_stats(self.save_id)
+            stats = rebuilt["stats"] if rebuilt else None
 
         if stats:
-            total_hours = int(stats.get("total_hours") or 0)
-            total_emissions_kg = float(stats.get("total_emissions") or 0.0)
-            total_aircraft = int(stats.get("total_aircraft") or 0)
-
+            spend_total = sum(stats[c] for c in ("spend_aircraft", "spend_bases", "spend_upgrades",
+                                                 "spend_repairs", "spend_bills"))
             print("\n--- Tilastot ---")
-            print(f"✈️  Koneita laivastossa: {total_aircraft} kpl")
-            print(f"⏱️  Lentotunteja yhteensä: {total_hours} h")
-            print(f"☁️  CO2-päästöjä yhteensä: {total_emissions_kg:,.0f} kg".replace(",", " "))
+            print(f"✈️  Koneita laivastossa: {stats['aircraft_count']} kpl")
+            print(f"⏱️  Lentotunteja yhteensä: {stats['total_hours']} h")
+            print(f"☁️  CO2-päästöjä yhteensä: {float(stats['total_emissions_kg']):,.0f} kg".replace(",", " "))
+            print(f"🛫 Lentoja: {stats['contract_flights']} rahtilentoa, {stats['rtb_flights']} paluulentoa "
+                  f"({stats['flights_arrived']} perillä)")
+            print(f"📦 Sopimukset: {stats['contracts_on_time']} ajallaan, {stats['contracts_late']} myöhässä")
+            print(f"💶 Tulot: {self._fmt_money(stats['revenue'])} | Menot: {self._fmt_money(spend_total)}")
+            print(f"   Koneet {self._fmt_money(stats['spend_aircraft'])} | Tukikohdat {self._fmt_money(stats['spend_bases'])} | "
+                  f"Päivitykset {self._fmt_money(stats['spend_upgrades'])} | Korjaukset {self._fmt_money(stats['spend_repairs'])} | "
+                  f"Laskut {self._fmt_money(stats['spend_bills'])}")
+            if stats["clubhouse_net"]:
+                print(f"🎰 Kerhohuone netto: {self._fmt_money(stats['clubhouse_net'])}")
 
         print("\nKiitos kun pelasit!")
\ No newline at end of file
@@ -1,16 +1,30 @@
 # main.py
 # -------
 # - Sovelluksen käynnistyspiste ja CLI.
-# - Käytetään yhtenäisiä yhteysmuuttujia: 'yhteys' ja 'kursori' (kursori = yhteys.cursor(...)).
+# - Käytetään yhtenäisiä yhteysmuuttujia: 'yhteys' ja 'kursori' (kursori = prepared_cursor(yhteys, ...)).
 # - Valikot: lisätty ikonit "kivan näköisiksi".
 # - Uuden pelin alussa GameSession huolehtii tarinasta ja aloituspaketista.
+# - game_session ladataan vasta kun peli aloitetaan/ladataan: valikko näkyy heti, eikä
+#   importeissa avata yhteyksiä (ks. benchmarks/bench_startup.py).
+# - Snapshotit: `python main.py --snapshot FILE` tuo binäärisnapshotin uudeksi tallennukseksi ja
+#   aloittaa sen; `--export-snapshot SAVE_ID FILE` kirjoittaa tallennuksen tiedostoon.
+# - Profilointi: `python main.py --profile [cprofile|sample]` ajaa koko session profiloituna ja
+#   kirjoittaa lopuksi .pstats- ja .collapsed-tiedostot (ks. session_helpers/profiling.py).
+# - Jäljitys: `python main.py --trace FILE.json` (tai AFC666_TRACE) kirjoittaa aikajanan
+#   Chrome trace -muodossa (chrome://tracing, ui.perfetto.dev; ks. storage/tracing.py).
+# - Muisti: `python main.py --memtrace` (tai AFC666_MEMTRACE=1) mittaa pikakelauksen muistikasvun
+#   päivittäin tracemallocilla ja raportoi kasvavimmat allokointipaikat.
+# - Tilastot: `python main.py --rebuild-stats SAVE_ID` laskee save_stats-rivin uudelleen pelitauluista
+#   ja näyttää erot inkrementaalisesti ylläpidettyyn riviin (ks. session_helpers/stats.py).
 
 from typing import Optional
 from datetime import datetime
+import argparse
 import sys
 import random
-from game_session import GameSession
+import time
 from utils import get_connection
+from session_helpers import prepared_cursor
 
 
 def _icon_title(title: str) -> None:
@@ -28,20 +42,8 @@ def list_recent_saves(limit: int = 20):
     """
     yhteys = get_connection()
     try:
-        try:
-            kursori = yhteys.cursor(dictionary=True)
-        except TypeError:
-            kursori = yhteys.cursor()
-
-        kursori.execute(
-            """
-            SELECT save_id, player_name, current_day, cash, difficulty, status, updated_at, created_at
-            FROM game_saves
-            ORDER BY COALESCE(updated_at, created_at) DESC
-            LIMIT %s
-            """,
-            (limit,),
-        )
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("save.recent", (limit,))
         rivit = kursori.fetchall() or []
         if not rivit:
             print("ℹ️  Ei tallennuksia.")
@@ -128,6 +130,8 @@ def start_new_game():
         print(f"✅ Satunnainen siemen {rng_seed} generoitu.")
 
     try:
+        from game_session import GameSession
+
         gs = GameSession.new_game(
             name=name,
             cash=cash,
@@ -157,6 +161,8 @@ def load_game():
         return
 
     try:
+        from game_session import GameSession
+
         gs = GameSession.load(save_id)
         print(f"✅ Ladattiin tallennus #{gs.save_id} pelaajalle {gs.player_name}.")
         gs.main_menu()
@@ -164,6 +170,66 @@ def load_game():
         print(f"❌ Lataus epäonnistui: {e}")
 
 
+def load_snapshot_game(path: Optional[str] = None):
+    """
+    Tuo binäärisnapshotin (ks. session_helpers/snapshot.py) uudeksi tallennukseksi ja siirry päävalikkoon.
+    """
+    _icon_title("Lataa snapshotista")
+    path = path or input("Snapshot-tiedoston polku (tyhjä = peruuta): ").strip()
+    if not path:
+        return
+
+    try:
+        from session_helpers.snapshot import import_snapshot_file
+        from game_session import GameSession
+
+        t0 = time.perf_counter()
+        save_id = import_snapshot_file(path)
+        print(f"✅ Snapshot tuotiin tallennukseksi #{save_id} ({(time.perf_counter() - t0) * 1000:.1f} ms).")
+        gs = GameSession.load(save_id)
+        gs.main_menu()
+    except FileNotFoundError:
+        print(f"❌ Tiedostoa ei löytynyt: {path}")
+    except Exception as e:
+        print(f"❌ Snapshotin lataus epäonnistui: {e}")
+
+
+def export_snapshot(save_id: int, path: str) -> None:
+    """
+    Kirjoittaa tallennuksen binäärisnapshotiksi (siirto ympäristöstä toiseen).
+    """
+    from session_helpers.snapshot import export_snapshot_file
+
+    t0 = time.perf_counter()
+    rows = export_snapshot_file(save_id, path)
+    print(f"💾 Tallennus #{save_id} → {path} ({rows} riviä, {(time.perf_counter() - t0) * 1000:.1f} ms).")
+
+
+def rebuild_stats(save_id: int) -> bool:
+    """
+    Laskee tallennuksen save_stats-rivin uudelleen pelitauluista ja tulostaa erot.
+    Palauttaa True, jos tallennetut tilastot vastasivat uudelleenlaskentaa.
+    """
+    from session_helpers.stats import LEDGER_ONLY, format_stats_diff, rebuild_save_stats
+
+    t0 = time.perf_counter()
+    result = rebuild_save_stats(save_id)
+    if result is None:
+        print(f"❌ Tallennusta #{save_id} ei löytynyt.")
+        return False
+    ms = (time.perf_counter() - t0) * 1000
+    if result["previous"] is None:
+        print(f"📊 Tallennuksen #{save_id} tilastot rakennettiin ensimmäistä kertaa ({ms:.1f} ms).")
+        return True
+    if not result["diff"]:
+        print(f"✅ Tallennuksen #{save_id} tilastot täsmäävät ({ms:.1f} ms; ei tarkistettavissa: {', '.join(LEDGER_ONLY)}).")
+        return True
+    print(f"⚠️  Tallennuksen #{save_id} tilastoissa oli eroja (korjattu, {ms:.1f} ms):")
+    for line in format_stats_diff(result["diff"]):
+        print(f"   {line}")
+    return False
+
+
 def main():
     """
     Päävalikko loopissa.
@@ -173,12 +239,15 @@ def main():
         print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
         print("1) 🌟 Uusi peli")
         print("2) 💾 Lataa peli")
+        print("3) 📦 Lataa snapshotista")
         print("0) 🚪 Poistu")
         choice = input("Valinta: ").strip()
         if choice == "1":
             start_new_game()
         elif choice == "2":
             load_game()
+        elif choice == "3":
+            load_snapshot_game()
         elif choice == "0":
             print("👋 Heippa!")
             break
@@ -187,8 +256,51 @@ def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Air Freight Company 666")
+    parser.add_argument("--snapshot", metavar="FILE", help="tuo snapshot uudeksi tallennukseksi ja aloita se")
+    parser.add_argument("--export-snapshot", nargs=2, metavar=("SAVE_ID", "FILE"),
+                        help="kirjoita tallennus snapshot-tiedostoon ja lopeta")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=("cprofile", "sample"),
+                        help="profiloi sessio: cprofile (tarkka) tai sample (kevyt, pitkiin ajoihin)")
+    parser.add_argument("--profile-out", metavar="PREFIX",
+                        help="profiilitiedostojen polku ilman päätettä (oletus .cache/profiles/afc666-<aika>)")
+    parser.add_argument("--profile-interval", type=float, default=0.005, metavar="S",
+                        help="sample-tilan näytteenottoväli sekunteina (oletus 0.005)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="kirjoita spanit Chrome trace JSON -tiedostoon (chrome://tracing / Perfetto)")
+    parser.add_argument("--rebuild-stats", type=int, metavar="SAVE_ID",
+                        help="laske tallennuksen tilastot uudelleen pelitauluista, näytä erot ja lopeta")
+    parser.add_argument("--memtrace", action="store_true",
+                        help="mittaa pikakelauksen muistikasvu päivittäin (tracemalloc)")
+    args = parser.parse_args()
+    if args.memtrace:
+        from session_helpers import memory
+
+        memory.enable()
+    if args.trace:
+        from storage import tracing
+
+        tracing.enable(args.trace)
+    if args.profile:
+        from session_helpers.profiling import start_profiling
+
+        start_profiling(args.profile, prefix=args.profile_out, interval=args.profile_interval)
     try:
+        if args.export_snapshot:
+            export_snapshot(int(args.export_snapshot[0]), args.export_snapshot[1])
+            sys.exit(0)
+        if args.rebuild_stats is not None:
+            sys.exit(0 if rebuild_stats(args.rebuild_stats) else 1)
+        if args.snapshot:
+            load_snapshot_game(args.snapshot)
         main()
     except KeyboardInterrupt:
         print("\n⛔ Keskeytetty.")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
+    finally:
+        if args.profile:
+            from session_helpers.profiling import stop_profiling, format_profile_result
+
+            result = stop_profiling()
+            if result is not None:
+                print(format_profile_result(result))
\ No newline at end of file
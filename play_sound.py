@@ -1,14 +1,240 @@
+# play_sound.py
+# -------------
+# - Ääniefektit taustasäikeessä: play/stop vain lisäävät komennon jonoon ja palaavat heti,
+#   joten pitkäkään klippi (esim. sfx/the-x-files-theme.mp3) ei pysäytä pelilooppia.
+# - Tapahtuma → äänitiedosto -kartta luetaan kerran (random_events.sound_file) ja polut
+#   tarkistetaan valmiiksi; soittaessa ei tehdä kyselyitä.
+# - Nielut: PlaysoundSink (playsound3) ja NullSink (headless, pikakelaus, automaattiajot).
+#   AFC666_AUDIO=0 hiljentää kaiken.
+
+import os
+import queue
+import threading
+from typing import Dict, Optional
+
 from utils import get_connection
 
-from playsound3 import playsound
+_HERE = os.path.dirname(os.path.abspath(__file__))
+AUDIO_ENABLED = os.environ.get("AFC666_AUDIO", "1").strip() not in ("", "0")
 
-def event_playsound(event_name):
-    sql = f"SELECT sound_file FROM random_events WHERE event_name= {event_name}"
+# Pelin omat äänimerkit (eivät ole random_events-taulussa)
+CUE_SOUNDS: Dict[str, str] = {
+    "intro": "sfx/hub-intro-sound.mp3",
+    "victory": "sfx/ff1_victory_fanfare_1.mp3",
+    "bankruptcy": "sfx/dark-souls-you-died-sound-effect_hm5sYFG.mp3",
+}
+
+_STOP = "stop"
+_PRELOAD = "preload"
+_SHUTDOWN = "shutdown"
+
+
+class NullSink:
+    """Hiljainen nielu: ei soita mitään eikä koskaan blokkaa."""
+
+    name = "null"
+
+    def play(self, path: str):
+        return None
+
+    def stop(self, handle) -> None:
+        pass
+
+
+class PlaysoundSink:
+    """playsound3-nielu; soitto käynnistetään ei-blokkaavana, jotta stop() voi katkaista sen."""
+
+    name = "playsound3"
+
+    def __init__(self):
+        from playsound3 import playsound
+
+        self._playsound = playsound
+
+    def play(self, path: str):
+        return self._playsound(path, block=False)
+
+    def stop(self, handle) -> None:
+        if handle is not None:
+            handle.stop()
+
+
+def resolve_sound(path: Optional[str]) -> Optional[str]:
+    """Palauttaa äänitiedoston absoluuttisen polun, tai None jos tiedostoa ei ole."""
+    if not path:
+        return None
+    full = path if os.path.isabs(path) else os.path.join(_HERE, path)
+    return full if os.path.isfile(full) else None
+
+
+def load_event_sounds() -> Dict[str, str]:
+    """Lukee tapahtuma → äänitiedosto -kartan random_events-taulusta (vain olemassa olevat tiedostot)."""
     yhteys = get_connection()
-    kursori = yhteys.cursor()
-    kursori.execute(sql)
-    result = kursori.fetchall()
-    sound_file = result
-    playsound(sound_file)
+    try:
+        kursori = yhteys.cursor()
+        kursori.execute("SELECT event_name, sound_file FROM random_events WHERE sound_file IS NOT NULL")
+        rows = kursori.fetchall()
+    finally:
+        yhteys.close()
+    sounds = {}
+    for event_name, sound_file in rows:
+        full = resolve_sound(sound_file)
+        if full:
+            sounds[event_name] = full
+    return sounds
+
+
+class AudioEngine:
+    """
+    Taustasäikeinen äänimoottori, yksi kanava: uusi ääni katkaisee edellisen.
+    Jono on rajattu; täydestä jonosta pudotetut komennot lasketaan (dropped).
+    NullSinkillä säiettä ei edes käynnistetä.
+    """
+
+    def __init__(self, sink=None, max_queue: int = 16):
+        self._sink = sink
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._event_sounds: Optional[Dict[str, str]] = None
+        self._current = None
+        self.played = 0
+        self.dropped = 0
+
+    @property
+    def silent(self) -> bool:
+        return isinstance(self._sink, NullSink)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="afc666-audio", daemon=True)
+                    self._thread.start()
+
+    def _submit(self, command) -> bool:
+        if self.silent:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(command)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    # --- Julkinen rajapinta: kaikki palaavat heti ---
+
+    def preload(self) -> bool:
+        """Lataa tapahtumakartan taustalla (kutsutaan pelin alussa)."""
+        return self._submit((_PRELOAD, None))
+
+    def play(self, path: Optional[str]) -> bool:
+        return bool(path) and self._submit(("file", path))
+
+    def play_event(self, event_name: Optional[str]) -> bool:
+        return bool(event_name) and self._submit(("event", event_name))
+
+    def play_cue(self, cue: str) -> bool:
+        return self.play(CUE_SOUNDS.get(cue))
+
+    def stop(self) -> bool:
+        return self._submit((_STOP, None))
+
+    def shutdown(self, timeout: float = 1.0) -> None:
+        """Pysäyttää soiton ja säikeen (odottaa enintään `timeout` sekuntia)."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put((_SHUTDOWN, None), timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            # Seuraava play käynnistää uuden säikeen (main.py voi aloittaa uuden pelin)
+            self._thread = None
+
+    # --- Taustasäie ---
+
+    def _run(self) -> None:
+        while True:
+            kind, arg = self._queue.get()
+            try:
+                if kind == _SHUTDOWN:
+                    self._stop_current()
+                    return
+                if kind == _STOP:
+                    self._stop_current()
+                elif kind == _PRELOAD:
+                    self._sounds()
+                else:
+                    path = self._sounds().get(arg) if kind == "event" else resolve_sound(arg)
+                    if path:
+                        self._stop_current()
+                        sink = self._get_sink()
+                        try:
+                            self._current = sink.play(path)
+                        except Exception:
+                            # Soitin on asennettu mutta ei toimi (esim. ei äänilaitetta): hiljaiseksi
+                            # loppusession ajaksi, ettei jokainen tapahtuma epäonnistu uudelleen
+                            self._sink = NullSink()
+                            raise
+                        self.played += 1
+            except Exception:
+                # Äänet ovat koristetta: virhe (puuttuva soitin, kanta) ei saa kaataa peliä
+                if self._sink is None:
+                    self._sink = NullSink()
+
+    def _get_sink(self):
+        if self._sink is None:
+            try:
+                self._sink = PlaysoundSink()
+            except ImportError:
+                self._sink = NullSink()
+        return self._sink
+
+    def _sounds(self) -> Dict[str, str]:
+        if self._event_sounds is None:
+            try:
+                self._event_sounds = load_event_sounds()
+            except Exception:
+                self._event_sounds = {}
+        return self._event_sounds
+
+    def _stop_current(self) -> None:
+        if self._current is not None:
+            try:
+                self._get_sink().stop(self._current)
+            finally:
+                self._current = None
+
+
+NULL_ENGINE = AudioEngine(NullSink())
+_engine: Optional[AudioEngine] = None
+
+
+def get_audio_engine(headless: bool = False) -> AudioEngine:
+    """
+    Palauttaa prosessin yhteisen äänimoottorin; headless-tilassa ja AFC666_AUDIO=0:lla hiljaisen.
+    """
+    global _engine
+    if headless or not AUDIO_ENABLED:
+        return NULL_ENGINE
+    if _engine is None:
+        _engine = AudioEngine()
+    return _engine
+
+
+def event_playsound(event_name):
+    """Soittaa tapahtuman äänen taustalla (palaa heti)."""
+    return get_audio_engine().play_event(event_name)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
 
-event_playsound(event_name)
+    engine = get_audio_engine()
+    engine.play_event(sys.argv[1] if len(sys.argv) > 1 else "Volcano")
+    time.sleep(5)
+    engine.shutdown()
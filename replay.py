@@ -0,0 +1,160 @@
+# replay.py
+# ---------
+# - Rakentaa tallennuksen tilan mille tahansa päivälle toimintojournaalista (action_journal):
+#   lähin snapshot (save_snapshots) palautetaan muistikantaan ja sen jälkeiset toiminnot
+#   ajetaan GameSessionin omilla metodeilla. Lähdekantaan ei kirjoiteta mitään.
+# - RNG:tä ei siemennetä uudelleen: jokaisen toiminnon aikana tehdyt arvonnat syötetään
+#   journaalista sellaisenaan, ja jokainen poikkeama (eri/ylimääräinen arvonta, eri päivä
+#   tai kassa toiminnon jälkeen) raportoidaan divergenssinä.
+# - Käyttö: python replay.py <save_id> [--day N] [--no-verify] [--quiet]
+
+import argparse
+import builtins
+import contextlib
+import io
+import sys
+import time
+from typing import List, Optional
+
+import utils
+from session_helpers import capture_state, restore_state, state_digest, prepared_cursor, _to_dec
+from session_helpers.journal import (
+    ReplayDivergence,
+    ReplayRandom,
+    install_rng,
+    load_journal,
+    load_snapshot,
+    restore_rng,
+    suspended,
+)
+from storage.sqlite_backend import SQLiteBackend
+
+
+def _copy_airports(target_backend) -> int:
+    """Kopioi lähdekannan lentokenttätaulun replayn muistikantaan."""
+    with utils.get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys)
+        kursori.execute("snapshot.airports")
+        rows = kursori.fetchall() or []
+    with target_backend.connect() as kohde:
+        kohde.start_transaction()
+        kursori = kohde.cursor()
+        kursori.executemany(
+            "INSERT OR IGNORE INTO airport (ident, type, name, latitude_deg, longitude_deg, iso_country) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [tuple(r) for r in rows],
+        )
+        kohde.commit()
+    return len(rows)
+
+
+def replay_save(save_id: int, day: Optional[int] = None, verify: bool = True) -> dict:
+    """
+    Toistaa tallennuksen muistissa päivään `day` asti (None = journaalin loppuun).
+    Palauttaa raportin: toistetut toiminnot, kesto, divergenssit ja (verify) tilojen tiivisteet.
+    """
+    from game_session import GameSession
+
+    t_start = time.perf_counter()
+    snapshot = load_snapshot(save_id, day)
+    if snapshot is None:
+        raise RuntimeError(f"Tallennukselle {save_id} ei ole snapshotia (journaali puuttuu?)")
+    snap_seq, snap_day, state = snapshot
+    records = [r for r in load_journal(save_id, snap_seq) if day is None or r["day"] <= day]
+    live_state = capture_state(save_id) if verify else None
+
+    backend = SQLiteBackend(":memory:", seed_airports=False)
+    airports = _copy_airports(backend)
+    with backend.connect() as kohde:
+        kohde.start_transaction()
+        restore_state(kohde, state)
+        kohde.commit()
+    t_ready = time.perf_counter()
+
+    divergences: List[str] = []
+    rng = ReplayRandom()
+    real_input = builtins.input
+    session = None
+    with utils.use_backend(backend), suspended(), contextlib.redirect_stdout(io.StringIO()):
+        install_rng(rng)
+        builtins.input = lambda prompt="": ""
+        try:
+            session = GameSession.load(save_id, headless=True)
+            for rec in records:
+                rng.feed(rec["draws"][rec["rng_skip"]:])
+                try:
+                    if rec["action"] == "load":
+                        session = GameSession.load(save_id, headless=True)
+                    else:
+                        getattr(session, rec["action"])(*rec["args"], **rec["kwargs"])
+                except ReplayDivergence:
+                    pass
+                problems = []
+                if rng.diverged:
+                    problems.append(rng.diverged)
+                elif rng.remaining():
+                    problems.append(f"{rng.remaining()} käyttämätöntä arvontaa")
+                if session.current_day != rec["day"]:
+                    problems.append(f"päivä {session.current_day} ≠ {rec['day']}")
+                if rec["cash_after"] is not None and _to_dec(session.cash) != _to_dec(rec["cash_after"]):
+                    problems.append(f"kassa {session.cash} ≠ {_to_dec(rec['cash_after'])}")
+                if problems:
+                    divergences.append(f"seq {rec['seq']} ({rec['action']}, päivä {rec['day']}): " + "; ".join(problems))
+            replay_state = capture_state(save_id) if verify else None
+        finally:
+            builtins.input = real_input
+            restore_rng()
+    t_end = time.perf_counter()
+
+    replay_seconds = t_end - t_ready
+    report = {
+        "save_id": save_id,
+        "snapshot_seq": snap_seq,
+        "snapshot_day": snap_day,
+        "day": session.current_day if session else snap_day,
+        "cash": str(session.cash) if session else None,
+        "actions": len(records),
+        "airports": airports,
+        "setup_s": round(t_ready - t_start, 3),
+        "replay_s": round(replay_seconds, 3),
+        "actions_per_s": round(len(records) / replay_seconds, 1) if replay_seconds > 0 else None,
+        "divergences": divergences,
+    }
+    if verify:
+        report["replay_digest"] = state_digest(replay_state)
+        # Lähdekannan nykytilaa voi verrata vain, kun journaali toistettiin loppuun
+        if day is None or day >= int(live_state["game_saves"]["rows"][0][
+                live_state["game_saves"]["columns"].index("current_day")]):
+            report["live_digest"] = state_digest(live_state)
+            report["state_match"] = report["live_digest"] == report["replay_digest"]
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tallennuksen toisto toimintojournaalista muistikantaan.")
+    parser.add_argument("save_id", type=int)
+    parser.add_argument("--day", type=int, help="toista tämän päivän loppuun asti (oletus: koko journaali)")
+    parser.add_argument("--no-verify", action="store_true", help="älä vertaa lopputilaa lähdekantaan")
+    parser.add_argument("--quiet", action="store_true", help="tulosta vain yhteenveto")
+    args = parser.parse_args(argv)
+
+    report = replay_save(args.save_id, day=args.day, verify=not args.no_verify)
+    print(f"🔁 Tallennus {report['save_id']}: snapshot seq {report['snapshot_seq']} (päivä {report['snapshot_day']}) "
+          f"→ päivä {report['day']}, kassa {report['cash']}")
+    print(f"   Toimintoja {report['actions']} | valmistelu {report['setup_s']} s | toisto {report['replay_s']} s "
+          f"({report['actions_per_s']} toimintoa/s)")
+    if "state_match" in report:
+        print("   ✅ Tila vastaa tallennusta." if report["state_match"] else "   ❌ Tila poikkeaa tallennuksesta!")
+    if report["divergences"]:
+        print(f"   ❌ Divergenssejä: {len(report['divergences'])}")
+        if not args.quiet:
+            for line in report["divergences"]:
+                print(f"      {line}")
+    else:
+        print("   ✅ Ei divergenssejä.")
+    ok = not report["divergences"] and report.get("state_match", True)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
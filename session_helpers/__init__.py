@@ -1,8 +1,16 @@
 """Helper utilities extracted from game_session module."""
 
 from .common import _to_dec, _icon_title
+from .statements import (
+    prepared_cursor,
+    statement_counts,
+    reset_statement_counts,
+    format_statement_counts,
+    fetch_multi,
+)
 from .aircraft import (
     fetch_player_aircrafts_with_model_info,
+    fetch_fleet_overview,
     get_current_aircraft_upgrade_state,
     compute_effective_eco_multiplier,
     calc_aircraft_upgrade_cost,
@@ -14,11 +22,105 @@ from .bases import (
     fetch_base_current_level_map,
     insert_base_upgrade,
 )
+from .hydrate import (
+    hydrate_save,
+    fetch_owned_bases_with_levels,
+    fetch_active_contracts,
+    fetch_fate_calendar,
+)
+from .airports import (
+    airport_catalog,
+    reset_airport_catalog,
+    catalog_coords,
+    catalog_sample_destinations,
+    use_shared_catalog,
+)
+from .dashboard import (
+    fetch_traffic,
+    build_dashboard,
+)
+from .cache import (
+    FLEET,
+    BASES,
+    CASH,
+    CONTRACTS,
+    DAY,
+    TOPICS,
+    MemoCache,
+    InvalidationBus,
+    day_cached,
+    publishes,
+    process_cache,
+    format_cache_stats,
+)
+from .clubhouse import (
+    CLUBHOUSE_GAMES,
+    COIN_FLIP,
+    HIGH_LOW,
+    SLOT_MACHINE,
+    expected_value,
+    house_edge,
+    match_payline,
+    monte_carlo,
+    spin,
+)
+from .rules import (
+    haversine_km,
+    speed_km_per_day,
+    eco_multiplier_for_level,
+    nearest_point,
+    return_flight,
+    build_task_offer,
+    settle_arrival,
+    is_billing_day,
+    next_billing_day,
+    monthly_bill,
+)
+from .market import (
+    market_window,
+    fetch_market_models,
+    generate_market_listings,
+    fetch_purchased_listing_ids,
+    record_market_purchase,
+)
+from .snapshot import (
+    capture_state,
+    restore_state,
+    encode_state,
+    decode_state,
+    state_digest,
+)
+from .journal import (
+    ActionJournal,
+    ReplayDivergence,
+    journaled,
+)
+from .stats import (
+    add_stats,
+    arrival_stats,
+    merge_stats,
+    init_save_stats,
+    load_save_stats,
+    compute_save_stats,
+    rebuild_save_stats,
+)
+from .analytics import (
+    load_fleet_columns,
+    compute_fleet_analytics,
+    fleet_analytics,
+    format_fleet_analytics,
+)
 
 __all__ = [
     "_to_dec",
     "_icon_title",
+    "prepared_cursor",
+    "statement_counts",
+    "reset_statement_counts",
+    "format_statement_counts",
+    "fetch_multi",
     "fetch_player_aircrafts_with_model_info",
+    "fetch_fleet_overview",
     "get_current_aircraft_upgrade_state",
     "compute_effective_eco_multiplier",
     "calc_aircraft_upgrade_cost",
@@ -27,4 +129,70 @@ __all__ = [
     "fetch_owned_bases",
     "fetch_base_current_level_map",
     "insert_base_upgrade",
+    "hydrate_save",
+    "fetch_owned_bases_with_levels",
+    "fetch_active_contracts",
+    "fetch_fate_calendar",
+    "airport_catalog",
+    "reset_airport_catalog",
+    "catalog_coords",
+    "catalog_sample_destinations",
+    "use_shared_catalog",
+    "fetch_traffic",
+    "build_dashboard",
+    "FLEET",
+    "BASES",
+    "CASH",
+    "CONTRACTS",
+    "DAY",
+    "TOPICS",
+    "MemoCache",
+    "InvalidationBus",
+    "day_cached",
+    "publishes",
+    "process_cache",
+    "format_cache_stats",
+    "CLUBHOUSE_GAMES",
+    "COIN_FLIP",
+    "HIGH_LOW",
+    "SLOT_MACHINE",
+    "expected_value",
+    "house_edge",
+    "match_payline",
+    "monte_carlo",
+    "spin",
+    "haversine_km",
+    "speed_km_per_day",
+    "eco_multiplier_for_level",
+    "nearest_point",
+    "return_flight",
+    "build_task_offer",
+    "settle_arrival",
+    "is_billing_day",
+    "next_billing_day",
+    "monthly_bill",
+    "market_window",
+    "fetch_market_models",
+    "generate_market_listings",
+    "fetch_purchased_listing_ids",
+    "record_market_purchase",
+    "capture_state",
+    "restore_state",
+    "encode_state",
+    "decode_state",
+    "state_digest",
+    "ActionJournal",
+    "ReplayDivergence",
+    "journaled",
+    "add_stats",
+    "arrival_stats",
+    "merge_stats",
+    "init_save_stats",
+    "load_save_stats",
+    "compute_save_stats",
+    "rebuild_save_stats",
+    "load_fleet_columns",
+    "compute_fleet_analytics",
+    "fleet_analytics",
+    "format_fleet_analytics",
 ]
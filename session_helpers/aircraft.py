@@ -14,45 +14,40 @@ from upgrade_config import (
 from utils import get_connection
 
 from .common import _to_dec
+from .rules import eco_multiplier_for_level
+from .statements import prepared_cursor
 
 
 def fetch_player_aircrafts_with_model_info(save_id: int) -> List[dict]:
     """Return all unsold aircraft for the save, hydrated with model metadata."""
-    sql = """
-        SELECT
-            a.aircraft_id,
-            a.registration,
-            a.model_code,
-            am.model_name,
-            am.category,
-            a.purchase_price  AS purchase_price_aircraft,
-            am.purchase_price AS purchase_price_model,
-            am.eco_fee_multiplier
-        FROM aircraft a
-        JOIN aircraft_models am ON am.model_code = a.model_code
-        WHERE a.save_id = %s
-          AND (a.sold_day IS NULL OR a.sold_day = 0)
-        ORDER BY a.aircraft_id
-    """
     with get_connection() as yhteys:
-        kursori = yhteys.cursor(dictionary=True)
-        kursori.execute(sql, (save_id,))
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("aircraft.with_model_info", (save_id,))
         return kursori.fetchall() or []
 
 
+def with_effective_eco(rows: List[dict]) -> List[dict]:
+    """Attach eco_level (int) and eco_effective (float) to fleet overview rows."""
+    for r in rows:
+        r["eco_level"] = int(r.get("eco_level") or 0)
+        r["eco_effective"] = eco_multiplier_for_level(r.get("eco_fee_multiplier") or 1.0, r["eco_level"])
+    return rows
+
+
+def fetch_fleet_overview(save_id: int) -> List[dict]:
+    """Return unsold aircraft with model name, ECO level and effective ECO multiplier in one query."""
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("fleet.overview", (save_id, UPGRADE_CODE, save_id))
+        rows = kursori.fetchall() or []
+    return with_effective_eco(rows)
+
+
 def get_current_aircraft_upgrade_state(aircraft_id: int, upgrade_code: str = UPGRADE_CODE) -> dict:
     """Return the latest upgrade level entry for the aircraft."""
-    sql = """
-        SELECT level
-        FROM aircraft_upgrades
-        WHERE aircraft_id = %s
-          AND upgrade_code = %s
-        ORDER BY aircraft_upgrade_id DESC
-        LIMIT 1
-    """
     with get_connection() as yhteys:
-        kursori = yhteys.cursor(dictionary=True)
-        kursori.execute(sql, (aircraft_id, upgrade_code))
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("upgrade.latest_level", (aircraft_id, upgrade_code))
         row = kursori.fetchone()
 
     if not row:
@@ -64,16 +59,7 @@ def get_current_aircraft_upgrade_state(aircraft_id: int, upgrade_code: str = UPG
 def compute_effective_eco_multiplier(aircraft_id: int, base_eco_multiplier: float) -> float:
     """Compute the effective ECO multiplier after taking installed upgrades into account."""
     state = get_current_aircraft_upgrade_state(aircraft_id)
-    level = int(state["level"])
-
-    factor_per_level = Decimal("1.05")
-    base_dec = Decimal(str(base_eco_multiplier))
-    effective_multiplier = base_dec * (factor_per_level ** level)
-
-    floor = Decimal("0.50")
-    cap = Decimal("5.00")
-    final_multiplier = max(floor, min(effective_multiplier, cap))
-    return float(final_multiplier)
+    return eco_multiplier_for_level(base_eco_multiplier, int(state["level"]))
 
 
 def calc_aircraft_upgrade_cost(aircraft_row: dict, next_level: int) -> Decimal:
@@ -102,16 +88,10 @@ def apply_aircraft_upgrade(aircraft_id: int, installed_day: int) -> int:
     state = get_current_aircraft_upgrade_state(aircraft_id)
     new_level = int(state["level"]) + 1
 
-    sql = """
-        INSERT INTO aircraft_upgrades
-            (aircraft_id, upgrade_code, level, installed_day)
-        VALUES
-            (%s, %s, %s, %s)
-    """
     with get_connection() as yhteys:
-        kursori = yhteys.cursor()
+        kursori = prepared_cursor(yhteys)
         kursori.execute(
-            sql,
+            "upgrade.insert",
             (
                 int(aircraft_id),
                 str(UPGRADE_CODE),
@@ -124,15 +104,9 @@ def apply_aircraft_upgrade(aircraft_id: int, installed_day: int) -> int:
 
 def get_effective_eco_for_aircraft(aircraft_id: int) -> float:
     """Fetch base ECO multiplier for the model and apply upgrades to get the effective multiplier."""
-    sql = """
-        SELECT am.eco_fee_multiplier
-        FROM aircraft a
-        JOIN aircraft_models am ON am.model_code = a.model_code
-        WHERE a.aircraft_id = %s
-    """
     with get_connection() as yhteys:
-        kursori = yhteys.cursor()
-        kursori.execute(sql, (aircraft_id,))
+        kursori = prepared_cursor(yhteys)
+        kursori.execute("aircraft.base_eco", (aircraft_id,))
         row = kursori.fetchone()
 
     if row is None:
@@ -0,0 +1,67 @@
+"""
+Airport catalog of the active backend, loaded once per process (see storage.airports).
+
+A worker process started with AFC666_AIRPORT_SHM=<file> (or after use_shared_catalog) maps the
+catalog its parent published with SharedAirportCatalog instead of loading its own copy.
+"""
+
+import os
+import random
+import weakref
+from typing import List, Optional, Tuple
+
+import utils
+
+# backend -> AirportCatalog (tai None, jos NumPy puuttuu: kutsuja käyttää SQL-kyselyitä)
+_catalogs: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_shared = None
+
+
+def use_shared_catalog(name: Optional[str]) -> None:
+    """Serve every backend from the published catalog file `name` (None = back to per-process catalogs)."""
+    global _shared
+    if name is None:
+        _shared = None
+        return
+    from storage.airports import attach_shared_catalog
+
+    _shared = attach_shared_catalog(name)
+
+
+def airport_catalog():
+    """
+    Return the shared catalog if one is attached, else the AirportCatalog of the current
+    backend (from the on-disk cache when available), or None when NumPy is not installed.
+    """
+    if _shared is None and os.environ.get("AFC666_AIRPORT_SHM"):
+        use_shared_catalog(os.environ["AFC666_AIRPORT_SHM"])
+    if _shared is not None:
+        return _shared
+    backend = utils.get_backend()
+    if backend not in _catalogs:
+        try:
+            from storage.airports import load_catalog
+
+            _catalogs[backend] = load_catalog(backend, connect=utils.get_connection)
+        except ImportError:
+            _catalogs[backend] = None
+    return _catalogs[backend]
+
+
+def reset_airport_catalog() -> None:
+    """Forget the loaded catalogs (after writing to the airport table in-process)."""
+    _catalogs.clear()
+
+
+def catalog_coords(ident: str) -> Optional[Tuple[float, float]]:
+    catalog = airport_catalog()
+    return catalog.coords(ident) if catalog is not None else None
+
+
+def catalog_sample_destinations(exclude_ident: str, n: int) -> Optional[List[Tuple[str, str]]]:
+    """
+    `n` random (ident, name) destinations drawn with the module-level random (the game RNG),
+    or None when the catalog is unavailable.
+    """
+    catalog = airport_catalog()
+    return catalog.sample_destinations(exclude_ident, n, rng=random) if catalog is not None else None
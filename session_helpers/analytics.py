@@ -0,0 +1,275 @@
+"""
+Columnar fleet and flight analytics of one save.
+
+`load_fleet_columns` streams the save's flights and completed contracts with stream_rows
+(fetchmany batches of FETCH_BATCH_ROWS rows, each turned into a NumPy block right away, so
+no more than one batch of Python row tuples is alive at a time) and the aircraft with their
+model and eco class. `compute_fleet_analytics` then answers the group-by questions without
+Python-level loops over rows: ids are mapped to aircraft / contract positions with
+searchsorted and grouped with bincount.
+
+- revenue per aircraft model (earned contract rewards, late ones net of penalty)
+- utilisation per aircraft: days in the air / days owned (and its mean per model)
+- average lateness of completed contracts by route length (DISTANCE_BUCKETS_KM)
+- CO2 emissions by eco_class
+
+`fleet_analytics` does both and records the load / compute times.
+"""
+
+import time
+from itertools import chain
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils import get_connection
+
+from .statements import prepared_cursor, stream_rows
+
+FETCH_BATCH_ROWS = 50_000
+# Reittipituusluokkien ylärajat (km); viimeinen luokka on avoin
+DISTANCE_BUCKETS_KM = (500, 1500, 3000, 6000)
+
+# (sarake, NumPy-tyyppi) lauseiden analytics.flights ja analytics.contracts järjestyksessä
+FLIGHT_COLUMNS = (
+    ("aircraft_id", "i8"),
+    ("dep_day", "i4"),
+    ("arrival_day", "i4"),
+    ("distance_km", "f8"),
+    ("emission_kg", "f8"),
+    ("contract_id", "i8"),
+)
+CONTRACT_COLUMNS = (
+    ("contract_id", "i8"),
+    ("aircraft_id", "i8"),
+    ("reward", "f8"),
+    ("penalty", "f8"),
+    ("deadline_day", "i4"),
+    ("completed_day", "i4"),
+    ("status", "i1"),  # 1 = COMPLETED, 2 = COMPLETED_LATE
+)
+
+Progress = Optional[Callable[[str, int], None]]
+
+
+def _load_columns(yhteys, name: str, save_id: int, columns: Sequence[Tuple[str, str]],
+                  progress: Progress = None) -> Dict[str, "np.ndarray"]:
+    import numpy as np
+
+    width = len(columns)
+    blocks = []
+    loaded = 0
+    for rows in stream_rows(yhteys, name, (save_id,), FETCH_BATCH_ROWS):
+        # Yksi erä kerrallaan float64-lohkoksi (Decimal-arvot muuntuvat __float__-kautta);
+        # fromiter litistetystä erästä on selvästi nopeampi kuin np.array(tuple-lista)
+        flat = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=len(rows) * width)
+        blocks.append(flat.reshape(len(rows), width))
+        loaded += len(rows)
+        if progress is not None:
+            progress(name, loaded)
+    block = np.concatenate(blocks) if blocks else np.empty((0, width))
+    return {col: block[:, i].astype(dtype) for i, (col, dtype) in enumerate(columns)}
+
+
+def _factorize(values: List[str]) -> Tuple[List[str], "np.ndarray"]:
+    import numpy as np
+
+    labels = sorted(set(values))
+    index = {v: i for i, v in enumerate(labels)}
+    return labels, np.fromiter((index[v] for v in values), dtype=np.int64, count=len(values))
+
+
+def load_fleet_columns(save_id: int, progress: Progress = None) -> dict:
+    """
+    The save's analytics input as column arrays:
+    {"flights": {...}, "contracts": {...}, "aircraft": {...}, "models": [...], "model_names": {...},
+    "eco_classes": [...]}. Aircraft arrays are sorted by aircraft_id; "model" and "eco" are
+    positions in "models" / "eco_classes". `progress(statement, rows_so_far)` is called per batch.
+    """
+    import numpy as np
+
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("analytics.aircraft", (save_id,))
+        planes = kursori.fetchall() or []
+        flights = _load_columns(yhteys, "analytics.flights", save_id, FLIGHT_COLUMNS, progress)
+        contracts = _load_columns(yhteys, "analytics.contracts", save_id, CONTRACT_COLUMNS, progress)
+
+    models, model_idx = _factorize([p["model_code"] or "-" for p in planes])
+    eco_classes, eco_idx = _factorize([p["eco_class"] or "-" for p in planes])
+    aircraft = {
+        "aircraft_id": np.array([int(p["aircraft_id"]) for p in planes], dtype=np.int64),
+        "registration": [p["registration"] for p in planes],
+        "model": model_idx,
+        "eco": eco_idx,
+        "acquired_day": np.array([int(p["acquired_day"] or 0) for p in planes], dtype=np.int32),
+        # 0 = ei myyty
+        "sold_day": np.array([int(p["sold_day"] or 0) for p in planes], dtype=np.int32),
+    }
+    model_names = {p["model_code"] or "-": p["model_name"] or p["model_code"] or "-" for p in planes}
+    return {
+        "flights": flights,
+        "contracts": contracts,
+        "aircraft": aircraft,
+        "models": models,
+        "model_names": model_names,
+        "eco_classes": eco_classes,
+    }
+
+
+def _positions(sorted_ids: "np.ndarray", ids: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Positions of `ids` in `sorted_ids` and the mask of ids that were found."""
+    import numpy as np
+
+    if not len(sorted_ids):
+        return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return pos, sorted_ids[pos] == ids
+
+
+def _bucket_labels() -> List[str]:
+    edges = (0,) + DISTANCE_BUCKETS_KM
+    labels = [f"{lo}–{hi} km" for lo, hi in zip(edges, edges[1:])]
+    return labels + [f"> {DISTANCE_BUCKETS_KM[-1]} km"]
+
+
+def compute_fleet_analytics(columns: dict, current_day: int) -> dict:
+    """
+    Group-by aggregates of load_fleet_columns output as plain lists of dicts:
+    revenue_by_model, utilization (mean, by_aircraft, by_model), lateness_by_distance and
+    emissions_by_eco_class. Flights still in the air count as busy up to `current_day`.
+    """
+    import numpy as np
+
+    f, c, a = columns["flights"], columns["contracts"], columns["aircraft"]
+    models, eco_classes = columns["models"], columns["eco_classes"]
+    n_models, n_eco, n_planes = len(models), len(eco_classes), len(a["aircraft_id"])
+
+    # Lennot ja sopimukset koneiden riveille (aircraft_id on järjestyksessä)
+    f_pos, f_ok = _positions(a["aircraft_id"], f["aircraft_id"])
+    c_pos, c_ok = _positions(a["aircraft_id"], c["aircraft_id"])
+
+    # Tulot mallia kohden
+    earned = np.where(c["status"] == 1, c["reward"], np.maximum(c["reward"] - c["penalty"], 0.0))
+    c_model = a["model"][c_pos[c_ok]]
+    revenue = np.bincount(c_model, weights=earned[c_ok], minlength=n_models)
+    contract_counts = np.bincount(c_model, minlength=n_models)
+    revenue_by_model = sorted(
+        ({"model_code": m, "model_name": columns["model_names"].get(m, m),
+          "contracts": int(contract_counts[i]), "revenue": float(revenue[i])}
+         for i, m in enumerate(models)),
+        key=lambda r: -r["revenue"],
+    )
+
+    # Käyttöaste: ilmassa vietetyt päivät / omistetut päivät
+    busy_days = np.clip(np.minimum(f["arrival_day"], current_day) - f["dep_day"], 0, None)
+    busy = np.bincount(f_pos[f_ok], weights=busy_days[f_ok], minlength=n_planes)[:n_planes]
+    owned_until = np.where(a["sold_day"] > 0, a["sold_day"], current_day)
+    owned = np.maximum(owned_until - a["acquired_day"], 1)
+    util = busy / owned
+    per_model = np.bincount(a["model"], minlength=n_models)
+    util_by_model = np.divide(np.bincount(a["model"], weights=util, minlength=n_models), per_model,
+                              out=np.zeros(n_models), where=per_model > 0)
+    order = np.argsort(-util, kind="stable")
+    by_aircraft = [
+        {"registration": a["registration"][i], "model_code": models[a["model"][i]],
+         "busy_days": int(busy[i]), "owned_days": int(owned[i]), "utilization": float(util[i])}
+        for i in order
+    ]
+
+    # Myöhästyminen reittipituuden mukaan (sopimuksen matka sen lennolta)
+    order_c = np.argsort(c["contract_id"], kind="stable")
+    sorted_cids = c["contract_id"][order_c]
+    has_contract = f["contract_id"] > 0
+    cf_pos, cf_ok = _positions(sorted_cids, f["contract_id"][has_contract])
+    distance = np.full(len(sorted_cids), np.nan)
+    distance[cf_pos[cf_ok]] = f["distance_km"][has_contract][cf_ok]
+    with_route = ~np.isnan(distance)
+    bucket = np.searchsorted(np.asarray(DISTANCE_BUCKETS_KM, dtype=np.float64), distance[with_route], side="right")
+    late_days = np.maximum(c["completed_day"][order_c] - c["deadline_day"][order_c], 0)[with_route]
+    late = (c["status"][order_c] == 2)[with_route]
+    labels = _bucket_labels()
+    n_buckets = len(labels)
+    b_count = np.bincount(bucket, minlength=n_buckets)
+    b_late = np.bincount(bucket, weights=late.astype(np.float64), minlength=n_buckets)
+    b_days = np.bincount(bucket, weights=late_days, minlength=n_buckets)
+    lateness_by_distance = [
+        {"bucket": labels[i], "contracts": int(b_count[i]), "late": int(b_late[i]),
+         "avg_late_days": float(b_days[i] / b_count[i]) if b_count[i] else 0.0}
+        for i in range(n_buckets)
+    ]
+
+    # Päästöt eco-luokittain
+    f_eco = a["eco"][f_pos[f_ok]]
+    e_flights = np.bincount(f_eco, minlength=n_eco)
+    e_kg = np.bincount(f_eco, weights=f["emission_kg"][f_ok], minlength=n_eco)
+    e_km = np.bincount(f_eco, weights=f["distance_km"][f_ok], minlength=n_eco)
+    emissions_by_eco_class = [
+        {"eco_class": e, "flights": int(e_flights[i]), "emissions_kg": float(e_kg[i]), "distance_km": float(e_km[i]),
+         "kg_per_km": float(e_kg[i] / e_km[i]) if e_km[i] else 0.0}
+        for i, e in enumerate(eco_classes)
+    ]
+
+    return {
+        "flights": int(len(f["aircraft_id"])),
+        "contracts": int(len(c["contract_id"])),
+        "aircraft": n_planes,
+        "revenue_by_model": revenue_by_model,
+        "utilization": {
+            "mean": float(util.mean()) if n_planes else 0.0,
+            "by_aircraft": by_aircraft,
+            "by_model": [{"model_code": m, "aircraft": int(per_model[i]), "utilization": float(util_by_model[i])}
+                         for i, m in enumerate(models)],
+        },
+        "lateness_by_distance": lateness_by_distance,
+        "emissions_by_eco_class": emissions_by_eco_class,
+    }
+
+
+def fleet_analytics(save_id: int, current_day: int, progress: Progress = None) -> dict:
+    """load_fleet_columns + compute_fleet_analytics, with "load_s" and "compute_s" timings."""
+    t0 = time.perf_counter()
+    columns = load_fleet_columns(save_id, progress)
+    t1 = time.perf_counter()
+    report = compute_fleet_analytics(columns, current_day)
+    report["load_s"] = t1 - t0
+    report["compute_s"] = time.perf_counter() - t1
+    return report
+
+
+def _eur(amount: float) -> str:
+    return f"{amount:,.0f} €".replace(",", " ")
+
+
+def format_fleet_analytics(report: dict, top: int = 10) -> str:
+    """Text report of fleet_analytics (the `top` most and least utilised aircraft)."""
+    lines = [
+        f"📊 {report['flights']} lentoa, {report['contracts']} valmista sopimusta, {report['aircraft']} konetta "
+        f"(luku {report.get('load_s', 0):.2f} s, laskenta {report.get('compute_s', 0):.2f} s)",
+        "",
+        "💶 Tulot malleittain",
+    ]
+    for r in report["revenue_by_model"]:
+        lines.append(f"   {r['model_name'][:28]:<28} {r['contracts']:>8} sop. {_eur(r['revenue']):>18}")
+
+    util = report["utilization"]
+    lines += ["", f"⏱️ Käyttöaste (keskim. {util['mean'] * 100:.0f} %)"]
+    for r in util["by_model"]:
+        lines.append(f"   {r['model_code'][:28]:<28} {r['aircraft']:>6} konetta {r['utilization'] * 100:>6.1f} %")
+    planes = util["by_aircraft"]
+    shown = planes if len(planes) <= 2 * top else planes[:top] + [None] + planes[-top:]
+    for r in shown:
+        if r is None:
+            lines.append("   …")
+            continue
+        lines.append(f"   {r['registration']:<12} {r['model_code'][:20]:<20} "
+                     f"{r['busy_days']:>5}/{r['owned_days']:<5} pv {r['utilization'] * 100:>6.1f} %")
+
+    lines += ["", "⌛ Myöhästyminen reittipituuden mukaan"]
+    for r in report["lateness_by_distance"]:
+        lines.append(f"   {r['bucket']:<14} {r['contracts']:>8} sop. {r['late']:>7} myöhässä, "
+                     f"keskim. {r['avg_late_days']:.2f} pv")
+
+    lines += ["", "🌱 Päästöt eco-luokittain"]
+    for r in report["emissions_by_eco_class"]:
+        lines.append(f"   {r['eco_class'][:14]:<14} {r['flights']:>8} lentoa {r['emissions_kg'] / 1000:>14,.1f} t CO2 "
+                     f"({r['kg_per_km']:.2f} kg/km)".replace(",", " "))
+    return "\n".join(lines)
@@ -0,0 +1,204 @@
+"""
+Session-level caches with pub/sub invalidation.
+
+Write methods publish typed topics on the session's InvalidationBus (`@publishes(...)`) and
+every cache subscribed to one of those topics is cleared. `@day_cached(...)` memoizes a
+GameSession method per (current_day, args) in a bounded LRU with an optional TTL. Every
+cache counts hits, misses, evictions (LRU/TTL) and invalidations.
+"""
+
+import functools
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Invalidointiaiheet
+FLEET = "fleet"
+BASES = "bases"
+CASH = "cash"
+CONTRACTS = "contracts"
+DAY = "day"
+TOPICS = (FLEET, BASES, CASH, CONTRACTS, DAY)
+
+_MISSING = object()
+
+# Prosessitason välimuistit (esim. markkinat), jotka eivät kuulu millekään sessiolle
+PROCESS_CACHES: List["MemoCache"] = []
+
+
+def _check_topics(topics: Iterable[str]) -> Tuple[str, ...]:
+    topics = tuple(topics)
+    unknown = [t for t in topics if t not in TOPICS]
+    if unknown:
+        raise ValueError(f"Tuntematon välimuistiaihe: {', '.join(unknown)} (sallitut: {', '.join(TOPICS)})")
+    return topics
+
+
+class MemoCache:
+    """Bounded LRU mapping with an optional per-entry TTL (seconds) and hit/miss/eviction counters."""
+
+    def __init__(self, name: str, maxsize: int = 128, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[tuple, Tuple[float, object]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key, _MISSING)
+        if entry is not _MISSING and self.ttl is not None and self._clock() - entry[0] > self.ttl:
+            del self._data[key]
+            self.evictions += 1
+            entry = _MISSING
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value) -> None:
+        self._data[key] = (self._clock(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        if self._data:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def process_cache(name: str, maxsize: int = 128, ttl: Optional[float] = None) -> MemoCache:
+    """Create a module-level cache that is listed in format_cache_stats alongside the session caches."""
+    cache = MemoCache(name, maxsize=maxsize, ttl=ttl)
+    PROCESS_CACHES.append(cache)
+    return cache
+
+
+class InvalidationBus:
+    """Per-session topic -> subscriber registry; also owns the session's named caches."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {t: [] for t in TOPICS}
+        self.caches: Dict[str, MemoCache] = {}
+        self.published: Dict[str, int] = {t: 0 for t in TOPICS}
+
+    def subscribe(self, topic: str, callback: Callable[[str], None]) -> None:
+        _check_topics((topic,))
+        self._subscribers[topic].append(callback)
+
+    def publish(self, *topics: str) -> None:
+        """Notify the subscribers of each topic (a cache subscribed to several is cleared once)."""
+        notified = set()
+        for topic in _check_topics(topics):
+            self.published[topic] += 1
+            for callback in self._subscribers[topic]:
+                if id(callback) not in notified:
+                    notified.add(id(callback))
+                    callback(topic)
+
+    def cache(self, name: str, topics: Iterable[str] = (), maxsize: int = 128,
+              ttl: Optional[float] = None) -> MemoCache:
+        """Return the named cache, creating it and subscribing it to `topics` on first use."""
+        cache = self.caches.get(name)
+        if cache is None:
+            cache = MemoCache(name, maxsize=maxsize, ttl=ttl)
+            clear = lambda _topic: cache.clear()
+            for topic in _check_topics(topics):
+                self.subscribe(topic, clear)
+            self.caches[name] = cache
+        return cache
+
+    def stats(self) -> List[dict]:
+        return [c.stats() for c in self.caches.values()]
+
+
+def day_cached(topics: Iterable[str] = (), maxsize: int = 8, ttl: Optional[float] = None, per_day: bool = True):
+    """
+    Memoize a GameSession method in `self.cache_bus`, keyed by (current_day, *args) or just args
+    when per_day=False, and cleared whenever one of `topics` is published. The wrapper gets a
+    `prime(session, value, *args)` helper for seeding the cache (e.g. from load hydration).
+    """
+    topics = _check_topics(topics)
+
+    def decorator(fn):
+        name = fn.__name__
+
+        def _cache_and_key(self, args):
+            cache = self.cache_bus.cache(name, topics, maxsize=maxsize, ttl=ttl)
+            key = ((self.current_day,) + args) if per_day else args
+            return cache, key
+
+        @functools.wraps(fn)
+        def wrapper(self, *args):
+            cache, key = _cache_and_key(self, args)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = fn(self, *args)
+                cache.put(key, value)
+            return value
+
+        def prime(self, value, *args) -> None:
+            cache, key = _cache_and_key(self, args)
+            cache.put(key, value)
+
+        wrapper.prime = prime
+        return wrapper
+
+    return decorator
+
+
+def publishes(*topics: str):
+    """
+    Publish `topics` on `self.cache_bus` after the method returns. Also on error: a failed
+    transaction may still have committed part of its work (or changed in-memory state).
+    """
+    topics = _check_topics(topics)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                self.cache_bus.publish(*topics)
+
+        return wrapper
+
+    return decorator
+
+
+def format_cache_stats(bus: Optional[InvalidationBus] = None) -> str:
+    """Human-readable table of the session caches (and the process-level ones)."""
+    rows = (bus.stats() if bus is not None else []) + [c.stats() for c in PROCESS_CACHES]
+    if not rows:
+        return "(ei välimuisteja)"
+    width = max(len(r["name"]) for r in rows)
+    lines = [f"{'välimuisti':<{width}}  {'koko':>9}  {'osumat':>9}  {'hudit':>9}  {'poistot':>9}  {'tyhjennykset':>12}"]
+    for r in rows:
+        lines.append(
+            f"{r['name']:<{width}}  {str(r['size']) + '/' + str(r['maxsize']):>9}  {r['hits']:>9}  "
+            f"{r['misses']:>9}  {r['evictions']:>9}  {r['invalidations']:>12}"
+        )
+    return "\n".join(lines)
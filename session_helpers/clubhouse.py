@@ -0,0 +1,215 @@
+"""Odds engine for the clubhouse games: weight/payout tables, exact EV and Monte Carlo."""
+
+import random
+from fractions import Fraction
+from itertools import product
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from upgrade_config import (
+    COIN_FLIP_SIDES,
+    COIN_FLIP_WEIGHTS,
+    COIN_FLIP_WIN,
+    HIGH_LOW_FACES,
+    HIGH_LOW_WIN,
+    SLOT_SYMBOLS,
+    SLOT_WEIGHTS,
+    SLOT_PAYLINES,
+)
+
+
+class OddsTable:
+    """
+    Describe one game as independent weighted reels plus a payout rule.
+
+    - reels: list of (symbols, weights) pairs, one per drawn symbol.
+    - choices: the player's options; (None,) when the player makes no choice.
+    - reveal: how many reels the player sees before choosing.
+    - payout: (outcome, choice) -> net multiplier of the stake.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        reels: List[Tuple[Sequence, Sequence[int]]],
+        payout: Callable[[tuple, Optional[str]], int],
+        choices: Sequence[Optional[str]] = (None,),
+        reveal: int = 0,
+    ):
+        self.name = name
+        self.reels = [(tuple(symbols), tuple(int(w) for w in weights)) for symbols, weights in reels]
+        self.payout = payout
+        self.choices = tuple(choices)
+        self.reveal = int(reveal)
+
+
+def match_payline(outcome: tuple) -> Tuple[int, Optional[str]]:
+    """Return (gross multiplier, message) of the first matching slot payline."""
+    for pattern, gross, message in SLOT_PAYLINES:
+        if all(p is None or p == s for p, s in zip(pattern, outcome)):
+            return int(gross), message
+    return 0, None
+
+
+def _coin_flip_payout(outcome: tuple, choice: Optional[str]) -> int:
+    return COIN_FLIP_WIN if outcome[0] == choice else -1
+
+
+def _high_low_payout(outcome: tuple, choice: Optional[str]) -> int:
+    first, second = outcome
+    if (choice == "s" and second > first) or (choice == "p" and second < first):
+        return HIGH_LOW_WIN
+    return -1
+
+
+def _slot_payout(outcome: tuple, choice: Optional[str]) -> int:
+    gross, _ = match_payline(outcome)
+    return gross - 1
+
+
+COIN_FLIP = OddsTable(
+    name="Kruuna vai Klaava",
+    reels=[(COIN_FLIP_SIDES, COIN_FLIP_WEIGHTS)],
+    payout=_coin_flip_payout,
+    choices=COIN_FLIP_SIDES,
+)
+
+HIGH_LOW = OddsTable(
+    name="Suurempi vai Pienempi",
+    reels=[(HIGH_LOW_FACES, [1] * len(HIGH_LOW_FACES))] * 2,
+    payout=_high_low_payout,
+    choices=("s", "p"),
+    reveal=1,
+)
+
+SLOT_MACHINE = OddsTable(
+    name="Yksikätinen Rosvo",
+    reels=[(SLOT_SYMBOLS, SLOT_WEIGHTS)] * 3,
+    payout=_slot_payout,
+)
+
+CLUBHOUSE_GAMES: Dict[str, OddsTable] = {
+    "coin_flip": COIN_FLIP,
+    "high_low": HIGH_LOW,
+    "slot_machine": SLOT_MACHINE,
+}
+
+
+# ---------- Exact analysis ----------
+
+def iter_outcomes(table: OddsTable) -> Iterator[Tuple[tuple, Fraction]]:
+    """Yield every outcome of the table with its exact probability."""
+    reel_probs = []
+    for symbols, weights in table.reels:
+        total = sum(weights)
+        reel_probs.append([(s, Fraction(w, total)) for s, w in zip(symbols, weights)])
+    for combo in product(*reel_probs):
+        prob = Fraction(1)
+        for _, p in combo:
+            prob *= p
+        yield tuple(s for s, _ in combo), prob
+
+
+def best_policy(table: OddsTable) -> Dict[tuple, Optional[str]]:
+    """Map each revealed prefix to the choice with the highest conditional EV."""
+    ev_by_prefix: Dict[tuple, Dict[Optional[str], Fraction]] = {}
+    for outcome, prob in iter_outcomes(table):
+        per_choice = ev_by_prefix.setdefault(outcome[:table.reveal], {c: Fraction(0) for c in table.choices})
+        for choice in table.choices:
+            per_choice[choice] += prob * table.payout(outcome, choice)
+    # Tasapelissä ensimmäinen vaihtoehto (deterministinen)
+    return {prefix: max(table.choices, key=lambda c: evs[c]) for prefix, evs in ev_by_prefix.items()}
+
+
+def _resolve_policy(table: OddsTable, choice: Optional[str]) -> Callable[[tuple], Optional[str]]:
+    if choice is not None:
+        return lambda outcome: choice
+    policy = best_policy(table)
+    return lambda outcome: policy[outcome[:table.reveal]]
+
+
+def expected_value(table: OddsTable, choice: Optional[str] = None) -> Fraction:
+    """
+    Exact expected net return per unit stake.
+    choice=None plays the best policy; otherwise the given choice is always used.
+    """
+    pick = _resolve_policy(table, choice)
+    return sum((prob * table.payout(outcome, pick(outcome)) for outcome, prob in iter_outcomes(table)), Fraction(0))
+
+
+def house_edge(table: OddsTable, choice: Optional[str] = None) -> Fraction:
+    """House edge against the given (or best) play, as a fraction of the stake."""
+    return -expected_value(table, choice)
+
+
+# ---------- Monte Carlo ----------
+
+def payout_lut(table: OddsTable, choice: Optional[str] = None):
+    """Return a flat NumPy lookup table of net payouts indexed by mixed-radix reel indices."""
+    import numpy as np
+
+    pick = _resolve_policy(table, choice)
+    index_ranges = [range(len(symbols)) for symbols, _ in table.reels]
+    values = []
+    for idx in product(*index_ranges):
+        outcome = tuple(table.reels[r][0][i] for r, i in enumerate(idx))
+        values.append(table.payout(outcome, pick(outcome)))
+    return np.asarray(values, dtype=np.int64)
+
+
+def monte_carlo(
+    table: OddsTable,
+    spins: int = 10_000_000,
+    seed: Optional[int] = None,
+    choice: Optional[str] = None,
+    batch: int = 1_000_000,
+) -> dict:
+    """
+    Simulate `spins` rounds with NumPy and return mean return, standard error and exact EV.
+    Spins are processed in batches so memory stays bounded for 10^7+ rounds.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    lut = payout_lut(table, choice)
+    cums = []
+    strides = []
+    stride = 1
+    for symbols, weights in reversed(table.reels):
+        cums.append(np.cumsum(np.asarray(weights, dtype=np.float64)))
+        strides.append(stride)
+        stride *= len(symbols)
+    cums.reverse()
+    strides.reverse()
+
+    total = 0
+    total_sq = 0
+    done = 0
+    while done < spins:
+        n = min(batch, spins - done)
+        flat = np.zeros(n, dtype=np.int64)
+        for cum, st in zip(cums, strides):
+            idx = np.searchsorted(cum, rng.random(n) * cum[-1], side="right")
+            flat += idx * st
+        results = lut[flat]
+        total += int(results.sum())
+        total_sq += int((results * results).sum())
+        done += n
+
+    mean = total / spins if spins else 0.0
+    var = (total_sq / spins - mean * mean) if spins else 0.0
+    stderr = (max(var, 0.0) / spins) ** 0.5 if spins else 0.0
+    return {
+        "game": table.name,
+        "spins": spins,
+        "mean": mean,
+        "stderr": stderr,
+        "exact_ev": float(expected_value(table, choice)),
+    }
+
+
+# ---------- Interactive play ----------
+
+def spin(table: OddsTable, rng=random) -> tuple:
+    """Draw one outcome with the same weights the analysis uses."""
+    return tuple(rng.choices(symbols, weights=weights, k=1)[0] for symbols, weights in table.reels)
+
@@ -0,0 +1,49 @@
+"""Main-menu dashboard model: everything the menu header shows, built once per day or state change."""
+
+from typing import List, Optional
+
+from utils import get_connection
+
+from .rules import monthly_bill, next_billing_day
+from .statements import fetch_multi
+
+TRAFFIC_STATEMENTS = ("dashboard.traffic", "aircraft.fleet_counts")
+
+
+def traffic_from_rows(traffic: List[dict], counts: List[dict]) -> dict:
+    """Combine the dashboard.traffic and aircraft.fleet_counts rows into one dict."""
+    t = traffic[0] if traffic else {}
+    c = counts[0] if counts else {}
+    next_arrival = t.get("next_arrival")
+    return {
+        "enroute": int(t.get("enroute") or 0),
+        "next_arrival": int(next_arrival) if next_arrival is not None else None,
+        "total_planes": int(c.get("total") or 0),
+        "starter_planes": int(c.get("starters") or 0),
+    }
+
+
+def fetch_traffic(save_id: int) -> dict:
+    """Flights en route, the next arrival day and fleet counts for billing in one round trip."""
+    with get_connection() as yhteys:
+        traffic, counts = fetch_multi(yhteys, [(name, (save_id,)) for name in TRAFFIC_STATEMENTS])
+    return traffic_from_rows(traffic, counts)
+
+
+def build_dashboard(day: int, cash, primary_base: Optional[dict], event, traffic: dict) -> dict:
+    """
+    Assemble the dashboard dict. The next bill is estimated with the current fleet, charged on
+    the next billing day with that day's growth multiplier.
+    """
+    bill_day = next_billing_day(day)
+    _, bill = monthly_bill(traffic["total_planes"], traffic["starter_planes"], bill_day)
+    return {
+        "day": day,
+        "cash": cash,
+        "base_ident": primary_base["base_ident"] if primary_base else None,
+        "event": event,
+        "enroute": traffic["enroute"],
+        "next_arrival": traffic["next_arrival"],
+        "next_bill_day": bill_day,
+        "next_bill": bill,
+    }
@@ -0,0 +1,86 @@
+"""Single round-trip load of everything the session menus need (save, bases, fleet, contracts, fate, stats)."""
+
+from typing import Dict, List, Optional
+
+from upgrade_config import UPGRADE_CODE
+from utils import get_connection
+
+from .aircraft import with_effective_eco
+from .dashboard import traffic_from_rows
+from .statements import fetch_multi, prepared_cursor
+
+# FlightEvent(id, name, description, Cmax, Pmult, dmg, days, duration, sfx)
+FATE_EVENT_COLUMNS = (
+    "event_id",
+    "event_name",
+    "description",
+    "chance_max",
+    "package_multiplier",
+    "plane_damage",
+    "days",
+    "duration",
+    "sound_file",
+)
+
+
+def fate_calendar(rows: List[dict]) -> Dict[int, tuple]:
+    """Map game day -> FlightEvent constructor arguments (first event per day wins, like SelectEvent)."""
+    calendar: Dict[int, tuple] = {}
+    for r in rows:
+        day = int(r["game_day"])
+        if day not in calendar:
+            calendar[day] = tuple(r[c] for c in FATE_EVENT_COLUMNS)
+    return calendar
+
+
+def hydrate_save(save_id: int) -> Optional[dict]:
+    """
+    Fetch the save row, owned bases with their current level, the fleet overview, active
+    contracts with their flights, the fate calendar, the dashboard traffic counts and the
+    save_stats row in one round trip. None if the save is missing.
+    """
+    with get_connection() as yhteys:
+        save, bases, fleet, contracts, fate, traffic, counts, stats = fetch_multi(yhteys, [
+            ("save.state", (save_id,)),
+            ("hydrate.bases", (save_id, save_id)),
+            ("fleet.overview", (save_id, UPGRADE_CODE, save_id)),
+            ("contract.active", (save_id,)),
+            ("hydrate.fate", (save_id,)),
+            ("dashboard.traffic", (save_id,)),
+            ("aircraft.fleet_counts", (save_id,)),
+            ("stats.get", (save_id,)),
+        ])
+    if not save:
+        return None
+    return {
+        "save": save[0],
+        "bases": bases,
+        "fleet": with_effective_eco(fleet),
+        "contracts": contracts,
+        "fate": fate_calendar(fate),
+        "traffic": traffic_from_rows(traffic, counts),
+        "stats": stats[0] if stats else None,
+    }
+
+
+def fetch_owned_bases_with_levels(save_id: int) -> List[dict]:
+    """Owned bases (acquisition order) with their current size level."""
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("hydrate.bases", (save_id, save_id))
+        return kursori.fetchall() or []
+
+
+def fetch_active_contracts(save_id: int) -> List[dict]:
+    """Accepted/in-progress contracts with their aircraft and flight."""
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("contract.active", (save_id,))
+        return kursori.fetchall() or []
+
+
+def fetch_fate_calendar(save_id: int) -> Dict[int, tuple]:
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("hydrate.fate", (save_id,))
+        return fate_calendar(kursori.fetchall() or [])
@@ -0,0 +1,303 @@
+"""
+Append-only action journal: every state-changing GameSession action plus the RNG draws behind it.
+
+Each journaled call (see `journaled`) appends one action_journal row with the method name, its
+arguments as compact JSON, the packed RNG draws made since the previous row (the first
+`rng_skip` of them happened in menus before the action) and the day/cash afterwards. A full
+state snapshot is written to save_snapshots at seq 0 and every JOURNAL_SNAPSHOT_EVERY_DAYS
+days, so replay.py can rebuild a save at any day from the nearest snapshot.
+"""
+
+import functools
+import random
+import struct
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import utils
+from upgrade_config import JOURNAL_SNAPSHOT_EVERY_DAYS
+
+from .snapshot import capture_state, dumps, encode_state, loads, decode_state
+from .statements import prepared_cursor
+
+# Moduulitason random.*-funktiot ovat random._inst-olion sidottuja metodeja
+_RANDOM_API = tuple(
+    name for name in random.__all__
+    if getattr(getattr(random, name, None), "__self__", None) is random._inst
+)
+
+_suspended = 0
+
+
+class ReplayDivergence(RuntimeError):
+    """Replay asked for a different or an extra RNG draw than the journal recorded."""
+
+
+class RecordingRandom(random.Random):
+    """Random that remembers every primitive draw: ("F", float) or ("B", k, int)."""
+
+    def __init__(self, x=None):
+        self.draws: List[tuple] = []
+        super().__init__(x)
+
+    def random(self):
+        value = super().random()
+        self.draws.append(("F", value))
+        return value
+
+    def getrandbits(self, k):
+        value = super().getrandbits(k)
+        self.draws.append(("B", k, value))
+        return value
+
+
+class ReplayRandom(random.Random):
+    """Random that hands back recorded draws in order; seeding is ignored."""
+
+    def __init__(self):
+        self._queue: deque = deque()
+        self.diverged: Optional[str] = None
+        super().__init__()
+
+    def seed(self, *args, **kwargs):
+        pass
+
+    def feed(self, draws: List[tuple]) -> None:
+        self._queue = deque(draws)
+        self.diverged = None
+
+    def remaining(self) -> int:
+        return len(self._queue)
+
+    def _next(self, kind: str, k: Optional[int] = None) -> tuple:
+        if not self._queue:
+            self.diverged = f"ylimääräinen arvonta ({kind})"
+            raise ReplayDivergence(self.diverged)
+        draw = self._queue.popleft()
+        if draw[0] != kind or (k is not None and draw[1] != k):
+            self.diverged = f"arvonta {kind}{k or ''} mutta journaalissa {draw[0]}{draw[1] if draw[0] == 'B' else ''}"
+            raise ReplayDivergence(self.diverged)
+        return draw
+
+    def random(self):
+        return self._next("F")[1]
+
+    def getrandbits(self, k):
+        return self._next("B", k)[2]
+
+
+def install_rng(rng: random.Random) -> random.Random:
+    """Route the module-level random.* functions to `rng`, continuing the current stream."""
+    rng.setstate(random.random.__self__.getstate())
+    for name in _RANDOM_API:
+        setattr(random, name, getattr(rng, name))
+    return rng
+
+
+def restore_rng() -> None:
+    """Route random.* back to the stdlib instance, keeping the stream position."""
+    active = random.random.__self__
+    if active is random._inst:
+        return
+    random._inst.setstate(active.getstate())
+    for name in _RANDOM_API:
+        setattr(random, name, getattr(random._inst, name))
+
+
+def pack_draws(draws: List[tuple]) -> bytes:
+    """b"F" + <d per float draw, b"B" + <H k + little-endian bits per getrandbits draw."""
+    out = bytearray()
+    for draw in draws:
+        if draw[0] == "F":
+            out += b"F" + struct.pack("<d", draw[1])
+        else:
+            k, value = draw[1], draw[2]
+            out += b"B" + struct.pack("<H", k) + value.to_bytes((k + 7) // 8, "little")
+    return bytes(out)
+
+
+def unpack_draws(blob: Optional[bytes]) -> List[tuple]:
+    draws: List[tuple] = []
+    data = bytes(blob or b"")
+    pos = 0
+    while pos < len(data):
+        kind = data[pos:pos + 1]
+        if kind == b"F":
+            draws.append(("F", struct.unpack_from("<d", data, pos + 1)[0]))
+            pos += 9
+        elif kind == b"B":
+            k = struct.unpack_from("<H", data, pos + 1)[0]
+            n = (k + 7) // 8
+            draws.append(("B", k, int.from_bytes(data[pos + 3:pos + 3 + n], "little")))
+            pos += 3 + n
+        else:
+            raise ValueError(f"Rikkinäinen arvontadata kohdassa {pos}")
+    return draws
+
+
+@contextmanager
+def suspended():
+    """Disable journaling (e.g. while replaying) for the duration of the block."""
+    global _suspended
+    _suspended += 1
+    try:
+        yield
+    finally:
+        _suspended -= 1
+
+
+class ActionJournal:
+    """Per-session writer for action_journal and save_snapshots."""
+
+    def __init__(self, save_id: int, enabled: Optional[bool] = None):
+        self.save_id = int(save_id)
+        self.enabled = utils.JOURNAL if enabled is None else bool(enabled)
+        self._seq: Optional[int] = None
+        self._last_snapshot_day: Optional[int] = None
+        self._rng: Optional[RecordingRandom] = None
+        self._depth = 0
+        self._skip = 0
+
+    @property
+    def active(self) -> bool:
+        return self.enabled and not _suspended
+
+    def start(self, day: int, cash, marker: Optional[str] = None) -> None:
+        """
+        Begin recording for this session: installs the recording RNG and writes the base
+        snapshot (seq 0) for a save without one, otherwise an optional marker row (e.g. "load").
+        """
+        if not self.active:
+            return
+        self._rng = install_rng(RecordingRandom())
+        try:
+            if self._next_seq() == 1 and self._last_snapshot_day is None:
+                self._write(None, day, cash, with_snapshot=True)
+            elif marker:
+                self._write(marker, day, cash)
+        except Exception as err:
+            self._disable(err)
+
+    def resync(self) -> None:
+        """Forget the cached sequence/snapshot day (e.g. after a rolled-back batch); re-read on next write."""
+        self._seq = None
+        self._last_snapshot_day = None
+
+    def enter(self) -> bool:
+        """Mark entry into a journaled call; returns True for the outermost one."""
+        self._depth += 1
+        if self._depth == 1:
+            self._skip = len(self._rng.draws) if self._rng is not None else 0
+            return True
+        return False
+
+    def exit(self) -> None:
+        self._depth -= 1
+
+    def append(self, action: str, args: tuple, kwargs: dict, day: int, cash) -> None:
+        if not self.active:
+            return
+        try:
+            self._write(action, day, cash, args=[list(args), kwargs])
+        except Exception as err:
+            self._disable(err)
+
+    # --- Sisäiset ---
+
+    def _next_seq(self) -> int:
+        if self._seq is None:
+            with utils.get_connection() as yhteys:
+                kursori = prepared_cursor(yhteys)
+                kursori.execute("journal.last_seq", (self.save_id,))
+                self._seq = int(kursori.fetchone()[0] or 0)
+                kursori.execute("journal.snapshot_last_day", (self.save_id,))
+                last = kursori.fetchone()[0]
+                self._last_snapshot_day = int(last) if last is not None else None
+        return self._seq + 1
+
+    def _write(self, action: Optional[str], day: int, cash, args=None, with_snapshot: bool = False) -> None:
+        base = action is None
+        seq = 0 if base else self._next_seq()
+        if not base and (self._last_snapshot_day is None
+                         or day - self._last_snapshot_day >= JOURNAL_SNAPSHOT_EVERY_DAYS):
+            with_snapshot = True
+        state = encode_state(capture_state(self.save_id)) if with_snapshot else None
+        draws = self._rng.draws if self._rng is not None else []
+        now = datetime.utcnow()
+
+        with utils.get_connection() as yhteys:
+            kursori = prepared_cursor(yhteys)
+            yhteys.start_transaction()
+            if not base:
+                kursori.execute("journal.insert", (
+                    self.save_id, seq, int(day), action, dumps(args) if args is not None else None,
+                    self._skip, pack_draws(draws), cash, now,
+                ))
+            if state is not None:
+                kursori.execute("journal.snapshot_insert", (self.save_id, seq, int(day), state, now))
+            yhteys.commit()
+
+        if base:
+            self._seq = 0
+        else:
+            self._seq = seq
+        if state is not None:
+            self._last_snapshot_day = int(day)
+        draws.clear()
+        self._skip = 0
+
+    def _disable(self, err: Exception) -> None:
+        self.enabled = False
+        restore_rng()
+        print(f"⚠️  Toimintojournaali poistettu käytöstä tältä pelikerralta: {err}")
+
+
+def journaled(fn):
+    """
+    Record a successful GameSession method call in `self.journal`. Only the outermost journaled
+    call is written, so actions that call each other (day advance -> bills -> status) are one row.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        journal = getattr(self, "journal", None)
+        if journal is None or not journal.active:
+            return fn(self, *args, **kwargs)
+        outermost = journal.enter()
+        try:
+            result = fn(self, *args, **kwargs)
+        finally:
+            journal.exit()
+        if outermost:
+            journal.append(fn.__name__, args, kwargs, self.current_day, self.cash)
+        return result
+
+    return wrapper
+
+
+# ---------- Lukeminen (replay) ----------
+
+def load_snapshot(save_id: int, day: Optional[int] = None) -> Optional[Tuple[int, int, dict]]:
+    """Return (seq, day, state) of the latest snapshot at or before `day` (any day if None)."""
+    with utils.get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys)
+        kursori.execute("journal.snapshot_at_or_before", (save_id, day if day is not None else 2 ** 31 - 1))
+        row = kursori.fetchone()
+    if not row:
+        return None
+    return int(row[0]), int(row[1]), decode_state(row[2])
+
+
+def load_journal(save_id: int, after_seq: int = 0) -> List[dict]:
+    """Return the journal rows after `after_seq` with args and draws decoded."""
+    with utils.get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("journal.for_save", (save_id, after_seq))
+        rows = kursori.fetchall() or []
+    for r in rows:
+        args = loads(r["args"]) or [[], {}]
+        r["args"], r["kwargs"] = args[0], args[1]
+        r["draws"] = unpack_draws(r["rng"])
+    return rows
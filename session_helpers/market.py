@@ -0,0 +1,107 @@
+"""Seed-derived used-aircraft market: listings are generated on demand, only purchases are stored."""
+
+import random
+from decimal import Decimal
+from typing import List, Set
+
+from upgrade_config import MARKET_WINDOW_DAYS, MARKET_MIN_LISTINGS, MARKET_MAX_LISTINGS
+from utils import get_connection
+
+from .cache import process_cache
+from .statements import prepared_cursor
+
+# Listaus-ID = ikkuna * LISTING_ID_STRIDE + paikka (1..MARKET_MAX_LISTINGS)
+LISTING_ID_STRIDE = 100
+
+_MARKET_NOTES = [
+    None,
+    "Edellinen omistaja oli todella varovainen.",
+    "Rungossa on muutamia pieniä naarmuja.",
+    "Moottori saattaa kaivata huoltoa pian.",
+    "Tällä on lennetty vain lyhyitä matkoja.",
+    "Sisusta on kuin uusi.",
+    None, None
+]
+
+_LISTINGS_CACHE_MAX = 256
+_models_cache = process_cache("market.models", maxsize=1)
+_listings_cache = process_cache("market.listings", maxsize=_LISTINGS_CACHE_MAX)
+
+
+def market_window(day: int) -> int:
+    """Return the market window index the given day belongs to."""
+    return max(0, int(day)) // MARKET_WINDOW_DAYS
+
+
+def fetch_market_models() -> List[dict]:
+    """Return the non-starter model catalog; it is static, so it is fetched once per process."""
+    models = _models_cache.get(())
+    if models is None:
+        with get_connection() as yhteys:
+            kursori = prepared_cursor(yhteys, dictionary=True)
+            kursori.execute("model.market_catalog")
+            models = kursori.fetchall() or []
+        _models_cache.put((), models)
+    return models
+
+
+def generate_market_listings(rng_seed: int, window: int, models: List[dict]) -> List[dict]:
+    """
+    Deterministically generate the listings for (rng_seed, window).
+    Uses its own Random instance so the game's global RNG stream is left untouched.
+    """
+    key = (int(rng_seed), int(window))
+    cached = _listings_cache.get(key)
+    if cached is not None:
+        return cached
+
+    listings: List[dict] = []
+    if models:
+        rng = random.Random(f"market:{key[0]}:{key[1]}")
+        listed_day = max(1, key[1] * MARKET_WINDOW_DAYS)
+        count = rng.randint(MARKET_MIN_LISTINGS, MARKET_MAX_LISTINGS)
+        for slot in range(1, count + 1):
+            model = rng.choice(models)
+
+            # Arvotaan koneelle ominaisuudet
+            age = rng.randint(10, 500)
+            hours = age * rng.randint(1, 5)
+            condition = rng.randint(20, 95)
+
+            # Hinta perustuu uuteen hintaan, mutta sitä muokataan iän, tuntien ja kunnon mukaan
+            price_modifier = (Decimal(condition) / 100) - (Decimal(hours) / 20000) - (Decimal(age) / 5000)
+            price_modifier = max(Decimal('0.1'), min(price_modifier, Decimal('0.9')))  # 10-90% uudesta hinnasta
+            price = (Decimal(model['purchase_price']) * price_modifier).quantize(Decimal("0.01"))
+
+            listings.append({
+                "market_id": key[1] * LISTING_ID_STRIDE + slot,
+                "model_code": model["model_code"],
+                "model_name": model["model_name"],
+                "manufacturer": model["manufacturer"],
+                "purchase_price": price,
+                "condition_percent": condition,
+                "hours_flown": hours,
+                "manufactured_day": listed_day - age,
+                "market_notes": rng.choice(_MARKET_NOTES),
+                "listed_day": listed_day,
+            })
+        listings.sort(key=lambda p: (p["purchase_price"], p["market_id"]))
+
+    _listings_cache.put(key, listings)
+    return listings
+
+
+def fetch_purchased_listing_ids(save_id: int, window: int) -> Set[int]:
+    """Return the listing ids of the window that this save has already bought."""
+    lo = int(window) * LISTING_ID_STRIDE
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys)
+        kursori.execute("market.purchased_in_range", (save_id, lo, lo + LISTING_ID_STRIDE))
+        rows = kursori.fetchall() or []
+    return {int(r["listing_id"] if isinstance(r, dict) else r[0]) for r in rows}
+
+
+def record_market_purchase(kursori, save_id: int, listing_id: int, day: int) -> bool:
+    """Claim a listing inside the caller's transaction (`kursori` is a prepared_cursor). Returns False if it was already bought."""
+    kursori.execute("market.record_purchase", (int(save_id), int(listing_id), int(day)))
+    return kursori.rowcount == 1
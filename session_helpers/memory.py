@@ -0,0 +1,162 @@
+"""
+Opt-in memory instrumentation for long runs (tracemalloc snapshots at day boundaries).
+
+Enabled with AFC666_MEMTRACE=1, `main.py --memtrace` or enable(). fast_forward_days then
+creates a MemoryTracker: it starts tracemalloc (if it is not already running), collects
+garbage and takes a snapshot at every day boundary, and at the end reports the retained
+growth per simulated day, the day that grew the most together with its top allocation sites,
+and the top sites of the whole run (last snapshot vs the first). The summary dict is also what
+benchmarks/bench_memory.py compares against its threshold.
+
+Disabled (the default) the cost is one flag check per fast-forward.
+"""
+
+import gc
+import os
+import tracemalloc
+from typing import List, Optional
+
+import utils
+
+TRACEBACK_FRAMES = 10
+TOP_SITES = 10
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_enabled = utils.MEMTRACE
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def memory_tracker() -> Optional["MemoryTracker"]:
+    """A new MemoryTracker when memory instrumentation is on, else None."""
+    return MemoryTracker() if _enabled else None
+
+
+def _site(stat) -> str:
+    frame = stat.traceback[0]
+    return f"{os.path.relpath(frame.filename) if os.path.isabs(frame.filename) else frame.filename}:{frame.lineno}"
+
+
+def _top_growth(new, old, top: int) -> List[dict]:
+    diffs = [d for d in new.compare_to(old, "lineno") if d.size_diff > 0]
+    diffs.sort(key=lambda d: -d.size_diff)
+    return [
+        {"site": _site(d), "size_diff": d.size_diff, "count_diff": d.count_diff, "size": d.size}
+        for d in diffs[:top]
+    ]
+
+
+class MemoryTracker:
+    """
+    Per-day traced-memory bookkeeping. Call begin(day) before the first simulated day,
+    day_boundary(day) after each one and finish() at the end; summary() and
+    format_report() describe the run.
+    """
+
+    def __init__(self, frames: int = TRACEBACK_FRAMES, top: int = TOP_SITES,
+                 snapshot_every: int = 1, collect: bool = True):
+        self.frames = frames
+        self.top = top
+        self.snapshot_every = max(1, int(snapshot_every))
+        self.collect = collect
+        self.start_day: Optional[int] = None
+        self.days: List[dict] = []  # {"day", "bytes", "growth"}
+        self._started_tracing = False
+        self._first = None
+        self._prev = None
+        self._prev_bytes = 0
+        self._start_bytes = 0
+        self._worst: Optional[dict] = None
+        self._top_run: List[dict] = []
+        self._peak = 0
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def _current(self) -> int:
+        if self.collect:
+            gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        self._peak = max(self._peak, peak)
+        return current
+
+    def begin(self, day: int) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._start_bytes = self._prev_bytes = self._current()
+        self._first = self._prev = self._snapshot()
+        self.start_day = day
+
+    def day_boundary(self, day: int) -> None:
+        current = self._current()
+        growth = current - self._prev_bytes
+        self.days.append({"day": day, "bytes": current, "growth": growth})
+        self._prev_bytes = current
+        if len(self.days) % self.snapshot_every:
+            return
+        snap = self._snapshot()
+        if self._worst is None or growth > self._worst["growth"]:
+            self._worst = {"day": day, "growth": growth, "sites": _top_growth(snap, self._prev, self.top)}
+        self._prev = snap
+
+    def finish(self) -> None:
+        if self._first is not None and self.days:
+            self._top_run = _top_growth(self._snapshot(), self._first, self.top)
+        self._first = self._prev = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def summary(self) -> dict:
+        n = len(self.days)
+        end_bytes = self.days[-1]["bytes"] if self.days else self._start_bytes
+        retained = end_bytes - self._start_bytes
+        return {
+            "days": n,
+            "start_bytes": self._start_bytes,
+            "end_bytes": end_bytes,
+            "retained_bytes": retained,
+            "retained_per_day": retained / n if n else 0.0,
+            "peak_bytes": self._peak,
+            "worst_day": self._worst,
+            "top_sites": self._top_run,
+        }
+
+    def format_report(self) -> str:
+        s = self.summary()
+        if not s["days"]:
+            return "🧠 Muisti: ei simuloituja päiviä."
+        out = [
+            f"🧠 Muisti ({s['days']} päivää): alussa {s['start_bytes'] / 1024:.0f} KiB, lopussa "
+            f"{s['end_bytes'] / 1024:.0f} KiB, huippu {s['peak_bytes'] / 1024:.0f} KiB | "
+            f"pysyvä kasvu {s['retained_bytes'] / 1024:+.1f} KiB ({s['retained_per_day'] / 1024:+.2f} KiB/päivä)"
+        ]
+        worst = s["worst_day"]
+        if worst and worst["growth"] > 0:
+            out.append(f"   Suurin päiväkasvu: päivä {worst['day']} {worst['growth'] / 1024:+.1f} KiB")
+            for site in worst["sites"][:3]:
+                out.append(f"      {site['size_diff'] / 1024:+8.1f} KiB {site['count_diff']:+6} kpl  {site['site']}")
+        if s["top_sites"]:
+            out.append("   Eniten kasvaneet allokointipaikat (koko ajo):")
+            for site in s["top_sites"]:
+                out.append(f"      {site['size_diff'] / 1024:+8.1f} KiB {site['count_diff']:+6} kpl  {site['site']}")
+        return "\n".join(out)
@@ -0,0 +1,165 @@
+"""
+Per-day economic time series of a save (cash, revenue, bills, arrivals, fleet utilisation).
+
+advance_to_next_day records one sample per simulated day into the session's DailyMetrics
+buffer; nothing is written per day. The buffer is flushed as one packed chunk row of
+save_daily_metrics (append-only): by fast_forward_days inside each batch transaction (so the
+chunk commits or rolls back with its days), after METRICS_FLUSH_DAYS buffered days otherwise,
+and when the game ends. A chunk is column-wise little-endian arrays:
+
+    u8 version | u16 days | per column in METRIC_COLUMNS order: `days` values of its dtype
+
+Money is stored in integer cents. `load_daily_metrics` returns the whole series as NumPy
+arrays (one per column, plus "utilization" = enroute / fleet).
+"""
+
+import struct
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from utils import get_connection
+
+from .common import _to_dec
+from .statements import prepared_cursor
+
+METRICS_VERSION = 1
+METRICS_FLUSH_DAYS = 30
+
+# (sarake, NumPy-tyyppi, struct-koodi)
+METRIC_COLUMNS = (
+    ("day", "<i4", "i"),
+    ("cash_cents", "<i8", "q"),
+    ("revenue_cents", "<i8", "q"),
+    ("bills_cents", "<i8", "q"),
+    ("arrivals", "<i4", "i"),
+    ("enroute", "<i4", "i"),
+    ("fleet", "<i4", "i"),
+)
+_HEADER = struct.Struct("<BH")
+_MAX_CHUNK_DAYS = 0xFFFF
+
+
+def _cents(amount) -> int:
+    return int((_to_dec(amount) * 100).to_integral_value())
+
+
+def pack_chunk(rows: List[tuple]) -> bytes:
+    """Pack day samples (tuples in METRIC_COLUMNS order) into one chunk blob."""
+    n = len(rows)
+    parts = [_HEADER.pack(METRICS_VERSION, n)]
+    for i, (_name, _dtype, code) in enumerate(METRIC_COLUMNS):
+        parts.append(struct.pack(f"<{n}{code}", *(r[i] for r in rows)))
+    return b"".join(parts)
+
+
+def unpack_chunk(blob: bytes) -> Dict[str, "np.ndarray"]:
+    """Column arrays of one chunk (zero-copy views into `blob`)."""
+    import numpy as np
+
+    version, n = _HEADER.unpack_from(blob, 0)
+    if version != METRICS_VERSION:
+        raise ValueError(f"Tuntematon metriikkaversio: {version}")
+    offset = _HEADER.size
+    out = {}
+    for name, dtype, _code in METRIC_COLUMNS:
+        out[name] = np.frombuffer(blob, dtype=dtype, count=n, offset=offset)
+        offset += n * np.dtype(dtype).itemsize
+    return out
+
+
+class DailyMetrics:
+    """In-memory buffer of a session's unwritten day samples."""
+
+    def __init__(self, save_id: int):
+        self.save_id = save_id
+        self._rows: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def record(self, day: int, cash, revenue, bills, arrivals: int, enroute: int, fleet: int) -> None:
+        self._rows.append((int(day), _cents(cash), _cents(revenue), _cents(bills),
+                           int(arrivals), int(enroute), int(fleet)))
+
+    def discard_after(self, day: Optional[int]) -> None:
+        """Drop samples of days after `day` (their transaction was rolled back)."""
+        if day is not None:
+            self._rows = [r for r in self._rows if r[0] <= day]
+
+    def flush(self) -> int:
+        """
+        Write the buffered samples as chunk rows on a get_connection() connection (inside an
+        open batch this joins the batch transaction). Returns the number of days written.
+        """
+        if not self._rows:
+            return 0
+        rows = self._rows
+        now = datetime.utcnow()
+        params = [
+            (self.save_id, part[0][0], len(part), pack_chunk(part), now)
+            for part in (rows[i:i + _MAX_CHUNK_DAYS] for i in range(0, len(rows), _MAX_CHUNK_DAYS))
+        ]
+        yhteys = get_connection()
+        kursori = prepared_cursor(yhteys)
+        try:
+            yhteys.start_transaction()
+            for p in params:
+                kursori.execute("metrics.insert_chunk", p)
+            yhteys.commit()
+        except Exception:
+            yhteys.rollback()
+            raise
+        finally:
+            try:
+                kursori.close()
+            except Exception:
+                pass
+            yhteys.close()
+        self._rows = []
+        return len(rows)
+
+
+def load_daily_metrics(save_id: int) -> Dict[str, "np.ndarray"]:
+    """
+    The save's whole daily series as NumPy arrays sorted by day (one entry per column of
+    METRIC_COLUMNS plus float "utilization"). A day recorded twice keeps its latest sample.
+    """
+    import numpy as np
+
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys)
+        kursori.execute("metrics.chunks", (save_id,))
+        blobs = [bytes(r[0]) for r in kursori.fetchall() or []]
+
+    chunks = [unpack_chunk(b) for b in blobs]
+    if chunks:
+        series = {name: np.concatenate([c[name] for c in chunks]) for name, _d, _c in METRIC_COLUMNS}
+    else:
+        series = {name: np.empty(0, dtype=dtype) for name, dtype, _c in METRIC_COLUMNS}
+
+    # Viimeisin näyte per päivä (käännetyn taulukon ensimmäinen esiintymä), päiväjärjestyksessä
+    days = series["day"]
+    if len(days):
+        _, last = np.unique(days[::-1], return_index=True)
+        keep = len(days) - 1 - last
+        series = {name: col[keep] for name, col in series.items()}
+    fleet = series["fleet"]
+    series["utilization"] = np.divide(series["enroute"], fleet, out=np.zeros(len(fleet)), where=fleet > 0)
+    return series
+
+
+def _eur(amount: float) -> str:
+    return f"{amount:,.0f} €".replace(",", " ")
+
+
+def format_metrics_summary(series: Dict[str, "np.ndarray"]) -> str:
+    """One-line summary of a series (days, cash range, totals, mean utilisation)."""
+    n = len(series["day"])
+    if not n:
+        return "📈 Ei päiväkohtaisia mittauksia."
+    cash = series["cash_cents"] / 100
+    return (
+        f"📈 {n} päivää ({int(series['day'][0])}–{int(series['day'][-1])}): kassa {_eur(cash.min())}–{_eur(cash.max())}, "
+        f"tulot {_eur(series['revenue_cents'].sum() / 100)}, laskut {_eur(series['bills_cents'].sum() / 100)}, "
+        f"saapumisia {int(series['arrivals'].sum())}, käyttöaste keskim. {series['utilization'].mean() * 100:.0f} %"
+    )
@@ -0,0 +1,284 @@
+"""
+Built-in profiling: cProfile or a sampling profiler thread, plus per-phase wall-clock timers.
+
+`start_profiling("cprofile")` profiles every call on the calling thread (exact, but several
+times slower). `start_profiling("sample")` runs a daemon thread that records the calling
+thread's stack every `interval` seconds, so long fast-forwards keep their normal speed.
+`stop_profiling()` writes two files next to each other:
+
+  <prefix>.pstats     readable with `python -m pstats <file>` or snakeviz
+  <prefix>.collapsed  one "frame;frame;frame count" line per stack, the input format of
+                      flamegraph.pl / speedscope / inferno
+
+For cProfile runs the collapsed stacks are reconstructed from the caller graph (time is split
+between callers in proportion to their cumulative time), so deep paths are approximate.
+For sampled runs the pstats counts are samples, and times are samples × interval.
+
+PhaseTimer is independent of the profilers: it accumulates wall-clock time per named phase
+and is cheap enough to stay on in every advance_to_next_day. With tracing enabled each lap
+is also recorded as a "phase" span.
+"""
+
+import cProfile
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from storage import tracing
+
+MODES = ("cprofile", "sample")
+DEFAULT_MODE = "cprofile"
+DEFAULT_INTERVAL = 0.005
+# Oletuskohde: <repo>/.cache/profiles/afc666-<aikaleima>.{pstats,collapsed}
+PROFILE_DIR = os.environ.get(
+    "AFC666_PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "profiles"),
+)
+MAX_STACK_DEPTH = 128
+
+_active: Optional["_Profiler"] = None
+
+# pstats-funktioavain: (tiedosto, rivi, funktio)
+FuncKey = Tuple[str, int, str]
+
+
+def _frame_label(key: FuncKey) -> str:
+    filename, line, name = key
+    if filename == "~":
+        return name  # sisäänrakennettu (esim. <built-in method time.sleep>)
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+# ---------- cProfile ----------
+
+class _CProfiler:
+    mode = "cprofile"
+
+    def __init__(self, interval: float):
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def stats(self) -> dict:
+        self._profile.create_stats()
+        return self._profile.stats
+
+    def collapsed(self) -> Counter:
+        return collapse_pstats(self.stats())
+
+
+def collapse_pstats(stats: dict, min_us: int = 1) -> Counter:
+    """
+    Collapsed stacks (frames joined with ';' -> microseconds of own time) from a pstats
+    dict, walking the call graph from its roots. Recursive edges are cut.
+    """
+    callees: Dict[FuncKey, List[Tuple[FuncKey, float]]] = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [f for f, v in stats.items() if not v[4]]
+
+    out: Counter = Counter()
+
+    def walk(func: FuncKey, weight: float, path: List[str], seen: set) -> None:
+        _cc, _nc, tt, ct, _callers = stats[func]
+        path.append(_frame_label(func))
+        own_us = int(tt * weight * 1e6)
+        if own_us >= min_us:
+            out[";".join(path)] += own_us
+        if len(path) < MAX_STACK_DEPTH:
+            seen.add(func)
+            for callee, edge_ct in callees.get(func, ()):
+                total = stats[callee][3]
+                if callee in seen or total <= 0:
+                    continue
+                child = weight * edge_ct / total
+                if child * total * 1e6 >= min_us:
+                    walk(callee, child, path, seen)
+            seen.discard(func)
+        path.pop()
+
+    for root in roots:
+        walk(root, 1.0, [], set())
+    return out
+
+
+# ---------- Näytteistävä profiloija ----------
+
+class _SamplingProfiler:
+    mode = "sample"
+
+    def __init__(self, interval: float):
+        self.interval = max(0.0005, float(interval))
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stacks: Counter = Counter()  # tuple(FuncKey, ...) juuresta lehteen -> näytteet
+        self.samples = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="afc666-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        target = self._target
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack.reverse()
+            self._stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> Counter:
+        out: Counter = Counter()
+        for stack, count in self._stacks.items():
+            out[";".join(_frame_label(f) for f in stack)] += count
+        return out
+
+    def stats(self) -> dict:
+        """pstats-compatible dict: call counts are samples, times are samples × interval."""
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        edges: Counter = Counter()
+        for stack, count in self._stacks.items():
+            own[stack[-1]] += count
+            for func in set(stack):
+                inclusive[func] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                edges[(caller, callee)] += count
+
+        callers: Dict[FuncKey, dict] = {f: {} for f in inclusive}
+        for (caller, callee), count in edges.items():
+            callers[callee][caller] = (count, count, 0.0, count * self.interval)
+        return {
+            f: (n, n, own[f] * self.interval, n * self.interval, callers[f])
+            for f, n in inclusive.items()
+        }
+
+
+class _Profiler:
+    def __init__(self, mode: str, prefix: str, interval: float):
+        impl = _CProfiler if mode == "cprofile" else _SamplingProfiler
+        self.impl = impl(interval)
+        self.prefix = prefix
+        self.started = time.perf_counter()
+
+
+# ---------- Julkinen rajapinta ----------
+
+def is_profiling() -> bool:
+    return _active is not None
+
+
+def profiling_mode() -> Optional[str]:
+    return _active.impl.mode if _active is not None else None
+
+
+def default_prefix() -> str:
+    return os.path.join(PROFILE_DIR, time.strftime("afc666-%Y%m%d-%H%M%S"))
+
+
+def start_profiling(mode: str = DEFAULT_MODE, prefix: Optional[str] = None,
+                    interval: float = DEFAULT_INTERVAL) -> None:
+    """Profile the calling thread until stop_profiling(); `prefix` is the output path without suffix."""
+    global _active
+    if mode not in MODES:
+        raise ValueError(f"Tuntematon profilointitapa: {mode} (sallitut: {', '.join(MODES)})")
+    if _active is not None:
+        raise RuntimeError("Profilointi on jo käynnissä.")
+    _active = _Profiler(mode, prefix or default_prefix(), interval)
+    _active.impl.start()
+
+
+def stop_profiling() -> Optional[dict]:
+    """
+    Stop the running profiler and write <prefix>.pstats and <prefix>.collapsed.
+    Returns {"mode", "seconds", "pstats", "collapsed"}, or None if nothing was running.
+    """
+    global _active
+    prof, _active = _active, None
+    if prof is None:
+        return None
+    prof.impl.stop()
+    seconds = time.perf_counter() - prof.started
+
+    directory = os.path.dirname(prof.prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    pstats_path = prof.prefix + ".pstats"
+    collapsed_path = prof.prefix + ".collapsed"
+    with open(pstats_path, "wb") as fh:
+        marshal.dump(prof.impl.stats(), fh)
+    with open(collapsed_path, "w", encoding="utf-8") as fh:
+        for stack, weight in sorted(prof.impl.collapsed().items()):
+            fh.write(f"{stack} {weight}\n")
+    return {"mode": prof.impl.mode, "seconds": seconds, "pstats": pstats_path, "collapsed": collapsed_path}
+
+
+def format_profile_result(result: dict) -> str:
+    return (
+        f"🔬 Profiili ({result['mode']}, {result['seconds']:.1f} s):\n"
+        f"   pstats:    {result['pstats']}  (python -m pstats)\n"
+        f"   flamegraph: {result['collapsed']}  (flamegraph.pl / speedscope)"
+    )
+
+
+# ---------- Vaiheajastin ----------
+
+class PhaseTimer:
+    """
+    Wall-clock time per named phase. `begin()` starts a lap and each `lap(name)` charges the
+    time since the previous mark to `name`, so timing a function needs no re-indentation.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._mark = 0
+
+    def reset(self) -> None:
+        self.seconds.clear()
+        self.counts.clear()
+
+    def begin(self) -> None:
+        self._mark = time.perf_counter_ns()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter_ns()
+        self.seconds[name] = self.seconds.get(name, 0.0) + (now - self._mark) / 1e9
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if tracing.is_enabled():
+            tracing.record_span(name, self._mark, now, cat="phase")
+        self._mark = now
+
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+    def format(self) -> str:
+        total = self.total()
+        if not total:
+            return "(ei mitattuja vaiheita)"
+        parts = [
+            f"{name} {secs * 1000:.1f} ms ({secs / total * 100:.0f} %)"
+            for name, secs in self.seconds.items()
+        ]
+        return " | ".join(parts)
@@ -0,0 +1,184 @@
+"""Pure game rules shared by the synchronous GameSession and the asyncio data-access path."""
+
+import math
+import random
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from upgrade_config import (
+    HQ_MONTHLY_FEE,
+    MAINT_PER_AIRCRAFT,
+    BILL_GROWTH_RATE,
+    STARTER_MAINT_DISCOUNT,
+)
+
+from .common import _to_dec
+
+# Tehtävätarjousten palkkioparametrit
+OFFER_PER_KG = Decimal("10.10")  # €/kg
+OFFER_PER_KM = Decimal("6.90")  # €/km
+OFFER_MIN_REWARD = Decimal("250.00")  # alin sallittu palkkio
+OFFER_ECO_MIN = Decimal("0.10")  # eco-kerroin ei alle tämän
+OFFER_ECO_MAX = Decimal("5.00")  # eikä yli tämän
+OFFER_PENALTY_RATIO = Decimal("0.30")
+
+ECO_FACTOR_PER_LEVEL = Decimal("1.05")
+ECO_EFFECTIVE_FLOOR = Decimal("0.50")
+ECO_EFFECTIVE_CAP = Decimal("5.00")
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    """Great-circle distance between two points in kilometres."""
+    R = 6371.0
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dl / 2) ** 2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return R * c
+
+
+def speed_km_per_day(cruise_speed_kts) -> float:
+    """Daily travel distance used by the simulation (speed is doubled on purpose)."""
+    speed_kts = float(cruise_speed_kts or 200.0)
+    return max(1.0, speed_kts * 1.852 * 24.0 * 2.0)
+
+
+def eco_multiplier_for_level(base_eco_multiplier, level: int) -> float:
+    """Apply `level` ECO upgrades to the model multiplier and clamp to the allowed range."""
+    effective = Decimal(str(base_eco_multiplier)) * (ECO_FACTOR_PER_LEVEL ** int(level))
+    return float(max(ECO_EFFECTIVE_FLOOR, min(effective, ECO_EFFECTIVE_CAP)))
+
+
+def nearest_point(origin: Tuple[float, float], candidates: Dict[str, Tuple[float, float]]) -> Tuple[Optional[str], float]:
+    """Return (ident, distance_km) of the candidate closest to origin, or (None, inf)."""
+    closest_ident = None
+    min_dist = float("inf")
+    for ident, xy in candidates.items():
+        if not xy:
+            continue
+        dist = haversine_km(origin[0], origin[1], xy[0], xy[1])
+        if dist < min_dist:
+            min_dist = dist
+            closest_ident = ident
+    return closest_ident, min_dist
+
+
+def return_flight(distance_km: float, cruise_speed_kts, co2_kg_per_km, day: int) -> Tuple[int, float]:
+    """(arrival_day, emissions_kg) of a return-to-base flight of `distance_km` departing on `day`."""
+    duration_days = max(1, math.ceil(distance_km / speed_km_per_day(cruise_speed_kts)))
+    co2_per_km = Decimal(str(co2_kg_per_km or 0.2))
+    emissions = float((Decimal(distance_km) * co2_per_km).quantize(Decimal("0.01")))
+    return day + duration_days, emissions
+
+
+def build_task_offer(
+    dest: dict,
+    dist_km: float,
+    capacity: int,
+    speed_per_day: float,
+    eff_eco: Decimal,
+    current_day: int,
+    rng=random,
+) -> dict:
+    """
+    Build one cargo offer for a route.
+    - Payload scales with distance and may exceed capacity (-> several trips).
+    - Reward: (payload * PER_KG + distance * PER_KM) * eco, floored to the minimum reward.
+    - Penalty is a share of the reward; deadline adds a buffer to the total duration.
+    """
+    capacity = int(capacity or 0) or 1
+    eff_eco = max(OFFER_ECO_MIN, min(OFFER_ECO_MAX, _to_dec(eff_eco)))
+
+    if dist_km < 500:
+        payload = rng.randint(max(1, capacity // 2), max(1, capacity * 3))
+    elif dist_km < 1500:
+        payload = rng.randint(capacity, capacity * 4)
+    else:
+        payload = rng.randint(capacity * 2, capacity * 6)
+
+    base_days = max(1, math.ceil(dist_km / speed_per_day))
+    trips = max(1, math.ceil(payload / capacity))
+    total_days = base_days * trips
+
+    base_reward = (Decimal(payload) * OFFER_PER_KG) + (Decimal(dist_km) * OFFER_PER_KM)
+    reward = (base_reward * eff_eco).quantize(Decimal("0.01"))
+    if reward < OFFER_MIN_REWARD:
+        reward = OFFER_MIN_REWARD
+
+    penalty = (reward * OFFER_PENALTY_RATIO).quantize(Decimal("0.01"))
+    if penalty < Decimal("0.00"):
+        penalty = Decimal("0.00")
+
+    buffer_days = max(1, trips // 2)
+    deadline = current_day + total_days + buffer_days
+
+    return {
+        "dest_ident": dest["ident"],
+        "dest_name": dest.get("name"),
+        "payload_kg": payload,
+        "distance_km": dist_km,
+        "base_days": base_days,
+        "trips": trips,
+        "total_days": total_days,
+        "reward": reward,
+        "penalty": penalty,
+        "deadline": deadline,
+    }
+
+
+def settle_arrival(flight: dict, new_day: int) -> dict:
+    """
+    Decide the outcome of an arriving flight row (contract flight or RTB).
+    Returns hours_to_add, flight_status, contract_status (None for RTB) and earned.
+    """
+    arr_day = int(flight["arrival_day"])
+    dep_day = int(flight["dep_day"])
+    current_status = flight["flight_status"]
+
+    result = {
+        "hours_to_add": max(0, arr_day - dep_day) * 24,
+        "flight_status": "ARRIVED_RTB" if current_status == "ENROUTE_RTB" else "ARRIVED",
+        "contract_status": None,
+        "earned": Decimal("0.00"),
+    }
+
+    if flight.get("contract_id") is not None and current_status == "ENROUTE":
+        deadline = int(flight["deadline_day"])
+        reward = _to_dec(flight["reward"])
+        penalty = _to_dec(flight["penalty"])
+        if new_day <= deadline:
+            result["earned"] = reward
+            result["contract_status"] = "COMPLETED"
+        else:
+            result["earned"] = max(Decimal("0.00"), reward - penalty)
+            result["contract_status"] = "COMPLETED_LATE"
+    return result
+
+
+def is_billing_day(day: int) -> bool:
+    """Monthly bills fall due every 30th day."""
+    return day % 30 == 0
+
+
+def next_billing_day(day: int) -> int:
+    """First billing day after `day` (bills are charged when the day advances onto it)."""
+    return (day // 30 + 1) * 30
+
+
+def monthly_bill(total_planes: int, starter_planes: int, current_day: int) -> Tuple[Decimal, Decimal]:
+    """
+    Return (base_bill, total_bill) for the month.
+    From day 60 onwards the bill grows with compound BILL_GROWTH_RATE per 30-day period.
+    """
+    maint_starter = (MAINT_PER_AIRCRAFT * STARTER_MAINT_DISCOUNT) * starter_planes
+    maint_nonstarter = MAINT_PER_AIRCRAFT * max(0, total_planes - starter_planes)
+    base_bill = (HQ_MONTHLY_FEE + maint_starter + maint_nonstarter).quantize(Decimal("0.01"))
+
+    total_bill = base_bill
+    if current_day >= 60:
+        growth_periods = (current_day // 30) - 1
+        growth_multiplier = (1 + BILL_GROWTH_RATE) ** growth_periods
+        total_bill = (base_bill * growth_multiplier).quantize(Decimal("0.01"))
+    return base_bill, total_bill
+
@@ -0,0 +1,458 @@
+"""
+Whole-save snapshots: capture every row of a save, stream it to a compact binary format and
+bulk-import it back (as a new save) or restore it verbatim (replay).
+
+Binary format, version 2 (all integers little-endian):
+
+    b"AFC666S" | u8 version | u8 flags (bit 0 = zlib-compressed chunks)
+    per table:  u8 name length | name | u16 column count | (u8 length | name) per column
+                chunks: u32 row count | u32 payload length | payload, ended by a 0-row chunk
+    end:        u8 0
+
+A chunk payload is column-wise: per column one kind byte, one null-flag byte (followed by one
+byte per row when set) and the values: "q" int64 / "d" float64 packed with struct, and the
+text kinds ("s" str, "D" Decimal, "t" datetime, "a" date, "b" bytes, "j" mixed as JSON) as
+u32 lengths followed by the concatenated UTF-8 bytes. "n" is an all-NULL column.
+
+Version 2 keeps the layout and adds the save_stats row and the save_daily_metrics chunks.
+Version 1 files are still read (their daily series starts empty);
+a save imported from one has no stats row, and GameSession.load rebuilds it from the
+game tables. Ledger-only spend cannot be rebuilt, so it starts from zero.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import struct
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import accumulate
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from utils import get_connection
+
+from .statements import prepared_cursor
+
+# Taulut riippuvuusjärjestyksessä (palautus lisää rivit tässä järjestyksessä)
+SNAPSHOT_TABLES = (
+    "game_saves",
+    "owned_bases",
+    "base_upgrades",
+    "aircraft",
+    "aircraft_upgrades",
+    "contracts",
+    "flights",
+    "market_purchases",
+    "save_stats",
+    "save_daily_metrics",
+    "player_fate",
+)
+
+# Tuonnissa uusitaan pääavaimet ja niihin viittaavat sarakkeet: {taulu: (pääavain, {sarake: viitattu taulu})}
+_ID_MAP = {
+    "game_saves": ("save_id", {}),
+    "owned_bases": ("base_id", {"save_id": "game_saves"}),
+    "base_upgrades": ("base_upgrade_id", {"base_id": "owned_bases"}),
+    "aircraft": ("aircraft_id", {"save_id": "game_saves", "base_id": "owned_bases"}),
+    "aircraft_upgrades": ("aircraft_upgrade_id", {"aircraft_id": "aircraft"}),
+    "contracts": ("contractId", {"save_id": "game_saves", "aircraft_id": "aircraft"}),
+    "flights": ("flight_id", {"save_id": "game_saves", "aircraft_id": "aircraft", "contract_id": "contracts"}),
+    "market_purchases": (None, {"save_id": "game_saves"}),
+    "save_stats": (None, {"save_id": "game_saves"}),
+    "save_daily_metrics": ("chunk_id", {"save_id": "game_saves"}),
+}
+
+# Aikaleimat vaihtelevat ajokerrasta toiseen, joten ne eivät kuulu tilan tiivisteeseen
+_VOLATILE_COLUMNS = frozenset(("created_at", "updated_at"))
+# Johdetut taulut siirtyvät snapshotissa, mutta eivät kuulu tilan tiivisteeseen: vanhat
+# journaalin snapshotit eivät sisällä niitä (tilastot tarkistetaan --rebuild-stats-valinnalla),
+# ja päiväsarjan lohkorajat riippuvat kirjoitusajankohdista, eivät pelitilasta
+_DIGEST_EXCLUDED_TABLES = frozenset(("save_stats", "save_daily_metrics"))
+
+SNAPSHOT_MAGIC = b"AFC666S"
+SNAPSHOT_VERSION = 2
+_FLAG_ZLIB = 1
+CHUNK_ROWS = 4096
+
+_INT64_MIN, _INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+
+def _fate_range(rng_seed) -> tuple:
+    base = int(rng_seed or 0) * 1000
+    return base + 1, base + 666
+
+
+# ---------- Kaappaus ja palautus ----------
+
+def iter_save_tables(save_id: int) -> Iterator[Tuple[str, List[str], List[list]]]:
+    """Yield (table, columns, rows) for every snapshot table of the save, one query per table."""
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        rng_seed = None
+        for table in SNAPSHOT_TABLES:
+            params = _fate_range(rng_seed) if table == "player_fate" else (save_id,)
+            kursori.execute(f"snapshot.{table}", params)
+            rows = kursori.fetchall() or []
+            if table == "game_saves":
+                if not rows:
+                    raise ValueError(f"Tallennusta {save_id} ei löytynyt")
+                rng_seed = rows[0].get("rng_seed")
+            columns = list(rows[0].keys()) if rows else []
+            yield table, columns, [[r[c] for c in columns] for r in rows]
+
+
+def capture_state(save_id: int) -> Dict[str, dict]:
+    """
+    Read every row that belongs to the save: {table: {"columns": [...], "rows": [[...], ...]}}.
+    Empty tables are included with no columns.
+    """
+    return {table: {"columns": columns, "rows": rows} for table, columns, rows in iter_save_tables(save_id)}
+
+
+def _bulk_insert(kursori, table: str, columns: List[str], rows: List[list]) -> None:
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    kursori.executemany(sql, [tuple(r) for r in rows])
+
+
+def restore_state(yhteys, state: Dict[str, dict]) -> int:
+    """
+    Insert the captured rows (ids included) through `yhteys`; the caller owns the transaction.
+    Returns the number of rows written.
+    """
+    kursori = yhteys.cursor()
+    written = 0
+    try:
+        for table in SNAPSHOT_TABLES:
+            data = state.get(table) or {}
+            columns, rows = data.get("columns") or [], data.get("rows") or []
+            if rows:
+                _bulk_insert(kursori, table, columns, rows)
+                written += len(rows)
+    finally:
+        kursori.close()
+    return written
+
+
+# ---------- JSON (journaalin argumentit, sekatyyppiset sarakkeet) ----------
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return {"$d": str(value)}
+    if isinstance(value, (datetime, date)):
+        return {"$t": value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$b": base64.b64encode(bytes(value)).decode("ascii")}
+    raise TypeError(f"Ei JSON-muotoon: {type(value).__name__}")
+
+
+def _json_object_hook(obj: dict):
+    if len(obj) == 1:
+        if "$d" in obj:
+            return Decimal(obj["$d"])
+        if "$t" in obj:
+            return datetime.fromisoformat(obj["$t"])
+        if "$b" in obj:
+            return base64.b64decode(obj["$b"])
+    return obj
+
+
+def dumps(value) -> str:
+    """Compact JSON that round-trips Decimal, datetime and bytes (used for journal args too)."""
+    return json.dumps(value, default=_json_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(text: Optional[str]):
+    return json.loads(text, object_hook=_json_object_hook) if text else None
+
+
+# ---------- Binäärimuoto: sarakkeet ----------
+
+def _column_kind(values: list) -> str:
+    kinds = set()
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool) or isinstance(v, int):
+            kinds.add("q")
+        elif isinstance(v, float):
+            kinds.add("d")
+        elif isinstance(v, Decimal):
+            kinds.add("D")
+        elif isinstance(v, str):
+            kinds.add("s")
+        elif isinstance(v, datetime):
+            kinds.add("t")
+        elif isinstance(v, date):
+            kinds.add("a")
+        elif isinstance(v, (bytes, bytearray, memoryview)):
+            kinds.add("b")
+        else:
+            return "j"
+    if not kinds:
+        return "n"
+    if len(kinds) == 1:
+        kind = kinds.pop()
+        if kind == "q" and any(v is not None and not (_INT64_MIN <= v <= _INT64_MAX) for v in values):
+            return "j"
+        return kind
+    # SQLite palauttaa DECIMAL-sarakkeen arvot int/float-sekoituksena
+    if kinds == {"q", "d"}:
+        return "d"
+    if kinds <= {"q", "D"}:
+        return "D"
+    return "j"
+
+
+def _text_values(kind: str, values: list) -> List[bytes]:
+    if kind == "b":
+        return [bytes(v) if v is not None else b"" for v in values]
+    if kind == "j":
+        return [dumps(v).encode("utf-8") if v is not None else b"" for v in values]
+    if kind in ("t", "a"):
+        return [v.isoformat().encode("ascii") if v is not None else b"" for v in values]
+    return [str(v).encode("utf-8") if v is not None else b"" for v in values]
+
+
+def _encode_column(values: list) -> bytes:
+    n = len(values)
+    kind = _column_kind(values)
+    nulls = kind != "n" and any(v is None for v in values)
+    out = bytearray(kind.encode("ascii"))
+    out.append(1 if nulls else 0)
+    if nulls:
+        out += bytes(1 if v is None else 0 for v in values)
+    if kind == "q":
+        out += struct.pack(f"<{n}q", *(int(v) if v is not None else 0 for v in values))
+    elif kind == "d":
+        out += struct.pack(f"<{n}d", *(float(v) if v is not None else 0.0 for v in values))
+    elif kind != "n":
+        parts = _text_values(kind, values)
+        out += struct.pack(f"<{n}I", *(len(p) for p in parts))
+        out += b"".join(parts)
+    return bytes(out)
+
+
+_TEXT_DECODERS = {
+    "s": lambda b: b.decode("utf-8"),
+    "D": lambda b: Decimal(b.decode("ascii")),
+    "t": lambda b: datetime.fromisoformat(b.decode("ascii")),
+    "a": lambda b: date.fromisoformat(b.decode("ascii")),
+    "b": bytes,
+    "j": lambda b: loads(b.decode("utf-8")),
+}
+
+
+def _decode_column(buf: memoryview, pos: int, n: int) -> Tuple[list, int]:
+    kind = chr(buf[pos])
+    has_nulls = buf[pos + 1]
+    pos += 2
+    nulls = None
+    if has_nulls:
+        nulls = bytes(buf[pos:pos + n])
+        pos += n
+    if kind == "n":
+        return [None] * n, pos
+    if kind in ("q", "d"):
+        values = list(struct.unpack_from(f"<{n}{kind}", buf, pos))
+        pos += 8 * n
+    else:
+        lens = struct.unpack_from(f"<{n}I", buf, pos)
+        pos += 4 * n
+        decode = _TEXT_DECODERS[kind]
+        data = bytes(buf[pos:pos + sum(lens)])
+        ends = list(accumulate(lens))
+        values = [decode(data[end - size:end]) for size, end in zip(lens, ends)]
+        pos += len(data)
+    if nulls:
+        values = [None if is_null else v for v, is_null in zip(values, nulls)]
+    return values, pos
+
+
+# ---------- Binäärimuoto: virrat ----------
+
+def _write_name(fh: BinaryIO, name: str) -> None:
+    raw = name.encode("utf-8")
+    fh.write(struct.pack("<B", len(raw)) + raw)
+
+
+def _read_exact(fh: BinaryIO, n: int) -> bytes:
+    data = fh.read(n)
+    if len(data) != n:
+        raise ValueError("Snapshot-tiedosto on katkennut")
+    return data
+
+
+def _read_name(fh: BinaryIO) -> str:
+    (length,) = struct.unpack("<B", _read_exact(fh, 1))
+    return _read_exact(fh, length).decode("utf-8")
+
+
+def write_snapshot(fh: BinaryIO, tables, compress: bool = True) -> int:
+    """
+    Stream (table, columns, rows) tuples to `fh` in CHUNK_ROWS-row chunks. Returns rows written.
+    """
+    fh.write(SNAPSHOT_MAGIC + struct.pack("<BB", SNAPSHOT_VERSION, _FLAG_ZLIB if compress else 0))
+    total = 0
+    for table, columns, rows in tables:
+        _write_name(fh, table)
+        fh.write(struct.pack("<H", len(columns)))
+        for column in columns:
+            _write_name(fh, column)
+        for start in range(0, len(rows), CHUNK_ROWS):
+            chunk = rows[start:start + CHUNK_ROWS]
+            payload = b"".join(_encode_column([r[i] for r in chunk]) for i in range(len(columns)))
+            if compress:
+                payload = zlib.compress(payload, 1)
+            fh.write(struct.pack("<II", len(chunk), len(payload)) + payload)
+            total += len(chunk)
+        fh.write(struct.pack("<II", 0, 0))
+    fh.write(b"\x00")
+    return total
+
+
+def iter_snapshot(fh: BinaryIO) -> Iterator[Tuple[str, List[str], List[list]]]:
+    """Read a snapshot stream table by table: yields (table, columns, rows)."""
+    header = _read_exact(fh, len(SNAPSHOT_MAGIC) + 2)
+    if not header.startswith(SNAPSHOT_MAGIC):
+        raise ValueError("Ei AFC666-snapshot-tiedosto")
+    version, flags = header[-2], header[-1]
+    if version > SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot-versio {version} on uudempi kuin tuettu {SNAPSHOT_VERSION}")
+    while True:
+        table = _read_name(fh)
+        if not table:
+            return
+        (ncols,) = struct.unpack("<H", _read_exact(fh, 2))
+        columns = [_read_name(fh) for _ in range(ncols)]
+        rows: List[list] = []
+        while True:
+            nrows, size = struct.unpack("<II", _read_exact(fh, 8))
+            if nrows == 0:
+                break
+            payload = _read_exact(fh, size)
+            if flags & _FLAG_ZLIB:
+                payload = zlib.decompress(payload)
+            buf = memoryview(payload)
+            pos = 0
+            cols = []
+            for _ in range(ncols):
+                values, pos = _decode_column(buf, pos, nrows)
+                cols.append(values)
+            rows.extend(map(list, zip(*cols)) if cols else ([] for _ in range(nrows)))
+        yield table, columns, rows
+
+
+def read_snapshot(fh: BinaryIO) -> Dict[str, dict]:
+    return {table: {"columns": columns, "rows": rows} for table, columns, rows in iter_snapshot(fh)}
+
+
+def encode_state(state: Dict[str, dict], compress: bool = True) -> bytes:
+    """Serialize a captured state to the binary snapshot format."""
+    buf = io.BytesIO()
+    write_snapshot(buf, ((t, d["columns"], d["rows"]) for t, d in state.items()), compress=compress)
+    return buf.getvalue()
+
+
+def decode_state(blob: bytes) -> Dict[str, dict]:
+    return read_snapshot(io.BytesIO(bytes(blob)))
+
+
+def export_snapshot(save_id: int, fh: BinaryIO, compress: bool = True) -> int:
+    """Stream the save to `fh` table by table (one query per table). Returns rows written."""
+    return write_snapshot(fh, iter_save_tables(save_id), compress=compress)
+
+
+# ---------- Tuonti uudeksi tallennukseksi ----------
+
+def import_snapshot(fh: BinaryIO) -> int:
+    """
+    Import a snapshot stream as a new save: every primary key is moved past the current maximum
+    of its table and the references follow. One bulk insert per table inside one transaction.
+    Returns the new save_id.
+    """
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys)
+        raw = yhteys.cursor()
+        try:
+            yhteys.start_transaction()
+            offsets: Dict[str, int] = {}
+            save_id = None
+            for table, columns, rows in iter_snapshot(fh):
+                if not rows:
+                    continue
+                if table == "player_fate":
+                    # Kohtalo on siemenkohtainen: sama siemen kannassa jo -> rivit ovat samat
+                    idx = columns.index("day")
+                    kursori.execute("snapshot.fate_exists", (min(r[idx] for r in rows), max(r[idx] for r in rows)))
+                    if kursori.fetchone():
+                        continue
+                elif table in _ID_MAP:
+                    pk, refs = _ID_MAP[table]
+                    if pk is not None:
+                        idx = columns.index(pk)
+                        kursori.execute(f"snapshot.max_id.{table}")
+                        offsets[table] = int(kursori.fetchone()[0] or 0) + 1 - min(int(r[idx]) for r in rows)
+                        for r in rows:
+                            r[idx] = int(r[idx]) + offsets[table]
+                    for column, ref_table in refs.items():
+                        if column in columns:
+                            idx, off = columns.index(column), offsets.get(ref_table, 0)
+                            for r in rows:
+                                if r[idx] is not None:
+                                    r[idx] = int(r[idx]) + off
+                    if table == "game_saves":
+                        save_id = int(rows[0][columns.index("save_id")])
+                _bulk_insert(raw, table, columns, rows)
+            if save_id is None:
+                raise ValueError("Snapshotissa ei ole game_saves-riviä")
+            yhteys.commit()
+            return save_id
+        except Exception:
+            yhteys.rollback()
+            raise
+        finally:
+            raw.close()
+
+
+def export_snapshot_file(save_id: int, path: str, compress: bool = True) -> int:
+    with open(path, "wb") as fh:
+        return export_snapshot(save_id, fh, compress=compress)
+
+
+def import_snapshot_file(path: str) -> int:
+    with open(path, "rb") as fh:
+        return import_snapshot(fh)
+
+
+# ---------- Vertailu ----------
+
+def _normalize(value):
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        # MySQL palauttaa DECIMALin, SQLite floatin/intin: verrataan sentin tarkkuudella
+        return f"{float(value):.2f}"
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    return str(value)
+
+
+def state_rows(state: Dict[str, dict]) -> Dict[str, List[tuple]]:
+    """Backend-neutral, ordered rows per table without volatile timestamp columns."""
+    out: Dict[str, List[tuple]] = {}
+    for table in SNAPSHOT_TABLES:
+        if table in _DIGEST_EXCLUDED_TABLES:
+            continue
+        data = state.get(table) or {}
+        columns = data.get("columns") or []
+        keep = [i for i, c in enumerate(columns) if c not in _VOLATILE_COLUMNS]
+        rows = [tuple((columns[i], _normalize(r[i])) for i in keep) for r in data.get("rows") or []]
+        out[table] = sorted(rows, key=repr)
+    return out
+
+
+def state_digest(state: Dict[str, dict]) -> str:
+    """SHA-256 over state_rows(); equal digests mean equal game state."""
+    return hashlib.sha256(repr(state_rows(state)).encode("utf-8")).hexdigest()
@@ -0,0 +1,611 @@
+"""
+Catalogue of every SQL statement used by GameSession and the session helpers.
+
+Statements are registered by name in storage.prepared.REGISTRY and executed with
+`prepared_cursor(yhteys).execute(name, params)`, so each one is prepared once per pooled
+connection and its executions are counted (`statement_counts()`).
+Names are "<table or area>.<action>"; IN_LIST marks a variable-length IN (...) list.
+"""
+
+from storage.prepared import (
+    IN_LIST,
+    register,
+    prepared_cursor,
+    fetch_multi,
+    stream_rows,
+    statement_counts,
+    reset_statement_counts,
+    format_statement_counts,
+)
+
+# ---------- game_saves ----------
+
+register("save.insert", """
+    INSERT INTO game_saves
+    (player_name, current_day, cash, difficulty, status, rng_seed, created_at, updated_at)
+    VALUES
+        (%s, %s, %s, %s, %s, %s, %s, %s)
+""")
+register("save.state", """
+    SELECT player_name, cash, difficulty, current_day, status, rng_seed
+    FROM game_saves
+    WHERE save_id = %s
+""")
+register("save.lock", "SELECT save_id FROM game_saves WHERE save_id = %s FOR UPDATE")
+register("save.cash_for_update", "SELECT cash FROM game_saves WHERE save_id = %s FOR UPDATE")
+register("save.set_cash", "UPDATE game_saves SET cash = %s WHERE save_id = %s")
+register("save.set_cash_touch", "UPDATE game_saves SET cash = %s, updated_at = %s WHERE save_id = %s")
+register("save.set_status", "UPDATE game_saves SET status = %s, updated_at = %s WHERE save_id = %s")
+register("save.set_day", "UPDATE game_saves SET current_day = %s, updated_at = %s WHERE save_id = %s")
+register("save.touch", "UPDATE game_saves SET updated_at = %s WHERE save_id = %s")
+register("save.recent", """
+    SELECT save_id, player_name, current_day, cash, difficulty, status, updated_at, created_at
+    FROM game_saves
+    ORDER BY COALESCE(updated_at, created_at) DESC
+    LIMIT %s
+""")
+
+# ---------- save_stats (inkrementaalisesti ylläpidetyt tilastot) ----------
+
+STATS_COLUMNS = (
+    "aircraft_count",
+    "total_hours",
+    "total_emissions_kg",
+    "contract_flights",
+    "rtb_flights",
+    "flights_arrived",
+    "contracts_on_time",
+    "contracts_late",
+    "revenue",
+    "spend_aircraft",
+    "spend_bases",
+    "spend_upgrades",
+    "spend_repairs",
+    "spend_bills",
+    "clubhouse_net",
+)
+# Yksi kiinteä lause kaikille päivityksille: puuttuvien sarakkeiden delta on 0
+STATS_ADD_SQL = (
+    "UPDATE save_stats SET "
+    + ", ".join(f"{c} = {c} + %s" for c in STATS_COLUMNS)
+    + " WHERE save_id = %s"
+)
+
+register("stats.add", STATS_ADD_SQL)
+register("stats.init", "INSERT IGNORE INTO save_stats (save_id) VALUES (%s)")
+register("stats.get", f"SELECT {', '.join(STATS_COLUMNS)} FROM save_stats WHERE save_id = %s")
+register("stats.delete", "DELETE FROM save_stats WHERE save_id = %s")
+register("stats.insert", f"""
+    INSERT INTO save_stats (save_id, {', '.join(STATS_COLUMNS)})
+    VALUES (%s, {', '.join(['%s'] * len(STATS_COLUMNS))})
+""")
+# Täysi uudelleenlaskenta pelitauluista (tarkistusta varten); kirjanpitosarakkeet puuttuvat
+register("stats.recompute", """
+    SELECT (SELECT COUNT(*) FROM aircraft WHERE save_id = gs.save_id)                     AS aircraft_count,
+           (SELECT COALESCE(SUM(hours_flown), 0) FROM aircraft WHERE save_id = gs.save_id) AS total_hours,
+           (SELECT COALESCE(SUM(emission_kg_co2), 0) FROM flights WHERE save_id = gs.save_id) AS total_emissions_kg,
+           (SELECT COUNT(*) FROM flights
+            WHERE save_id = gs.save_id AND contract_id IS NOT NULL)                        AS contract_flights,
+           (SELECT COUNT(*) FROM flights
+            WHERE save_id = gs.save_id AND contract_id IS NULL)                            AS rtb_flights,
+           (SELECT COUNT(*) FROM flights
+            WHERE save_id = gs.save_id AND status IN ('ARRIVED', 'ARRIVED_RTB'))          AS flights_arrived,
+           (SELECT COUNT(*) FROM contracts
+            WHERE save_id = gs.save_id AND status = 'COMPLETED')                           AS contracts_on_time,
+           (SELECT COUNT(*) FROM contracts
+            WHERE save_id = gs.save_id AND status = 'COMPLETED_LATE')                      AS contracts_late,
+           (SELECT COALESCE(SUM(CASE WHEN status = 'COMPLETED' THEN reward
+                                     WHEN reward > penalty THEN reward - penalty
+                                     ELSE 0 END), 0)
+            FROM contracts
+            WHERE save_id = gs.save_id AND status IN ('COMPLETED', 'COMPLETED_LATE'))      AS revenue,
+           (SELECT COALESCE(SUM(purchase_price), 0) FROM aircraft WHERE save_id = gs.save_id) AS spend_aircraft,
+           (SELECT COALESCE(SUM(purchase_cost), 0) FROM owned_bases WHERE save_id = gs.save_id) AS spend_bases,
+           (SELECT COALESCE(SUM(bu.upgrade_cost), 0)
+            FROM base_upgrades bu
+                     JOIN owned_bases ob ON ob.base_id = bu.base_id
+            WHERE ob.save_id = gs.save_id)                                                 AS spend_upgrades
+    FROM game_saves gs
+    WHERE gs.save_id = %s
+""")
+register("stats.recompute_aircraft_upgrades", """
+    SELECT u.level,
+           am.category,
+           a.purchase_price  AS purchase_price_aircraft,
+           am.purchase_price AS purchase_price_model
+    FROM aircraft_upgrades u
+             JOIN aircraft a ON a.aircraft_id = u.aircraft_id
+             JOIN aircraft_models am ON am.model_code = a.model_code
+    WHERE a.save_id = %s AND u.upgrade_code = %s
+""")
+
+# ---------- aircraft ----------
+
+register("aircraft.insert", """
+    INSERT INTO aircraft
+    (model_code, base_level, current_airport_ident, registration, nickname,
+     acquired_day, purchase_price, condition_percent, status, hours_flown,
+     sold_day, sale_price, save_id, base_id)
+    VALUES
+        (%s, %s, %s, %s, %s,
+         %s, %s, %s, %s, %s,
+         %s, %s, %s, %s)
+""")
+register("aircraft.insert_used", """
+    INSERT INTO aircraft (model_code, current_airport_ident, registration, acquired_day, purchase_price,
+                          condition_percent, hours_flown, status, save_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, 'IDLE', %s)
+""")
+register("aircraft.list_for_save", """
+    SELECT
+        a.aircraft_id, a.model_code, a.base_level, a.current_airport_ident, a.registration,
+        a.nickname, a.acquired_day, a.purchase_price, a.condition_percent, a.status,
+        a.hours_flown, a.sold_day, a.sale_price, a.save_id, a.base_id,
+        am.model_name
+    FROM aircraft a
+    JOIN aircraft_models am ON a.model_code = am.model_code
+    WHERE a.save_id = %s
+    ORDER BY a.aircraft_id ASC
+""")
+register("aircraft.list_unsold_for_save", """
+    SELECT
+        a.aircraft_id, a.model_code, a.base_level, a.current_airport_ident, a.registration,
+        a.nickname, a.acquired_day, a.purchase_price, a.condition_percent, a.status,
+        a.hours_flown, a.sold_day, a.sale_price, a.save_id, a.base_id,
+        am.model_name
+    FROM aircraft a
+    JOIN aircraft_models am ON a.model_code = am.model_code
+    WHERE a.save_id = %s AND a.sold_day IS NULL
+    ORDER BY a.aircraft_id ASC
+""")
+register("aircraft.with_model_info", """
+    SELECT
+        a.aircraft_id,
+        a.registration,
+        a.model_code,
+        am.model_name,
+        am.category,
+        a.purchase_price  AS purchase_price_aircraft,
+        am.purchase_price AS purchase_price_model,
+        am.eco_fee_multiplier
+    FROM aircraft a
+    JOIN aircraft_models am ON am.model_code = a.model_code
+    WHERE a.save_id = %s
+      AND (a.sold_day IS NULL OR a.sold_day = 0)
+    ORDER BY a.aircraft_id
+""")
+
+FLEET_OVERVIEW_SQL = """
+    SELECT
+        a.aircraft_id,
+        a.model_code,
+        am.model_name,
+        a.registration,
+        a.current_airport_ident,
+        a.purchase_price,
+        a.condition_percent,
+        a.status,
+        a.hours_flown,
+        a.acquired_day,
+        am.eco_fee_multiplier,
+        COALESCE(u.max_level, 0) AS eco_level
+    FROM aircraft a
+    JOIN aircraft_models am ON am.model_code = a.model_code
+    LEFT JOIN (
+        SELECT au.aircraft_id, MAX(au.level) AS max_level
+        FROM aircraft_upgrades au
+        JOIN aircraft a2 ON a2.aircraft_id = au.aircraft_id
+        WHERE a2.save_id = %s
+          AND au.upgrade_code = %s
+        GROUP BY au.aircraft_id
+    ) u ON u.aircraft_id = a.aircraft_id
+    WHERE a.save_id = %s
+      AND a.sold_day IS NULL
+    ORDER BY a.aircraft_id ASC
+"""
+register("fleet.overview", FLEET_OVERVIEW_SQL)
+register("aircraft.repairable", """
+    SELECT a.aircraft_id,
+           a.registration,
+           a.status,
+           a.condition_percent,
+           am.model_name,
+           am.model_code
+    FROM aircraft a
+             JOIN aircraft_models am ON am.model_code = a.model_code
+    WHERE a.save_id = %s
+      AND (a.sold_day IS NULL OR a.sold_day = 0)
+      AND a.condition_percent IS NOT NULL
+      AND a.condition_percent < 100
+    ORDER BY a.aircraft_id
+""")
+register("aircraft.condition_for_update",
+         "SELECT condition_percent, status FROM aircraft WHERE aircraft_id = %s FOR UPDATE")
+register("aircraft.condition_many_for_update", f"""
+    SELECT aircraft_id, condition_percent, status
+    FROM aircraft
+    WHERE aircraft_id IN ({IN_LIST})
+    FOR UPDATE
+""")
+register("aircraft.repair", "UPDATE aircraft SET condition_percent = 100, status = 'IDLE' WHERE aircraft_id = %s")
+register("aircraft.repair_many",
+         f"UPDATE aircraft SET condition_percent = 100, status = 'IDLE' WHERE aircraft_id IN ({IN_LIST})")
+register("aircraft.idle_ready", """
+    SELECT a.aircraft_id,
+           a.registration,
+           a.current_airport_ident,
+           a.model_code,
+           am.model_name,
+           am.base_cargo_kg,
+           am.cruise_speed_kts,
+           am.eco_fee_multiplier
+    FROM aircraft a
+             JOIN aircraft_models am ON am.model_code = a.model_code
+    WHERE a.save_id = %s
+      AND a.status = 'IDLE'
+      AND a.condition_percent >= 100
+    ORDER BY a.aircraft_id
+""")
+register("aircraft.stranded_idle", """
+    SELECT a.aircraft_id, a.current_airport_ident, am.cruise_speed_kts, am.co2_kg_per_km
+    FROM aircraft a JOIN aircraft_models am ON a.model_code = am.model_code
+    WHERE a.save_id = %s AND a.status = 'IDLE'
+      AND a.current_airport_ident NOT IN (SELECT ob.base_ident FROM owned_bases ob WHERE ob.save_id = %s)
+""")
+register("aircraft.fleet_counts", """
+    SELECT COUNT(*)                                                 AS total,
+           SUM(CASE WHEN am.category = 'STARTER' THEN 1 ELSE 0 END) AS starters
+    FROM aircraft a
+             JOIN aircraft_models am ON am.model_code = a.model_code
+    WHERE a.save_id = %s
+      AND (a.sold_day IS NULL OR a.sold_day = 0)
+""")
+register("aircraft.set_busy", "UPDATE aircraft SET status = 'BUSY' WHERE aircraft_id = %s")
+register("aircraft.set_busy_rtb", "UPDATE aircraft SET status = 'BUSY_RTB' WHERE aircraft_id = %s")
+register("aircraft.add_hours", "UPDATE aircraft SET hours_flown = hours_flown + %s WHERE aircraft_id = %s")
+register("aircraft.land", "UPDATE aircraft SET status = 'IDLE', current_airport_ident = %s WHERE aircraft_id = %s")
+register("aircraft.base_eco", """
+    SELECT am.eco_fee_multiplier
+    FROM aircraft a
+    JOIN aircraft_models am ON am.model_code = a.model_code
+    WHERE a.aircraft_id = %s
+""")
+
+# ---------- aircraft_upgrades ----------
+
+register("upgrade.latest_level", """
+    SELECT level
+    FROM aircraft_upgrades
+    WHERE aircraft_id = %s
+      AND upgrade_code = %s
+    ORDER BY aircraft_upgrade_id DESC
+    LIMIT 1
+""")
+register("upgrade.max_levels", f"""
+    SELECT aircraft_id, MAX(level) AS max_level
+    FROM aircraft_upgrades
+    WHERE upgrade_code = %s AND aircraft_id IN ({IN_LIST})
+    GROUP BY aircraft_id
+""")
+register("upgrade.insert", """
+    INSERT INTO aircraft_upgrades
+        (aircraft_id, upgrade_code, level, installed_day)
+    VALUES
+        (%s, %s, %s, %s)
+""")
+register("upgrade.find",
+         "SELECT aircraft_upgrade_id, level FROM aircraft_upgrades WHERE aircraft_id = %s AND upgrade_code = %s")
+register("upgrade.set_level",
+         "UPDATE aircraft_upgrades SET level = %s, installed_day = %s WHERE aircraft_upgrade_id = %s")
+
+# ---------- aircraft_models ----------
+
+register("model.market_catalog", """
+    SELECT model_code, model_name, manufacturer, purchase_price
+    FROM aircraft_models
+    WHERE category != 'STARTER'
+    ORDER BY model_code
+""")
+register("model.flight_params", "SELECT cruise_speed_kts, co2_kg_per_km FROM aircraft_models WHERE model_code = %s")
+register("model.available_for_tier", """
+    WITH max_tier AS (
+        SELECT
+            COALESCE(MAX(
+                             CASE bu.upgrade_code
+                                 WHEN 'SMALL' THEN 1
+                                 WHEN 'MEDIUM' THEN 2
+                                 WHEN 'LARGE' THEN 3
+                                 WHEN 'HUGE' THEN 4
+                                 ELSE 0
+                                 END
+                     ), 0) AS t
+        FROM owned_bases ob
+                 JOIN base_upgrades bu ON bu.base_id = ob.base_id
+        WHERE ob.save_id = %s
+    )
+    SELECT am.model_code, am.manufacturer, am.model_name, am.purchase_price,
+           am.base_cargo_kg, am.range_km, am.cruise_speed_kts, am.category
+    FROM aircraft_models am
+             CROSS JOIN max_tier mt
+    WHERE am.category <> 'STARTER'
+      AND CASE am.category
+              WHEN 'SMALL' THEN 1
+              WHEN 'MEDIUM' THEN 2
+              WHEN 'LARGE' THEN 3
+              WHEN 'HUGE' THEN 4
+              ELSE 0
+              END <= mt.t
+    ORDER BY am.purchase_price ASC, am.model_code ASC
+""")
+
+# ---------- airport ----------
+
+register("airport.coords", "SELECT latitude_deg, longitude_deg FROM airport WHERE ident = %s")
+register("airport.destinations", """
+    SELECT ident, name
+    FROM airport
+    WHERE ident <> %s
+      AND type IN ('small_airport', 'medium_airport', 'large_airport')
+      AND latitude_deg IS NOT NULL
+      AND longitude_deg IS NOT NULL
+""")
+
+# ---------- owned_bases / base_upgrades ----------
+
+register("base.list", """
+    SELECT base_id, base_ident, base_name, purchase_cost
+    FROM owned_bases
+    WHERE save_id = %s
+    ORDER BY base_name
+""")
+register("base.primary", """
+    SELECT base_id, base_ident, base_name, acquired_day
+    FROM owned_bases
+    WHERE save_id = %s
+    ORDER BY acquired_day ASC, base_id ASC
+        LIMIT 1
+""")
+register("base.id_by_ident", "SELECT base_id FROM owned_bases WHERE save_id = %s AND base_ident = %s")
+register("base.insert", """
+    INSERT INTO owned_bases
+    (save_id, base_ident, base_name, acquired_day, purchase_cost, created_at, updated_at)
+    VALUES
+        (%s, %s, %s, %s, %s, %s, %s)
+""")
+register("base.upgrade_insert", """
+    INSERT INTO base_upgrades (base_id, upgrade_code, installed_day, upgrade_cost)
+    VALUES (%s, %s, %s, %s)
+""")
+register("base.latest_upgrades", f"""
+    SELECT bu.base_id, bu.upgrade_code
+    FROM base_upgrades bu
+    JOIN (
+        SELECT base_id, MAX(base_upgrade_id) AS maxid
+        FROM base_upgrades
+        WHERE base_id IN ({IN_LIST})
+        GROUP BY base_id
+    ) x ON x.base_id = bu.base_id AND x.maxid = bu.base_upgrade_id
+""")
+
+# ---------- contracts / flights ----------
+
+register("contract.active", """
+    SELECT c.contractId,
+           c.payload_kg,
+           c.reward,
+           c.penalty,
+           c.created_day,
+           c.deadline_day,
+           c.accepted_day,
+           c.status,
+           c.ident  AS dest_ident,
+           a.registration,
+           a.current_airport_ident,
+           f.arrival_day,
+           f.status AS flight_status
+    FROM contracts c
+             LEFT JOIN aircraft a ON a.aircraft_id = c.aircraft_id
+             LEFT JOIN flights f ON f.contract_id = c.contractId
+    WHERE c.save_id = %s
+      AND c.status IN ('ACCEPTED', 'IN_PROGRESS')
+    ORDER BY c.deadline_day ASC, c.contractId ASC
+""")
+register("contract.insert", """
+    INSERT INTO contracts (payload_kg, reward, penalty, priority,
+                           created_day, deadline_day, accepted_day, completed_day,
+                           status, lost_packages, damaged_packages,
+                           save_id, aircraft_id, ident, event_id)
+    VALUES (%s, %s, %s, %s,
+            %s, %s, %s, %s,
+            %s, %s, %s,
+            %s, %s, %s, %s)
+""")
+register("contract.complete", "UPDATE contracts SET status = %s, completed_day = %s WHERE contractId = %s")
+register("flight.insert", """
+    INSERT INTO flights (created_day, dep_day, arrival_day, status, distance_km, schedule_delay_min,
+                         emission_kg_co2, eco_fee, dep_ident, arr_ident, aircraft_id, save_id,
+                         contract_id)
+    VALUES (%s, %s, %s, %s, %s, %s,
+            %s, %s, %s, %s, %s, %s, %s)
+""")
+register("flight.insert_rtb", """
+    INSERT INTO flights (created_day, dep_day, arrival_day, status, distance_km, emission_kg_co2,
+                         dep_ident, arr_ident, aircraft_id, save_id, contract_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NULL)
+""")
+register("flight.arrivals_due", """
+    SELECT f.flight_id, f.contract_id, f.aircraft_id,
+        f.arr_ident, f.arrival_day, f.dep_day, f.status AS flight_status,
+        c.deadline_day, c.reward, c.penalty,
+        am.cruise_speed_kts, am.co2_kg_per_km
+    FROM flights f
+    -- LEFT JOIN, jotta paluulennot (ei sopimusta) tulevat mukaan
+    LEFT JOIN contracts c ON c.contractId = f.contract_id
+    -- Mallin nopeus ja päästöt saapumisen yhteydessä luotavaa paluulentoa varten
+    JOIN aircraft a ON a.aircraft_id = f.aircraft_id
+    JOIN aircraft_models am ON am.model_code = a.model_code
+    WHERE f.save_id = %s
+    -- KÄSITTELE SEKÄ ENROUTE ETTÄ ENROUTE_RTB TILAT --
+    AND f.status IN ('ENROUTE', 'ENROUTE_RTB')
+    AND f.arrival_day <= %s
+""")
+register("flight.set_status", "UPDATE flights SET status = %s WHERE flight_id = %s")
+register("flight.count_enroute", "SELECT COUNT(*) FROM flights WHERE save_id = %s AND status = 'ENROUTE'")
+register("dashboard.traffic", """
+    SELECT COUNT(*) AS enroute, MIN(arrival_day) AS next_arrival
+    FROM flights
+    WHERE save_id = %s
+      AND status IN ('ENROUTE', 'ENROUTE_RTB')
+""")
+
+# ---------- market_purchases ----------
+
+register("market.purchased_in_range", """
+    SELECT listing_id
+    FROM market_purchases
+    WHERE save_id = %s
+      AND listing_id >= %s
+      AND listing_id < %s
+""")
+register("market.record_purchase",
+         "INSERT IGNORE INTO market_purchases (save_id, listing_id, purchased_day) VALUES (%s, %s, %s)")
+
+# ---------- hydrate (GameSession.load: kaikki yhdellä kierroksella) ----------
+
+register("hydrate.bases", """
+    SELECT ob.base_id,
+           ob.base_ident,
+           ob.base_name,
+           ob.acquired_day,
+           ob.purchase_cost,
+           COALESCE(bu.upgrade_code, 'SMALL') AS level
+    FROM owned_bases ob
+    LEFT JOIN (
+        SELECT base_id, MAX(base_upgrade_id) AS maxid
+        FROM base_upgrades
+        WHERE base_id IN (SELECT base_id FROM owned_bases WHERE save_id = %s)
+        GROUP BY base_id
+    ) x ON x.base_id = ob.base_id
+    LEFT JOIN base_upgrades bu ON bu.base_upgrade_id = x.maxid
+    WHERE ob.save_id = %s
+    ORDER BY ob.acquired_day ASC, ob.base_id ASC
+""")
+# Kohtalokalenteri: pelipäivä -> random_events-rivi (sarakkeet FlightEventin järjestyksessä)
+register("hydrate.fate", """
+    SELECT pf.day - gs.rng_seed * 1000 AS game_day,
+           re.event_id,
+           re.event_name,
+           re.description,
+           re.chance_max,
+           re.package_multiplier,
+           re.plane_damage,
+           re.days,
+           re.duration,
+           re.sound_file
+    FROM game_saves gs
+    JOIN player_fate pf ON pf.day BETWEEN gs.rng_seed * 1000 + 1 AND gs.rng_seed * 1000 + 666
+    JOIN random_events re ON re.event_name = pf.event_name
+    WHERE gs.save_id = %s
+    ORDER BY pf.day ASC, re.event_id ASC
+""")
+
+# ---------- snapshots (tallennuksen rivit tauluittain) ----------
+
+register("snapshot.game_saves", "SELECT * FROM game_saves WHERE save_id = %s")
+register("snapshot.owned_bases", "SELECT * FROM owned_bases WHERE save_id = %s ORDER BY base_id")
+register("snapshot.base_upgrades", """
+    SELECT bu.*
+    FROM base_upgrades bu
+    JOIN owned_bases ob ON ob.base_id = bu.base_id
+    WHERE ob.save_id = %s
+    ORDER BY bu.base_upgrade_id
+""")
+register("snapshot.aircraft", "SELECT * FROM aircraft WHERE save_id = %s ORDER BY aircraft_id")
+register("snapshot.aircraft_upgrades", """
+    SELECT au.*
+    FROM aircraft_upgrades au
+    JOIN aircraft a ON a.aircraft_id = au.aircraft_id
+    WHERE a.save_id = %s
+    ORDER BY au.aircraft_upgrade_id
+""")
+register("snapshot.contracts", "SELECT * FROM contracts WHERE save_id = %s ORDER BY contractId")
+register("snapshot.flights", "SELECT * FROM flights WHERE save_id = %s ORDER BY flight_id")
+register("snapshot.market_purchases",
+         "SELECT * FROM market_purchases WHERE save_id = %s ORDER BY listing_id")
+register("snapshot.save_stats", "SELECT * FROM save_stats WHERE save_id = %s")
+register("snapshot.save_daily_metrics", "SELECT * FROM save_daily_metrics WHERE save_id = %s ORDER BY chunk_id")
+# player_fate on siemenkohtainen: päivät seed * 1000 + 1 .. seed * 1000 + 666
+register("snapshot.player_fate", "SELECT * FROM player_fate WHERE day BETWEEN %s AND %s ORDER BY day")
+# Snapshotin tuonti: uudet id:t alkavat kohdekannan suurimman id:n jälkeen
+register("snapshot.max_id.game_saves", "SELECT COALESCE(MAX(save_id), 0) FROM game_saves")
+register("snapshot.max_id.owned_bases", "SELECT COALESCE(MAX(base_id), 0) FROM owned_bases")
+register("snapshot.max_id.base_upgrades", "SELECT COALESCE(MAX(base_upgrade_id), 0) FROM base_upgrades")
+register("snapshot.max_id.aircraft", "SELECT COALESCE(MAX(aircraft_id), 0) FROM aircraft")
+register("snapshot.max_id.aircraft_upgrades", "SELECT COALESCE(MAX(aircraft_upgrade_id), 0) FROM aircraft_upgrades")
+register("snapshot.max_id.contracts", "SELECT COALESCE(MAX(contractId), 0) FROM contracts")
+register("snapshot.max_id.flights", "SELECT COALESCE(MAX(flight_id), 0) FROM flights")
+register("snapshot.max_id.save_daily_metrics", "SELECT COALESCE(MAX(chunk_id), 0) FROM save_daily_metrics")
+register("snapshot.fate_exists", "SELECT 1 FROM player_fate WHERE day BETWEEN %s AND %s LIMIT 1")
+# Lentokenttätaulu kopioidaan replayn muistikantaan (RTB-lennot tarvitsevat koordinaatit)
+register("snapshot.airports", """
+    SELECT ident, type, name, latitude_deg, longitude_deg, iso_country
+    FROM airport
+""")
+
+# ---------- save_daily_metrics (pakatut päiväsarjat) ----------
+
+register("metrics.insert_chunk", """
+    INSERT INTO save_daily_metrics (save_id, first_day, days, data, created_at)
+    VALUES (%s, %s, %s, %s, %s)
+""")
+register("metrics.chunks", "SELECT data FROM save_daily_metrics WHERE save_id = %s ORDER BY chunk_id")
+
+# ---------- analytics (sarakemuotoiset koosteet, luetaan stream_rows-erinä) ----------
+
+register("analytics.flights", """
+    SELECT aircraft_id, dep_day, COALESCE(arrival_day, dep_day), COALESCE(distance_km, 0),
+           COALESCE(emission_kg_co2, 0), COALESCE(contract_id, 0)
+    FROM flights
+    WHERE save_id = %s
+""")
+register("analytics.contracts", """
+    SELECT contractId, COALESCE(aircraft_id, 0), COALESCE(reward, 0), COALESCE(penalty, 0),
+           COALESCE(deadline_day, 0), COALESCE(completed_day, 0),
+           CASE status WHEN 'COMPLETED' THEN 1 ELSE 2 END
+    FROM contracts
+    WHERE save_id = %s AND status IN ('COMPLETED', 'COMPLETED_LATE')
+""")
+register("analytics.aircraft", """
+    SELECT a.aircraft_id, a.registration, a.model_code, m.model_name, m.eco_class,
+           a.acquired_day, a.sold_day
+    FROM aircraft a
+    LEFT JOIN aircraft_models m ON m.model_code = a.model_code
+    WHERE a.save_id = %s
+    ORDER BY a.aircraft_id
+""")
+
+# ---------- action_journal / save_snapshots ----------
+
+register("journal.last_seq", "SELECT COALESCE(MAX(seq), 0) FROM action_journal WHERE save_id = %s")
+register("journal.insert", """
+    INSERT INTO action_journal (save_id, seq, day, action, args, rng_skip, rng, cash_after, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+""")
+register("journal.for_save", """
+    SELECT seq, day, action, args, rng_skip, rng, cash_after
+    FROM action_journal
+    WHERE save_id = %s AND seq > %s
+    ORDER BY seq
+""")
+register("journal.snapshot_insert", """
+    INSERT INTO save_snapshots (save_id, seq, day, state, created_at)
+    VALUES (%s, %s, %s, %s, %s)
+""")
+register("journal.snapshot_last_day", "SELECT MAX(day) FROM save_snapshots WHERE save_id = %s")
+register("journal.snapshot_at_or_before", """
+    SELECT seq, day, state
+    FROM save_snapshots
+    WHERE save_id = %s AND day <= %s
+    ORDER BY seq DESC
+    LIMIT 1
+""")
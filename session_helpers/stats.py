@@ -0,0 +1,142 @@
+"""
+Incrementally maintained per-save statistics (the save_stats table).
+
+Every transaction that changes a counted quantity (arrival settlement, task start, return
+flights, purchases, repairs, upgrades, bills, clubhouse bets) adds its deltas to the save's
+single save_stats row with `add_stats` inside that same transaction, so a stats read is one
+primary-key lookup however long the save's history is. `rebuild_save_stats` recomputes the row
+from the game tables for verification; spend that leaves no rows behind (repairs, bills,
+clubhouse) exists only in the ledger and is carried over unchanged.
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from upgrade_config import UPGRADE_CODE
+from utils import get_connection
+
+from .aircraft import calc_aircraft_upgrade_cost
+from .common import _to_dec
+from .statements import STATS_COLUMNS, prepared_cursor
+
+# Sarakkeet, joita ei voi johtaa muista tauluista (kirjataan vain tapahtumahetkellä)
+LEDGER_ONLY = ("spend_repairs", "spend_bills", "clubhouse_net")
+_INT_COLUMNS = frozenset((
+    "aircraft_count", "total_hours", "contract_flights", "rtb_flights", "flights_arrived",
+    "contracts_on_time", "contracts_late",
+))
+
+
+def _normalize(row: Optional[dict]) -> Optional[dict]:
+    if row is None:
+        return None
+    return {c: int(row.get(c) or 0) if c in _INT_COLUMNS else _to_dec(row.get(c) or 0).quantize(Decimal("0.01"))
+            for c in STATS_COLUMNS}
+
+
+def merge_stats(acc: Dict[str, object], **deltas) -> Dict[str, object]:
+    """Accumulate deltas into `acc` (one add_stats call per transaction instead of one per row)."""
+    for column, value in deltas.items():
+        if column not in STATS_COLUMNS:
+            raise KeyError(f"Tuntematon tilastosarake: {column}")
+        acc[column] = acc.get(column, 0) + value
+    return acc
+
+
+def stats_params(save_id: int, deltas: Dict[str, object]) -> tuple:
+    """Parameters of stats.add (every column's delta in STATS_COLUMNS order, then save_id)."""
+    unknown = set(deltas) - set(STATS_COLUMNS)
+    if unknown:
+        raise KeyError(f"Tuntematon tilastosarake: {', '.join(sorted(unknown))}")
+    return tuple(deltas.get(c, 0) for c in STATS_COLUMNS) + (save_id,)
+
+
+def add_stats(kursori, save_id: int, **deltas) -> None:
+    """Add deltas to the save's stats row on the caller's cursor (i.e. in its transaction)."""
+    if deltas:
+        kursori.execute("stats.add", stats_params(save_id, deltas))
+
+
+def arrival_stats(outcome: dict) -> dict:
+    """Stats deltas of one settled arrival (see rules.settle_arrival)."""
+    deltas = {"total_hours": int(outcome["hours_to_add"]), "flights_arrived": 1}
+    if outcome["contract_status"] == "COMPLETED":
+        deltas["contracts_on_time"] = 1
+    elif outcome["contract_status"] == "COMPLETED_LATE":
+        deltas["contracts_late"] = 1
+    if outcome["earned"]:
+        deltas["revenue"] = outcome["earned"]
+    return deltas
+
+
+def init_save_stats(kursori, save_id: int) -> None:
+    """Create the all-zero stats row of a new save (caller's transaction)."""
+    kursori.execute("stats.init", (save_id,))
+
+
+def load_save_stats(save_id: int) -> Optional[dict]:
+    """The save's stats row (one point lookup), or None if it has not been built yet."""
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("stats.get", (save_id,))
+        return _normalize(kursori.fetchone())
+
+
+def compute_save_stats(save_id: int) -> Optional[dict]:
+    """
+    Recompute the stats from the game tables (full scans of the save's rows). Ledger-only
+    columns come back as None. None if the save does not exist.
+    """
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys, dictionary=True)
+        kursori.execute("stats.recompute", (save_id,))
+        row = kursori.fetchone()
+        if row is None:
+            return None
+        kursori.execute("stats.recompute_aircraft_upgrades", (save_id, UPGRADE_CODE))
+        upgrades = kursori.fetchall() or []
+
+    aircraft_upgrade_spend = sum(
+        (calc_aircraft_upgrade_cost(u, int(u["level"])) for u in upgrades), Decimal("0.00")
+    )
+    stats = _normalize(row)
+    stats["spend_upgrades"] += aircraft_upgrade_spend
+    for column in LEDGER_ONLY:
+        stats[column] = None
+    return stats
+
+
+def rebuild_save_stats(save_id: int) -> Optional[dict]:
+    """
+    Rebuild the save's stats row from scratch and return {"stats", "previous", "diff"}:
+    `diff` maps each recomputed column whose stored value differed to (stored, recomputed).
+    None if the save does not exist.
+    """
+    stats = compute_save_stats(save_id)
+    if stats is None:
+        return None
+    previous = load_save_stats(save_id)
+    for column in LEDGER_ONLY:
+        stats[column] = previous[column] if previous else Decimal("0.00")
+
+    diff = {}
+    if previous is not None:
+        diff = {c: (previous[c], stats[c]) for c in STATS_COLUMNS
+                if c not in LEDGER_ONLY and previous[c] != stats[c]}
+
+    with get_connection() as yhteys:
+        kursori = prepared_cursor(yhteys)
+        try:
+            yhteys.start_transaction()
+            kursori.execute("stats.delete", (save_id,))
+            kursori.execute("stats.insert", (save_id,) + tuple(stats[c] for c in STATS_COLUMNS))
+            yhteys.commit()
+        except Exception:
+            yhteys.rollback()
+            raise
+    return {"stats": stats, "previous": previous, "diff": diff}
+
+
+def format_stats_diff(diff: Dict[str, tuple]) -> List[str]:
+    """Human-readable lines of a rebuild diff."""
+    return [f"{column}: {stored} → {recomputed}" for column, (stored, recomputed) in diff.items()]
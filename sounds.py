@@ -1,6 +1,5 @@
 
 #linkit ääniin
-from playsound3 import playsound
 #event_id=[
 #1 = https://www.myinstants.com/en/instant/volcano-eruption-24577/?utm_source=copy&utm_medium=share # volcano
 #2 = https://www.myinstants.com/en/instant/x-files-theme-20294/?utm_source=copy&utm_medium=share # aliens
@@ -21,5 +20,9 @@ from playsound3 import playsound
 
 #sound_file = ("https://www.myinstants.com/en/instant/victory-ff/?utm_source=copy&utm_medium=share")
 #sound_file = ("sfx/ff1_victory_fanfare_1.mp3")
-sound = playsound("sfx/ff1_victory_fanfare_1.mp3")
-sound.stop(3)
\ No newline at end of file
+if __name__ == "__main__":
+    # Kokeilu: soitetaan voittofanfaari (ei importissa, jotta moduuli on sivuvaikutukseton)
+    from playsound3 import playsound
+
+    sound = playsound("sfx/ff1_victory_fanfare_1.mp3")
+    sound.stop(3)
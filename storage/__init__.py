@@ -0,0 +1,26 @@
+"""Storage backends: MySQL (default) and an embedded SQLite backend for single-player and test runs."""
+
+
+class StorageBackend:
+    """Minimal backend interface: hand out DB-API connections that behave like mysql.connector ones."""
+
+    name = "abstract"
+
+    def connect(self):
+        """Return a connection supporting cursor(dictionary=...), start_transaction, commit, rollback, close."""
+        raise NotImplementedError
+
+
+def get_backend(name: str, **options) -> StorageBackend:
+    """Instantiate the backend called `name` ('mysql' or 'sqlite') with backend-specific options."""
+    key = (name or "mysql").strip().lower()
+    if key == "mysql":
+        from .mysql_backend import MySQLBackend
+        return MySQLBackend(**options)
+    if key == "sqlite":
+        from .sqlite_backend import SQLiteBackend
+        return SQLiteBackend(**options)
+    raise ValueError(f"Tuntematon tallennustausta: {name!r} (sallitut: mysql, sqlite)")
+
+
+__all__ = ["StorageBackend", "get_backend"]
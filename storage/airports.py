@@ -0,0 +1,541 @@
+"""
+Airport catalog: bulk import from an OurAirports-style CSV and an on-disk columnar cache.
+
+`import_airports` streams the CSV (only the columns the game uses: ident, type, name,
+latitude_deg, longitude_deg, iso_country) into the airport table in chunks of
+IMPORT_CHUNK_ROWS with executemany, then rewrites the cache from the table. `load_catalog`
+reads the cache (one uncompressed .npz, a few arrays per column) when its stored fingerprint
+of the airport table (row count, first/last ident, coordinate sums: one aggregate query)
+still matches, and otherwise runs the full SELECT and rewrites it. Rows added or removed
+by other means (an SQL dump, a manual INSERT) are therefore picked up at the next process
+start without a manual refresh. An empty catalog is never written to disk.
+For multi-process runs `SharedAirportCatalog.publish` writes the same columns into one
+read-only memory-mapped file that workers attach to without copying.
+
+NumPy is needed for the catalog and its cache; the importer itself only needs the csv module.
+
+Usage: python -m storage.airports import airports.csv | refresh | info
+"""
+
+import csv
+import hashlib
+import os
+import random
+import struct
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_REPO_ROOT = os.path.dirname(_HERE)
+
+CATALOG_COLUMNS = ("ident", "type", "name", "latitude_deg", "longitude_deg", "iso_country")
+DESTINATION_TYPES = ("small_airport", "medium_airport", "large_airport")
+IMPORT_CHUNK_ROWS = 5000
+CACHE_VERSION = 3
+CACHE_DIR = os.environ.get("AFC666_AIRPORT_CACHE_DIR", os.path.join(_REPO_ROOT, ".cache"))
+
+AIRPORT_DDL = """
+CREATE TABLE IF NOT EXISTS airport (
+  ident VARCHAR(40) PRIMARY KEY,
+  type VARCHAR(40),
+  name VARCHAR(200),
+  latitude_deg DOUBLE,
+  longitude_deg DOUBLE,
+  iso_country VARCHAR(40)
+)
+"""
+_INSERT_SQL = (
+    "INSERT IGNORE INTO airport (ident, type, name, latitude_deg, longitude_deg, iso_country) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+_SELECT_SQL = (
+    "SELECT ident, type, name, latitude_deg, longitude_deg, iso_country FROM airport ORDER BY ident"
+)
+_FINGERPRINT_SQL = (
+    "SELECT COUNT(*), MIN(ident), MAX(ident), SUM(latitude_deg), SUM(longitude_deg) FROM airport"
+)
+
+
+# ---------- CSV ----------
+
+def _float_or_none(value: Optional[str]) -> Optional[float]:
+    value = (value or "").strip()
+    return float(value) if value else None
+
+
+def iter_csv_rows(path: str) -> Iterator[tuple]:
+    """Yield (ident, type, name, lat, lon, iso_country) tuples from an OurAirports-style CSV."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        missing = [c for c in CATALOG_COLUMNS if c not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"{path}: puuttuvat sarakkeet {', '.join(missing)}")
+        for r in reader:
+            ident = (r["ident"] or "").strip()
+            if not ident:
+                continue
+            yield (
+                ident,
+                (r["type"] or "").strip() or None,
+                (r["name"] or "").strip() or None,
+                _float_or_none(r["latitude_deg"]),
+                _float_or_none(r["longitude_deg"]),
+                (r["iso_country"] or "").strip() or None,
+            )
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk: List[tuple] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_airports(backend, path: str, chunk_rows: int = IMPORT_CHUNK_ROWS, write_cache: bool = True) -> dict:
+    """
+    Stream `path` into the airport table, one executemany + commit per chunk. Idents that
+    already exist are kept as they are (saves reference them). Returns counts and timings.
+    """
+    t0 = time.perf_counter()
+    read = inserted = 0
+    yhteys = backend.connect()
+    try:
+        kursori = yhteys.cursor()
+        for chunk in _chunks(iter_csv_rows(path), chunk_rows):
+            yhteys.start_transaction()
+            kursori.executemany(_INSERT_SQL, chunk)
+            yhteys.commit()
+            read += len(chunk)
+            inserted += max(0, kursori.rowcount or 0)
+    finally:
+        yhteys.close()
+    t_import = time.perf_counter() - t0
+
+    report = {"read": read, "inserted": inserted, "import_s": round(t_import, 3)}
+    if write_cache:
+        catalog = load_catalog(backend, refresh=True)
+        report["catalog"] = len(catalog)
+        report["cache"] = catalog_cache_path(backend)
+    return report
+
+
+# ---------- Katalogi ----------
+
+# Sarakkeet (kaikki NumPy-taulukoita; sama joukko tiedostossa ja jaetussa muistissa)
+_ARRAY_COLUMNS = (
+    "ident",              # S<n>, lajiteltu
+    "type_code",          # uint8 -> type_names
+    "type_names",         # S<n>
+    "latitude_deg",       # float64, NaN = puuttuu
+    "longitude_deg",      # float64
+    "iso_country",        # S<n>
+    "name_blob",          # uint8, UTF-8
+    "name_offsets",       # int64, tavusiirtymät name_blobiin (n + 1)
+    "destination_index",  # int64, tehtäväkohteiksi kelpaavien rivien indeksit
+)
+EARTH_RADIUS_KM = 6371.0
+
+
+class AirportCatalog:
+    """
+    Column arrays of the airport table sorted by ident. Every lookup works on the arrays
+    directly (searchsorted, slicing), so a catalog backed by shared memory needs no
+    per-process copies.
+    """
+
+    def __init__(self, columns: dict, owner=None):
+        self.columns = columns
+        self.type_names = [t.decode("utf-8") for t in columns["type_names"].tolist()]
+        self._owner = owner  # pitää jaetun muistin lohkon hengissä niin kauan kuin näkymiä on
+
+    def __len__(self) -> int:
+        return len(self.columns["ident"])
+
+    @property
+    def latitude(self):
+        return self.columns["latitude_deg"]
+
+    @property
+    def longitude(self):
+        return self.columns["longitude_deg"]
+
+    @property
+    def destination_index(self):
+        return self.columns["destination_index"]
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple]) -> "AirportCatalog":
+        """Build from (ident, type, name, lat, lon, iso_country) rows."""
+        import numpy as np
+
+        rows = sorted(rows, key=lambda r: r[0].encode("utf-8"))
+        type_names = sorted({r[1] or "" for r in rows})
+        type_index = {t: i for i, t in enumerate(type_names)}
+        names = [(r[2] or "").encode("utf-8") for r in rows]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(n) for n in names], out=offsets[1:])
+        lat = np.array([r[3] if r[3] is not None else np.nan for r in rows], dtype=np.float64)
+        lon = np.array([r[4] if r[4] is not None else np.nan for r in rows], dtype=np.float64)
+        type_code = np.array([type_index[r[1] or ""] for r in rows], dtype=np.uint8)
+        wanted = [i for i, t in enumerate(type_names) if t in DESTINATION_TYPES]
+        dest = np.isin(type_code, wanted) & ~np.isnan(lat) & ~np.isnan(lon)
+        return cls({
+            "ident": np.array([r[0].encode("utf-8") for r in rows], dtype=bytes),
+            "type_code": type_code,
+            "type_names": np.array([t.encode("utf-8") for t in type_names], dtype=bytes),
+            "latitude_deg": lat,
+            "longitude_deg": lon,
+            "iso_country": np.array([(r[5] or "").encode("utf-8") for r in rows], dtype=bytes),
+            "name_blob": np.frombuffer(b"".join(names), dtype=np.uint8),
+            "name_offsets": offsets,
+            "destination_index": np.flatnonzero(dest).astype(np.int64),
+        })
+
+    @classmethod
+    def from_connection(cls, yhteys) -> "AirportCatalog":
+        kursori = yhteys.cursor()
+        kursori.execute(_SELECT_SQL)
+        rows = [
+            (r[0], r[1], r[2],
+             float(r[3]) if r[3] is not None else None,
+             float(r[4]) if r[4] is not None else None,
+             r[5])
+            for r in kursori.fetchall() or []
+        ]
+        return cls.from_rows(rows)
+
+    # --- Tiedosto ---
+
+    def save(self, path: str, fingerprint: str = "") -> None:
+        """Write the uncompressed .npz atomically (temp file + rename), tagged with `fingerprint`."""
+        import numpy as np
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, version=np.array([CACHE_VERSION], dtype=np.int32),
+                     fingerprint=np.array([fingerprint.encode("utf-8")], dtype=bytes), **self.columns)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[str] = None) -> "AirportCatalog":
+        """Read a cache file; with `fingerprint`, a file written for other table contents raises ValueError."""
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"][0]) != CACHE_VERSION:
+                raise ValueError(f"{path}: väärä välimuistiversio {int(data['version'][0])}")
+            if fingerprint is not None and data["fingerprint"][0].decode("utf-8") != fingerprint:
+                raise ValueError(f"{path}: airport-taulu on muuttunut välimuistin kirjoittamisen jälkeen")
+            return cls({name: data[name] for name in _ARRAY_COLUMNS})
+
+    # --- Haut ---
+
+    def index_of(self, ident: str) -> Optional[int]:
+        idents = self.columns["ident"]
+        key = ident.encode("utf-8")
+        i = int(idents.searchsorted(key))
+        return i if i < len(idents) and idents[i] == key else None
+
+    def ident_at(self, i: int) -> str:
+        return self.columns["ident"][i].decode("utf-8")
+
+    def name_at(self, i: int) -> Optional[str]:
+        o = self.columns["name_offsets"]
+        return self.columns["name_blob"][o[i]:o[i + 1]].tobytes().decode("utf-8") or None
+
+    def coords(self, ident: str) -> Optional[Tuple[float, float]]:
+        """(lat, lon) as floats, or None if the airport is unknown or has no coordinates."""
+        i = self.index_of(ident)
+        if i is None:
+            return None
+        lat, lon = float(self.latitude[i]), float(self.longitude[i])
+        if lat != lat or lon != lon:
+            return None
+        return lat, lon
+
+    def _destination_slots(self, exclude_ident: str) -> Tuple[int, Optional[int]]:
+        """(candidate count, position of exclude_ident in destination_index or None)."""
+        dest = self.destination_index
+        i = self.index_of(exclude_ident)
+        pos = None
+        if i is not None:
+            p = int(dest.searchsorted(i))
+            if p < len(dest) and dest[p] == i:
+                pos = p
+        return len(dest) - (pos is not None), pos
+
+    def sample_destinations(self, exclude_ident: str, n: int, rng=random) -> List[Tuple[str, str]]:
+        """
+        (ident, name) of `n` random destination airports other than `exclude_ident`, or all of
+        them if there are at most `n`. Draws exactly like rng.sample(rows, n) over the ident-
+        ordered airport.destinations rows, without materialising those rows.
+        """
+        count, pos = self._destination_slots(exclude_ident)
+        picks = range(count) if count <= n else rng.sample(range(count), n)
+        dest = self.destination_index
+        out = []
+        for k in picks:
+            i = int(dest[k + 1 if pos is not None and k >= pos else k])
+            out.append((self.ident_at(i), self.name_at(i)))
+        return out
+
+    def destinations(self, exclude_ident: str) -> List[Tuple[str, str]]:
+        """(ident, name) of every destination-type airport with coordinates except `exclude_ident`."""
+        count, _ = self._destination_slots(exclude_ident)
+        return self.sample_destinations(exclude_ident, count)
+
+    # --- Etäisyydet ---
+
+    def distances_km(self, lat: float, lon: float, index=None):
+        """
+        Vectorised haversine from (lat, lon) to every airport (or the rows in `index`),
+        computed straight from the column arrays. NaN where coordinates are missing.
+        """
+        import numpy as np
+
+        lat2, lon2 = self.latitude, self.longitude
+        if index is not None:
+            lat2, lon2 = lat2[index], lon2[index]
+        p1, p2 = np.radians(lat), np.radians(lat2)
+        dphi = p2 - p1
+        dlmb = np.radians(lon2 - lon)
+        a = np.sin(dphi / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlmb / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def nearest(self, lat: float, lon: float, k: int = 1, index=None) -> List[Tuple[str, float]]:
+        """The `k` nearest airports (from `index`, default destination_index) as (ident, km)."""
+        import numpy as np
+
+        idx = self.destination_index if index is None else np.asarray(index)
+        if len(idx) == 0:
+            return []
+        dist = self.distances_km(lat, lon, idx)
+        k = min(int(k), len(idx))
+        best = np.argpartition(dist, k - 1)[:k]
+        best = best[np.argsort(dist[best])]
+        return [(self.ident_at(int(idx[b])), float(dist[b])) for b in best]
+
+
+# ---------- Jaettu muisti (moniprosessiajot) ----------
+
+_SHM_MAGIC = b"AFC666A\0"
+_SHM_HEADER = struct.Struct("<8sII")  # magic, versio, sisällysluettelon (JSON) pituus
+_SHM_ALIGN = 64
+SHM_DIR = "/dev/shm"
+
+
+def _align(n: int) -> int:
+    return -(-n // _SHM_ALIGN) * _SHM_ALIGN
+
+
+class SharedAirportCatalog:
+    """
+    The catalog published as one read-only memory-mapped file: a small header, a JSON table of
+    contents and the column arrays (64-byte aligned). The file lives in /dev/shm when available
+    (RAM-backed), otherwise in the temp directory. Worker processes call
+    attach_shared_catalog(path) and get NumPy views straight into the mapping, so any number of
+    workers share a single copy of the pages. The mapping is PROT_READ, so no worker can modify
+    it, and unlike multiprocessing.shared_memory no resource tracker can unlink it behind the
+    publisher's back.
+    """
+
+    def __init__(self, path: str, mapping, catalog: AirportCatalog, owner: bool):
+        self.path = path
+        self.mapping = mapping
+        self.catalog = catalog
+        self.owner = owner
+
+    @property
+    def name(self) -> str:
+        return self.path
+
+    @classmethod
+    def publish(cls, catalog: AirportCatalog, path: Optional[str] = None) -> "SharedAirportCatalog":
+        """Write `catalog` to a new mapping file and map it (the caller owns it and must unlink it)."""
+        import json
+        import tempfile
+
+        toc = {}
+        offset = 0
+        for col in _ARRAY_COLUMNS:
+            arr = catalog.columns[col]
+            toc[col] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+            offset += _align(arr.nbytes)
+        toc_bytes = json.dumps(toc, separators=(",", ":")).encode("ascii")
+        data_start = _align(_SHM_HEADER.size + len(toc_bytes))
+
+        if path is None:
+            directory = SHM_DIR if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK) else None
+            fd, path = tempfile.mkstemp(prefix="afc666-airports-", suffix=".bin", dir=directory)
+        else:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(_SHM_HEADER.pack(_SHM_MAGIC, CACHE_VERSION, len(toc_bytes)) + toc_bytes)
+            for col in _ARRAY_COLUMNS:
+                arr = catalog.columns[col]
+                fh.seek(data_start + toc[col]["offset"])
+                fh.write(arr.tobytes())
+            fh.truncate(max(1, data_start + offset))
+        shared = cls.attach(path)
+        shared.owner = True
+        return shared
+
+    @classmethod
+    def attach(cls, path: str) -> "SharedAirportCatalog":
+        """Map an existing catalog file read-only; nothing is copied."""
+        import json
+        import mmap
+
+        with open(path, "rb") as fh:
+            mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, toc_len = _SHM_HEADER.unpack_from(mapping, 0)
+        if magic != _SHM_MAGIC or version != CACHE_VERSION:
+            mapping.close()
+            raise ValueError(f"{path}: ei kenttäluettelon muistikuvatiedosto (versio {version})")
+        toc = json.loads(mapping[_SHM_HEADER.size:_SHM_HEADER.size + toc_len])
+        views = _mapped_views(mapping, toc, _align(_SHM_HEADER.size + toc_len))
+        return cls(path, mapping, AirportCatalog(views, owner=mapping), owner=False)
+
+    def close(self) -> None:
+        """Drop this handle; the mapping is released once no catalog views refer to it."""
+        self.catalog = None
+        self.mapping = None
+
+    def unlink(self) -> None:
+        """Owner only: remove the file (mapped workers keep their pages until they exit)."""
+        if self.owner and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> "SharedAirportCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        self.unlink()
+
+
+def _mapped_views(mapping, toc: dict, data_start: int) -> dict:
+    import numpy as np
+
+    views = {}
+    for col, spec in toc.items():
+        dtype = np.dtype(spec["dtype"])
+        count = 1
+        for dim in spec["shape"]:
+            count *= int(dim)
+        arr = np.frombuffer(mapping, dtype=dtype, count=count, offset=data_start + spec["offset"])
+        views[col] = arr.reshape(spec["shape"])
+    return views
+
+
+def attach_shared_catalog(path: str) -> AirportCatalog:
+    """Worker-side shortcut: the AirportCatalog view of the published file `path`."""
+    return SharedAirportCatalog.attach(path).catalog
+
+
+# ---------- Välimuistin sijainti ja lataus ----------
+
+def catalog_cache_path(backend) -> Optional[str]:
+    """
+    Cache file for the backend's database (MySQL host/database or SQLite file path).
+    None for in-memory SQLite, whose airport table is rebuilt in every process anyway.
+    """
+    if getattr(backend, "name", None) == "sqlite":
+        path = getattr(backend, "path", ":memory:")
+        if path == ":memory:":
+            return None
+        source = f"sqlite:{os.path.abspath(path)}"
+    else:
+        config = getattr(backend, "config", {}) or {}
+        source = f"{getattr(backend, 'name', 'db')}:{config.get('host')}:{config.get('port', '')}:{config.get('database')}"
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"airports-{digest}.npz")
+
+
+def drop_catalog_cache(backend) -> None:
+    """Delete the backend's cache file (forces a full reload; table changes are normally caught by the fingerprint)."""
+    path = catalog_cache_path(backend)
+    if path and os.path.isfile(path):
+        os.remove(path)
+
+
+def table_fingerprint(yhteys) -> str:
+    """
+    Cheap summary of the airport table's contents (row count, first/last ident, coordinate
+    sums), stored in the cache file to notice rows written after it.
+    """
+    kursori = yhteys.cursor()
+    kursori.execute(_FINGERPRINT_SQL)
+    count, first, last, lat_sum, lon_sum = kursori.fetchone()
+    # Summat pyöristetään: liukulukujen yhteenlaskujärjestys ei saa tuottaa eroa
+    lat = f"{float(lat_sum):.4f}" if lat_sum is not None else "-"
+    lon = f"{float(lon_sum):.4f}" if lon_sum is not None else "-"
+    return f"{int(count or 0)}|{first or ''}|{last or ''}|{lat}|{lon}"
+
+
+def load_catalog(backend, refresh: bool = False, connect: Optional[Callable[[], object]] = None) -> AirportCatalog:
+    """
+    Load the catalog from the backend's cache file when its fingerprint matches the airport
+    table (read through `connect`, default backend.connect). With refresh=True, or when the
+    file is missing, broken, of another CACHE_VERSION or stale, read the table and rewrite the
+    cache (unless the table is empty).
+    """
+    path = catalog_cache_path(backend)
+    yhteys = (connect or backend.connect)()
+    try:
+        fingerprint = table_fingerprint(yhteys)
+        if path and not refresh and os.path.isfile(path):
+            try:
+                return AirportCatalog.load(path, fingerprint)
+            except (OSError, ValueError, KeyError):
+                pass  # rikkinäinen, vanha tai vanhentunut välimuisti: luetaan kannasta ja kirjoitetaan uusi
+        catalog = AirportCatalog.from_connection(yhteys)
+    finally:
+        yhteys.close()
+    if path and len(catalog):
+        try:
+            catalog.save(path, fingerprint)
+        except OSError:
+            pass  # välimuisti on vain nopeutus
+    return catalog
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lentokenttäluettelon tuonti ja välimuisti.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="tuo OurAirports-tyylinen CSV airport-tauluun")
+    p_import.add_argument("csv_path")
+    p_import.add_argument("--chunk", type=int, default=IMPORT_CHUNK_ROWS, help="rivejä per executemany")
+    sub.add_parser("refresh", help="kirjoita välimuisti uudelleen airport-taulusta")
+    sub.add_parser("info", help="näytä välimuistin tiedot ja latausaika")
+    args = parser.parse_args(argv)
+
+    import utils
+
+    backend = utils.get_backend()
+    if args.command == "import":
+        report = import_airports(backend, args.csv_path, chunk_rows=args.chunk)
+        print(f"✈️  Luettu {report['read']} riviä, lisätty {report['inserted']} ({report['import_s']} s)")
+        print(f"🗃️  Katalogissa {report['catalog']} kenttää → {report['cache'] or '(ei välimuistia)'}")
+    elif args.command == "refresh":
+        catalog = load_catalog(backend, refresh=True)
+        print(f"🗃️  Katalogissa {len(catalog)} kenttää → {catalog_cache_path(backend) or '(ei välimuistia)'}")
+    else:
+        path = catalog_cache_path(backend)
+        t0 = time.perf_counter()
+        catalog = load_catalog(backend)
+        ms = (time.perf_counter() - t0) * 1000
+        size = os.path.getsize(path) if path and os.path.isfile(path) else 0
+        print(f"🗃️  {len(catalog)} kenttää, välimuisti {path or '-'} ({size / 1024:.0f} KiB), lataus {ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+"""
+Batched transactions: several game actions committed as one database transaction.
+
+Inside `utils.batched_transaction()` every get_connection() on the same thread returns a
+BatchMember over the batch's single connection instead of a new one. The game code keeps
+its own transaction calls: start_transaction() opens a SAVEPOINT, commit() releases it and
+rollback() rolls back to it, so one failing action is undone exactly as before while the
+rest of the batch stays pending. Nothing is durable until the batch commits; an exception
+escaping the batch rolls everything back to the previous committed batch.
+
+Works with both backends (MySQL and SQLite support savepoints). Used by fast_forward_days
+to apply K simulated days per commit.
+"""
+
+import threading
+from typing import Optional
+
+_local = threading.local()
+
+
+def current_batch() -> Optional["BatchTransaction"]:
+    """The batch open on this thread, or None."""
+    return getattr(_local, "batch", None)
+
+
+class BatchTransaction:
+    """One open transaction shared by every get_connection() on the owning thread."""
+
+    def __init__(self, yhteys):
+        self.yhteys = yhteys
+        self.savepoints = 0
+        self._cursor = None
+
+    def begin(self) -> None:
+        if current_batch() is not None:
+            raise RuntimeError("Erä on jo käynnissä tällä säikeellä.")
+        self.yhteys.start_transaction()
+        _local.batch = self
+
+    def _end(self) -> None:
+        if current_batch() is self:
+            _local.batch = None
+        if self._cursor is not None:
+            try:
+                self._cursor.close()
+            except Exception:
+                pass
+            self._cursor = None
+
+    def commit(self) -> None:
+        try:
+            self.yhteys.commit()
+        finally:
+            self._end()
+
+    def rollback(self) -> None:
+        try:
+            self.yhteys.rollback()
+        finally:
+            self._end()
+
+    def _execute(self, sql: str) -> None:
+        if self._cursor is None:
+            self._cursor = self.yhteys.cursor()
+        self._cursor.execute(sql)
+
+    def savepoint(self) -> str:
+        self.savepoints += 1
+        name = f"afc666_sp{self.savepoints}"
+        self._execute(f"SAVEPOINT {name}")
+        return name
+
+    def release(self, name: str) -> None:
+        self._execute(f"RELEASE SAVEPOINT {name}")
+
+    def rollback_to(self, name: str) -> None:
+        self._execute(f"ROLLBACK TO SAVEPOINT {name}")
+        self._execute(f"RELEASE SAVEPOINT {name}")
+
+    def member(self) -> "BatchMember":
+        return BatchMember(self)
+
+
+class BatchMember:
+    """get_connection() result inside a batch: the batch connection, with savepoints for transactions."""
+
+    def __init__(self, batch: BatchTransaction):
+        self._batch = batch
+        self._savepoint: Optional[str] = None
+
+    @property
+    def _cnx(self):
+        # Prepared-lauseiden välimuisti (storage/prepared.py) erän todelliselle yhteydelle
+        yhteys = self._batch.yhteys
+        return getattr(yhteys, "_cnx", None) or yhteys
+
+    @property
+    def in_transaction(self) -> bool:
+        return True
+
+    def cursor(self, *args, **kwargs):
+        return self._batch.yhteys.cursor(*args, **kwargs)
+
+    def start_transaction(self, **_ignored) -> None:
+        if self._savepoint is None:
+            self._savepoint = self._batch.savepoint()
+
+    def commit(self) -> None:
+        if self._savepoint is not None:
+            self._batch.release(self._savepoint)
+            self._savepoint = None
+
+    def rollback(self) -> None:
+        if self._savepoint is not None:
+            self._batch.rollback_to(self._savepoint)
+            self._savepoint = None
+
+    def close(self) -> None:
+        # Kesken jäänyt oma osuus perutaan kuten yhteyden sulkeutuessa; itse erä jää auki
+        self.rollback()
+
+    def is_connected(self) -> bool:
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._batch.yhteys, name)
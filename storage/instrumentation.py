@@ -0,0 +1,407 @@
+"""
+Query instrumentation: statement fingerprints, latency histograms and N+1 detection.
+
+When enabled, utils.get_connection() wraps every connection in InstrumentedConnection and
+each executed statement is recorded with its fingerprint (SQL with literals replaced by ?),
+latency, rows returned and the game-code call site. Records are grouped into units of work
+(`unit_of_work("name")` / `@track_action()`; a simulated day and each menu action are one
+unit), aggregated into per-action histograms, and a fingerprint repeated more than
+N_PLUS_ONE_THRESHOLD times inside one unit is flagged as a probable N+1 pattern.
+
+Disabled (the default) the only cost is one flag check per get_connection() and per tracked
+action.
+"""
+
+import atexit
+import functools
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Latenssihistogrammin ylärajat millisekunteina (viimeinen lokero = yli viimeisen rajan)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250)
+N_PLUS_ONE_THRESHOLD = 10
+NO_ACTION = "(ei toimintoa)"
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+_enabled = False
+_atexit_registered = False
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(n_plus_one_threshold: Optional[int] = None, report_at_exit: bool = True) -> None:
+    """Start recording; optionally print the report when the process exits."""
+    global _enabled, _atexit_registered, N_PLUS_ONE_THRESHOLD
+    if n_plus_one_threshold is not None:
+        N_PLUS_ONE_THRESHOLD = int(n_plus_one_threshold)
+    _enabled = True
+    if report_at_exit and not _atexit_registered:
+        atexit.register(_print_report_at_exit)
+        _atexit_registered = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+# ---------- Sormenjälki ja kutsupaikka ----------
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """Normalize a statement so executions that differ only in literals share one key."""
+    fp = _COMMENT_RE.sub(" ", sql)
+    fp = _STRING_RE.sub("?", fp)
+    fp = _NUMBER_RE.sub("?", fp)
+    fp = _PLACEHOLDER_RE.sub("?", fp)
+    fp = _IN_LIST_RE.sub("(?+)", fp)
+    return _SPACE_RE.sub(" ", fp).strip()
+
+
+def _call_site() -> str:
+    """First frame outside the storage package, as 'file.py:line function'."""
+    frame = sys._getframe(2)
+    while frame is not None and os.path.dirname(os.path.abspath(frame.f_code.co_filename)) == _HERE:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+# ---------- Työyksiköt ----------
+
+class _Unit:
+    __slots__ = ("action", "queries", "seconds", "per_fingerprint")
+
+    def __init__(self, action: str):
+        self.action = action
+        self.queries = 0
+        self.seconds = 0.0
+        self.per_fingerprint: Dict[str, list] = {}
+
+
+class _ActionStats:
+    def __init__(self):
+        self.units = 0
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.latency_hist = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.max_queries_per_unit = 0
+
+
+_actions: Dict[str, _ActionStats] = defaultdict(_ActionStats)
+_fingerprints: Dict[str, list] = {}  # fp -> [count, seconds, rows, call_sites:set]
+_n_plus_one: Dict[tuple, list] = {}  # (action, fp) -> [occurrences, max_repeat, call_site]
+
+
+def _stack() -> List[_Unit]:
+    st = getattr(_local, "stack", None)
+    if st is None:
+        st = _local.stack = []
+    return st
+
+
+class _UnitContext:
+    __slots__ = ("_action", "_unit")
+
+    def __init__(self, action: str):
+        self._action = action
+        self._unit = None
+
+    def __enter__(self):
+        self._unit = _Unit(self._action)
+        _stack().append(self._unit)
+        return self._unit
+
+    def __exit__(self, exc_type, exc, tb):
+        st = _stack()
+        if st and st[-1] is self._unit:
+            st.pop()
+        _close_unit(self._unit)
+        return False
+
+
+class _NullContext:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+def unit_of_work(action: str):
+    """Context manager grouping the statements executed inside it under `action`."""
+    if not _enabled:
+        return _NULL_CONTEXT
+    return _UnitContext(action)
+
+
+def track_action(action: Optional[str] = None):
+    """Decorator form of unit_of_work (default name: the function's qualified name)."""
+
+    def decorator(func):
+        name = action or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _UnitContext(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _close_unit(unit: _Unit) -> None:
+    with _lock:
+        stats = _actions[unit.action]
+        stats.units += 1
+        stats.max_queries_per_unit = max(stats.max_queries_per_unit, unit.queries)
+        for fp, (count, site) in unit.per_fingerprint.items():
+            if count > N_PLUS_ONE_THRESHOLD:
+                entry = _n_plus_one.setdefault((unit.action, fp), [0, 0, site])
+                entry[0] += 1
+                entry[1] = max(entry[1], count)
+
+
+def _record(sql: str, seconds: float, rows: int, site: str) -> None:
+    fp = fingerprint(sql)
+    ms = seconds * 1000.0
+    bucket = len(LATENCY_BUCKETS_MS)
+    for i, limit in enumerate(LATENCY_BUCKETS_MS):
+        if ms <= limit:
+            bucket = i
+            break
+
+    st = _stack()
+    unit = st[-1] if st else None
+    with _lock:
+        stats = _actions[unit.action if unit else NO_ACTION]
+        stats.queries += 1
+        stats.seconds += seconds
+        stats.rows += rows
+        stats.latency_hist[bucket] += 1
+        if unit is None:
+            stats.units += 1
+            stats.max_queries_per_unit = max(stats.max_queries_per_unit, 1)
+
+        agg = _fingerprints.get(fp)
+        if agg is None:
+            agg = _fingerprints[fp] = [0, 0.0, 0, set()]
+        agg[0] += 1
+        agg[1] += seconds
+        agg[2] += rows
+        if len(agg[3]) < 5:
+            agg[3].add(site)
+
+    if unit is not None:
+        unit.queries += 1
+        unit.seconds += seconds
+        per = unit.per_fingerprint.get(fp)
+        if per is None:
+            unit.per_fingerprint[fp] = [1, site]
+        else:
+            per[0] += 1
+
+
+def reset() -> None:
+    with _lock:
+        _actions.clear()
+        _fingerprints.clear()
+        _n_plus_one.clear()
+
+
+# ---------- Kääreet ----------
+
+class InstrumentedCursor:
+    """Times execute() and counts the rows fetched afterwards."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._sql = None
+        self._site = None
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def _flush(self) -> None:
+        if self._sql is not None:
+            _record(self._sql, self._elapsed, self._rows, self._site)
+            self._sql = None
+
+    def execute(self, sql, params=(), *args, **kwargs):
+        self._flush()
+        site = _call_site()
+        t0 = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params, *args, **kwargs)
+        finally:
+            self._elapsed = time.perf_counter() - t0
+            self._sql = sql if isinstance(sql, str) else str(sql)
+            self._site = site
+            self._rows = 0
+            if not getattr(self._cursor, "description", None):
+                self._flush()
+
+    def executemany(self, sql, seq_of_params):
+        self._flush()
+        site = _call_site()
+        t0 = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_of_params)
+        finally:
+            _record(sql, time.perf_counter() - t0, 0, site)
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._elapsed += time.perf_counter() - t0
+        if row is not None:
+            self._rows += 1
+        else:
+            self._flush()
+        return row
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._elapsed += time.perf_counter() - t0
+        self._rows += len(rows or ())
+        self._flush()
+        return rows
+
+    def fetchmany(self, size: int = 1):
+        t0 = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        self._elapsed += time.perf_counter() - t0
+        self._rows += len(rows or ())
+        return rows
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._rows += 1
+            yield row
+        self._flush()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Delegating connection wrapper whose cursors are InstrumentedCursors."""
+
+    def __init__(self, yhteys):
+        self.wrapped = yhteys
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self.wrapped.cursor(*args, **kwargs))
+
+    def wrap_cursor(self, cursor):
+        return InstrumentedCursor(cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.wrapped.__exit__(exc_type, exc, tb)
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+def instrument(yhteys):
+    """Wrap `yhteys` if instrumentation is enabled, otherwise return it unchanged."""
+    if not _enabled or isinstance(yhteys, InstrumentedConnection):
+        return yhteys
+    return InstrumentedConnection(yhteys)
+
+
+# ---------- Raportti ----------
+
+def _hist_line(hist: List[int]) -> str:
+    labels = [f"≤{b:g}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]:g}"]
+    return " ".join(f"{lbl}:{n}" for lbl, n in zip(labels, hist) if n)
+
+
+def _percentile_ms(hist: List[int], pct: float) -> str:
+    total = sum(hist)
+    if not total:
+        return "-"
+    target = total * pct
+    acc = 0
+    for i, n in enumerate(hist):
+        acc += n
+        if acc >= target:
+            return f"≤{LATENCY_BUCKETS_MS[i]:g}" if i < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]:g}"
+    return "-"
+
+
+def report(top: int = 10) -> str:
+    """Text report: per-action latency histograms, heaviest fingerprints and N+1 suspects."""
+    with _lock:
+        actions = {k: v for k, v in _actions.items() if v.queries}
+        fingerprints = dict(_fingerprints)
+        n_plus_one = dict(_n_plus_one)
+
+    if not actions:
+        return "Kyselytilastot: ei kirjattuja kyselyjä."
+
+    out = ["", "═══ Kyselytilastot ═══", "Toiminnot (latenssit ms):"]
+    for name, st in sorted(actions.items(), key=lambda kv: -kv[1].seconds):
+        per_unit = st.queries / st.units if st.units else 0.0
+        out.append(
+            f"  {name}: {st.units} krt | {st.queries} kyselyä ({per_unit:.1f}/krt, max {st.max_queries_per_unit}) | "
+            f"{st.seconds * 1000:.1f} ms | {st.rows} riviä | p50 {_percentile_ms(st.latency_hist, 0.5)} "
+            f"p95 {_percentile_ms(st.latency_hist, 0.95)}"
+        )
+        out.append(f"      {_hist_line(st.latency_hist)}")
+
+    out.append(f"Raskaimmat lauseet (top {top}, kokonaisaika):")
+    heavy = sorted(fingerprints.items(), key=lambda kv: -kv[1][1])[:top]
+    for fp, (count, seconds, rows, sites) in heavy:
+        short = fp if len(fp) <= 110 else fp[:107] + "..."
+        out.append(f"  {seconds * 1000:9.1f} ms | {count:6} krt | {rows:7} riviä | {short}")
+        out.append(f"      @ {', '.join(sorted(sites))}")
+
+    if n_plus_one:
+        out.append(f"Mahdolliset N+1-kuviot (sama lause > {N_PLUS_ONE_THRESHOLD} krt yhdessä työyksikössä):")
+        for (action, fp), (occurrences, worst, site) in sorted(n_plus_one.items(), key=lambda kv: -kv[1][1]):
+            short = fp if len(fp) <= 90 else fp[:87] + "..."
+            out.append(f"  ⚠️  {action}: {worst} krt (toistui {occurrences} yksikössä) @ {site}")
+            out.append(f"      {short}")
+    else:
+        out.append("N+1-kuvioita ei havaittu.")
+    return "\n".join(out)
+
+
+def _print_report_at_exit() -> None:
+    if _enabled:
+        print(report())
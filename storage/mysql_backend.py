@@ -0,0 +1,47 @@
+"""MySQL backend: mysql.connector connections, optionally handed out from a connection pool."""
+
+import threading
+
+from . import StorageBackend
+
+
+class MySQLBackend(StorageBackend):
+    name = "mysql"
+
+    def __init__(self, pool_size: int = 0, **config):
+        self.config = dict(config)
+        self.pool_size = int(pool_size or 0)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    from mysql.connector import pooling
+
+                    # Ei session resetointia palautuksessa: se hävittäisi yhteyden prepared-lauseet
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name="afc666",
+                        pool_size=self.pool_size,
+                        pool_reset_session=False,
+                        autocommit=True,
+                        **self.config,
+                    )
+        return self._pool
+
+    def connect(self):
+        import mysql.connector
+
+        if self.pool_size <= 0:
+            return mysql.connector.connect(**self.config, autocommit=True)
+
+        try:
+            yhteys = self._get_pool().get_connection()
+        except mysql.connector.errors.PoolError:
+            # Pooli tyhjä (sisäkkäiset yhteydet) -> tavallinen erillinen yhteys
+            return mysql.connector.connect(**self.config, autocommit=True)
+        if yhteys.in_transaction:
+            # Edellinen käyttäjä jätti transaktion auki: ei vuodeta sitä seuraavalle
+            yhteys.rollback()
+        return yhteys
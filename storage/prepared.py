@@ -0,0 +1,262 @@
+"""
+Registry of named, parameterized statements executed through prepared cursors.
+
+Statements are registered once by name (see session_helpers/statements.py) and executed with
+`prepared_cursor(yhteys).execute(name, params)`. On MySQL every (connection, statement) pair
+gets its own server-side prepared cursor, cached on the underlying connection, so a pooled
+connection parses each statement once and afterwards only sends the parameters. SQLite keeps
+its own per-connection statement cache, so there the same cursor is simply reused.
+
+Result rows are buffered right after execute, which keeps the unbuffered prepared cursors
+from blocking the next statement on the same connection; `stream_rows` is the exception for
+large scans and hands rows out in fetchmany batches instead. Every execution is counted per
+statement name (`statement_counts()`) and, when tracing is on, recorded as a "sql" span.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .tracing import span
+
+# Muuttuvan mittaisen IN-listan paikka lauseessa: korvataan expand-määrällä %s-merkkejä
+IN_LIST = "{in_list}"
+
+_CACHE_ATTR = "_afc666_prepared"
+
+
+class StatementRegistry:
+    """Named SQL statements plus per-statement execution counters."""
+
+    def __init__(self):
+        self._sql: Dict[str, str] = {}
+        self._expanded: Dict[Tuple[str, int], str] = {}
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, sql: str) -> str:
+        """Register `sql` under `name` (re-registering the same text is a no-op). Returns the name."""
+        existing = self._sql.get(name)
+        if existing is not None and existing != sql:
+            raise ValueError(f"SQL-lause {name!r} on jo rekisteröity eri sisällöllä")
+        self._sql[name] = sql
+        return name
+
+    def sql(self, name: str, expand: Optional[int] = None) -> str:
+        """
+        Return the statement text. With `expand`, the IN_LIST marker becomes `expand` placeholders;
+        the expanded text is cached so repeated calls return the very same string object
+        (mysql.connector re-prepares whenever the statement object changes).
+        """
+        try:
+            text = self._sql[name]
+        except KeyError:
+            raise KeyError(f"Tuntematon SQL-lause: {name!r}") from None
+        if expand is None:
+            return text
+        key = (name, int(expand))
+        expanded = self._expanded.get(key)
+        if expanded is None:
+            expanded = text.replace(IN_LIST, ",".join(["%s"] * max(1, key[1])))
+            self._expanded[key] = expanded
+        return expanded
+
+    def names(self):
+        return sorted(self._sql)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def counts(self) -> Dict[str, int]:
+        """Execution count per statement name since start (or the last reset)."""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def format_counts(self, top: Optional[int] = None) -> str:
+        """Human-readable table of execution counts, most executed first."""
+        rows = sorted(self.counts().items(), key=lambda kv: (-kv[1], kv[0]))
+        if top is not None:
+            rows = rows[:top]
+        if not rows:
+            return "(ei suoritettuja lauseita)"
+        width = max(len(name) for name, _ in rows)
+        lines = [f"{name:<{width}}  {n:>9}" for name, n in rows]
+        lines.append(f"{'yhteensä':<{width}}  {sum(n for _, n in rows):>9}")
+        return "\n".join(lines)
+
+    def cursor(self, yhteys, dictionary: bool = False) -> "PreparedCursor":
+        return PreparedCursor(self, yhteys, dictionary)
+
+    def fetch_multi(self, yhteys, statements: Sequence[Tuple[str, tuple]], dictionary: bool = True) -> List[list]:
+        """
+        Run several registered SELECTs in one round trip; returns their row lists in order.
+        On MySQL they are sent as one multi-statement query (text protocol, parameters bound
+        client-side); connections that implement execute_multi (SQLite) run them in-process.
+        """
+        raw = getattr(yhteys, "wrapped", yhteys)
+        parts = [(self.sql(name), tuple(params or ())) for name, params in statements]
+        runner = getattr(raw, "execute_multi", None)
+        with span("fetch_multi", cat="sql", statements=", ".join(name for name, _ in statements)):
+            results = runner(parts, dictionary=dictionary) if runner is not None else _mysql_multi(raw, parts, dictionary)
+        for name, _ in statements:
+            self.count(name)
+        return results
+
+    def stream(self, yhteys, name: str, params=(), batch_size: int = 50_000) -> Iterator[list]:
+        """
+        Execute a registered SELECT and yield its tuple rows in fetchmany batches of up to
+        `batch_size`, so a large result never has to be materialized at once. Uses a fresh
+        unbuffered (non-prepared) cursor that is closed when the generator finishes; consume it
+        fully before running other statements on the same connection.
+        """
+        raw = getattr(yhteys, "wrapped", yhteys)
+        cur = raw.cursor()
+        wrap = getattr(yhteys, "wrap_cursor", None)
+        if wrap is not None:
+            cur = wrap(cur)
+        try:
+            # Span kattaa vain suorituksen: generaattorin tauot eivät saa jäädä avoimen spanin sisään
+            with span(name, cat="sql", streamed=True):
+                cur.execute(self.sql(name), tuple(params or ()))
+            self.count(name)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            try:
+                cur.close()
+            except Exception:
+                pass
+
+
+def _statement_cache(yhteys) -> dict:
+    """Per-connection cache {(sql_id, dictionary): cursor}, kept on the real (non-pooled-proxy) connection."""
+    target = getattr(yhteys, "_cnx", None) or yhteys
+    conn_id = getattr(target, "connection_id", None)
+    cache = getattr(target, _CACHE_ATTR, None)
+    if cache is None or cache.get("_conn_id") != conn_id:
+        # Uusi yhteys tai uudelleenyhdistetty: palvelimen prepared-lauseet eivät ole enää voimassa
+        cache = {"_conn_id": conn_id}
+        setattr(target, _CACHE_ATTR, cache)
+    return cache
+
+
+def _mysql_multi(raw, parts: List[Tuple[str, tuple]], dictionary: bool) -> List[list]:
+    sql = ";\n".join(text.strip().rstrip(";") for text, _ in parts)
+    params = tuple(p for _, ps in parts for p in ps)
+    cur = raw.cursor(dictionary=dictionary)
+    results: List[list] = []
+    try:
+        try:
+            cur.execute(sql, params, map_results=True)
+        except TypeError:
+            # mysql-connector < 9.2: multi=True palauttaa tulosjoukot iteraattorina
+            for result in cur.execute(sql, params, multi=True):
+                results.append(result.fetchall() if result.with_rows else [])
+            return results
+        while True:
+            results.append(cur.fetchall() if cur.with_rows else [])
+            if not cur.nextset():
+                break
+        return results
+    finally:
+        cur.close()
+
+
+class PreparedCursor:
+    """
+    Cursor-like facade that executes registered statements by name on one connection.
+    fetchone/fetchall read the buffered rows; rowcount and lastrowid come from the last statement.
+    """
+
+    def __init__(self, registry: StatementRegistry, yhteys, dictionary: bool = False):
+        self._registry = registry
+        self._yhteys = yhteys
+        self._dictionary = bool(dictionary)
+        self._rows = []
+        self._pos = 0
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, name: str, params=(), expand: Optional[int] = None) -> "PreparedCursor":
+        sql = self._registry.sql(name, expand)
+        # Instrumentoitu yhteys: välimuisti ja kursorit todellisella yhteydellä, ajastus kääreellä
+        raw = getattr(self._yhteys, "wrapped", self._yhteys)
+        cache = _statement_cache(raw)
+        key = (id(sql), self._dictionary)
+        cur = cache.get(key)
+        if cur is None:
+            cur = raw.cursor(prepared=True, dictionary=self._dictionary)
+            cache[key] = cur
+        wrap = getattr(self._yhteys, "wrap_cursor", None)
+        if wrap is not None:
+            cur = wrap(cur)
+
+        with span(name, cat="sql") as sp:
+            cur.execute(sql, tuple(params or ()))
+            self._rows = cur.fetchall() if cur.description else []
+            sp.set(rows=len(self._rows), rowcount=cur.rowcount)
+        self._registry.count(name)
+
+        self._pos = 0
+        self.rowcount = cur.rowcount
+        self.lastrowid = cur.lastrowid
+        return self
+
+    def fetchone(self):
+        if self._pos >= len(self._rows):
+            return None
+        row = self._rows[self._pos]
+        self._pos += 1
+        return row
+
+    def fetchall(self):
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return rows
+
+    def close(self) -> None:
+        # Välimuistissa olevat kursorit jäävät yhteydelle; suljetaan vain puskuri
+        self._rows = []
+        self._pos = 0
+
+
+REGISTRY = StatementRegistry()
+
+
+def register(name: str, sql: str) -> str:
+    return REGISTRY.register(name, sql)
+
+
+def prepared_cursor(yhteys, dictionary: bool = False) -> PreparedCursor:
+    """Return a facade executing REGISTRY statements through prepared cursors on `yhteys`."""
+    return REGISTRY.cursor(yhteys, dictionary=dictionary)
+
+
+def fetch_multi(yhteys, statements: Sequence[Tuple[str, tuple]], dictionary: bool = True) -> List[list]:
+    """Run registered SELECTs [(name, params), ...] in one round trip (see StatementRegistry.fetch_multi)."""
+    return REGISTRY.fetch_multi(yhteys, statements, dictionary=dictionary)
+
+
+def stream_rows(yhteys, name: str, params=(), batch_size: int = 50_000) -> Iterator[list]:
+    """Yield a registered SELECT's tuple rows in fetchmany batches (see StatementRegistry.stream)."""
+    return REGISTRY.stream(yhteys, name, params, batch_size)
+
+
+def statement_counts() -> Dict[str, int]:
+    return REGISTRY.counts()
+
+
+def reset_statement_counts() -> None:
+    REGISTRY.reset_counts()
+
+
+def format_statement_counts(top: Optional[int] = None) -> str:
+    return REGISTRY.format_counts(top)
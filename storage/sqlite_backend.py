@@ -0,0 +1,242 @@
+"""
+Embedded SQLite backend.
+
+The schema is derived from build_db_script.sql at first connect, so the two never drift,
+and a small seed airport table is bundled (seed_airports.csv). Connections are wrapped so
+game code written for mysql.connector runs unchanged:
+
+- `%s` placeholders become `?`, `FOR UPDATE` is dropped, `INSERT IGNORE` becomes
+  `INSERT OR IGNORE` (translations are cached per statement text).
+- `start_transaction()` issues BEGIN; `cursor(dictionary=True)` returns dict rows.
+- One underlying sqlite3 connection per thread is shared by all wrappers, so nested
+  get_connection() calls inside a transaction see (and join) that transaction instead
+  of deadlocking on the database lock. Only the wrapper that began a transaction may
+  commit or roll it back.
+"""
+
+import csv
+import datetime
+import os
+import re
+import sqlite3
+import threading
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional
+
+from . import StorageBackend
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_REPO_ROOT = os.path.dirname(_HERE)
+SCHEMA_SCRIPT = os.path.join(_REPO_ROOT, "build_db_script.sql")
+SEED_AIRPORTS = os.path.join(_HERE, "seed_airports.csv")
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+
+_FOR_UPDATE_RE = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+_INSERT_IGNORE_RE = re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def translate_sql(sql: str) -> str:
+    """Translate the MySQL dialect used by the game into SQLite."""
+    sql = _FOR_UPDATE_RE.sub("", sql)
+    sql = _INSERT_IGNORE_RE.sub("INSERT OR IGNORE", sql)
+    return sql.replace("%s", "?")
+
+
+def translate_schema(script: str) -> str:
+    """Turn build_db_script.sql into an SQLite script (auto-increment keys, no engine/index clauses)."""
+    script = re.sub(r"INT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY", "INTEGER PRIMARY KEY AUTOINCREMENT", script, flags=re.I)
+    script = re.sub(r"\)\s*ENGINE\s*=\s*\w+[^;]*;", ");", script, flags=re.I)
+    # Taulun sisäiset INDEX-määrittelyt eivät ole SQLitessä sallittuja
+    script = re.sub(r",\s*\n\s*INDEX\s+\w+\s*\([^)]*\)", "", script, flags=re.I)
+    return script
+
+
+class SQLiteCursor:
+    """mysql.connector-like cursor over sqlite3 (tuple or dict rows)."""
+
+    def __init__(self, raw: sqlite3.Cursor, dictionary: bool = False):
+        self._raw = raw
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self) -> int:
+        return self._raw.rowcount
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._raw.lastrowid
+
+    @property
+    def description(self):
+        return self._raw.description
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in (self._raw.description or ()))
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def execute(self, sql: str, params=()):
+        self._raw.execute(translate_sql(sql), tuple(params or ()))
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        self._raw.executemany(translate_sql(sql), [tuple(p) for p in seq_of_params])
+        return self
+
+    def fetchone(self):
+        return self._row(self._raw.fetchone())
+
+    def fetchmany(self, size: int = 1):
+        return [self._row(r) for r in self._raw.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._raw.fetchall()]
+
+    def __iter__(self):
+        for r in self._raw:
+            yield self._row(r)
+
+    def close(self) -> None:
+        try:
+            self._raw.close()
+        except sqlite3.ProgrammingError:
+            pass
+
+
+class SQLiteConnection:
+    """Per-call wrapper over the thread's shared sqlite3 connection."""
+
+    def __init__(self, raw: sqlite3.Connection):
+        self._raw = raw
+        self._owns_tx = False
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._raw.in_transaction
+
+    def cursor(self, dictionary: bool = False, **_ignored) -> SQLiteCursor:
+        return SQLiteCursor(self._raw.cursor(), dictionary=dictionary)
+
+    def start_transaction(self, **_ignored) -> None:
+        if not self._raw.in_transaction:
+            self._raw.execute("BEGIN")
+            self._owns_tx = True
+
+    def commit(self) -> None:
+        if self._owns_tx and self._raw.in_transaction:
+            self._raw.execute("COMMIT")
+        self._owns_tx = False
+
+    def rollback(self) -> None:
+        if self._owns_tx and self._raw.in_transaction:
+            self._raw.execute("ROLLBACK")
+        self._owns_tx = False
+
+    def close(self) -> None:
+        # Kesken jäänyt oma transaktio perutaan kuten MySQL-yhteyden sulkeutuessa
+        self.rollback()
+
+    def is_connected(self) -> bool:
+        return True
+
+    def execute_multi(self, parts, dictionary: bool = False) -> list:
+        """Run [(sql, params), ...] in order and return each statement's rows (no network round trips)."""
+        results = []
+        for sql, params in parts:
+            cursor = self.cursor(dictionary=dictionary)
+            cursor.execute(sql, params)
+            results.append(cursor.fetchall() if cursor.description else [])
+            cursor.close()
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite file or `:memory:` database with the game schema and seed airports."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ":memory:", seed_airports: bool = True):
+        self.path = path
+        self.seed_airports = seed_airports
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._keeper: Optional[sqlite3.Connection] = None
+        if path == ":memory:":
+            # Jaettu muistikanta: kaikki säikeet näkevät saman datan niin kauan kuin keeper elää
+            self._uri = f"file:afc666-mem-{id(self)}?mode=memory&cache=shared"
+        else:
+            self._uri = None
+
+    def _open(self) -> sqlite3.Connection:
+        if self._uri:
+            raw = sqlite3.connect(self._uri, uri=True, isolation_level=None, check_same_thread=False)
+        else:
+            raw = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            raw.execute("PRAGMA journal_mode=WAL")
+            raw.execute("PRAGMA synchronous=NORMAL")
+        return raw
+
+    def _raw_connection(self) -> sqlite3.Connection:
+        raw = getattr(self._local, "raw", None)
+        if raw is None:
+            raw = self._open()
+            self._local.raw = raw
+        return raw
+
+    def _ensure_schema(self, raw: sqlite3.Connection) -> None:
+        with self._init_lock:
+            if self._initialized:
+                return
+            if self._uri and self._keeper is None:
+                self._keeper = raw
+            exists = raw.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'game_saves'"
+            ).fetchone()
+            if not exists:
+                self.create_schema(raw)
+            self._initialized = True
+
+    def create_schema(self, raw: sqlite3.Connection) -> None:
+        """Create the game schema (from build_db_script.sql, airport table included) and the seed airports."""
+        with open(SCHEMA_SCRIPT, encoding="utf-8") as fh:
+            raw.executescript(translate_schema(fh.read()))
+        if self.seed_airports:
+            load_seed_airports(raw)
+
+    def connect(self) -> SQLiteConnection:
+        raw = self._raw_connection()
+        if not self._initialized:
+            self._ensure_schema(raw)
+        return SQLiteConnection(raw)
+
+
+def load_seed_airports(raw: sqlite3.Connection, path: str = SEED_AIRPORTS) -> int:
+    """Insert the bundled seed airports (ignores idents that already exist). Returns rows read."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = [
+            (r["ident"], r["type"], r["name"], float(r["latitude_deg"]), float(r["longitude_deg"]), r["iso_country"])
+            for r in csv.DictReader(fh)
+        ]
+    raw.executemany(
+        "INSERT OR IGNORE INTO airport (ident, type, name, latitude_deg, longitude_deg, iso_country) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    return len(rows)
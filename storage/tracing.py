@@ -0,0 +1,247 @@
+"""
+Span-based tracing exported as Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev).
+
+    with span("päivä", day=12) as sp:
+        ...
+        sp.set(arrivals=3)
+
+    @traced("tehtävä: lähetä")
+    def _start_task_tx(...): ...
+
+Every span becomes one complete ("X") event with its thread, start, duration and attributes,
+so the viewer shows which statements ran inside which phase and where connections were
+opened. When tracing is disabled (the default) span() returns a shared no-op context and
+traced() calls straight through: the cost is one flag check per call.
+
+Enable with AFC666_TRACE=<file.json> (written at exit) or enable()/export() directly.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Puskurin yläraja: pitkä pikakelaus ei saa kasvattaa muistia rajatta
+MAX_EVENTS = 500_000
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+_events: List[dict] = []
+_dropped = 0
+_origin_ns = 0
+_thread_ids: Dict[int, int] = {}
+_export_path: Optional[str] = None
+_atexit_registered = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(path: Optional[str] = None) -> None:
+    """Start recording spans; with `path` the trace is written there when the process exits."""
+    global _enabled, _origin_ns, _export_path, _atexit_registered
+    if not _enabled:
+        _origin_ns = time.perf_counter_ns()
+    _enabled = True
+    if path:
+        _export_path = path
+        if not _atexit_registered:
+            atexit.register(_export_at_exit)
+            _atexit_registered = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def reset() -> None:
+    global _dropped
+    with _lock:
+        _events.clear()
+        _thread_ids.clear()
+        _dropped = 0
+
+
+def _tid() -> int:
+    ident = threading.get_ident()
+    tid = _thread_ids.get(ident)
+    if tid is None:
+        with _lock:
+            tid = _thread_ids.setdefault(ident, len(_thread_ids) + 1)
+    return tid
+
+
+def _append(event: dict) -> None:
+    global _dropped
+    with _lock:
+        if len(_events) < MAX_EVENTS:
+            _events.append(event)
+        else:
+            _dropped += 1
+
+
+def _attr(value):
+    # JSON-kelvollinen arvo (Decimal, datetime ym. merkkijonoiksi)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+# ---------- Spanit ----------
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "_start")
+
+    def __init__(self, name: str, cat: str, args: dict):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self._start = 0
+
+    def set(self, **attrs) -> None:
+        self.args.update(attrs)
+
+    def __enter__(self) -> "_Span":
+        st = getattr(_local, "stack", None)
+        if st is None:
+            st = _local.stack = []
+        st.append(self)
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        st = _local.stack
+        if st and st[-1] is self:
+            st.pop()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        record_span(self.name, self._start, end, self.cat, **self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, cat: str = "game", **attrs):
+    """Context manager timing the block as one span; attributes go to the event's args."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, cat, attrs)
+
+
+def traced(name: Optional[str] = None, cat: str = "game"):
+    """Decorator form of span() (default name: the function's qualified name)."""
+
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(label, cat, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def annotate(**attrs) -> None:
+    """Add attributes to the innermost open span of this thread (no-op when tracing is off)."""
+    if not _enabled:
+        return
+    st = getattr(_local, "stack", None)
+    if st:
+        st[-1].args.update(attrs)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, cat: str = "game", **attrs) -> None:
+    """Record an already measured span (perf_counter_ns timestamps), e.g. a PhaseTimer lap."""
+    if not _enabled:
+        return
+    event = {
+        "name": name,
+        "cat": cat,
+        "ph": "X",
+        "ts": (start_ns - _origin_ns) / 1000.0,
+        "dur": (end_ns - start_ns) / 1000.0,
+        "pid": os.getpid(),
+        "tid": _tid(),
+    }
+    if attrs:
+        event["args"] = {k: _attr(v) for k, v in attrs.items()}
+    _append(event)
+
+
+def instant(name: str, cat: str = "game", **attrs) -> None:
+    """A zero-length marker on this thread's timeline."""
+    if not _enabled:
+        return
+    event = {
+        "name": name,
+        "cat": cat,
+        "ph": "i",
+        "s": "t",
+        "ts": (time.perf_counter_ns() - _origin_ns) / 1000.0,
+        "pid": os.getpid(),
+        "tid": _tid(),
+    }
+    if attrs:
+        event["args"] = {k: _attr(v) for k, v in attrs.items()}
+    _append(event)
+
+
+# ---------- Vienti ----------
+
+def trace_events() -> List[dict]:
+    """Recorded events plus process/thread name metadata, in the trace-event format."""
+    pid = os.getpid()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    with _lock:
+        events = list(_events)
+        threads = dict(_thread_ids)
+    meta = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "afc666"}}]
+    for ident, tid in threads.items():
+        meta.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                     "args": {"name": names.get(ident, f"thread-{tid}")}})
+    return meta + events
+
+
+def export(path: str) -> int:
+    """Write the trace as Chrome trace-event JSON; returns the number of events written."""
+    events = trace_events()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                   "otherData": {"dropped_events": _dropped}}, fh, separators=(",", ":"))
+    return len(events)
+
+
+def _export_at_exit() -> None:
+    if _export_path and _events:
+        count = export(_export_path)
+        dropped = f", {_dropped} pudotettu" if _dropped else ""
+        print(f"🧵 Jäljitys: {count} tapahtumaa → {_export_path}{dropped} (chrome://tracing / ui.perfetto.dev)")
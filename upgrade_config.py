@@ -73,4 +73,45 @@ BILL_GROWTH_RATE: Decimal = Decimal("0.05")
 # ---------- Pelin tavoite ----------
 # Suuntaa-antava tavoite tasapainolle: kuinka monen päivän yli pitäisi kyetä
 # selviämään tyypillisellä pelillä ilman konkurssia.
-SURVIVAL_TARGET_DAYS: int = 666
\ No newline at end of file
+SURVIVAL_TARGET_DAYS: int = 666
+
+# ---------- Kerhohuone: kerroin- ja voittotaulukot ----------
+# Pelien todennäköisyydet ja voitot kuvataan taulukkoina, jotta talon etu voidaan
+# laskea tarkasti (session_helpers.clubhouse) ja interaktiiviset pelit käyttävät
+# täsmälleen samoja lukuja. Voitot ovat NETTOkertoimia panokseen nähden:
+# +1 = voitat panoksen verran, -1 = menetät panoksen.
+
+# Kruuna vai Klaava: painot puolille (kr, kl)
+COIN_FLIP_SIDES: tuple = ("kr", "kl")
+COIN_FLIP_WEIGHTS: tuple = (49, 51)
+COIN_FLIP_WIN: int = 1
+
+# Suurempi vai Pienempi: kaksi tasapainoista noppaa, tasapeli häviää
+HIGH_LOW_FACES: tuple = (1, 2, 3, 4, 5, 6)
+HIGH_LOW_WIN: int = 1
+
+# Yksikätinen Rosvo: kolme samanlaista kiekkoa
+SLOT_SYMBOLS: tuple = ("🍒", "🍋", "🔔", "💎", "💰")
+SLOT_WEIGHTS: tuple = (40, 30, 20, 9, 1)
+# Voittorivit järjestyksessä (ensimmäinen osuma voittaa). None = mikä tahansa symboli.
+# Kerroin on BRUTTO (panos veloitetaan ennen pyöräytystä), kuten pelissä aina ennenkin.
+SLOT_PAYLINES: list = [
+    (("💰", "💰", "💰"), 50, "✨ JÄTTIPOTTI! ✨"),
+    (("💎", "💎", "💎"), 20, "💎 Timanttivoitto!"),
+    (("🔔", "🔔", "🔔"), 10, "🔔 Kellot soivat!"),
+    (("🍋", "🍋", "🍋"), 5, "🍋 Sitruunavoitto!"),
+    (("🍒", "🍒", "🍒"), 3, "🍒 Kirsikkavoitto!"),
+    (("🍒", "🍒", None), 2, "🍒 Pieni kirsikkavoitto!"),
+]
+
+# ---------- Käytettyjen koneiden markkinat ----------
+# Tarjonta johdetaan deterministisesti (rng_seed, ikkuna) -parista, joten markkinoita
+# ei tallenneta kantaan. Ikkuna vaihtuu MARKET_WINDOW_DAYS päivän välein.
+MARKET_WINDOW_DAYS: int = 10
+MARKET_MIN_LISTINGS: int = 5
+MARKET_MAX_LISTINGS: int = 10
+
+# ---------- Toimintojournaali ----------
+# Jokainen pelaajan toiminto kirjataan action_journal-tauluun; koko tallennuksen tila
+# tallennetaan save_snapshots-tauluun JOURNAL_SNAPSHOT_EVERY_DAYS päivän välein (replay.py).
+JOURNAL_SNAPSHOT_EVERY_DAYS: int = 30
@@ -1,10 +1,119 @@
-import mysql.connector
+import os
+from contextlib import contextmanager
+
+from storage import get_backend as _make_backend
+from storage import instrumentation
+from storage import tracing
+from storage.batch import BatchTransaction, current_batch
+
+# Yhteysasetukset yhdessä paikassa (synkroninen ja asynkroninen polku käyttävät samoja)
+DB_CONFIG = {
+    "host": "127.0.0.1",
+    "user": "golda",
+    "password": "GoldaKoodaa",
+    "database": "airway666",
+}
+
+# Tallennustausta: "mysql" (oletus) tai "sqlite" (upotettu, ei palvelinta; polku tai ":memory:")
+DB_BACKEND = os.environ.get("AFC666_DB_BACKEND", "mysql")
+SQLITE_PATH = os.environ.get("AFC666_SQLITE_PATH", ":memory:")
+# MySQL-yhteyspoolin koko (0 = uusi yhteys jokaiselle get_connection-kutsulle)
+DB_POOL_SIZE = int(os.environ.get("AFC666_DB_POOL_SIZE", "8"))
+# Kyselyinstrumentointi (latenssit, N+1-tunnistus, raportti lopussa): AFC666_QUERY_STATS=1
+QUERY_STATS = os.environ.get("AFC666_QUERY_STATS", "").strip() not in ("", "0")
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("AFC666_N_PLUS_ONE", "10"))
+# Toimintojournaali (action_journal + save_snapshots, ks. replay.py): AFC666_JOURNAL=0 poistaa käytöstä
+JOURNAL = os.environ.get("AFC666_JOURNAL", "1").strip() not in ("", "0")
+# Aikajanajäljitys (Chrome trace JSON, kirjoitetaan lopussa): AFC666_TRACE=polku.json
+TRACE_PATH = os.environ.get("AFC666_TRACE", "").strip()
+# Muistiinstrumentointi pikakelaukseen (tracemalloc-snapshotit päivien välissä): AFC666_MEMTRACE=1
+MEMTRACE = os.environ.get("AFC666_MEMTRACE", "").strip() not in ("", "0")
+# Pikakelauksen eräkoko: montako päivää yhteen transaktioon (1 = jokainen päivä erikseen)
+FF_BATCH_DAYS = max(1, int(os.environ.get("AFC666_FF_BATCH_DAYS", "30")))
+
+if QUERY_STATS:
+    instrumentation.enable(n_plus_one_threshold=N_PLUS_ONE_THRESHOLD)
+if TRACE_PATH:
+    tracing.enable(TRACE_PATH)
+
+_backend = None
+
+
+def get_backend():
+    """
+    Palauttaa prosessin yhteisen tallennustaustan (luodaan ensimmäisellä kutsulla).
+    """
+    global _backend
+    if _backend is None:
+        if DB_BACKEND.strip().lower() == "sqlite":
+            _backend = _make_backend("sqlite", path=SQLITE_PATH)
+        else:
+            _backend = _make_backend(DB_BACKEND, pool_size=DB_POOL_SIZE, **DB_CONFIG)
+    return _backend
+
+
+@contextmanager
+def use_backend(backend):
+    """
+    Vaihtaa prosessin tallennustaustan lohkon ajaksi (esim. replay muistikantaan) ja palauttaa edellisen.
+    """
+    global _backend
+    previous, _backend = _backend, backend
+    try:
+        yield backend
+    finally:
+        _backend = previous
+
+
+@contextmanager
+def batched_transaction():
+    """
+    Kokoaa lohkon kaikki get_connection()-kutsut (tällä säikeellä) yhdeksi transaktioksi, joka
+    commitoidaan lohkon lopussa; poikkeus peruu koko erän (ks. storage/batch.py).
+    """
+    batch = BatchTransaction(get_backend().connect())
+    batch.begin()
+    try:
+        with tracing.span("db.batch", cat="db"):
+            yield batch
+    except BaseException:
+        batch.rollback()
+        raise
+    else:
+        batch.commit()
+    finally:
+        try:
+            batch.yhteys.close()
+        except Exception:
+            pass
+
 
 def get_connection():
-    return mysql.connector.connect(
-        host="127.0.0.1",
-        user="golda",
-        password="GoldaKoodaa",
-        database="airway666",
-        autocommit=True
-    )
\ No newline at end of file
+    batch = current_batch()
+    if batch is not None:
+        yhteys = batch.member()
+    elif tracing.is_enabled():
+        with tracing.span("db.connect", cat="db", backend=get_backend().name):
+            yhteys = get_backend().connect()
+    else:
+        yhteys = get_backend().connect()
+    if instrumentation.is_enabled():
+        return instrumentation.instrument(yhteys)
+    return yhteys
+
+
+async def get_async_pool(minsize: int = 1, maxsize: int = 10):
+    """
+    Luo aiomysql-yhteyspoolin samoilla asetuksilla (asyncio-polku, ks. async_session.py).
+    """
+    import aiomysql
+
+    return await aiomysql.create_pool(
+        host=DB_CONFIG["host"],
+        user=DB_CONFIG["user"],
+        password=DB_CONFIG["password"],
+        db=DB_CONFIG["database"],
+        autocommit=True,
+        minsize=minsize,
+        maxsize=maxsize,
+    )